@@ -4,7 +4,7 @@ Grace note drawing mixin for the Editor class.
 Handles drawing grace note events on the piano roll canvas.
 '''
 from __future__ import annotations
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional, Tuple
 
 if TYPE_CHECKING:
     from file.SCORE import SCORE, GraceNote
@@ -23,8 +23,12 @@ class GraceNoteDrawerMixin:
         def pitch_to_x(self, pitch: int) -> float: ...
         def time_to_y(self, time: float) -> float: ...
     
-    def _draw_grace_notes(self) -> None:
-        '''Draw all grace note events from all staves.'''
+    def _draw_grace_notes(self, window: Optional[Tuple[float, float]] = None) -> None:
+        '''Draw the grace note events of the rendered stave.
+
+        Args:
+            window: (start, end) tick range to draw the grace notes of; None draws all of them
+        '''
         if not self.score:
             return
         
@@ -36,7 +40,24 @@ class GraceNoteDrawerMixin:
         # Draw grace notes from the currently rendered stave
         stave = self.score.stave[stave_idx]
         for gracenote in stave.event.graceNote:
-            self._draw_single_gracenote(stave_idx, gracenote)
+            if self._gracenote_in_window(gracenote, window):
+                self._draw_single_gracenote(stave_idx, gracenote)
+
+    def _shift_grace_note_window(self, stave_idx: int, old_window: Optional[Tuple[float, float]],
+                                 new_window: Optional[Tuple[float, float]]) -> None:
+        '''Draw the grace notes entering new_window and delete those leaving old_window.'''
+        for gracenote in self.score.stave[stave_idx].event.graceNote:
+            was_in = self._gracenote_in_window(gracenote, old_window)
+            is_in = self._gracenote_in_window(gracenote, new_window)
+            if was_in and not is_in:
+                self.canvas.delete_by_tag(str(gracenote.id))
+            elif is_in and not was_in:
+                self._draw_single_gracenote(stave_idx, gracenote)
+
+    @staticmethod
+    def _gracenote_in_window(gracenote: GraceNote, window: Optional[Tuple[float, float]]) -> bool:
+        '''Whether a grace note lies in window (always True for None).'''
+        return window is None or window[0] <= gracenote.time <= window[1]
 
     def _draw_single_gracenote(self, stave_idx: int, gracenote: GraceNote, 
                                draw_mode: str = 'grace_note') -> None:
@@ -4,6 +4,9 @@ Grid and barline drawing mixin for the Editor class.
 Handles drawing barlines, measure numbers, and gridlines.
 '''
 
+import math
+from typing import Any, Dict, Optional, Tuple
+
 from kivy.metrics import sp
 from gui.colors import LIGHT_DARKER_HEX
 from utils.CONSTANTS import PIANOTICK_QUARTER
@@ -15,30 +18,76 @@ class GridDrawerMixin:
         Mixin for drawing barlines and grid lines.
     '''
     
-    def _draw_barlines_and_grid(self):
-        '''Draw barlines and grid lines based on baseGrid configuration.'''
+    # Category tags of the barlines, grid and time signatures (a static layer, see Editor.redraw_pianoroll)
+    GRID_TAGS = ('time_signature_indicator', 'barline', 'measurenumber', 'gridline', 'cursor_grid')
+    
+    def _grid_layer_key(self) -> tuple:
+        '''Everything the barlines and grid depend on besides the window; the layer is only redrawn when this changes.'''
+        basegrid = self.score.properties.globalBasegrid
+        return (
+            self.score.timeline().key,
+            self.canvas._quarter_note_spacing_mm, self.scroll_time_offset,
+            self.editor_margin, self.stave_width, self.canvas.height_mm,
+            self.grid_selector.get_grid_step(),
+            self.barline_color, basegrid.barlineWidthMm,
+            basegrid.gridlineColor, basegrid.gridlineWidthMm, tuple(basegrid.gridlineDashPatternMm),
+            self.score.properties.globalMeasureNumbering.color,
+        )
+    
+    def _grid_measures(self, window: Optional[Tuple[float, float]]) -> Dict[str, Tuple[Any, int]]:
+        '''Measure tag -> (span, measure index) of the measures that overlap window (None = all measures).'''
+        window_start, window_end = window if window is not None else (float('-inf'), float('inf'))
+        measures = {}
+        for span in self.score.timeline().spans:
+            if span.end < window_start or span.start > window_end:
+                continue
+            meas_length = span.measure_ticks
+            first_idx = max(0, math.floor((window_start - span.start) / meas_length)) if window is not None else 0
+            last_idx = min(span.measure_amount, math.ceil((window_end - span.start) / meas_length)) if window is not None else span.measure_amount
+            for meas_idx in range(first_idx, last_idx):
+                measures[f'grid_measure_{int(span.measure_start(meas_idx))}'] = (span, meas_idx)
+        return measures
+    
+    def _draw_barlines_and_grid(self, window: Optional[Tuple[float, float]] = None):
+        '''Draw barlines and grid lines based on baseGrid configuration.
         
-        # Initialize
-        time_cursor = 0.0
-        measure_number = 1
-        unit = self.score.fileSettings.quarterNoteUnit
-        barlines = self._get_barline_positions()
+        Args:
+            window: (start, end) tick range to draw the measures of; None draws the whole score
+        '''
+        for measure_tag, (span, meas_idx) in self._grid_measures(window).items():
+            self._draw_grid_measure(measure_tag, span, meas_idx)
+        self._grid_window = window
+    
+    def _shift_grid_window(self, window: Optional[Tuple[float, float]]):
+        '''Draw the measures entering window and delete those leaving it, keeping the rest of the grid layer.'''
+        if window == self._grid_window:
+            return
+        old_measures = self._grid_measures(self._grid_window)
+        new_measures = self._grid_measures(window)
+        for measure_tag in old_measures.keys() - new_measures.keys():
+            self.canvas.delete_by_tag(measure_tag)
+        with self.canvas.default_tagging():
+            for measure_tag in new_measures.keys() - old_measures.keys():
+                self._draw_grid_measure(measure_tag, *new_measures[measure_tag])
+        self._grid_window = window
+    
+    def _draw_grid_measure(self, measure_tag: str, span, meas_idx: int):
+        '''Draw one measure of the grid; every item is tagged with measure_tag so it can be evicted on its own.'''
+        op = OperatorThreshold()
         
-        for grid in self.score.baseGrid:
-            
-            # Values from baseGrid
-            num = grid.numerator
-            den = grid.denominator
-            gt = grid.gridTimes
-            amount = grid.measureAmount
-            tsig_indicator_visible = grid.timeSignatureIndicatorVisible
-            
-            # How long is one measure?
-            meas_length = (unit * 4) * (num / den)
-
-            barline_y = self.time_to_y(time_cursor)
+        # Values from baseGrid
+        num = span.numerator
+        den = span.denominator
+        gt = span.grid_times
+        
+        # How long is one measure?
+        meas_length = span.measure_ticks
+        time_cursor = span.measure_start(meas_idx)
+        measure_end = time_cursor + meas_length
+        barline_y = self.time_to_y(time_cursor)
 
-            # Draw time-signature-indicator:
+        # Draw time-signature-indicator (with the first measure of the span):
+        if meas_idx == 0:
             # numerator
             self.canvas.add_text(
                 x_mm=self.editor_margin - 10,  # Slightly right of stave left
@@ -47,7 +96,7 @@ class GridDrawerMixin:
                 font_size_pt=16,
                 anchor='bc',
                 color='#000000',
-                tags=['time_signature_indicator', f'time_signature_indicator_{int(time_cursor)}']
+                tags=['time_signature_indicator', f'time_signature_indicator_{int(time_cursor)}', measure_tag]
             )
             # divide line
             self.canvas.add_line(
@@ -57,7 +106,7 @@ class GridDrawerMixin:
                 y2_mm=barline_y,
                 color='#000000',
                 width_mm=0.25,
-                tags=['time_signature_indicator', f'time_signature_indicator_{int(time_cursor)}']
+                tags=['time_signature_indicator', f'time_signature_indicator_{int(time_cursor)}', measure_tag]
             )
             # denominator
             self.canvas.add_text(
@@ -67,101 +116,92 @@ class GridDrawerMixin:
                 font_size_pt=16,
                 anchor='tc',
                 color='#000000',
-                tags=['time_signature_indicator', f'time_signature_indicator_{int(time_cursor)}']
+                tags=['time_signature_indicator', f'time_signature_indicator_{int(time_cursor)}', measure_tag]
             )
+        
+        # Draw barline at start of measure
+        # Only draw if within viewport
+        if 0 <= barline_y <= self.canvas.height_mm + self.editor_margin:
+            self.canvas.add_line(
+                x1_mm=self.editor_margin, 
+                y1_mm=barline_y,
+                x2_mm=self.editor_margin + self.stave_width, 
+                y2_mm=barline_y,
+                color=self.barline_color,
+                width_mm=self.score.properties.globalBasegrid.barlineWidthMm,
+                tags=['barline', f'barline_{int(time_cursor)}', measure_tag]
+            )
+            
+            # Draw measure number 
+            self.canvas.add_text(
+                x_mm=1,  # Position to the left of the barline
+                y_mm=barline_y,  # Slightly below the barline
+                text=str(span.first_measure + meas_idx + 1),
+                font_size_pt=16,
+                anchor='top_left',
+                color=self.score.properties.globalMeasureNumbering.color,
+                tags=['measurenumber', f'measurenumber_{int(time_cursor)}', measure_tag]
+            )
+        
+        # Draw grid lines at subdivision points defined in gridTimes
+        for i, grid_time in enumerate(gt):
+            # Skip if grid_time is 0 (that's the barline position)
+            if grid_time == 0:
+                continue
+            
+            # Calculate absolute time position
+            grid_tick_position = time_cursor + grid_time
+            y1 = self.time_to_y(grid_tick_position)
             
-            for meas_idx in range(amount):
-                
-                # Draw barline at start of measure
-                barline_y = self.time_to_y(time_cursor)
-                
-                # Only draw if within viewport
-                if 0 <= barline_y <= self.canvas.height_mm + self.editor_margin:
-                    self.canvas.add_line(
-                        x1_mm=self.editor_margin, 
-                        y1_mm=barline_y,
-                        x2_mm=self.editor_margin + self.stave_width, 
-                        y2_mm=barline_y,
-                        color=self.barline_color,
-                        width_mm=self.score.properties.globalBasegrid.barlineWidthMm,
-                        tags=['barline', f'barline_{int(time_cursor)}']
-                    )
-                    
-                    # Draw measure number 
-                    self.canvas.add_text(
-                        x_mm=1,  # Position to the left of the barline
-                        y_mm=barline_y,  # Slightly below the barline
-                        text=str(measure_number),
-                        font_size_pt=16,
-                        anchor='top_left',
-                        color=self.score.properties.globalMeasureNumbering.color,
-                        tags=['measurenumber', f'measurenumber_{int(time_cursor)}']
-                    )
-                    measure_number += 1
-                
-                # Draw grid lines at subdivision points defined in gridTimes
-                for i, grid_time in enumerate(gt):
-                    # Skip if grid_time is 0 (that's the barline position)
-                    if grid_time == 0:
-                        continue
-                    
-                    # Calculate absolute time position
-                    grid_tick_position = time_cursor + grid_time
-                    y1 = self.time_to_y(grid_tick_position)
-                    
-                    # draw gridTimes gridlines
-                    if 0 <= y1 <= self.canvas.height_mm + self.editor_margin:
-                        self.canvas.add_line(
-                            x1_mm=self.editor_margin, 
-                            y1_mm=y1,
-                            x2_mm=self.editor_margin + self.stave_width, 
-                            y2_mm=y1,
-                            color=self.score.properties.globalBasegrid.gridlineColor,
-                            width_mm=self.score.properties.globalBasegrid.gridlineWidthMm,
-                            dash=True,  # Dashed gridlines
-                            dash_pattern_mm=self.score.properties.globalBasegrid.gridlineDashPatternMm,
-                            tags=['gridline', f'gridline_{int(grid_tick_position)}_{i}']
-                        )
+            # draw gridTimes gridlines
+            if 0 <= y1 <= self.canvas.height_mm + self.editor_margin:
+                self.canvas.add_line(
+                    x1_mm=self.editor_margin, 
+                    y1_mm=y1,
+                    x2_mm=self.editor_margin + self.stave_width, 
+                    y2_mm=y1,
+                    color=self.score.properties.globalBasegrid.gridlineColor,
+                    width_mm=self.score.properties.globalBasegrid.gridlineWidthMm,
+                    dash=True,  # Dashed gridlines
+                    dash_pattern_mm=self.score.properties.globalBasegrid.gridlineDashPatternMm,
+                    tags=['gridline', f'gridline_{int(grid_tick_position)}_{i}', measure_tag]
+                )
 
-                # draw grid 3 based on the grid unit
-                grid_step = self.grid_selector.get_grid_step()
-                grid_step_cursor = 0.0
-                color = "#d9d9d9"
-                is_color = True
-                while OperatorThreshold().less(grid_step_cursor, meas_length):
-                    grid_tick_position = time_cursor + grid_step_cursor
-                    y1 = self.time_to_y(grid_tick_position)
-                    y2 = self.time_to_y(grid_tick_position + grid_step)
+        # draw grid 3 based on the grid unit
+        grid_step = self.grid_selector.get_grid_step()
+        grid_step_cursor = 0.0
+        color = "#d9d9d9"
+        is_color = True
+        while op.less(grid_step_cursor, meas_length):
+            grid_tick_position = time_cursor + grid_step_cursor
+            y1 = self.time_to_y(grid_tick_position)
+            y2 = self.time_to_y(grid_tick_position + grid_step)
 
-                    # resize the rectangle if needed
-                    for barline_pos in barlines:
-                        if OperatorThreshold().greater(barline_pos, grid_step_cursor) and OperatorThreshold().less(barline_pos, grid_step_cursor + grid_step):
-                            y2 = self.time_to_y(time_cursor + barline_pos)
-                            break
+            # clip the last rectangle at the barline that closes the measure
+            if op.less(measure_end, grid_tick_position + grid_step):
+                y2 = self.time_to_y(measure_end)
 
-                    # Only draw if within viewport
-                    if 0 <= y1 <= self.canvas.height_mm + self.editor_margin and not is_color:
-                        # draw the grid rectangle
-                        self.canvas.add_rectangle(
-                            x1_mm=self.editor_margin, 
-                            y1_mm=y1,
-                            x2_mm=self.editor_margin + self.stave_width, 
-                            y2_mm=y2,
-                            fill=True,
-                            fill_color=color,
-                            outline=False,
-                            tags=['cursor_grid']
-                        )
-                    is_color = not is_color
-                    
-                    grid_step_cursor += grid_step
-                
-                # Move time cursor forward by one measure
-                time_cursor += meas_length
+            # Only draw if within viewport
+            if 0 <= y1 <= self.canvas.height_mm + self.editor_margin and not is_color:
+                # draw the grid rectangle
+                self.canvas.add_rectangle(
+                    x1_mm=self.editor_margin, 
+                    y1_mm=y1,
+                    x2_mm=self.editor_margin + self.stave_width, 
+                    y2_mm=y2,
+                    fill=True,
+                    fill_color=color,
+                    outline=False,
+                    tags=['cursor_grid', measure_tag]
+                )
+            is_color = not is_color
+            
+            grid_step_cursor += grid_step
         
-        # Draw final barline at the end of the score (double thickness)
-        final_y_pos = self.time_to_y(time_cursor)
-        if 0 <= final_y_pos <= self.canvas.height_mm + self.editor_margin:
+        # Draw final barline at the end of the score (double thickness), with the last measure
+        timeline = self.score.timeline()
+        final_y_pos = self.time_to_y(timeline.end)
+        if op.equal(measure_end, timeline.end) and 0 <= final_y_pos <= self.canvas.height_mm + self.editor_margin:
             self.canvas.add_line(
                 x1_mm=self.editor_margin, 
                 y1_mm=final_y_pos,
@@ -169,5 +209,5 @@ class GridDrawerMixin:
                 y2_mm=final_y_pos,
                 color=self.barline_color,
                 width_mm=self.score.properties.globalBasegrid.barlineWidthMm * 2,  # Double thickness
-                tags=['barline', 'endBarline']
+                tags=['barline', 'endBarline', measure_tag]
             )
@@ -4,7 +4,7 @@ Note drawing mixin for the Editor class.
 Handles drawing note events on the piano roll canvas.
 '''
 from __future__ import annotations
-from typing import TYPE_CHECKING, Literal, Optional
+from typing import TYPE_CHECKING, Dict, Literal, Optional, Tuple
 
 from file import note
 from gui.colors import ACCENT_COLOR_HEX
@@ -38,10 +38,14 @@ class NoteDrawerMixin:
         
         def pitch_to_x(self, pitch: int) -> float: ...
         def time_to_y(self, time: float) -> float: ...
-        def _get_barline_positions(self) -> list[float]: ...
     
-    def _draw_notes(self) -> None:
-        '''Draw all note events from the currently rendered stave.'''
+    def _draw_notes(self, window: Optional[Tuple[float, float]] = None) -> None:
+        '''Draw the note events of the currently rendered stave.
+        
+        Args:
+            window: (start, end) tick range; only the notes overlapping it are
+                drawn. None draws every note.
+        '''
         # Access the score from the Editor instance
         if not self.score:
             return
@@ -52,8 +56,11 @@ class NoteDrawerMixin:
         )
         
         # Draw notes from the currently rendered stave
-        stave = self.score.stave[stave_idx]
-        for note in stave.event.note:
+        if window is None:
+            notes = self.score.stave[stave_idx].event.note
+        else:
+            notes = self.score.note_index(stave_idx).overlapping(*window)
+        for note in notes:
             self._draw_single_note(stave_idx, note)
 
     def _draw_single_note(self, stave_idx: int, note: Note, 
@@ -274,7 +281,7 @@ class NoteDrawerMixin:
         y = self.time_to_y(note.time)
 
         # skip if note starts at barline or grid positions
-        if any(self._time_op.equal(note.time, pos) for pos in self._get_barline_and_grid_positions()):
+        if self.score.timeline().is_on_grid(note.time, self._time_op.threshold):
             return
         
         # Calculate stem endpoint
@@ -295,7 +302,7 @@ class NoteDrawerMixin:
     
     def _draw_stem_whitespace(self, note: Note, base_tag: str) -> None:
         '''Draw stem whitespace to highlight stem on barlines.'''
-        if any(self._time_op.equal(note.time, barline_time) for barline_time in self._get_barline_positions()):
+        if self.score.timeline().is_on_barline(note.time, self._time_op.threshold):
             # Calculate positions
             x = self.pitch_to_x(note.pitch)
             y = self.time_to_y(note.time)
@@ -343,13 +350,11 @@ class NoteDrawerMixin:
             return
         
         # check if note starts at barline or grid positions
-        if any(self._time_op.equal(note.time, pos) for pos in self._get_barline_and_grid_positions()):
+        if self.score.timeline().is_on_grid(note.time, self._time_op.threshold):
             return  # Don't draw chord guide on barline/grid positions
         
-        note_list = self.score.stave[stave_idx].event.note
-        
         # Find all notes with the same start time
-        same_time_notes = [n for n in note_list if self._time_op.equal(n.time, note.time)]
+        same_time_notes = self.score.note_index(stave_idx).starting_at(note.time)
 
         if len(same_time_notes) < 2:
             return  # No chord, only a single note
@@ -402,29 +407,17 @@ class NoteDrawerMixin:
         if stave_idx >= len(self.score.stave):
             return True  # Default to showing note stop if stave not found
         
-        stave = self.score.stave[stave_idx]
-        answer = False
-        if not hasattr(stave.event, 'note'):
-            return True  # Default to showing note stop if no notes
-        
-        note_list = stave.event.note
         note_end_time = note.time + note.duration
-        for other_note in note_list:
+        # Notes in the same hand that start at the current note's end time (using threshold)
+        for other_note in self.score.note_index(stave_idx).starting_at(note_end_time, hand=note.hand):
             # Skip the current note itself
             if other_note.id == note.id:
                 continue
             
-            # Only check notes in the same hand
-            if other_note.hand != note.hand:
-                continue
-            
-            # Check if this note starts at the current note's end time (using threshold)
-            if self._time_op.equal(other_note.time, note_end_time):
-                # Check if pitch difference is more than an octave
-                if abs(other_note.pitch - note.pitch) <= interval:
-                    answer = True
-                    break # found a note within an octave
-        return answer
+            # Check if pitch difference is more than an octave
+            if abs(other_note.pitch - note.pitch) <= interval:
+                return True  # found a note within an octave
+        return False
 
     def _is_followed_by_rest(self, stave_idx: int, note: Note) -> bool:
         '''Check if a note is followed by a rest (gap) in the same hand.
@@ -445,32 +438,12 @@ class NoteDrawerMixin:
         if stave_idx >= len(self.score.stave):
             return True  # Default to showing note stop if stave not found
         
-        stave = self.score.stave[stave_idx]
-        if not hasattr(stave.event, 'note'):
-            return True  # Default to showing note stop if no notes
-        
-        note_list = stave.event.note
         note_end_time = note.time + note.duration
         
-        # Find the next note in the same hand that starts at or after this note ends
-        next_note_in_hand = None
-        min_time_gap = float('inf')
-        
-        for other_note in note_list:
-            # Skip the current note itself
-            if other_note.id == note.id:
-                continue
-            
-            # Only check notes in the same hand
-            if other_note.hand != note.hand:
-                continue
-            
-            # Check if this note starts at or after the current note ends (using threshold)
-            if self._time_op.greater_or_equal(other_note.time, note_end_time):
-                time_gap = other_note.time - note_end_time
-                if time_gap < min_time_gap:
-                    min_time_gap = time_gap
-                    next_note_in_hand = other_note
+        # Find the next note in the same hand that starts at or after this note ends (using threshold)
+        next_note_in_hand = self.score.note_index(stave_idx).next_in_hand(
+            note.hand, note_end_time, exclude_id=note.id
+        )
         
         # If no next note found, there's a rest (show note stop)
         if next_note_in_hand is None:
@@ -478,7 +451,7 @@ class NoteDrawerMixin:
         
         # If there's a gap (rest) before the next note, show note stop
         # If the next note starts immediately (gap ~= 0 within threshold), don't show note stop
-        return self._time_op.greater(min_time_gap, 0)
+        return self._time_op.greater(next_note_in_hand.time - note_end_time, 0)
 
     def _draw_note_continuation_dot(self, stave_idx: int, note: Note, 
                                  draw_mode: Optional[Literal['note', 'cursor', 'edit', 'selected']] = 'note') -> None:
@@ -488,9 +461,7 @@ class NoteDrawerMixin:
             stave_idx: Index of the stave containing the note.
             note: The note event that is being drawn.
                 - we need to check if there is another note starting somewhere in the middle of this note
-                - we use an efficient looping system to loop first backwards from the current notes index
-                    (we always keep the notelist sorted on time key) and look forward.
-                - if another note time is later than this notes time + duration we can break the loop (no dot needed)
+                - the stave's NoteIndex returns only the same-hand notes overlapping this note
                 - if another note time is found in the duration range we draw the dot at that time position on the current midinote.
                 - if another note time+duration is found in the duration range we draw the dot at that time position on the current midinote.
 
@@ -508,18 +479,6 @@ class NoteDrawerMixin:
         if stave_idx >= len(self.score.stave):
             return
         
-        stave = self.score.stave[stave_idx]
-        if not hasattr(stave.event, 'note'):
-            return
-        
-        note_list = stave.event.note
-        
-        # Find current note's index in the list
-        try:
-            current_idx = note_list.index(note)
-        except ValueError:
-            return  # Note not found in list
-        
         # Calculate the time range we're checking
         note_start = note.time
         note_end = note.time + note.duration
@@ -527,42 +486,12 @@ class NoteDrawerMixin:
         # List to store times where we need to draw dots
         dot_times = []
         
-        # Search backwards from current note
-        for i in range(current_idx - 1, -1, -1):
-            other_note = note_list[i]
-            other_start = other_note.time
-            other_end = other_note.time + other_note.duration
-            
-            # If other note ends before our note starts, we can stop looking backwards (using threshold)
-            if self._time_op.less_or_equal(other_end, note_start):
-                break
-            
-            # Only consider notes from the same hand
-            if other_note.hand != note.hand or other_note.id == note.id:
-                continue
-            
-            # Check if other note starts within our duration range (using threshold)
-            if self._time_op.less(note_start, other_start) and self._time_op.less(other_start, note_end):
-                dot_times.append(other_start)
-            
-            # Check if other note ends within our duration range (using threshold)
-            if self._time_op.less(note_start, other_end) and self._time_op.less(other_end, note_end):
-                dot_times.append(other_end)
-        
-        # Search forwards from current note
-        for i in range(current_idx + 1, len(note_list)):
-            other_note = note_list[i]
+        # Only notes from the same hand that overlap this note can put a dot on it
+        for other_note in self.score.note_index(stave_idx).overlapping(
+                note_start, note_end, hand=note.hand, exclude_id=note.id):
             other_start = other_note.time
             other_end = other_note.time + other_note.duration
             
-            # If other note starts after our note ends, we can stop looking forward (using threshold)
-            if self._time_op.greater_or_equal(other_start, note_end):
-                break
-            
-            # Only consider notes from the same hand
-            if other_note.hand != note.hand or other_note.id == note.id:
-                continue
-            
             # Check if other note starts within our duration range (using threshold)
             if self._time_op.less(note_start, other_start) and self._time_op.less(other_start, note_end):
                 dot_times.append(other_start)
@@ -571,9 +500,8 @@ class NoteDrawerMixin:
             if self._time_op.less(note_start, other_end) and self._time_op.less(other_end, note_end):
                 dot_times.append(other_end)
         
-        # Check for barline crossings
-        barline_positions = self._get_barline_positions()
-        for barline_time in barline_positions:
+        # Check for barline crossings (bisect narrows the candidates to the note's range)
+        for barline_time in self.score.timeline().barlines_between(note_start, note_end):
             # Check if barline falls within this note's duration (using threshold)
             if self._time_op.less(note_start, barline_time) and self._time_op.less(barline_time, note_end):
                 dot_times.append(barline_time)
@@ -617,7 +545,8 @@ class NoteDrawerMixin:
                 tags=['left_dot', base_tag]
             )
 
-    def _redraw_overlapping_notes(self, stave_idx: int, note: Note) -> None:
+    def _redraw_overlapping_notes(self, stave_idx: int, note: Note,
+                                  previous: Optional[Tuple[float, float, str]] = None) -> None:
         '''Redraw all notes that overlap with the given note's time range.
         
         This is needed to update continuation dots when a note is added/modified/deleted.
@@ -626,63 +555,46 @@ class NoteDrawerMixin:
         Args:
             stave_idx: Index of the stave
             note: The note whose overlapping neighbors should be redrawn
+            previous: (time, duration, hand) of the note before it was edited; the
+                neighbours of that old range are redrawn as well
         '''
         if stave_idx >= len(self.score.stave):
             return
         
-        stave = self.score.stave[stave_idx]
-        if not hasattr(stave.event, 'note'):
-            return
-        
-        note_list = stave.event.note
-        note_start = note.time
-        note_end = note.time + note.duration
-        
-        notes_to_redraw = set()
-        
-        # Find all notes that overlap with this note's time range
-        for other_note in note_list:
-            if other_note.id == note.id:
-                continue  # Skip the note itself
-            
-            # Only consider notes from the same hand (continuation dots only appear for same hand)
-            if other_note.hand != note.hand:
-                continue
-            
-            other_start = other_note.time
-            other_end = other_note.time + other_note.duration
-            
-            # Check if time ranges overlap (using threshold operators)
-            # Two ranges [a,b] and [c,d] overlap if: a < d AND c < b
-            if self._time_op.less(note_start, other_end) and self._time_op.less(other_start, note_end):
-                # This note overlaps - needs redraw for continuation dots
-                notes_to_redraw.add(other_note.id)
-        
-        # Find notes in the same hand that might need note stop updates
-        # Any note in the same hand that could have considered this note as "next" needs redrawing
-        # This includes notes that end before this note AND notes that start after this note
-        for other_note in note_list:
-            if other_note.id == note.id:
-                continue
-            
-            if other_note.hand == note.hand:
-                other_start = other_note.time
-                other_end = other_note.time + other_note.duration
-                
-                # If other note ends at or before this note starts, it might have checked
-                # this note as its "next note" for note stop calculation
-                if self._time_op.less_or_equal(other_end, note_start):
-                    notes_to_redraw.add(other_note.id)
-                
-                # If other note starts at or after this note ends, it might have been
-                # the "next note" that this note was checking
-                elif self._time_op.greater_or_equal(other_start, note_end):
-                    notes_to_redraw.add(other_note.id)
+        index = self.score.note_index(stave_idx)
+        notes_to_redraw = self._notes_near_range(index, note.time, note.time + note.duration, note.hand, note.id)
+        if previous is not None:
+            old_time, old_duration, old_hand = previous
+            notes_to_redraw.update(
+                self._notes_near_range(index, old_time, old_time + old_duration, old_hand, note.id)
+            )
         
         # Redraw all affected notes
-        for other_note in note_list:
-            if other_note.id in notes_to_redraw:
-                self._draw_single_note(stave_idx, other_note, draw_mode='note')
+        for other_note in notes_to_redraw.values():
+            self._draw_single_note(stave_idx, other_note, draw_mode='note')
+
+    def _notes_near_range(self, index, start: float, end: float, hand: str, note_id: int) -> Dict[int, Note]:
+        '''Notes whose drawing depends on a note of hand occupying [start, end).'''
+        # Continuation dots and note stops only depend on the same hand
+        # Notes that overlap the time range need a redraw for continuation dots
+        notes = {
+            other_note.id: other_note
+            for other_note in index.overlapping(start, end, hand=hand, exclude_id=note_id)
+        }
+        
+        # Chord guides are drawn by the lowest note starting at a time, in either hand
+        for other_note in index.starting_at(start):
+            if other_note.id != note_id:
+                notes[other_note.id] = other_note
+        
+        # Notes that could have this note as their "next note" need note stop updates:
+        # those ending at or before this note starts, but after the previous note in the hand starts
+        previous_note = index.previous_in_hand(hand, start, exclude_id=note_id)
+        lower_bound = previous_note.time - index.threshold if previous_note is not None else float('-inf')
+        for other_note in index.ending_between(lower_bound, start + index.threshold, hand=hand):
+            if other_note.id != note_id:
+                notes[other_note.id] = other_note
+        return notes
 
     # def _draw_display(self, stave_idx: int, note: Note, base_tag: str, color: str) -> None:
     #     '''Draw the note display (text) above the notehead.'''
@@ -35,6 +35,21 @@ class StaveDrawerMixin:
         def pitch_to_x(self, key_number: int) -> float: ...
         def get_score_length_in_ticks(self) -> float: ...
     
+    # Category tags of the stave lines (a static layer, see Editor.redraw_pianoroll)
+    STAVE_TAGS = ('stavetwoline', 'stavethreeline', 'staveclefline')
+    
+    def _stave_layer_key(self) -> tuple:
+        '''Everything the stave lines depend on; they are only redrawn when this changes.'''
+        return (
+            self.score.timeline().key,
+            self.canvas._quarter_note_spacing_mm, self.pixels_per_quarter,
+            self.editor_margin, self.stave_width,
+            self.stave_two_color, self.stave_two_width,
+            self.stave_three_color, self.stave_three_width,
+            self.stave_clef_color, self.stave_clef_width,
+            tuple(self.clef_dash_pattern),
+        )
+    
     def _draw_stave(self):
         '''Draw the 88-key stave with your specific line patterns.'''
         total_ticks = self.get_score_length_in_ticks()
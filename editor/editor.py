@@ -1,9 +1,11 @@
 from __future__ import annotations
-from typing import Optional, Dict, Any, Tuple, Callable, List
+from typing import Optional, Dict, Any, Tuple, Callable, List, Iterable
+from contextlib import contextmanager
 from kivy.clock import Clock
 from kivy.core.window import Window
 from kivy.metrics import sp
 import math
+from bisect import bisect_left
 
 from gui.colors import DARK_HEX
 from file.SCORE import SCORE
@@ -11,7 +13,7 @@ from file.note import Note
 from utils.canvas import Canvas
 from utils.CONSTANTS import (
     PHYSICAL_SEMITONE_POSITIONS, BE_GAPS, BLACK_KEYS, PIANOTICK_QUARTER,
-    MIDI_KEY_OFFSET, PIANO_KEY_COUNT,
+    MIDI_KEY_OFFSET, PIANO_KEY_COUNT, KEY_UNIT_OFFSETS,
     get_visual_semitone_positions
 )
 from editor.tool_manager import ToolManager
@@ -47,6 +49,9 @@ class Editor(
     - Pitch flows horizontally with your custom spacing
     '''
     
+    # Tag of every item outside the static stave and grid layers (see _clear_dynamic_layers)
+    DYNAMIC_TAG = 'dynamic_layer'
+    
     def __init__(self, editor_canvas: Canvas, score: SCORE = None, gui=None):
         self.canvas: Canvas = editor_canvas
         self.score: SCORE = score  # Will be initialized via new_score() or load_score()
@@ -72,6 +77,10 @@ class Editor(
         self.gridline_dash_pattern = [2, 2]
         self.clef_dash_pattern = [2, 2]
 
+        # X of every key position, cached per (editor_margin, semitone_width); see _key_x_table
+        self._key_x: List[float] = []
+        self._key_x_layout: Optional[Tuple[float, float]] = None
+
         # Immediately apply preferences (incl. zoom) from SCORE model to avoid mismatch
         self._apply_settings_from_score()
         
@@ -109,6 +118,20 @@ class Editor(
         # all pianoroll variables here:
         self.total_time: float = 0.0
         
+        # Static layer name -> key of the inputs it was drawn with (see redraw_pianoroll)
+        self._static_layer_keys: Dict[str, tuple] = {}
+        # Every item outside a static layer carries DYNAMIC_TAG, so the note layers clear by tag
+        self.canvas.default_tags = (self.DYNAMIC_TAG,)
+        # View key of the last full redraw; invalidate_notes falls back to a full redraw when it changed
+        self._drawn_view_key: Optional[tuple] = None
+        
+        # Virtualized mode: notes, grace notes and grid only exist for a tick window around the viewport
+        # (settings key 'virtualized_editor'); full_canvas() generates the whole score, e.g. for a PDF export
+        self.virtualized: bool = True
+        self.WINDOW_MARGIN_SCREENS = 1.0  # window margin on each side, in viewport heights
+        self._window: Optional[Tuple[float, float]] = None  # (start, end) ticks; None = whole score
+        self._grid_window: Optional[Tuple[float, float]] = None  # window the grid layer holds the measures of
+        
         # Initialize layout
         self._calculate_layout()
         
@@ -122,6 +145,8 @@ class Editor(
                 Clock.schedule_once(lambda dt: self._draw_keyboard_overlay(), 0)
             # Bind to canvas size and pos to catch viewport changes
             self.canvas.bind(size=_redraw_overlay_scheduled, pos=_redraw_overlay_scheduled)
+            # Generate and evict items as the view moves (virtualized mode)
+            self.canvas.bind(on_view_change=self._on_view_change)
         except Exception:
             pass
 
@@ -242,47 +267,33 @@ class Editor(
         '''Canvas height in mm.'''
         return self.canvas.height_mm
     
+    def _key_x_table(self) -> List[float]:
+        '''X of each key position: index 0 is key 1, index 88 is one past the top key.
+        
+        Built from KEY_UNIT_OFFSETS and cached until editor_margin or semitone_width changes.
+        '''
+        layout = (self.editor_margin, self.semitone_width)
+        if self._key_x_layout != layout:
+            self._key_x = [self.editor_margin + self.semitone_width * (offset - 2) for offset in KEY_UNIT_OFFSETS[1:]]
+            self._key_x_layout = layout
+        return self._key_x
+    
     def pitch_to_x(self, key_number: int) -> float:
         '''Convert piano key number (1-88) to X position using your spacing algorithm.'''
-        # Build x_positions list exactly like x_to_pitch does (must match!)
-        x_pos = self.editor_margin - self.semitone_width
-        x_positions = [x_pos]  # Start with initial position at index 0
-        
-        for n in range(1, PIANO_KEY_COUNT + 1):
-            # Add extra space at BE gaps (your specific spacing)
-            if n in BE_GAPS:
-                x_pos += self.semitone_width
-            x_pos += self.semitone_width
-            x_positions.append(x_pos)
-        
-        # x_to_pitch returns (index + 1), so to reverse it:
-        # If x_to_pitch found x_positions[index] and returned (index + 1) as the key,
-        # then pitch_to_x should return x_positions[key_number - 1]
         if 1 <= key_number <= PIANO_KEY_COUNT:
-            return x_positions[key_number - 1]
+            return self._key_x_table()[key_number - 1]
         return self.editor_margin
     
     def x_to_pitch(self, x_mm: float) -> int:
-        '''Convert X coordinate to piano key number (1-88) using your algorithm.'''
-        # Recreate the x_positions list from your Tkinter code
-        x_pos = self.editor_margin - self.semitone_width
-        x_positions = [x_pos]
-        
-        # create center positions for all 88 keys
-        for n in range(1, PIANO_KEY_COUNT + 1):
-            if n in BE_GAPS:
-                x_pos += self.semitone_width
-            x_pos += self.semitone_width
-            x_positions.append(x_pos)
-
-        # Find the closest center position
-        if x_positions:
-            closest_x = min(x_positions, key=lambda y: abs(y - x_mm))
-            closest_x_index = x_positions.index(closest_x)
-            return closest_x_index + 1
-        
-        # Default to key 1 if no positions found
-        return 1
+        '''Convert X coordinate to piano key number (1-89), the key with the closest position.'''
+        x_positions = self._key_x_table()
+        i = bisect_left(x_positions, x_mm)
+        if i == len(x_positions):
+            i -= 1
+        elif i > 0 and x_mm - x_positions[i - 1] <= x_positions[i] - x_mm:
+            # Ties go to the lower key
+            i -= 1
+        return i + 1
     
     def time_to_y(self, time_ticks: float) -> float:
         '''Convert time in ticks to Y coordinate in millimeters (top-left origin).'''
@@ -404,65 +415,27 @@ class Editor(
         return True
     
     def get_score_length_in_ticks(self) -> float:
-        '''Calculate total score length in ticks based on your algorithm.'''
-        total_ticks = 0.0
-        for grid in self.score.baseGrid:
-            ql = self.score.fileSettings.quarterNoteUnit
-            measure_ticks = (ql * 4) * (grid.numerator / grid.denominator)
-            total_ticks += measure_ticks * grid.measureAmount
-        return total_ticks
+        '''Total score length in ticks: the end of the last baseGrid measure.'''
+        return self.score.timeline().end
     
     def _get_barline_positions(self) -> List[float]:
         '''Get list of barline positions in ticks.
         
-        This method calculates where barlines occur in the score based on the
-        baseGrid configuration. It can be reused by the editor and engraver.
+        The positions come from the score's cached Timeline (see SCORE.timeline),
+        which the grid drawer and the engraver share.
         
         Returns:
             List of tick positions where barlines should be drawn.
         '''
-        barline_positions = []
-        total_ticks = 0.0
-        
-        for grid in self.score.baseGrid:
-            ql = self.score.fileSettings.quarterNoteUnit
-            measure_ticks = (ql * 4) * (grid.numerator / grid.denominator)
-            
-            for _ in range(grid.measureAmount):
-                # Barline at the end of this measure
-                barline_positions.append(total_ticks)
-                total_ticks += measure_ticks
-        
-        return barline_positions
+        return list(self.score.timeline().measure_starts)
     
     def _get_barline_and_grid_positions(self) -> List[float]:
-        '''Get list of barline positions in ticks.
-        
-        This method calculates where barlines occur in the score based on the
-        baseGrid configuration. It can be reused by the editor and engraver.
+        '''Get list of barline and gridline positions in ticks, sorted.
         
         Returns:
-            List of tick positions where barlines should be drawn.
+            Every barline plus every measure start + gridTime, from the score's Timeline.
         '''
-        barline_and_grid_positions = []
-        cursor = 0.0
-        
-        for grid in self.score.baseGrid:
-            ql = self.score.fileSettings.quarterNoteUnit
-            measure_ticks = (ql * 4) * (grid.numerator / grid.denominator)
-            
-            for _ in range(grid.measureAmount):
-                # add barline position
-                barline_and_grid_positions.append(cursor)
-                
-                # add grid lines within the measure
-                for g in grid.gridTimes:
-                    barline_and_grid_positions.append(cursor + g)
-
-                # update cursor
-                cursor += measure_ticks
-        
-        return barline_and_grid_positions
+        return list(self.score.timeline().grid_ticks)
     
     def redraw_pianoroll(self):
         '''Redraw the complete piano roll with all elements.
@@ -470,7 +443,10 @@ class Editor(
         This is the main rendering method. It:
         1. Syncs zoom from SCORE.fileSettings.zoomPixelsQuarter
         2. Recalculates layout (margins, spacing, etc.)
-        3. Clears and redraws all canvas elements
+        3. Clears and redraws the note elements
+        
+        The stave and grid are static layers: they are kept on the canvas and
+        only redrawn when their inputs (timeline, zoom, canvas width, ...) changed.
         '''
         
         # Guard: don't draw if no score loaded yet
@@ -490,8 +466,9 @@ class Editor(
         # Recalculate layout with current zoom
         self._calculate_layout()
         
-        # Clear any existing content
-        self.canvas.clear()
+        # Clear the note layers; the static layers are refreshed below
+        self._window = None
+        self._clear_dynamic_layers()
         
         # Calculate required dimensions
         self.total_time = self.get_score_length_in_ticks()
@@ -515,12 +492,16 @@ class Editor(
             # Keep scroll; Canvas clamps if out-of-bounds. Avoid reset to prevent jumpiness.
             self.canvas.set_size_mm(self.canvas.width_mm, desired_height_mm, reset_scroll=False)
         
+        # In virtualized mode only the items of a window around the viewport are generated
+        if self.virtualized:
+            self._window = self._window_for_view(*self.canvas._get_visible_y_range_mm())
+        
         # Draw all elements:
         
-        self._draw_stave()
-        self._draw_barlines_and_grid()
-        self._draw_notes()
-        self._draw_grace_notes()
+        self._refresh_static_layer('stave', self._stave_layer_key(), self.STAVE_TAGS, self._draw_stave)
+        self._refresh_grid_layer()
+        self._draw_notes(self._window)
+        self._draw_grace_notes(self._window)
         #self._draw_beams()
         #self._draw_slurs()
         #self._draw_texts()
@@ -530,6 +511,7 @@ class Editor(
 
         # Force canvas redraw with culling now that all items are added
         self.canvas._redraw_all()
+        self._drawn_view_key = self._view_key()
 
         # Draw the fixed keyboard overlay at the bottom (outside scissor)
         try:
@@ -537,6 +519,148 @@ class Editor(
         except Exception as e:
             print(f'Editor: keyboard overlay draw failed: {e}')
     
+    def invalidate_notes(self, stave_idx: int, notes: Iterable[Note] = (),
+                         previous: Optional[Dict[int, Tuple[float, float, str]]] = None,
+                         deleted: Iterable[Tuple[int, float, float, str]] = ()):
+        '''Redraw changed notes and the neighbours whose drawing depends on them.
+        
+        Only the affected notes are redrawn (tag-based deletion); the rest of the
+        piano roll stays on the canvas. Notes outside the virtualized window are
+        only removed. Falls back to redraw_pianoroll when the timeline, zoom or
+        layout changed since the last full redraw.
+        
+        Args:
+            stave_idx: Index of the stave containing the notes
+            notes: Notes that were added or changed, in their new state
+            previous: Note id -> (time, duration, hand) before the change, so the
+                neighbours of the old range are redrawn as well
+            deleted: (id, time, duration, hand) of notes removed from the stave
+        '''
+        if self.score is None:
+            return
+        if self._drawn_view_key is None or self._drawn_view_key != self._view_key():
+            self.redraw_pianoroll()
+            return
+        
+        previous = previous or {}
+        index = self.score.note_index(stave_idx)
+        notes_to_redraw: Dict[int, Note] = {}
+        for note in notes:
+            notes_to_redraw[note.id] = note
+            notes_to_redraw.update(self._notes_near_range(index, note.time, note.time + note.duration, note.hand, note.id))
+            if note.id in previous:
+                old_time, old_duration, old_hand = previous[note.id]
+                notes_to_redraw.update(self._notes_near_range(index, old_time, old_time + old_duration, old_hand, note.id))
+        for note_id, old_time, old_duration, old_hand in deleted:
+            self.canvas.delete_by_tag(str(note_id))
+            self.detection_rects.pop(note_id, None)
+            notes_to_redraw.update(self._notes_near_range(index, old_time, old_time + old_duration, old_hand, note_id))
+        
+        for note in notes_to_redraw.values():
+            if self._in_window(note):
+                self._draw_single_note(stave_idx, note, draw_mode='note')
+            else:
+                self.canvas.delete_by_tag(str(note.id))
+                self.detection_rects.pop(note.id, None)
+    
+    @contextmanager
+    def full_canvas(self):
+        '''Generate the items of the whole score for the duration of the with block.
+        
+        In virtualized mode the canvas only holds a window around the viewport;
+        export_canvas_to_pdf uses this to export the complete score.
+        '''
+        if not self.virtualized or self.score is None:
+            yield
+            return
+        self.virtualized = False
+        self.redraw_pianoroll()
+        try:
+            yield
+        finally:
+            self.virtualized = True
+            self.redraw_pianoroll()
+    
+    def _in_window(self, note: Note) -> bool:
+        '''Whether a note overlaps the virtualized window (always True when not virtualized).'''
+        if self._window is None:
+            return True
+        window_start, window_end = self._window
+        return note.time < window_end and note.time + note.duration > window_start
+    
+    def _window_for_view(self, y_min_mm: float, y_max_mm: float) -> Tuple[float, float]:
+        '''Tick window for a visible y range: the range plus WINDOW_MARGIN_SCREENS on each side.'''
+        view_start, view_end = self.y_to_time(y_min_mm), self.y_to_time(y_max_mm)
+        margin = (view_end - view_start) * self.WINDOW_MARGIN_SCREENS
+        return (max(0.0, view_start - margin), min(self.total_time, view_end + margin))
+    
+    def _on_view_change(self, canvas: Canvas, y_min_mm: float, y_max_mm: float):
+        '''Move the virtualized window once the view comes within half a margin of its edge.'''
+        if self._window is None or self.score is None:
+            return
+        window_start, window_end = self._window
+        view_start, view_end = self.y_to_time(y_min_mm), self.y_to_time(y_max_mm)
+        slack = (view_end - view_start) * self.WINDOW_MARGIN_SCREENS / 2
+        if ((window_start <= 0.0 or view_start - slack >= window_start)
+                and (window_end >= self.total_time or view_end + slack <= window_end)):
+            return
+        self._move_window(self._window_for_view(y_min_mm, y_max_mm))
+    
+    def _move_window(self, window: Tuple[float, float]):
+        '''Generate the items of the notes, grace notes and measures entering the window and evict those leaving it.'''
+        stave_idx = self.score.fileSettings.get_rendered_stave_index(num_staves=len(self.score.stave))
+        index = self.score.note_index(stave_idx)
+        old_notes = {note.id: note for note in index.overlapping(*self._window)}
+        new_notes = {note.id: note for note in index.overlapping(*window)}
+        self._shift_grace_note_window(stave_idx, self._window, window)
+        self._window = window
+        
+        for note_id in old_notes.keys() - new_notes.keys():
+            self.canvas.delete_by_tag(str(note_id))
+            self.detection_rects.pop(note_id, None)
+        selected_ids = {
+            item['element'].id for item in self.selection_manager.selected_elements if item['type'] == 'note'
+        }
+        for note_id in new_notes.keys() - old_notes.keys():
+            self._draw_single_note(stave_idx, new_notes[note_id],
+                                   draw_mode='selected' if note_id in selected_ids else 'note')
+        
+        self._refresh_grid_layer()
+    
+    def _view_key(self) -> tuple:
+        '''Everything note positions depend on besides the notes themselves.'''
+        return (
+            self.score.timeline().key,
+            self.score.fileSettings.zoomPixelsQuarter,
+            self.canvas._quarter_note_spacing_mm,
+            self.editor_margin, self.stave_width, self.scroll_time_offset,
+        )
+    
+    def _clear_dynamic_layers(self):
+        '''Delete every canvas item that is not part of a static layer.'''
+        self.canvas.delete_by_tag(self.DYNAMIC_TAG)
+    
+    def _refresh_static_layer(self, name: str, key: tuple, tags: Tuple[str, ...], draw: Callable[[], None]) -> bool:
+        '''Redraw a static layer if its key changed or its items are no longer on the canvas.
+        
+        Returns:
+            True if the layer was redrawn
+        '''
+        if self._static_layer_keys.get(name) == key and any(self.canvas.find_by_tag(tag) for tag in tags):
+            return False
+        for tag in tags:
+            self.canvas.delete_by_tag(tag)
+        with self.canvas.default_tagging():
+            draw()
+        self._static_layer_keys[name] = key
+        return True
+    
+    def _refresh_grid_layer(self):
+        '''Redraw the grid layer if its key changed; otherwise only shift its measures to the current window.'''
+        if not self._refresh_static_layer('grid', self._grid_layer_key(), self.GRID_TAGS,
+                                          lambda: self._draw_barlines_and_grid(self._window)):
+            self._shift_grid_window(self._window)
+    
     # Removed update_drawing_order() - no longer needed!
     # Drawing order is now set automatically by tags when items are created.
     
@@ -331,10 +331,15 @@ class SelectionManager:
             num_staves=len(self.editor.score.stave)
         ) if (self.editor.score and hasattr(self.editor.score, 'fileSettings')) else 0
         
-        # Only check the currently rendered stave
-        stave = self.editor.score.stave[stave_idx]
+        # Only check the currently rendered stave, and only notes whose start time
+        # falls inside the rectangle's vertical extent (time_to_y is monotonic)
+        t_top = self.editor.y_to_time(top)
+        t_bottom = self.editor.y_to_time(bottom)
+        candidates = self.editor.score.note_index(stave_idx).starting_between(
+            min(t_top, t_bottom), max(t_top, t_bottom)
+        )
         # Check notes - use notehead position only
-        for note in stave.event.note:
+        for note in sorted(candidates, key=lambda n: n.time):
             # Get notehead position in mm coordinates
             note_x = self.editor.pitch_to_x(note.pitch)
             note_y = self.editor.time_to_y(note.time)
@@ -508,18 +513,20 @@ class SelectionManager:
     def _delete_selected(self) -> bool:
         """Delete all selected elements."""
         
+        deleted: Dict[int, List[Tuple[int, float, float, str]]] = {}
         for item in self.selected_elements:
             if item['type'] == 'note':
-                stave = self.editor.score.stave[item['stave_idx']]
-                if item['element'] in stave.event.note:
-                    stave.event.note.remove(item['element'])
+                note = item['element']
+                if self.editor.score.delete_by_id(note.id):
+                    deleted.setdefault(item['stave_idx'], []).append((note.id, note.time, note.duration, note.hand))
         
         self.clear_selection()
         
         if hasattr(self.editor, 'on_modified') and self.editor.on_modified:
             self.editor.on_modified()
         
-        self.editor.redraw_pianoroll()
+        for stave_idx, stave_deleted in deleted.items():
+            self.editor.invalidate_notes(stave_idx, deleted=stave_deleted)
         return True
     
     def _paste(self) -> bool:
@@ -574,6 +581,8 @@ class SelectionManager:
                 'stave_idx': note_data['stave_idx']
             })
         
+        self._invalidate_selection()
+        
         # Highlight pasted elements
         if self.selected_elements:
             self._highlight_selection()
@@ -581,7 +590,6 @@ class SelectionManager:
         if hasattr(self.editor, 'on_modified') and self.editor.on_modified:
             self.editor.on_modified()
         
-        self.editor.redraw_pianoroll()
         return True
     
     # === Selection Movement ===
@@ -626,11 +634,12 @@ class SelectionManager:
                 return False
         
         # All checks passed, perform the move
+        previous = self._selection_ranges()
         for item in self.selected_elements:
             if item['type'] == 'note':
                 item['element'].time += time_offset
         
-        self.editor.redraw_pianoroll()
+        self._invalidate_selection(previous)
         self._highlight_selection()
         
         if hasattr(self.editor, 'on_modified') and self.editor.on_modified:
@@ -662,7 +671,7 @@ class SelectionManager:
             if item['type'] == 'note':
                 item['element'].pitch += semitone_offset
         
-        self.editor.redraw_pianoroll()
+        self._invalidate_selection()
         self._highlight_selection()
         
         if hasattr(self.editor, 'on_modified') and self.editor.on_modified:
@@ -679,16 +688,33 @@ class SelectionManager:
         if not self.selected_elements:
             return False
         
+        previous = self._selection_ranges()
         for item in self.selected_elements:
             if item['type'] == 'note':
                 item['element'].hand = hand
         
         print(f"SelectionManager: Assigned {len(self.selected_elements)} notes to hand '{hand}'")
         
-        self.editor.redraw_pianoroll()
+        self._invalidate_selection(previous)
         self._highlight_selection()
         
         if hasattr(self.editor, 'on_modified') and self.editor.on_modified:
             self.editor.on_modified()
         
         return True
+    
+    def _selection_ranges(self) -> Dict[int, Tuple[float, float, str]]:
+        """(time, duration, hand) of the selected notes by id, taken before an edit."""
+        return {
+            item['element'].id: (item['element'].time, item['element'].duration, item['element'].hand)
+            for item in self.selected_elements if item['type'] == 'note'
+        }
+    
+    def _invalidate_selection(self, previous: Optional[Dict[int, Tuple[float, float, str]]] = None):
+        """Redraw the selected notes and their neighbours after an edit of the selection."""
+        by_stave: Dict[int, List] = {}
+        for item in self.selected_elements:
+            if item['type'] == 'note':
+                by_stave.setdefault(item['stave_idx'], []).append(item['element'])
+        for stave_idx, notes in by_stave.items():
+            self.editor.invalidate_notes(stave_idx, notes, previous=previous)
@@ -343,11 +343,12 @@ class BaseTool(ABC):
             
             # Check if point is inside rectangle
             if min_x <= x <= max_x and min_y <= y <= max_y:
-                # Find the element by ID
-                element = self.editor.score.find_by_id(element_id)
+                # Find the element and its stave by ID (O(1) registry lookup)
+                entry = self.editor.score.lookup_id(element_id)
                 
-                if element is None:
+                if entry is None:
                     continue
+                stave_idx, _, element = entry
                 
                 # Determine element type from the element itself
                 element_type = self._get_element_type(element)
@@ -356,9 +357,6 @@ class BaseTool(ABC):
                 if element_types is not None and element_type not in element_types:
                     continue
                 
-                # Find which stave contains this element
-                stave_idx = self._find_stave_for_element(element)
-                
                 # Calculate center of the rectangle
                 center_x = (min_x + max_x) / 2.0
                 center_y = (min_y + max_y) / 2.0
@@ -245,12 +245,11 @@ class BeamTool(BaseTool):
             
             # Remove from SCORE
             if stave_idx is not None and stave_idx < len(self.editor.score.stave):
-                stave = self.editor.score.stave[stave_idx]
-                if hasattr(stave.event, 'beam') and element in stave.event.beam:
-                    stave.event.beam.remove(element)
+                if self.editor.score.delete_by_id(element.id):
                     
-                    # Delete the visual representation
+                    # Delete the visual representation and its hit-test rectangle
                     self.editor.canvas.delete_by_tag(str(element.id))
+                    self.editor.detection_rects.pop(element.id, None)
                     
                     # Mark as modified
                     if hasattr(self.editor, 'on_modified') and self.editor.on_modified:
@@ -198,9 +198,7 @@ class GraceNoteTool(BaseTool):
 
         if element and elem_type == 'grace_note':
             # Delete the grace note
-            stave = self.score.stave[stave_idx]
-            # Event list attribute is camelCase 'graceNote'
-            stave.event.graceNote.remove(element)
+            self.score.delete_by_id(element.id)
             
             # Redraw everything
             self.editor.redraw_pianoroll()
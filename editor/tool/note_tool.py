@@ -21,6 +21,7 @@ class NoteTool(BaseTool):
         # Editing state
         self.edit_note = None  # Note being created/edited during drag
         self.edit_stave_idx = None  # Stave index of note being edited
+        self.edit_origin = None  # (time, duration, hand) of an existing note before editing
         self.hand_cursor = '<'  # Default to left hand
     
     @property
@@ -71,7 +72,6 @@ class NoteTool(BaseTool):
         
         self.editor.selection_manager._assign_selection_hand('<')
         
-        self.editor.redraw_pianoroll()
         self.editor.on_modified()
     
     def _set_selection_right(self):
@@ -79,7 +79,6 @@ class NoteTool(BaseTool):
         
         self.editor.selection_manager._assign_selection_hand('>')
         
-        self.editor.redraw_pianoroll()
         self.editor.on_modified()
     
     def _transpose_up(self):
@@ -234,6 +233,7 @@ class NoteTool(BaseTool):
             # EDIT MODE: Start editing existing note
             self.edit_note = element
             self.edit_stave_idx = stave_idx
+            self.edit_origin = (element.time, element.duration, element.hand)
             
             # Assign current cursor hand and accidental to the note being edited
             self.edit_note.hand = self.hand_cursor
@@ -340,8 +340,8 @@ class NoteTool(BaseTool):
         self.editor.canvas.delete_by_tag('edit')
         self.editor._draw_single_note(self.edit_stave_idx, self.edit_note, draw_mode='note')
         
-        # Redraw overlapping notes to update their continuation dots
-        self.editor._redraw_overlapping_notes(self.edit_stave_idx, self.edit_note)
+        # Redraw overlapping notes (around the old and the new range) to update their continuation dots
+        self.editor._redraw_overlapping_notes(self.edit_stave_idx, self.edit_note, previous=self.edit_origin)
         
         # Mark as modified (which will trigger engraving via FileManager)
         if hasattr(self.editor, 'on_modified') and self.editor.on_modified:
@@ -350,6 +350,7 @@ class NoteTool(BaseTool):
         # Clear references
         self.edit_note = None
         self.edit_stave_idx = None
+        self.edit_origin = None
         
         return True
 
@@ -381,12 +382,11 @@ class NoteTool(BaseTool):
             
             # Remove from SCORE
             if stave_idx is not None and stave_idx < len(self.editor.score.stave):
-                stave = self.editor.score.stave[stave_idx]
-                if hasattr(stave.event, 'note') and element in stave.event.note:
-                    stave.event.note.remove(element)
+                if self.editor.score.delete_by_id(element.id):
                     
-                    # Delete the visual representation
+                    # Delete the visual representation and its hit-test rectangle
                     self.editor.canvas.delete_by_tag(str(element.id))
+                    self.editor.detection_rects.pop(element.id, None)
                     
                     # Redraw overlapping notes AFTER deleting (using saved attributes)
                     # We create a temporary object with just the needed attributes
@@ -439,8 +439,8 @@ class NoteTool(BaseTool):
         self.editor.canvas.delete_by_tag('edit')
         self.editor._draw_single_note(self.edit_stave_idx, self.edit_note, draw_mode='note')
         
-        # Redraw overlapping notes to update their continuation dots
-        self.editor._redraw_overlapping_notes(self.edit_stave_idx, self.edit_note)
+        # Redraw overlapping notes (around the old and the new range) to update their continuation dots
+        self.editor._redraw_overlapping_notes(self.edit_stave_idx, self.edit_note, previous=self.edit_origin)
         
         # Mark as modified (which will trigger engraving via FileManager)
         if hasattr(self.editor, 'on_modified') and self.editor.on_modified:
@@ -449,6 +449,7 @@ class NoteTool(BaseTool):
         # Clear references
         self.edit_note = None
         self.edit_stave_idx = None
+        self.edit_origin = None
         
         print(f"NoteTool: Drag ended at ({x}, {y})")
         return True
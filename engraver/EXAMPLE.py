@@ -33,18 +33,16 @@ class ExampleNoteTool(BaseTool):
         time_ticks = self.get_snapped_time_from_y(y)
         duration = self.editor.get_grid_step_ticks()
         
-        from file.note import Note
-        note = Note(
+        # Find stave (simplified - use actual stave detection)
+        stave_idx = 0
+        # new_note() assigns an id and registers the note for find_by_id/delete_by_id
+        note = self.score.new_note(
+            stave_idx=stave_idx,
             pitch=pitch,
-            time_ticks=time_ticks,
+            time=time_ticks,
             duration=duration,
-            color='#000000'
         )
         
-        # Find stave (simplified - use actual stave detection)
-        stave_idx = 0
-        self.score.stave[stave_idx].event.note.append(note)
-        
         # 2. Trigger engraving (non-blocking, queued, automatic)
         self.trigger_engrave()
         
@@ -58,17 +56,11 @@ class ExampleNoteTool(BaseTool):
         if element is None:
             return False
         
-        # Remove from score
-        stave_idx = self.find_stave_for_element(element)
-        if stave_idx is not None:
-            stave = self.score.stave[stave_idx]
-            if element in stave.event.note:
-                stave.event.note.remove(element)
-                
-                # 2. Trigger engraving to update display
-                self.trigger_engrave()
-                
-                return True
+        # Remove from score (O(1) lookup through the SCORE id registry)
+        if self.score.delete_by_id(element.id):
+            # 2. Trigger engraving to update display
+            self.trigger_engrave()
+            return True
         
         return False
     
@@ -101,8 +93,8 @@ def migrate_tool_to_engraver():
     Step-by-step migration guide:
     
     1. Find all places where SCORE is modified:
-       - Adding elements: score.stave[i].event.note.append(...)
-       - Removing elements: score.stave[i].event.note.remove(...)
+       - Adding elements: score.new_note(stave_idx=i, ...)
+       - Removing elements: score.delete_by_id(element.id)
        - Modifying elements: note.pitch = new_pitch
     
     2. After each modification, replace:
@@ -143,7 +135,7 @@ class EngravingPatterns:
         # Make ALL modifications first
         tool.score.property1 = value1
         tool.score.property2 = value2
-        tool.score.stave[0].event.note.append(note)
+        tool.score.new_note(stave_idx=0, pitch=pitch, time=time)
         
         # THEN trigger once
         # The engraver will process the complete state
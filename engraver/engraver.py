@@ -2,6 +2,8 @@
 Engraver: Multi-threaded Klavarskribo/PianoScript notation layout and rendering engine.
 
 Architecture:
+- Phase 0 (Calling Thread): Snapshot the layout inputs of the score (engraver/snapshot.py)
+
 - Phase 1 (Background Thread): Calculate complete layout structure (DOC)
   - Generate structural events (barlines, gridlines, time signatures)
   - Process notes (split on barlines/linebreaks, add decorations)
@@ -30,13 +32,18 @@ import threading
 import queue
 import time
 import math
-from typing import Optional, Callable, Any, List, Dict, Tuple
-from dataclasses import dataclass
-from copy import deepcopy
+from bisect import bisect_right
+from typing import Optional, Callable, Any, Iterable, List, Dict, Tuple
+from dataclasses import dataclass, field, replace
 
 from kivy.clock import Clock
 
 from file.SCORE import SCORE
+from engraver.snapshot import OTHER_EVENT_TYPES, ScoreSnapshot, take_snapshot
+from engraver.layout_event import (
+    BARLINE_KINDS, NOTE_KINDS, BarlineEvent, EventKind, GridEvent, LayoutEvent,
+    NoteEvent, ObjectEvent, TimeSignatureEvent,
+)
 
 
 @dataclass
@@ -44,26 +51,65 @@ class LayoutData:
     '''Pre-calculated layout data structure (DOC).
     
     Organized as: pages → lines → events
-    Each event has type, time, pitch, and pre-calculated drawing coordinates.
+    Each event is a LayoutEvent record (engraver/layout_event.py) with an
+    EventKind, a time and the kind-specific fields.
     '''
-    DOC: List[List[List[Dict]]]  # [page][line][event]
+    DOC: List[List[List[LayoutEvent]]]  # [page][line][event]
     leftover_page_space: List[float]  # Extra horizontal space per page to distribute
     staff_dimensions: List[List[Dict]]  # Width/margins per staff per line
     staff_ranges: List[List[Tuple[int, int]]]  # (min_pitch, max_pitch) per staff per line
     barline_times: List[float]  # All barline tick positions
     total_pages: int
     current_page: int
+    changed_pages: Optional[List[int]] = None  # Pages to redraw; None = all (full layout)
 
 
 @dataclass
 class EngraveTask:
     '''Represents a single engraving task.'''
     
-    score: SCORE  # Will be deep copied for thread safety
+    snapshot: ScoreSnapshot  # Taken on the calling thread; the worker never sees the live SCORE
     canvas: Any  # Canvas widget reference
     callback: Optional[Callable[[bool, Optional[str]], None]] = None
     task_id: int = 0
     timestamp: float = 0.0
+    # What changed since the previous task for this canvas; both None = unknown (full layout)
+    dirty_range: Optional[Tuple[float, float]] = None
+    changed_ids: Optional[frozenset] = None
+    
+    def absorb(self, older: 'EngraveTask') -> None:
+        '''Merge the changes of an older, skipped task for the same canvas into this one.'''
+        if not older.has_changes() or not self.has_changes():
+            # Either one asks for a full layout
+            self.dirty_range = None
+            self.changed_ids = None
+            return
+        if older.dirty_range is not None:
+            if self.dirty_range is None:
+                self.dirty_range = older.dirty_range
+            else:
+                self.dirty_range = (min(self.dirty_range[0], older.dirty_range[0]),
+                                    max(self.dirty_range[1], older.dirty_range[1]))
+        if older.changed_ids:
+            self.changed_ids = (self.changed_ids or frozenset()) | older.changed_ids
+    
+    def has_changes(self) -> bool:
+        return self.dirty_range is not None or self.changed_ids is not None
+
+
+@dataclass
+class _LayoutCache:
+    '''Layout state kept per canvas so the next task can re-layout only dirty lines.
+    
+    Slots are indexed like snapshot.linebreak_times (one slot per linebreak, empty
+    slots included); LayoutData lines are the non-empty slots.
+    '''
+    snapshot: ScoreSnapshot
+    barline_times: List[float]
+    structural_slots: List[List[LayoutEvent]]  # Sorted structural events per slot
+    slots: List[List[LayoutEvent]]  # Sorted events per slot (structural + notes + decorations + other)
+    layout_data: LayoutData
+    line_slots: List[int] = field(default_factory=list)  # Slot index of each LayoutData line
 
 
 class Engraver:
@@ -93,6 +139,12 @@ class Engraver:
         self._task_id_counter = 0
         self._task_id_lock = threading.Lock()
         
+        # Per-canvas layout cache for incremental engraving (worker thread only)
+        self._layout_cache: Dict[int, _LayoutCache] = {}
+        # Canvases whose next task needs a full layout; other threads only add to it
+        self._stale_canvases: set = set()
+        self._stale_canvases_lock = threading.Lock()
+        
         # Statistics
         self._tasks_submitted = 0
         self._tasks_completed = 0
@@ -141,6 +193,7 @@ class Engraver:
                                 print(f"Engraver: Skipping task {task.task_id}, "
                                       f"jumping to newer task {newer_task.task_id}")
                                 self._tasks_skipped += 1
+                                self._supersede_task(task, newer_task)
                                 task = newer_task
                         except queue.Empty:
                             break
@@ -173,13 +226,11 @@ class Engraver:
         error_msg = None
         
         try:
-            # PHASE 1: Deep copy score for thread-safe access
-            score_copy = self._safe_copy_score(task.score)
+            # PHASE 1: Perform layout calculations on the snapshot (CPU-intensive)
+            # Only the lines touched by the task's changes are re-laid out when possible
+            layout_data = self._calculate_layout_for_task(task)
             
-            # PHASE 2: Perform layout calculations (CPU-intensive)
-            layout_data = self._calculate_layout(score_copy)
-            
-            # PHASE 3: Schedule canvas drawing on main thread (Kivy requirement)
+            # PHASE 2: Schedule canvas drawing on main thread (Kivy requirement)
             # All Kivy widget operations MUST happen on the main thread
             def draw_on_main_thread(dt):
                 try:
@@ -189,6 +240,8 @@ class Engraver:
                         task.callback(True, None)
                 except Exception as e:
                     print(f"Engraver: Canvas drawing failed: {e}")
+                    # The canvas no longer matches the cached layout
+                    self._mark_stale(task.canvas)
                     if task.callback:
                         task.callback(False, str(e))
             
@@ -217,6 +270,19 @@ class Engraver:
                   f"(success={success}, stats: {self._tasks_completed} completed, "
                   f"{self._tasks_skipped} skipped)")
     
+    def _supersede_task(self, old_task: EngraveTask, new_task: EngraveTask) -> None:
+        '''Carry the changes of a discarded task over to the task that replaces it.'''
+        if old_task.canvas is new_task.canvas:
+            new_task.absorb(old_task)
+        else:
+            # The old task's canvas misses an update; its next task must do a full layout
+            self._mark_stale(old_task.canvas)
+    
+    def _mark_stale(self, canvas: Any) -> None:
+        '''Make the next task for canvas do a full layout (safe from any thread).'''
+        with self._stale_canvases_lock:
+            self._stale_canvases.add(id(canvas))
+    
     def _is_print_preview_canvas(self, canvas: Any) -> bool:
         '''Detect if the given canvas is the print preview canvas.
         
@@ -237,34 +303,31 @@ class Engraver:
             pass
         return False
     
-    def _safe_copy_score(self, score: SCORE) -> SCORE:
-        '''Create a thread-safe deep copy of the score.
+    def _safe_copy_score(self, score: SCORE) -> Optional[ScoreSnapshot]:
+        '''Capture the layout inputs of the score for background processing.
+        
+        Only the fields the layout reads are copied, as flat tuples per stave
+        (see engraver/snapshot.py). Must be called on the thread that edits the score.
         
         Args:
-            score: The SCORE object to copy
+            score: The SCORE object to snapshot
             
         Returns:
-            A deep copy safe for background processing
-            
-        Raises:
-            Exception: If deep copy fails
+            An immutable ScoreSnapshot, or None if score is None
         '''
         if score is None:
-            print("Engraver: WARNING - Cannot copy None score!")
+            print("Engraver: WARNING - Cannot snapshot None score!")
             return None
-            
+        
         try:
-            score_copy = deepcopy(score)
-            if score_copy is None:
-                print("Engraver: WARNING - deepcopy returned None!")
-            return score_copy
+            return take_snapshot(score)
         except Exception as e:
-            print(f"Engraver: Error copying score: {e}")
+            print(f"Engraver: Error taking score snapshot: {e}")
             import traceback
             traceback.print_exc()
             raise
     
-    def _calculate_layout(self, score: SCORE) -> LayoutData:
+    def _calculate_layout(self, score: ScoreSnapshot, cache_key: Optional[int] = None) -> LayoutData:
         '''Calculate complete layout structure (DOC) for Klavarskribo/PianoScript notation.
         
         This is the main pre-calculation phase. All heavy computation happens here.
@@ -279,7 +342,9 @@ class Engraver:
         6. Organize lines into pages (based on page width)
         
         Args:
-            score: Deep copy of SCORE (thread-safe)
+            score: ScoreSnapshot taken by do_engrave (immutable, thread-safe)
+            cache_key: If given, keep the intermediate results under this key for
+                       incremental re-layout by _calculate_layout_incremental
             
         Returns:
             LayoutData with pre-calculated positions
@@ -309,6 +374,7 @@ class Engraver:
         # ====================================================================
         
         events = self._generate_structural_events(score, barline_times)
+        structural_events = list(events)
         print(f"Engraver: Generated {len(barline_times)} barlines, {len(events)} structural events")
         
         # ====================================================================
@@ -343,13 +409,14 @@ class Engraver:
         # STEP 6: Sort events by time
         # ====================================================================
         
-        events = sorted(events, key=lambda e: (e.get('time', 0.0), e.get('type', '')))
+        events = sorted(events, key=self._event_sort_key)
         
         # ====================================================================
         # STEP 7: Organize into lines (based on linebreaks)
         # ====================================================================
         
-        line_docs = self._organize_into_lines(score, events)
+        slots = self._organize_into_slots(score, events)
+        line_docs, line_slots = self._lines_from_slots(slots)
         print(f"Engraver: Organized into {len(line_docs)} lines")
         
         # ====================================================================
@@ -381,134 +448,329 @@ class Engraver:
             current_page=0  # Will be set by caller
         )
         
+        if cache_key is not None:
+            self._layout_cache[cache_key] = _LayoutCache(
+                snapshot=score,
+                barline_times=barline_times,
+                structural_slots=self._organize_into_slots(
+                    score, sorted(structural_events, key=self._event_sort_key)),
+                slots=slots,
+                layout_data=layout_data,
+                line_slots=line_slots,
+            )
+        
         calc_time = time.time() - start_time
-        total_events = sum(len(event) for page in DOC for line in page for event in line)
+        total_events = sum(len(line) for page in DOC for line in page)
         print(f"Engraver: Layout calculated in {calc_time:.3f}s - "
               f"{len(DOC)} pages, {len(line_docs)} lines, {total_events} events")
         
         return layout_data
     
+    # ========================================================================
+    # Incremental Layout (Background Thread)
+    # ========================================================================
+    
+    # Decorations of an edit can land just outside its range: a stop sign is
+    # placed FRACTION before a note end and EQUALS/GREATER use a 0.1 threshold.
+    # Start times are also compared after rounding, hence the extra tick.
+    _DIRTY_MARGIN = 1.5
+    
+    def _calculate_layout_for_task(self, task: EngraveTask) -> LayoutData:
+        '''Re-layout only the dirty lines if the cache allows it, else do a full layout.'''
+        cache_key = id(task.canvas)
+        with self._stale_canvases_lock:
+            stale = cache_key in self._stale_canvases
+            self._stale_canvases.discard(cache_key)
+        if stale:
+            self._layout_cache.pop(cache_key, None)
+        cache = self._layout_cache.get(cache_key)
+        snapshot = task.snapshot
+        
+        if (cache is None or snapshot is None or not task.has_changes()
+                or not self._same_structure(cache.snapshot, snapshot)):
+            return self._calculate_layout(snapshot, cache_key)
+        
+        dirty_range = task.dirty_range
+        if task.changed_ids:
+            id_range = self._dirty_range_for_ids(cache.snapshot, snapshot, task.changed_ids)
+            if id_range is not None:
+                dirty_range = id_range if dirty_range is None else (
+                    min(dirty_range[0], id_range[0]), max(dirty_range[1], id_range[1]))
+        
+        return self._calculate_layout_incremental(snapshot, cache_key, cache, dirty_range)
+    
+    @staticmethod
+    def _same_structure(old: ScoreSnapshot, new: ScoreSnapshot) -> bool:
+        '''True if barlines, gridlines and line breaks are unchanged between snapshots.'''
+        return (old.timeline.key == new.timeline.key and
+                old.linebreak_times == new.linebreak_times and
+                len(old.staves) == len(new.staves))
+    
+    @staticmethod
+    def _dirty_range_for_ids(
+        old: ScoreSnapshot,
+        new: ScoreSnapshot,
+        changed_ids: frozenset
+    ) -> Optional[Tuple[float, float]]:
+        '''Time range covered by the given events in either snapshot (None if none found).'''
+        low, high = math.inf, -math.inf
+        for snapshot in (old, new):
+            for stave in snapshot.staves:
+                for note_id, start, duration in zip(stave.note_id, stave.note_time, stave.note_duration):
+                    if note_id in changed_ids:
+                        low = min(low, start)
+                        high = max(high, start + duration)
+                for event_type in OTHER_EVENT_TYPES:
+                    times, ids = stave.events(event_type)
+                    for event_id, event_time in zip(ids, times):
+                        if event_id in changed_ids:
+                            low = min(low, event_time)
+                            high = max(high, event_time)
+        return (low, high) if low <= high else None
+    
+    def _calculate_layout_incremental(
+        self,
+        score: ScoreSnapshot,
+        cache_key: int,
+        cache: _LayoutCache,
+        dirty_range: Optional[Tuple[float, float]]
+    ) -> LayoutData:
+        '''Re-layout the lines touched by dirty_range and reuse the cached ones.
+        
+        The affected slots are rebuilt by running the regular note, decoration,
+        beam and other-event stages on a snapshot that only holds the events near
+        those slots, and keeping the output that falls inside them. Every stage
+        keeps the relative order of its input, so the result is the same as a full
+        layout.
+        
+        Args:
+            score: New ScoreSnapshot (same structure as cache.snapshot)
+            cache_key: Key of the cache, updated with the new layout
+            cache: Layout cache of the previous task for this canvas
+            dirty_range: (start, end) ticks that changed, None if nothing did
+            
+        Returns:
+            LayoutData with changed_pages set
+        '''
+        start_time = time.time()
+        old_layout = cache.layout_data
+        slots = list(cache.slots)
+        linebreak_times = score.linebreak_times
+        
+        changed_slots = []
+        if dirty_range is not None:
+            margin = self._DIRTY_MARGIN
+            first = self._slot_of(linebreak_times, dirty_range[0] - margin)
+            last = self._slot_of(linebreak_times, dirty_range[1] + margin)
+            window_start = linebreak_times[first] if first > 0 else -math.inf
+            window_end = linebreak_times[last + 1] if last + 1 < len(linebreak_times) else math.inf
+            
+            window = self._window_snapshot(score, window_start - margin, window_end + margin, margin)
+            events = self._process_notes(window, [], cache.barline_times)
+            events = self._add_note_decorations(window, events)
+            events = self._process_beams(window, events)
+            events = self._add_other_events(window, events)
+            
+            new_slots = [list(cache.structural_slots[i]) for i in range(first, last + 1)]
+            for event in events:
+                slot = self._slot_of(linebreak_times, event.time)
+                if first <= slot <= last:
+                    new_slots[slot - first].append(event)
+            
+            for offset, events_in_slot in enumerate(new_slots):
+                events_in_slot.sort(key=self._event_sort_key)
+                slot = first + offset
+                if events_in_slot != slots[slot]:
+                    slots[slot] = events_in_slot
+                    changed_slots.append(slot)
+        
+        if not changed_slots:
+            layout_data = replace(old_layout, changed_pages=[])
+            self._layout_cache[cache_key] = replace(cache, snapshot=score, layout_data=layout_data)
+            print(f"Engraver: Incremental layout - nothing changed")
+            return layout_data
+        
+        line_docs, line_slots = self._lines_from_slots(slots)
+        staff_dimensions, staff_ranges = self._calculate_staff_dimensions(score, line_docs)
+        DOC, leftover_page_space = self._organize_into_pages(score, line_docs, staff_dimensions)
+        
+        changed_pages = self._changed_pages(
+            old_layout.DOC, cache.line_slots, DOC, line_slots, set(changed_slots))
+        
+        layout_data = LayoutData(
+            DOC=DOC,
+            leftover_page_space=leftover_page_space,
+            staff_dimensions=staff_dimensions,
+            staff_ranges=staff_ranges,
+            barline_times=cache.barline_times,
+            total_pages=len(DOC),
+            current_page=old_layout.current_page,
+            changed_pages=changed_pages
+        )
+        self._layout_cache[cache_key] = replace(
+            cache, snapshot=score, slots=slots, layout_data=layout_data, line_slots=line_slots)
+        
+        print(f"Engraver: Incremental layout in {time.time() - start_time:.3f}s - "
+              f"{len(changed_slots)} of {len(slots)} lines rebuilt, pages changed: {changed_pages}")
+        return layout_data
+    
+    @staticmethod
+    def _changed_pages(
+        old_doc: List[List[List[LayoutEvent]]],
+        old_line_slots: List[int],
+        new_doc: List[List[List[LayoutEvent]]],
+        new_line_slots: List[int],
+        changed_slots: set
+    ) -> List[int]:
+        '''Pages whose lines differ between two layouts that share all unchanged slots.'''
+        def pages_of_slots(doc, line_slots):
+            result = []
+            line_idx = 0
+            for page in doc:
+                result.append(tuple(line_slots[line_idx:line_idx + len(page)]))
+                line_idx += len(page)
+            return result
+        
+        old_pages = pages_of_slots(old_doc, old_line_slots)
+        new_pages = pages_of_slots(new_doc, new_line_slots)
+        changed = []
+        for page_idx in range(max(len(old_pages), len(new_pages))):
+            if page_idx >= len(old_pages) or page_idx >= len(new_pages):
+                changed.append(page_idx)
+            elif old_pages[page_idx] != new_pages[page_idx]:
+                changed.append(page_idx)  # Lines moved between pages or were added/removed
+            elif any(slot in changed_slots for slot in new_pages[page_idx]):
+                changed.append(page_idx)
+        return changed
+    
+    @staticmethod
+    def _window_snapshot(score: ScoreSnapshot, start: float, end: float, margin: float) -> ScoreSnapshot:
+        '''A copy of the snapshot with only the events that can affect ticks [start, end).
+        
+        Notes are kept if they overlap the window, other events if they lie in it.
+        The connect stem scan of a note runs until its own note-off, so notes that
+        start before the last note starting in the window has ended are kept too.
+        Note order is preserved, which keeps the stage outputs in full-layout order.
+        '''
+        sweep_end = end
+        for stave in score.staves:
+            for t, d in zip(stave.note_time, stave.note_duration):
+                if start <= t < end and t + d + margin > sweep_end:
+                    sweep_end = t + d + margin
+        
+        staves = []
+        for stave in score.staves:
+            keep = [i for i, (t, d) in enumerate(zip(stave.note_time, stave.note_duration))
+                    if t < sweep_end and t + d >= start]
+            columns = {}
+            for event_type in OTHER_EVENT_TYPES:
+                times, ids = stave.events(event_type)
+                kept = [i for i, t in enumerate(times) if start <= t < end]
+                columns[f'{event_type}_time'] = tuple(times[i] for i in kept)
+                columns[f'{event_type}_id'] = tuple(ids[i] for i in kept)
+            staves.append(replace(
+                stave,
+                note_time=tuple(stave.note_time[i] for i in keep),
+                note_duration=tuple(stave.note_duration[i] for i in keep),
+                note_pitch=tuple(stave.note_pitch[i] for i in keep),
+                note_hand=tuple(stave.note_hand[i] for i in keep),
+                note_color=tuple(stave.note_color[i] for i in keep),
+                note_id=tuple(stave.note_id[i] for i in keep),
+                **columns,
+            ))
+        return replace(score, staves=tuple(staves))
+    
     # ========================================================================
     # Layout Calculation Helper Methods (Background Thread)
     # ========================================================================
     
-    def _generate_structural_events(self, score: SCORE, barline_times: List[float]) -> List[Dict]:
-        '''Generate barlines, gridlines, time signatures from baseGrid.
+    def _generate_structural_events(self, score: ScoreSnapshot, barline_times: List[float]) -> List[LayoutEvent]:
+        '''Generate barlines, gridlines, time signatures from the score's Timeline.
         
         Args:
-            score: The SCORE object
+            score: The ScoreSnapshot
             barline_times: List to populate with barline tick positions
             
         Returns:
             List of structural events (barlines, gridlines, time sigs)
         '''
         events = []
-        time_ticks = 0.0
         FRACTION = 0.01  # Small offset for event ordering
+        timeline = score.timeline
         
         # Debug: check what we're working with
-        print(f"Engraver: _generate_structural_events - score has {len(score.baseGrid)} baseGrids")
+        print(f"Engraver: _generate_structural_events - score has {len(timeline.spans)} baseGrids")
+        
+        barline_times.extend(timeline.measure_starts)
         
         # Process each baseGrid
-        for grid_idx, grid in enumerate(score.baseGrid):
-            print(f"Engraver:   baseGrid[{grid_idx}]: {grid.measureAmount} measures, "
-                  f"{grid.numerator}/{grid.denominator}, {len(grid.gridTimes)} gridlines")
+        for grid_idx, span in enumerate(timeline.spans):
+            print(f"Engraver:   baseGrid[{grid_idx}]: {span.measure_amount} measures, "
+                  f"{span.numerator}/{span.denominator}, {len(span.grid_times)} gridlines")
             
-            # Calculate measure duration in ticks
-            quarter_note_ticks = score.fileSettings.quarterNoteUnit if (hasattr(score, 'fileSettings') and hasattr(score.fileSettings, 'quarterNoteUnit')) else 256.0
-            measure_ticks = (grid.numerator / grid.denominator) * 4.0 * quarter_note_ticks
+            measure_ticks = span.measure_ticks
             
             # Generate barlines and gridlines for each measure
-            for measure_num in range(grid.measureAmount):
-                measure_start = time_ticks + (measure_num * measure_ticks)
+            for measure_num in range(span.measure_amount):
+                measure_start = timeline.measure_starts[span.first_measure + measure_num]
                 
                 # Add barline and double barline (double is slightly before for ordering)
-                barline_times.append(measure_start)
-                events.append({
-                    'type': 'barline',
-                    'time': measure_start,
-                    'measure_num': measure_num + 1
-                })
-                events.append({
-                    'type': 'barlinedouble',
-                    'time': measure_start - FRACTION
-                })
+                events.append(BarlineEvent(EventKind.BARLINE, measure_start, measure_num + 1))
+                events.append(GridEvent(EventKind.BARLINEDOUBLE, measure_start - FRACTION))
                 
                 # Add time signature indicator at first measure of grid
-                if measure_num == 0 and grid.timeSignatureIndicatorVisible:
-                    events.append({
-                        'type': 'timesignature',
-                        'time': time_ticks,
-                        'numerator': grid.numerator,
-                        'denominator': grid.denominator,
-                        'visible': grid.timeSignatureIndicatorVisible
-                    })
+                if measure_num == 0 and span.time_signature_visible:
+                    events.append(TimeSignatureEvent(
+                        EventKind.TIMESIGNATURE, span.start,
+                        span.numerator, span.denominator, span.time_signature_visible
+                    ))
                 
                 # Add gridlines within the measure
-                for grid_time in grid.gridTimes:
+                for grid_time in span.grid_times:
                     gridline_time = measure_start + grid_time
                     if gridline_time < measure_start + measure_ticks:
-                        events.append({
-                            'type': 'gridline',
-                            'time': gridline_time
-                        })
-                        events.append({
-                            'type': 'gridlinedouble',
-                            'time': gridline_time - FRACTION
-                        })
-            
-            # Move to next grid's start time
-            time_ticks += grid.measureAmount * measure_ticks
+                        events.append(GridEvent(EventKind.GRIDLINE, gridline_time))
+                        events.append(GridEvent(EventKind.GRIDLINEDOUBLE, gridline_time - FRACTION))
         
         # Add final endbarline
-        total_ticks = time_ticks
-        events.append({
-            'type': 'endbarline',
-            'time': total_ticks - FRACTION
-        })
+        events.append(GridEvent(EventKind.ENDBARLINE, timeline.end - FRACTION))
         
         return events
     
-    def _process_notes(self, score: SCORE, events: List[Dict], barline_times: List[float]) -> List[Dict]:
+    def _process_notes(self, score: ScoreSnapshot, events: List[LayoutEvent], barline_times: List[float]) -> List[LayoutEvent]:
         '''Process notes: split on barlines/linebreaks if needed.
         
         Args:
-            score: The SCORE object
+            score: The ScoreSnapshot
             events: Existing events list
             barline_times: Barline positions for splitting
             
         Returns:
             Events list with processed notes
         '''
-        from engraver.engraver_helpers_new import note_processor
-        
-        # Convert SCORE notes to dict format and process
-        for stave_idx, stave in enumerate(score.stave):
-            for note_obj in stave.event.note:
-                # Convert note to dict format
-                note_dict = {
-                    'time': note_obj.time,
-                    'duration': note_obj.duration,
-                    'pitch': note_obj.pitch,
-                    'staff': stave_idx,
-                    'hand': getattr(note_obj, 'hand', 'r'),
-                    'color': getattr(note_obj, 'color', '#000000'),
-                    'id': getattr(note_obj, 'id', 0),
-                }
-                
-                # Process note (splits on barlines if needed)
-                processed_notes = note_processor(note_dict, barline_times)
-                events.extend(processed_notes)
+        from engraver.engraver_helpers_new import note_processor_batch
+        
+        # Convert snapshot notes to NoteEvent records and process
+        for stave_idx, stave in enumerate(score.staves):
+            note_events = [
+                NoteEvent(EventKind.NOTE, time, duration, pitch, stave_idx, hand, color, note_id)
+                for time, duration, pitch, hand, color, note_id in zip(
+                    stave.note_time, stave.note_duration, stave.note_pitch,
+                    stave.note_hand, stave.note_color, stave.note_id)
+            ]
+            
+            # Process the stave's notes (splits on barlines if needed)
+            events.extend(note_processor_batch(note_events, barline_times))
         
         return events
     
-    def _add_note_decorations(self, score: SCORE, events: List[Dict]) -> List[Dict]:
+    def _add_note_decorations(self, score: ScoreSnapshot, events: List[LayoutEvent]) -> List[LayoutEvent]:
         '''Add continuation dots, stop signs, connect stems.
         
         Analyzes overlapping notes to add visual indicators.
         
         Args:
-            score: The SCORE object
+            score: The ScoreSnapshot
             events: Events list with notes
             
         Returns:
@@ -517,18 +779,18 @@ class Engraver:
         from engraver.engraver_helpers_new import continuation_dot_stopsign_and_connectstem_processor
         
         # Extract note events for processing
-        note_events = [e for e in events if e.get('type') in ['note', 'notesplit']]
+        note_events = [e for e in events if e.kind in NOTE_KINDS]
         
         # Process to add decorations
         events = continuation_dot_stopsign_and_connectstem_processor(note_events, events)
         
         return events
     
-    def _process_beams(self, score: SCORE, events: List[Dict]) -> List[Dict]:
+    def _process_beams(self, score: ScoreSnapshot, events: List[LayoutEvent]) -> List[LayoutEvent]:
         '''Group rapid notes into beam groups.
         
         Args:
-            score: The SCORE object
+            score: The ScoreSnapshot
             events: Events list
             
         Returns:
@@ -536,123 +798,100 @@ class Engraver:
         '''
         
         # Add beam events from score
-        for stave_idx, stave in enumerate(score.stave):
-            for beam in stave.event.beam:
-                events.append({
-                    'type': 'beam',
-                    'time': beam.time,
-                    'stave_idx': stave_idx,
-                    'beam_obj': beam
-                })
+        for stave_idx, stave in enumerate(score.staves):
+            for beam_time, beam_id in zip(stave.beam_time, stave.beam_id):
+                events.append(ObjectEvent(EventKind.BEAM, beam_time, stave_idx, beam_id))
         
         return events
     
-    def _add_other_events(self, score: SCORE, events: List[Dict]) -> List[Dict]:
+    def _add_other_events(self, score: ScoreSnapshot, events: List[LayoutEvent]) -> List[LayoutEvent]:
         '''Add slurs, text, tempo, grace notes, etc.
         
         Args:
-            score: The SCORE object
+            score: The ScoreSnapshot
             events: Events list
             
         Returns:
             Events list with all events
         '''
         
-        for stave_idx, stave in enumerate(score.stave):
+        for stave_idx, stave in enumerate(score.staves):
             # Slurs
-            for slur in stave.event.slur:
-                events.append({
-                    'type': 'slur',
-                    'time': slur.time,
-                    'stave_idx': stave_idx,
-                    'slur_obj': slur
-                })
+            for slur_time, slur_id in zip(stave.slur_time, stave.slur_id):
+                events.append(ObjectEvent(EventKind.SLUR, slur_time, stave_idx, slur_id))
             
             # Text
-            for text in stave.event.text:
-                events.append({
-                    'type': 'text',
-                    'time': text.time,
-                    'stave_idx': stave_idx,
-                    'text_obj': text
-                })
+            for text_time, text_id in zip(stave.text_time, stave.text_id):
+                events.append(ObjectEvent(EventKind.TEXT, text_time, stave_idx, text_id))
             
             # Tempo
-            for tempo in stave.event.tempo:
-                events.append({
-                    'type': 'tempo',
-                    'time': tempo.time,
-                    'stave_idx': stave_idx,
-                    'tempo_obj': tempo
-                })
+            for tempo_time, tempo_id in zip(stave.tempo_time, stave.tempo_id):
+                events.append(ObjectEvent(EventKind.TEMPO, tempo_time, stave_idx, tempo_id))
             
             # Grace notes
-            for grace in stave.event.graceNote:
-                events.append({
-                    'type': 'gracenote',
-                    'time': grace.time,
-                    'stave_idx': stave_idx,
-                    'gracenote_obj': grace
-                })
+            for grace_time, grace_id in zip(stave.graceNote_time, stave.graceNote_id):
+                events.append(ObjectEvent(EventKind.GRACENOTE, grace_time, stave_idx, grace_id))
             
             # Count lines
-            for count in stave.event.countLine:
-                events.append({
-                    'type': 'countline',
-                    'time': count.time,
-                    'stave_idx': stave_idx,
-                    'countline_obj': count
-                })
+            for count_time, count_id in zip(stave.countLine_time, stave.countLine_id):
+                events.append(ObjectEvent(EventKind.COUNTLINE, count_time, stave_idx, count_id))
         
         return events
     
-    def _organize_into_lines(self, score: SCORE, events: List[Dict]) -> List[List[Dict]]:
-        '''Organize events into lines based on linebreak markers.
+    @staticmethod
+    def _event_sort_key(event: LayoutEvent) -> Tuple[float, int]:
+        '''Sort key for the layout event list: time, then kind (same order as the type names).'''
+        return (event.time, event.kind)
+    
+    @staticmethod
+    def _slot_of(linebreak_times: Tuple[float, ...], event_time: float) -> int:
+        '''Index of the linebreak slot an event time falls in (before the first break = slot 0).'''
+        return max(bisect_right(linebreak_times, event_time) - 1, 0)
+    
+    def _organize_into_slots(self, score: ScoreSnapshot, events: List[LayoutEvent]) -> List[List[LayoutEvent]]:
+        '''Organize sorted events per linebreak: one slot per linebreak, empty slots included.
         
         Args:
-            score: The SCORE object
+            score: The ScoreSnapshot
             events: Sorted events list
             
         Returns:
-            List of lines, each line is a list of events
+            List of slots, each slot is a list of events
         '''
-        
-        lines = []
-        current_line = []
-        
-        # Get linebreak times
-        linebreak_times = sorted([lb.time for lb in score.lineBreak])
-        linebreak_idx = 0
-        
+        linebreak_times = score.linebreak_times
+        slots = [[] for _ in range(max(len(linebreak_times), 1))]
         for event in events:
-            event_time = event.get('time', 0.0)
-            
-            # Check if we've crossed a linebreak
-            while (linebreak_idx < len(linebreak_times) - 1 and 
-                   event_time >= linebreak_times[linebreak_idx + 1]):
-                # Start new line
-                if current_line:
-                    lines.append(current_line)
-                    current_line = []
-                linebreak_idx += 1
-            
-            current_line.append(event)
-        
-        # Add final line
-        if current_line:
-            lines.append(current_line)
+            slots[self._slot_of(linebreak_times, event.time)].append(event)
+        return slots
+    
+    @staticmethod
+    def _lines_from_slots(slots: List[List[LayoutEvent]]) -> Tuple[List[List[LayoutEvent]], List[int]]:
+        '''Lines are the non-empty slots. Returns (lines, slot index of each line).'''
+        line_slots = [i for i, slot in enumerate(slots) if slot]
+        lines = [slots[i] for i in line_slots]
+        return (lines, line_slots) if lines else ([[]], [0])
+    
+    def _organize_into_lines(self, score: ScoreSnapshot, events: List[LayoutEvent]) -> List[List[LayoutEvent]]:
+        '''Organize events into lines based on linebreak markers.
         
-        return lines if lines else [[]]
+        Args:
+            score: The ScoreSnapshot
+            events: Sorted events list
+            
+        Returns:
+            List of lines, each line is a list of events
+        '''
+        return self._lines_from_slots(self._organize_into_slots(score, events))[0]
     
     def _calculate_staff_dimensions(
         self, 
-        score: SCORE, 
-        line_docs: List[List[Dict]]
+        score: ScoreSnapshot, 
+        line_docs: List[List[LayoutEvent]]
     ) -> Tuple[List[List[Dict]], List[List[Tuple[int, int]]]]:
         '''Calculate width and margins for each staff in each line.
         
         Args:
-            score: The SCORE object
+            score: The ScoreSnapshot
             line_docs: Lines of events
             
         Returns:
@@ -669,7 +908,7 @@ class Engraver:
         for line in line_docs:
             line_dims = []
             line_ranges = []
-            for stave in score.stave:
+            for stave in score.staves:
                 line_dims.append({
                     'staff_width': 140.0,  # mm
                     'margin_left': 35.0,
@@ -683,14 +922,14 @@ class Engraver:
     
     def _organize_into_pages(
         self,
-        score: SCORE,
-        line_docs: List[List[Dict]],
+        score: ScoreSnapshot,
+        line_docs: List[List[LayoutEvent]],
         staff_dimensions: List[List[Dict]]
-    ) -> Tuple[List[List[List[Dict]]], List[float]]:
+    ) -> Tuple[List[List[List[LayoutEvent]]], List[float]]:
         '''Organize lines into pages based on page height.
         
         Args:
-            score: The SCORE object
+            score: The ScoreSnapshot
             line_docs: Lines of events
             staff_dimensions: Staff dimensions per line
             
@@ -727,8 +966,22 @@ class Engraver:
         is_print_preview = self._is_print_preview_canvas(canvas)
         print(f"Engraver: Is print preview canvas: {is_print_preview}")
         
-        # Clear canvas
-        canvas.clear()
+        # Incremental layouts only redraw the pages that changed
+        changed_pages = layout_data.changed_pages
+        if changed_pages is not None:
+            if not changed_pages:
+                print("Engraver: No pages changed, nothing to redraw")
+                return
+            for page_idx in changed_pages:
+                canvas.delete_by_tag(self._page_tag(page_idx))
+            changed = set(changed_pages)
+            layout_data = replace(layout_data, DOC=[
+                page if page_idx in changed else [[] for _ in page]
+                for page_idx, page in enumerate(layout_data.DOC)
+            ])
+        else:
+            # Clear canvas
+            canvas.clear()
         
         # Prepare all drawing operations as a list of callables
         draw_operations = []
@@ -741,8 +994,9 @@ class Engraver:
         
         # Only draw test visualization on print preview
         if is_print_preview:
-            # Page boundaries and background
-            draw_operations.extend(self._prepare_page_operations(layout_data))
+            # Page boundaries and background (kept on partial redraws)
+            if changed_pages is None:
+                draw_operations.extend(self._prepare_page_operations(layout_data))
             print(f"Engraver:   After page ops: {len(draw_operations)} total")
             
             # Header/footer
@@ -808,6 +1062,11 @@ class Engraver:
     # Drawing Operation Preparers (Return lists of callables)
     # ========================================================================
     
+    @staticmethod
+    def _page_tag(page_idx: int) -> str:
+        '''Canvas tag shared by everything drawn for one page (used for partial redraws).'''
+        return f'page_{page_idx}'
+    
     def _prepare_page_operations(self, layout_data: LayoutData) -> List[Callable]:
         '''Prepare page boundary and background drawing operations.'''
         operations = []
@@ -870,16 +1129,17 @@ class Engraver:
         for page_idx, page in enumerate(layout_data.DOC):
             for line_idx, line in enumerate(page):
                 for event in line:
-                    if event.get('type') in ['barline', 'endbarline']:
+                    if event.kind in BARLINE_KINDS:
                         barline_count += 1
                         # TODO: Calculate proper y position from time
-                        y_pos = 20.0 + (line_idx * 80.0) + (event.get('time', 0.0) * 0.05)
+                        y_pos = 20.0 + (line_idx * 80.0) + (event.time * 0.05)
                         x_left = 30.0
                         x_right = 180.0
                         
-                        width = 0.5 if event.get('type') == 'endbarline' else 0.3
+                        width = 0.5 if event.kind == EventKind.ENDBARLINE else 0.3
                         
-                        def draw_barline(canvas, y=y_pos, x1=x_left, x2=x_right, w=width):
+                        def draw_barline(canvas, y=y_pos, x1=x_left, x2=x_right, w=width,
+                                         page_tag=self._page_tag(page_idx)):
                             canvas.add_line(
                                 x1_mm=x1,
                                 y1_mm=y,
@@ -887,7 +1147,7 @@ class Engraver:
                                 y2_mm=y,
                                 color='#000000',
                                 width_mm=w,
-                                tags=['barline']
+                                tags=['barline', page_tag]
                             )
                         
                         operations.append(draw_barline)
@@ -904,13 +1164,14 @@ class Engraver:
         for page_idx, page in enumerate(layout_data.DOC):
             for line_idx, line in enumerate(page):
                 for event in line:
-                    if event.get('type') == 'gridline':
+                    if event.kind == EventKind.GRIDLINE:
                         gridline_count += 1
-                        y_pos = 20.0 + (line_idx * 80.0) + (event.get('time', 0.0) * 0.05)
+                        y_pos = 20.0 + (line_idx * 80.0) + (event.time * 0.05)
                         x_left = 30.0
                         x_right = 180.0
                         
-                        def draw_gridline(canvas, y=y_pos, x1=x_left, x2=x_right):
+                        def draw_gridline(canvas, y=y_pos, x1=x_left, x2=x_right,
+                                          page_tag=self._page_tag(page_idx)):
                             canvas.add_line(
                                 x1_mm=x1,
                                 y1_mm=y,
@@ -918,7 +1179,7 @@ class Engraver:
                                 y2_mm=y,
                                 color='#CCCCCC',
                                 width_mm=0.2,
-                                tags=['gridline']
+                                tags=['gridline', page_tag]
                             )
                         
                         operations.append(draw_gridline)
@@ -934,13 +1195,14 @@ class Engraver:
         for page_idx, page in enumerate(layout_data.DOC):
             for line_idx, line in enumerate(page):
                 for event in line:
-                    if event.get('type') == 'timesignature' and event.get('visible'):
-                        y_pos = 20.0 + (line_idx * 80.0) + (event.get('time', 0.0) * 0.05)
+                    if event.kind == EventKind.TIMESIGNATURE and event.visible:
+                        y_pos = 20.0 + (line_idx * 80.0) + (event.time * 0.05)
                         x_pos = 15.0
-                        num = event.get('numerator', 4)
-                        denom = event.get('denominator', 4)
+                        num = event.numerator
+                        denom = event.denominator
                         
-                        def draw_timesig(canvas, x=x_pos, y=y_pos, n=num, d=denom):
+                        def draw_timesig(canvas, x=x_pos, y=y_pos, n=num, d=denom,
+                                         page_tag=self._page_tag(page_idx)):
                             canvas.add_text(
                                 text=f"{n}/{d}",
                                 x_mm=x,
@@ -948,7 +1210,7 @@ class Engraver:
                                 font_size_pt=10,
                                 color='#000000',
                                 anchor='left',
-                                tags=['timesignature']
+                                tags=['timesignature', page_tag]
                             )
                         
                         operations.append(draw_timesig)
@@ -963,20 +1225,21 @@ class Engraver:
         for page_idx, page in enumerate(layout_data.DOC):
             for line_idx, line in enumerate(page):
                 for event in line:
-                    if event.get('type') in ['note', 'notesplit']:
+                    if event.kind in NOTE_KINDS:
                         # Calculate positions
-                        pitch = event.get('pitch', 40)
-                        time = event.get('time', 0.0)
-                        duration = event.get('duration', 256.0)
-                        staff = event.get('staff', 0)
+                        pitch = event.pitch
+                        time = event.time
+                        duration = event.duration
+                        staff = event.staff
                         
                         # Simple x position based on pitch (will improve with proper helper)
                         x_pos = 30.0 + ((pitch - 21) * 1.5)
                         y_start = 20.0 + (line_idx * 80.0) + (time * 0.05)
                         y_end = y_start + (duration * 0.05)
-                        color = event.get('color', '#000000')
+                        color = event.color
                         
-                        def draw_note(canvas, x=x_pos, y1=y_start, y2=y_end, col=color):
+                        def draw_note(canvas, x=x_pos, y1=y_start, y2=y_end, col=color,
+                                      page_tag=self._page_tag(page_idx)):
                             # Draw midi-note body (rectangle)
                             canvas.add_rectangle(
                                 x1_mm=x - 1.5,
@@ -986,7 +1249,7 @@ class Engraver:
                                 fill=True,
                                 fill_color=col,
                                 outline=False,
-                                tags=['note', 'midi_note']
+                                tags=['note', 'midi_note', page_tag]
                             )
                         
                         operations.append(draw_note)
@@ -1057,28 +1320,46 @@ class Engraver:
         self,
         score: Any,
         canvas: Any,
-        callback: Optional[Callable[[bool, Optional[str]], None]] = None
+        callback: Optional[Callable[[bool, Optional[str]], None]] = None,
+        dirty_range: Optional[Tuple[float, float]] = None,
+        changed_ids: Optional[Iterable[int]] = None
     ):
         '''Submit an engraving task.
         
         If a task is currently processing, this new task will be queued.
         If a task is already queued, it will be replaced with this newer task.
         
-        Thread-safe. Can be called from any thread (typically main/UI thread).
+        Must be called on the thread that edits the score (typically main/UI
+        thread): the layout inputs are snapshotted here, so later edits don't
+        leak into this task.
         
         Args:
             score: The SCORE object to engrave
             canvas: The Canvas widget to draw on
             callback: Optional callback(success: bool, error: Optional[str])
                      Called on main thread when engraving completes
+            dirty_range: (start, end) ticks covering everything that changed since
+                     the previous do_engrave for this canvas, old and new positions
+                     of moved events included
+            changed_ids: IDs of events that were added, removed or modified since
+                     the previous do_engrave for this canvas
+            
+            With neither dirty_range nor changed_ids the whole score is re-laid
+            out. Otherwise only the lines touched by the changes are, and
+            LayoutData.changed_pages lists the pages that need redrawing.
         '''
         # Generate unique task ID
         with self._task_id_lock:
             self._task_id_counter += 1
             task_id = self._task_id_counter
         
+        # Snapshot on the calling thread, before the UI can change the score again
+        snapshot = self._safe_copy_score(score)
+        
         # Create task
-        task = EngraveTask(score, canvas, callback, task_id)
+        task = EngraveTask(snapshot, canvas, callback, task_id,
+                           dirty_range=tuple(dirty_range) if dirty_range is not None else None,
+                           changed_ids=frozenset(changed_ids) if changed_ids is not None else None)
         
         # Clear any existing queued task (keep only the newest)
         while not self._task_queue.empty():
@@ -1087,6 +1368,7 @@ class Engraver:
                 if old_task is not None:
                     print(f"Engraver: Discarding old queued task {old_task.task_id}")
                     self._tasks_skipped += 1
+                    self._supersede_task(old_task, task)
             except queue.Empty:
                 break
         
@@ -4,8 +4,18 @@ Helper functions for the engraver, ported from Qt implementation.
 Contains coordinate conversion, note processing, staff calculations, etc.
 """
 
-import copy
-from typing import List, Dict, Tuple, Any
+from bisect import bisect_left, bisect_right
+from collections import deque
+from functools import lru_cache
+from typing import List, Dict, Tuple, Any, Sequence
+
+try:
+    import numpy as np  # Optional: vectorized barline search in note_processor_batch
+except ImportError:
+    np = None
+
+from engraver.layout_event import EventKind, LayoutEvent, MarkEvent, NoteEvent, StemEvent
+from utils.CONSTANTS import KEY_UNIT_OFFSETS
 
 # Constants
 FRACTION = 0.01
@@ -13,32 +23,34 @@ PITCH_UNIT = 3.0  # mm
 QUARTER_PIANOTICK = 256.0
 
 
+# Offsets that widen a key range to the outer lines of its stave groups, by key remainder (1-12)
+_MIN_KEY_OFFSET = {4: 0, 5: -1, 6: -2, 7: -3, 8: -4, 9: 0, 10: -1, 11: -2, 12: -3, 1: -4, 2: -5, 3: -6}
+_MAX_KEY_OFFSET = {4: 4, 5: 3, 6: 2, 7: 1, 8: 0, 9: 6, 10: 5, 11: 4, 12: 3, 1: 2, 2: 1, 3: 0}
+
+
+@lru_cache(maxsize=4096)
 def calculate_staff_width(key_min: int, key_max: int, draw_scale: float = 1.0) -> float:
     """Calculate staff width based on pitch range.
     
-    Based on Qt engraver calculate_staff_width function.
+    Based on Qt engraver calculate_staff_width function. The width is the
+    KEY_UNIT_OFFSETS distance from key_min - 1 to key_max, where the step into
+    key_min counts single; results are memoized per (key_min, key_max, draw_scale).
     """
     if key_min == 0 and key_max == 0:
         return 0.0
     
     # Trim to force range to outer sides of staff
-    key_min, key_max = min(key_min, 40), max(key_max, 44)
-    
-    mn_offset = {4: 0, 5: -1, 6: -2, 7: -3, 8: -4, 9: 0, 10: -1, 11: -2, 12: -3, 1: -4, 2: -5, 3: -6}
-    mx_offset = {4: 4, 5: 3, 6: 2, 7: 1, 8: 0, 9: 6, 10: 5, 11: 4, 12: 3, 1: 2, 2: 1, 3: 0}
-    
-    key_min += mn_offset[((key_min - 1) % 12) + 1]
-    key_max += mx_offset[((key_max - 1) % 12) + 1]
-    key_min, key_max = max(key_min, 1), min(key_max, 88)
+    key_min, key_max = trim_key_to_outer_sides_staff(key_min, key_max)
     
-    # Calculate width
-    width = 0.0
-    for n in range(key_min - 1, key_max + 1):
-        width += PITCH_UNIT * 2 if ((n - 1) % 12) + 1 in [4, 9] and n != key_min else PITCH_UNIT
+    # Units of the steps into keys key_min - 1 .. key_max (the step into key 0 is one unit)
+    units = KEY_UNIT_OFFSETS[key_max] - (KEY_UNIT_OFFSETS[key_min - 2] if key_min >= 2 else -1)
+    if KEY_UNIT_OFFSETS[key_min] - KEY_UNIT_OFFSETS[key_min - 1] == 2:
+        units -= 1
     
-    return width * draw_scale
+    return units * PITCH_UNIT * draw_scale
 
 
+@lru_cache(maxsize=None)
 def trim_key_to_outer_sides_staff(key_min: int, key_max: int) -> Tuple[int, int]:
     """Trim key range to outer sides of staff."""
     if not key_min and not key_max:
@@ -46,33 +58,38 @@ def trim_key_to_outer_sides_staff(key_min: int, key_max: int) -> Tuple[int, int]
     
     key_min, key_max = min(key_min, 40), max(key_max, 44)
     
-    mn_offset = {4: 0, 5: -1, 6: -2, 7: -3, 8: -4, 9: 0, 10: -1, 11: -2, 12: -3, 1: -4, 2: -5, 3: -6}
-    mx_offset = {4: 4, 5: 3, 6: 2, 7: 1, 8: 0, 9: 6, 10: 5, 11: 4, 12: 3, 1: 2, 2: 1, 3: 0}
-    
-    key_min += mn_offset[((key_min - 1) % 12) + 1]
-    key_max += mx_offset[((key_max - 1) % 12) + 1]
+    key_min += _MIN_KEY_OFFSET[((key_min - 1) % 12) + 1]
+    key_max += _MAX_KEY_OFFSET[((key_max - 1) % 12) + 1]
     key_min, key_max = max(key_min, 1), min(key_max, 88)
     
     return key_min, key_max
 
 
-def pitch2x_view(pitch: int, staff_range: Tuple[int, int], scale: float, x_cursor: float) -> float:
-    """Convert pitch to x coordinate in view."""
-    key_min, key_max = staff_range
-    key_min, key_max = trim_key_to_outer_sides_staff(key_min, key_max)
-    
-    x = x_cursor
-    for n in range(1, key_min):
-        remainder = ((n - 1) % 12) + 1
-        x -= PITCH_UNIT * 2 * scale if remainder in [4, 9] else PITCH_UNIT * 2 * scale / 2
+@lru_cache(maxsize=None)
+def _staff_key_units(key_min: int, key_max: int) -> Tuple[int, ...]:
+    """Offset of every pitch (index 0-89) in PITCH_UNITs from the left of a staff range.
     
-    for n in range(1, 88):
-        remainder = ((n - 1) % 12) + 1
-        x += PITCH_UNIT * 2 * scale if remainder in [4, 9] and n != key_min else PITCH_UNIT * 2 * scale / 2
-        if n == pitch:
-            break
+    Pitches outside 1-87 are placed at key 87; the step into the trimmed
+    key_min is a single unit, even across a BE gap.
+    """
+    key_min, key_max = trim_key_to_outer_sides_staff(key_min, key_max)
+    base = KEY_UNIT_OFFSETS[max(key_min - 1, 0)]
+    single_min_step = key_min >= 1 and KEY_UNIT_OFFSETS[key_min] - KEY_UNIT_OFFSETS[key_min - 1] == 2
     
-    return x
+    units = []
+    for pitch in range(len(KEY_UNIT_OFFSETS)):
+        key = pitch if 1 <= pitch <= 87 else 87
+        offset = KEY_UNIT_OFFSETS[key] - base
+        if single_min_step and key_min <= key:
+            offset -= 1
+        units.append(offset)
+    return tuple(units)
+
+
+def pitch2x_view(pitch: int, staff_range: Tuple[int, int], scale: float, x_cursor: float) -> float:
+    """Convert pitch to x coordinate in view (a lookup in the staff range's key table)."""
+    units = _staff_key_units(*staff_range)
+    return x_cursor + units[pitch if 0 <= pitch < len(units) else 87] * PITCH_UNIT * scale
 
 
 def tick2y_view(time: float, line_ticks: Tuple[float, float], staff_height: float) -> float:
@@ -100,170 +117,200 @@ def GREATER(a: float, b: float, threshold: float = 0.1) -> bool:
     return a > b + threshold
 
 
-def continuation_dot(time: float, pitch: int, note: Dict) -> Dict:
+def continuation_dot(time: float, pitch: int, note: NoteEvent) -> MarkEvent:
     """Create continuation dot event."""
-    return {
-        'time': time,
-        'pitch': pitch,
-        'type': 'continuationdot',
-        'staff': note.get('staff', 0),
-        'hand': note.get('hand', 'r')
-    }
+    return MarkEvent(EventKind.CONTINUATIONDOT, time, pitch, note.staff, note.hand)
 
 
-def stop_sign(time: float, pitch: int, note: Dict) -> Dict:
+def stop_sign(time: float, pitch: int, note: NoteEvent) -> MarkEvent:
     """Create stop sign event."""
-    return {
-        'time': time,
-        'pitch': pitch,
-        'type': 'notestop',
-        'staff': note.get('staff', 0),
-        'hand': note.get('hand', 'r')
-    }
+    return MarkEvent(EventKind.NOTESTOP, time, pitch, note.staff, note.hand)
+
 
+def _note_piece(note: NoteEvent, kind: EventKind, time: float, duration: float) -> NoteEvent:
+    """Copy of a note event with a new kind, time and duration."""
+    return NoteEvent(kind, time, duration, note.pitch, note.staff, note.hand, note.color, note.id)
 
-def note_processor(note: Dict, barline_times: List[float]) -> List[Dict]:
+
+def note_processor(note: NoteEvent, barline_times: Sequence[float]) -> List[LayoutEvent]:
     """Process a note: split on barlines if needed.
     
     Based on Qt engraver note_processor function.
     Returns list of note/notesplit events plus continuation dots.
+    barline_times must be sorted; the barlines inside the note are found with bisect.
     """
-    output = []
+    lo = bisect_right(barline_times, note.time)
+    hi = bisect_left(barline_times, note.time + note.duration)
+    return _split_note(note, barline_times[lo:hi])
+
+
+def note_processor_batch(notes: Sequence[NoteEvent], barline_times: Sequence[float]) -> List[LayoutEvent]:
+    """note_processor for many notes: the concatenation of note_processor(note) for each note.
     
-    note_start = note['time']
-    note_end = note['time'] + note['duration']
+    The barlines inside every note are found in one vectorized searchsorted
+    pass when NumPy is available (bisect per note otherwise).
+    barline_times must be sorted.
+    """
+    if np is None or not barline_times:
+        output = []
+        for note in notes:
+            output.extend(note_processor(note, barline_times))
+        return output
     
-    # Check if there's a barline between note_start and note_end
-    bl_times = []
-    for bl in barline_times:
-        if note_start < bl < note_end:
-            bl_times.append(bl)
-            output.append(continuation_dot(bl, note['pitch'], note))
+    barlines = np.asarray(barline_times, dtype=np.float64)
+    starts = np.fromiter((note.time for note in notes), dtype=np.float64, count=len(notes))
+    ends = starts + np.fromiter((note.duration for note in notes), dtype=np.float64, count=len(notes))
+    lo = np.searchsorted(barlines, starts, side='right').tolist()
+    hi = np.searchsorted(barlines, ends, side='left').tolist()
     
+    output = []
+    for note, first, last in zip(notes, lo, hi):
+        output.extend(_split_note(note, barline_times[first:last]))
+    return output
+
+
+def _split_note(note: NoteEvent, bl_times: Sequence[float]) -> List[LayoutEvent]:
+    """Note/notesplit pieces of a note and a continuation dot per barline in bl_times (inside the note)."""
     # If no barline in between, add as-is
     if not bl_times:
-        note_copy = dict(note)
-        note_copy['type'] = 'note'
-        output.append(note_copy)
-        return output
+        return [note if note.kind == EventKind.NOTE else
+                _note_piece(note, EventKind.NOTE, note.time, note.duration)]
+    
+    output = [continuation_dot(bl, note.pitch, note) for bl in bl_times]
     
     # Split note on barlines
+    note_start = note.time
+    note_end = note.time + note.duration
     first = True
     for bl in bl_times:
-        new = dict(note)
-        new['duration'] = bl - note_start
-        new['time'] = note_start
-        new['type'] = 'note' if first else 'notesplit'
-        output.append(new)
+        output.append(_note_piece(note, EventKind.NOTE if first else EventKind.NOTESPLIT,
+                                  note_start, bl - note_start))
         note_start = bl
         first = False
     
     # Add last split note
-    new = dict(note)
-    new['duration'] = note_end - note_start
-    new['time'] = note_start
-    new['type'] = 'notesplit'
-    output.append(new)
+    output.append(_note_piece(note, EventKind.NOTESPLIT, note_start, note_end - note_start))
     
     return output
 
 
-def continuation_dot_stopsign_and_connectstem_processor(note_events: List[Dict], DOC: List[Dict]) -> List[Dict]:
+def continuation_dot_stopsign_and_connectstem_processor(note_events: List[NoteEvent], DOC: List[LayoutEvent]) -> List[LayoutEvent]:
     """Process notes to add continuation dots, stop signs, and connect stems.
     
     Based on Qt engraver continuation_dot_stopsign_and_connectstem_processor.
+    
+    Sweep-line implementation: note on/off events are sorted once (same order as
+    the Qt version) and swept left to right while the sounding notes are kept per
+    (staff, hand). Stop signs look up the next note start of the same (staff, hand)
+    with bisect instead of scanning all remaining events. Input events are only read,
+    never copied or modified. Output is identical to the original nested-scan version.
     """
-    # Create note_on_off list like MIDI
+    # Create note_on_off list like MIDI: (is_off, note, endtime), on before off
     note_on_off = []
-    for note in sorted(note_events, key=lambda y: y['time']):
-        evt = copy.deepcopy(note)
-        evt['endtime'] = evt['time'] + evt['duration']
-        evt['original_type'] = evt.get('type', 'note')
-        note_on_off.append(copy.deepcopy(evt))
-        
-        # Add noteoff
-        evt_off = copy.deepcopy(evt)
-        evt_off['type'] = 'noteoff'
-        note_on_off.append(evt_off)
+    for note in sorted(note_events, key=lambda y: y.time):
+        endtime = note.time + note.duration
+        note_on_off.append((False, note, endtime))
+        note_on_off.append((True, note, endtime))
+    
+    if not note_on_off:
+        return DOC
     
     # Sort by time
-    note_on_off = sorted(
-        note_on_off,
+    note_on_off.sort(
         key=lambda y: (
-            round(y['time']) if y['type'] != 'noteoff' else round(y['endtime']),
-            round(y['endtime'])
+            round(y[1].time) if not y[0] else round(y[2]),
+            round(y[2])
         )
     )
+    count = len(note_on_off)
+    
+    # Per-event lookup tables
+    times = [n.time for _, n, _ in note_on_off]
+    groups = [(n.staff, n.hand) for _, n, _ in note_on_off]
+    
+    # Note starts per (staff, hand) in sweep order: positions and rounded start times.
+    # The sweep order is sorted on round(time) for starts, so round(time) is monotonic.
+    group_starts: Dict[Tuple[Any, Any], Tuple[List[int], List[int]]] = {}
+    for pos, (is_off, note, _) in enumerate(note_on_off):
+        if not is_off:
+            positions, rounded = group_starts.setdefault(groups[pos], ([], []))
+            positions.append(pos)
+            rounded.append(round(note.time))
+    
+    # The Qt version also raises the stop flag when it walks past an event that is
+    # equal (by value) to the very last event; collect those positions up front.
+    last_is_off, last_note, last_end = note_on_off[-1]
+    equals_last = []
+    for pos, (is_off, note, endtime) in enumerate(note_on_off):
+        if (endtime == last_end and is_off == last_is_off and
+                note.pitch == last_note.pitch and note == last_note):
+            equals_last.append(pos)
     
-    # Add notestop and continuationdot events
-    active_notes = []
-    for idx, note in enumerate(note_on_off):
-        if note['type'] != 'noteoff':
-            active_notes.append(note)
+    # Sounding notes per (staff, hand) in start order, and per (duration, pitch) for noteoff matching
+    active: Dict[Tuple[Any, Any], Dict[int, NoteEvent]] = {}
+    active_by_key: Dict[Tuple[Any, Any], Dict[Tuple[Any, Any], deque]] = {}
+    
+    for idx, (is_off, note, endtime) in enumerate(note_on_off):
+        group = groups[idx]
+        group_active = active.get(group)
+        if group_active is None:
+            group_active = active[group] = {}
+            active_by_key[group] = {}
+        match_key = (note.duration, note.pitch)
+        note_id = note.id
+        
+        if not is_off:
+            group_active[idx] = note
+            active_by_key[group].setdefault(match_key, deque()).append(idx)
             
             # Continuation dots for note start
-            for n in active_notes:
-                if n.get('id') != note.get('id'):
-                    if (not EQUALS(n['time'], note['time']) and
-                        note.get('staff') == n.get('staff') and
-                        note.get('hand') == n.get('hand')):
-                        DOC.append(continuation_dot(note['time'], n['pitch'], note))
-        
-        elif note['type'] == 'noteoff':
-            # Remove from active notes
-            for n in list(active_notes):
-                if (n.get('duration') == note.get('duration') and
-                    n.get('pitch') == note.get('pitch') and
-                    n.get('staff') == note.get('staff') and
-                    n.get('hand') == note.get('hand')):
-                    active_notes.remove(n)
-                    break
+            note_time = note.time
+            for n in group_active.values():
+                if n.id != note_id and not EQUALS(n.time, note_time):
+                    DOC.append(continuation_dot(note_time, n.pitch, note))
+        else:
+            # Remove from active notes (first sounding note with the same duration and pitch)
+            started = active_by_key[group].get(match_key)
+            if started:
+                del group_active[started.popleft()]
             
             # Continuation dots for note end
-            for n in active_notes:
-                if n.get('id') != note.get('id'):
-                    if (not EQUALS(n['endtime'], note['endtime']) and
-                        note.get('staff') == n.get('staff') and
-                        note.get('hand') == n.get('hand')):
-                        DOC.append(continuation_dot(note['endtime'], n['pitch'], note))
-        
-        if note['type'] == 'noteoff':
+            for n in group_active.values():
+                if n.id != note_id and not EQUALS(n.time + n.duration, endtime):
+                    DOC.append(continuation_dot(endtime, n.pitch, note))
             continue
         
-        # Stop sign
+        # Stop sign: find the first later note start in this (staff, hand) that decides it
+        note_end = note.time + note.duration
+        positions, rounded = group_starts[group]
+        # Starts rounded more than one tick below note_end can never be EQUAL or GREATER
+        i = max(bisect_left(rounded, round(note_end) - 1), bisect_right(positions, idx))
+        decisive = count
         stop_flag = False
-        for n in note_on_off[idx + 1:]:
-            if (n['type'] != 'noteoff' and
-                EQUALS(n['time'], note['time'] + note['duration']) and
-                n.get('staff') == note.get('staff') and
-                n.get('hand') == note.get('hand')):
+        while i < len(positions):
+            t = times[positions[i]]
+            if EQUALS(t, note_end):
+                decisive = positions[i]
                 break
-            if (n['type'] != 'noteoff' and
-                GREATER(n['time'], note['time'] + note['duration']) and
-                n.get('staff') == note.get('staff') and
-                n.get('hand') == note.get('hand')):
+            if GREATER(t, note_end):
+                decisive = positions[i]
                 stop_flag = True
                 break
-            if n == note_on_off[-1]:
-                stop_flag = True
+            i += 1
+        if not stop_flag:
+            k = bisect_right(equals_last, idx)
+            stop_flag = k < len(equals_last) and equals_last[k] < decisive
         
         if stop_flag:
-            DOC.append(stop_sign(note['time'] + note['duration'] - FRACTION, note['pitch'], note))
+            DOC.append(stop_sign(note_end - FRACTION, note.pitch, note))
         
-        # Connect stem
-        for n in note_on_off[idx + 1:]:
-            if (EQUALS(n['time'], note['time']) and
-                n.get('staff') == note.get('staff') and
-                n.get('hand') == note.get('hand')):
-                DOC.append({
-                    'type': 'connectstem',
-                    'time': note['time'],
-                    'pitch': note['pitch'],
-                    'time2': note['time'],
-                    'pitch2': n['pitch'],
-                    'staff': note.get('staff', 0)
-                })
-            if n['time'] > note['time']:
+        # Connect stem: walk forward until the first event that starts later
+        note_time = note.time
+        for j in range(idx + 1, count):
+            if EQUALS(times[j], note_time) and groups[j] == group:
+                DOC.append(StemEvent(EventKind.CONNECTSTEM, note_time, note.pitch,
+                                     note_time, note_on_off[j][1].pitch, note.staff))
+            if times[j] > note_time:
                 break
     
     return DOC
@@ -0,0 +1,128 @@
+'''
+Typed layout event records for LayoutData.DOC.
+
+Every stage of the engraver used to build, copy and string-compare plain
+dicts ({'type': 'note', 'time': ..., ...}). These records use __slots__
+(dataclass slots=True), so an event costs a fixed handful of pointers
+instead of a hash table, and the event type is an integer EventKind.
+
+EventKind values follow the alphabetical order of the old type strings, so
+sorting on (time, kind) gives the same event order as (time, type) did.
+to_dict() returns the old dict shape for debugging and comparisons.
+'''
+
+from dataclasses import dataclass, fields
+from enum import IntEnum
+from typing import Any, Dict
+
+
+class EventKind(IntEnum):
+    '''Layout event type, ordered like the old type strings.'''
+    BARLINE = 0
+    BARLINEDOUBLE = 1
+    BEAM = 2
+    CONNECTSTEM = 3
+    CONTINUATIONDOT = 4
+    COUNTLINE = 5
+    ENDBARLINE = 6
+    GRACENOTE = 7
+    GRIDLINE = 8
+    GRIDLINEDOUBLE = 9
+    NOTE = 10
+    NOTESPLIT = 11
+    NOTESTOP = 12
+    SLUR = 13
+    TEMPO = 14
+    TEXT = 15
+    TIMESIGNATURE = 16
+
+    @property
+    def type_name(self) -> str:
+        '''The old dict 'type' string.'''
+        return self.name.lower()
+
+
+NOTE_KINDS = (EventKind.NOTE, EventKind.NOTESPLIT)
+BARLINE_KINDS = (EventKind.BARLINE, EventKind.ENDBARLINE)
+
+
+@dataclass(slots=True)
+class LayoutEvent:
+    '''Base record: every layout event has a kind and a time in ticks.'''
+    kind: EventKind
+    time: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        '''The old dict form of this event.'''
+        result = {f.name: getattr(self, f.name) for f in fields(self) if f.name != 'kind'}
+        result['type'] = self.kind.type_name
+        return result
+
+
+@dataclass(slots=True)
+class GridEvent(LayoutEvent):
+    '''Barline, double barline, gridline, double gridline or end barline.'''
+
+
+@dataclass(slots=True)
+class BarlineEvent(LayoutEvent):
+    '''Barline at a measure start.'''
+    measure_num: int = 0
+
+
+@dataclass(slots=True)
+class TimeSignatureEvent(LayoutEvent):
+    '''Time signature indicator at the first measure of a baseGrid.'''
+    numerator: int = 4
+    denominator: int = 4
+    visible: bool = True
+
+
+@dataclass(slots=True)
+class NoteEvent(LayoutEvent):
+    '''A note or a piece of a note split on a barline.'''
+    duration: float = 0.0
+    pitch: int = 40
+    staff: int = 0
+    hand: str = '>'
+    color: str = '#000000'
+    id: int = 0
+
+
+@dataclass(slots=True)
+class MarkEvent(LayoutEvent):
+    '''Continuation dot or note stop sign.'''
+    pitch: int = 40
+    staff: int = 0
+    hand: str = '>'
+
+
+@dataclass(slots=True)
+class StemEvent(LayoutEvent):
+    '''Connect stem between two notes that start together.'''
+    pitch: int = 40
+    time2: float = 0.0
+    pitch2: int = 40
+    staff: int = 0
+
+
+@dataclass(slots=True)
+class ObjectEvent(LayoutEvent):
+    '''Beam, slur, text, tempo, grace note or count line, by the id of the score event.'''
+    stave_idx: int = 0
+    event_id: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'type': self.kind.type_name,
+            'time': self.time,
+            'stave_idx': self.stave_idx,
+            f'{self.kind.type_name}_id': self.event_id,
+        }
+
+
+__all__ = [
+    'EventKind', 'NOTE_KINDS', 'BARLINE_KINDS',
+    'LayoutEvent', 'GridEvent', 'BarlineEvent', 'TimeSignatureEvent',
+    'NoteEvent', 'MarkEvent', 'StemEvent', 'ObjectEvent',
+]
@@ -0,0 +1,108 @@
+'''
+Copy-free score snapshots for the engraver worker thread.
+
+take_snapshot() runs on the UI thread when an engrave is requested and copies
+only the fields the layout needs into flat tuples per stave. The worker thread
+lays out from the snapshot and never touches the live SCORE or its Note
+objects, so the UI can keep editing while a layout is in progress.
+
+Compared to deepcopy(score) this skips the properties/metaInfo/header trees,
+the Note.score back-references and the per-object dataclass overhead: the
+cost is a handful of tuple() calls over the event lists. Beams, slurs, text,
+tempo, grace notes and count lines are captured the same way, as time and id
+columns; the layout places them by time and reports them by id. Barlines and grid
+come from the score's cached Timeline, which is immutable and shared as is.
+'''
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Tuple
+
+from file.timeline import Timeline
+
+if TYPE_CHECKING:
+    from file.SCORE import SCORE
+
+
+# Stave event lists other than note, captured as <type>_time and <type>_id columns
+OTHER_EVENT_TYPES = ('beam', 'slur', 'text', 'tempo', 'graceNote', 'countLine')
+
+
+@dataclass(frozen=True)
+class StaveSnapshot:
+    '''The events of one stave as parallel tuples.
+
+    note_* tuples are index-aligned: note i is (note_time[i], note_duration[i], ...)
+    in the stave's note-list order; likewise beam_time/beam_id and the columns of
+    the other OTHER_EVENT_TYPES.
+    '''
+    note_time: Tuple[float, ...]
+    note_duration: Tuple[float, ...]
+    note_pitch: Tuple[int, ...]
+    note_hand: Tuple[str, ...]
+    note_color: Tuple[str, ...]
+    note_id: Tuple[int, ...]
+    beam_time: Tuple[float, ...]
+    beam_id: Tuple[int, ...]
+    slur_time: Tuple[float, ...]
+    slur_id: Tuple[int, ...]
+    text_time: Tuple[float, ...]
+    text_id: Tuple[int, ...]
+    tempo_time: Tuple[float, ...]
+    tempo_id: Tuple[int, ...]
+    graceNote_time: Tuple[float, ...]
+    graceNote_id: Tuple[int, ...]
+    countLine_time: Tuple[float, ...]
+    countLine_id: Tuple[int, ...]
+
+    @property
+    def note_count(self) -> int:
+        return len(self.note_time)
+
+    def events(self, event_type: str) -> Tuple[Tuple[float, ...], Tuple[int, ...]]:
+        '''(times, ids) columns of one of the OTHER_EVENT_TYPES.'''
+        return getattr(self, f'{event_type}_time'), getattr(self, f'{event_type}_id')
+
+
+@dataclass(frozen=True)
+class ScoreSnapshot:
+    '''Immutable view of everything Engraver._calculate_layout reads from a SCORE.'''
+    quarter_note_unit: float
+    timeline: Timeline                  # the score's cached Timeline, immutable and shared
+    linebreak_times: Tuple[float, ...]  # sorted
+    staves: Tuple[StaveSnapshot, ...]
+
+
+def _snapshot_stave(stave) -> StaveSnapshot:
+    notes = stave.event.note
+    event = stave.event
+    columns = {}
+    for event_type in OTHER_EVENT_TYPES:
+        events = getattr(event, event_type)
+        columns[f'{event_type}_time'] = tuple([e.time for e in events])
+        columns[f'{event_type}_id'] = tuple([getattr(e, 'id', 0) for e in events])
+    return StaveSnapshot(
+        note_time=tuple([n.time for n in notes]),
+        note_duration=tuple([n.duration for n in notes]),
+        note_pitch=tuple([n.pitch for n in notes]),
+        note_hand=tuple([getattr(n, 'hand', 'r') for n in notes]),
+        note_color=tuple([getattr(n, 'color', '#000000') for n in notes]),
+        note_id=tuple([getattr(n, 'id', 0) for n in notes]),
+        **columns,
+    )
+
+
+def take_snapshot(score: SCORE) -> ScoreSnapshot:
+    '''Capture the layout inputs of a score. Must run on the thread that edits the score.'''
+    timeline = score.timeline()
+
+    return ScoreSnapshot(
+        quarter_note_unit=timeline.quarter_note_unit,
+        timeline=timeline,
+        linebreak_times=tuple(sorted(lb.time for lb in score.lineBreak)),
+        staves=tuple(_snapshot_stave(stave) for stave in score.stave),
+    )
+
+
+__all__ = ['OTHER_EVENT_TYPES', 'StaveSnapshot', 'ScoreSnapshot', 'take_snapshot']
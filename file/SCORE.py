@@ -1,7 +1,13 @@
-from dataclasses import dataclass, field, fields, is_dataclass
+from dataclasses import dataclass, field
 from dataclasses_json import config, dataclass_json
-from typing import List, Literal, Optional
+from bisect import bisect_left
+from itertools import compress, count, repeat
+from operator import attrgetter, is_
+from typing import Dict, List, Literal, Optional, Tuple
+import copy
 import json
+import os
+import shutil
 
 from file.metaInfo import MetaInfo
 from file.header import Header
@@ -20,9 +26,34 @@ from file.text import Text
 from file.slur import Slur
 from file.tempo import Tempo
 from file.id import IDGenerator
+from file.noteIndex import NoteIndex
+from file.timeline import Timeline
 from file.event_factory import setup_event_factories
+from file.score_codec import (coerce_bool_aliases, schema_fingerprint, score_from_dict,
+                              score_to_dict, setup_score_codec, write_score_json)
 from file.fileSettings import FileSettings
 
+_event_time = attrgetter('time')
+
+
+def _event_position(event_list: list, event) -> int:
+    '''Index of event in event_list by identity, or -1 (dataclass __eq__ would compare every field).
+    The tools keep the event lists sorted by time, so the run of equal times found by
+    bisect is checked first; an unsorted list falls back to a scan that compares in C.'''
+    time = getattr(event, 'time', None)
+    if time is not None:
+        try:
+            i = bisect_left(event_list, time, key=_event_time)
+        except TypeError:
+            i = len(event_list)
+        while i < len(event_list) and event_list[i].time == time:
+            if event_list[i] is event:
+                return i
+            i += 1
+    for i in compress(count(), map(is_, event_list, repeat(event))):
+        return i
+    return -1
+
 
 @dataclass_json
 @dataclass
@@ -173,12 +204,34 @@ class SCORE:
         
         # Sync staveRange objects in all lineBreaks to match number of staves
         self._sync_stave_ranges()
+        # Per-stave NoteIndex, built lazily by note_index()
+        self._note_indexes: Dict[int, NoteIndex] = {}
+        # Build the id -> (stave_idx, event_type, event) registry for O(1) lookups
+        self.rebuild_id_registry()
+        # Measure/grid timeline, built lazily by timeline()
+        self._timeline: Optional[Timeline] = None
         # Normalize any fields that use a '?' JSON alias to booleans in Python
         try:
             self._coerce_bool_alias_fields()
         except Exception:
             pass
 
+    def __deepcopy__(self, memo):
+        '''Deep copy without the note indexes and the timeline: the indexes are keyed
+        on object identity, so the copy starts with none and rebuilds them lazily in
+        note_index(); the timeline is rebuilt on first use by timeline().'''
+        result = self.__class__.__new__(self.__class__)
+        memo[id(self)] = result
+        for key, value in self.__dict__.items():
+            if key == '_note_indexes':
+                value = {}
+            elif key == '_timeline':
+                value = None
+            else:
+                value = copy.deepcopy(value, memo)
+            object.__setattr__(result, key, value)
+        return result
+
     def _next_id(self) -> int:
         '''Get the next unique ID for this score.'''
         return self._id.new()
@@ -303,13 +356,17 @@ class SCORE:
         # 5. Check for overlapping events that might indicate data corruption
         for stave_idx, stave in enumerate(self.stave):
             # Check for notes with identical time and pitch (possible duplicates)
+            # (grouped on (time, pitch, hand) and reported in pairwise order)
             notes = stave.event.note
-            for i, note1 in enumerate(notes):
-                for j, note2 in enumerate(notes[i+1:], i+1):
-                    if (note1.time == note2.time and 
-                        note1.pitch == note2.pitch and 
-                        note1.hand == note2.hand):
-                        warnings.append(f'Duplicate notes detected in stave {stave_idx}: {note1.id} and {note2.id} (time={note1.time}, pitch={note1.pitch})')
+            seen: Dict[tuple, List[int]] = {}
+            duplicates = []
+            for j, note in enumerate(notes):
+                earlier = seen.setdefault((note.time, note.pitch, note.hand), [])
+                duplicates.extend((i, j) for i in earlier)
+                earlier.append(j)
+            for i, j in sorted(duplicates):
+                note1, note2 = notes[i], notes[j]
+                warnings.append(f'Duplicate notes detected in stave {stave_idx}: {note1.id} and {note2.id} (time={note1.time}, pitch={note1.pitch})')
         
         return warnings
     
@@ -372,6 +429,8 @@ class SCORE:
             del self.stave[index]
             # Sync staveRange objects in all lineBreaks
             self._sync_stave_ranges()
+            # Stave indices after the removed one have shifted
+            self.rebuild_id_registry()
             return True
         return False
     
@@ -402,36 +461,108 @@ class SCORE:
     # new_count_line, new_section, new_start_repeat, new_end_repeat, new_tempo
     # All accept stave_idx=0 and **kwargs matching the Event class fields
     
-    def find_by_id(self, target_id: int) -> Optional[Event]:
-        '''Find any event by ID across all staves and return the event object.'''
-        # Get event type names directly from the Event dataclass
+    # ------------------ ID registry ------------------
+
+    def rebuild_id_registry(self) -> None:
+        '''Rebuild the id -> (stave_idx, event_type, event) registry from all staves.
+        Call this after adding or removing events by editing the event lists directly
+        instead of going through the new_* factories or delete_by_id().'''
         event_types = list(Event.__dataclass_fields__.keys())
-        
-        # find the event with the matching ID
-        for stave in self.stave:
+        registry: Dict[int, Tuple[int, str, object]] = {}
+
+        for stave_idx, stave in enumerate(self.stave):
             for event_type in event_types:
-                event_list = getattr(stave.event, event_type)
-                for event in event_list:
-                    if hasattr(event, 'id') and event.id == target_id:
-                        return event
+                for event in getattr(stave.event, event_type):
+                    if hasattr(event, 'id'):
+                        # First occurrence wins, like the old linear scan did
+                        registry.setdefault(event.id, (stave_idx, event_type, event))
+
+        self._id_registry = registry
+        # Drop the note indexes of staves whose notes changed; they are rebuilt lazily by note_index()
+        for stave_idx, index in list(self._note_indexes.items()):
+            notes = self.stave[stave_idx].event.note if stave_idx < len(self.stave) else None
+            if notes is None or len(index) != len(notes) or not all(note in index for note in notes):
+                del self._note_indexes[stave_idx]
+
+    def _register_event(self, event, stave_idx: int, event_type: str) -> None:
+        '''Add a single stave event to the ID registry (and the note index if built).'''
+        self._id_registry[event.id] = (stave_idx, event_type, event)
+        if event_type == 'note':
+            index = self._note_indexes.get(stave_idx)
+            if index is not None:
+                index.add(event)
+
+    # ------------------ Note index ------------------
+
+    def note_index(self, stave_idx: int = 0) -> NoteIndex:
+        '''Get the time-sorted NoteIndex of a stave, building it on first use.'''
+        index = self._note_indexes.get(stave_idx)
+        if index is None:
+            index = NoteIndex()
+            index.build(self.get_stave(stave_idx).event.note)
+            self._note_indexes[stave_idx] = index
+        return index
+
+    def _on_note_changed(self, note) -> None:
+        '''Called by Note.__setattr__ when time, duration or hand changes and a note index is built.'''
+        # No rebuild on a miss here: notes that are not (yet) in a stave are not indexed either
+        entry = self._id_registry.get(note.id)
+        if entry is None or entry[2] is not note:
+            return
+        index = self._note_indexes.get(entry[0])
+        if index is not None:
+            index.update(note)
 
-        return None  # ID not found
+    # ------------------ Timeline ------------------
+
+    def timeline(self) -> Timeline:
+        '''Get the measure/grid Timeline, rebuilding it when baseGrid or quarterNoteUnit changed.'''
+        key = Timeline.key_for(self)
+        timeline = self._timeline
+        if timeline is None or timeline.key != key:
+            timeline = Timeline(*key)
+            self._timeline = timeline
+        return timeline
+
+    def lookup_id(self, target_id: int) -> Optional[Tuple[int, str, object]]:
+        '''Return (stave_idx, event_type, event) for the given ID in O(1), or None if not found.
+        Code that edits ids in place calls rebuild_id_registry() (renumber_id, the property
+        tree); a stale entry found under an old id is moved to the event's current id.'''
+        entry = self._id_registry.get(target_id)
+        if entry is not None and getattr(entry[2], 'id', None) != target_id:
+            del self._id_registry[target_id]
+            self._id_registry.setdefault(entry[2].id, entry)
+            return None
+        return entry
+
+    def find_by_id(self, target_id: int) -> Optional[Event]:
+        '''Find any event by ID across all staves and return the event object.'''
+        entry = self.lookup_id(target_id)
+        if entry is None:
+            return None  # ID not found
+        return entry[2]
 
     def delete_by_id(self, id: int) -> bool:
         '''Delete any event by ID across all staves. Returns True if deleted, False if not found.'''
-        # Get event type names directly from the Event dataclass
-        event_types = list(Event.__dataclass_fields__.keys())
-        
-        # find and delete the event with the matching ID
-        for stave in self.stave:
-            for event_type in event_types:
-                event_list = getattr(stave.event, event_type)
-                for i, event in enumerate(event_list):
-                    if hasattr(event, 'id') and event.id == id:
-                        del event_list[i]
-                        return True  # Successfully deleted
-        
-        return False  # ID not found
+        entry = self.lookup_id(id)
+        if entry is None:
+            return False  # ID not found
+
+        stave_idx, event_type, event = entry
+        del self._id_registry[id]
+        if event_type == 'note':
+            index = self._note_indexes.get(stave_idx)
+            if index is not None:
+                index.remove(event)
+        if stave_idx >= len(self.stave):
+            return False
+
+        event_list = getattr(self.stave[stave_idx].event, event_type)
+        i = _event_position(event_list, event)
+        if i < 0:
+            return False  # Already removed from the list outside of delete_by_id
+        del event_list[i]
+        return True  # Successfully deleted
 
     def renumber_id(self) -> None:
         '''Renumber all events across all staves with sequential IDs.'''
@@ -452,29 +583,80 @@ class SCORE:
         for line_break in self.lineBreak:
             line_break.id = self._next_id()
 
+        # All IDs changed; rebuild the registry in one pass
+        self.rebuild_id_registry()
+
     # Convenience methods for JSON operations
-    def save(self, filename: str) -> None:
-        '''Save SCORE instance to JSON file.'''
+    def _stamp_for_save(self) -> None:
+        '''Update the fields save() and save_binary() stamp into every written file.'''
         import time
         # Update modification timestamp before saving
         self.header.modificationStamp = time.strftime('%d-%m-%Y_%H:%M:%S')
-        
-        with open(filename, 'w', encoding='utf-8') as f:
-            # Write human-readable JSON with indentation
-            # Ensure all alias-'?' fields are serialized as JSON booleans true/false
-            try:
-                data = self._to_dict_with_bool_aliases()
-            except Exception:
-                data = self.to_dict()
-            json.dump(data, f, ensure_ascii=True, separators=(',', ':'))
+        # Stamp the data model fingerprint so load() can skip full validation
+        self.metaInfo.schema = schema_fingerprint()
+
+    def save(self, filename: str) -> None:
+        '''Save SCORE instance to JSON file.
+        The JSON is streamed from the objects (no intermediate dict) into a temp file
+        next to filename, which then replaces it; a failed save leaves the old file intact.'''
+        self._stamp_for_save()
+
+        # Write atomically via a temp file
+        tmp = filename + '.tmp'
+        try:
+            with open(tmp, 'w', encoding='utf-8', buffering=1 << 20) as f:
+                # Alias-'?' fields are written as JSON booleans true/false
+                try:
+                    write_score_json(self, f)
+                except Exception:
+                    # Fall back to dumping the codec's dict, and only then the generic to_dict()
+                    f.seek(0)
+                    f.truncate()
+                    try:
+                        json.dump(score_to_dict(self), f, ensure_ascii=True, separators=(',', ':'))
+                    except Exception:
+                        f.seek(0)
+                        f.truncate()
+                        json.dump(self.to_dict(), f, ensure_ascii=True, separators=(',', ':'))
+                f.flush()
+                os.fsync(f.fileno())
+            if os.path.exists(filename):
+                shutil.copymode(filename, tmp)
+            os.replace(tmp, filename)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+    
+    def save_binary(self, filename: str) -> None:
+        '''Save SCORE instance to a binary .piano container (see file/binary_container.py).
+        Holds the same document as save(); load() reads both.'''
+        from file.binary_container import write_binary
+        self._stamp_for_save()
+        write_binary(score_to_dict(self), filename)
     
     @classmethod
     def load(cls, filename: str) -> 'SCORE':
-        '''Load ScoreFile instance from JSON file with validation and default filling.'''
-        from file.validation import full_score_validation
+        '''Load ScoreFile instance from a JSON (or binary) .piano file with validation and default filling.
+        Files stamped with the current schema fingerprint (see save()) skip the full
+        validation; they fall back to it if they fail to decode.'''
+        from file.binary_container import is_binary_score, read_binary
+        from file.validation import full_score_validation, is_trusted_score
         
-        with open(filename, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        if is_binary_score(filename):
+            data = read_binary(filename)
+        else:
+            with open(filename, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        
+        if is_trusted_score(data):
+            try:
+                score = score_from_dict(data)
+                score.renumber_id()
+                return score
+            except Exception as e:
+                # The decoder leaves data untouched, so it can go through validation as is
+                print(f'Trusted load of "{filename}" failed ({e}), running full validation')
         
         # Validate and fix missing fields + check cross-references
         fixed_data, warnings = full_score_validation(data)
@@ -486,14 +668,10 @@ class SCORE:
                 print(f'  ⚠ {warning}')
             print(f'=== {len(warnings)} warning(s) total ===\n')
 
-        score = cls.from_dict(fixed_data)
+        # Generated single-pass decoder: fills defaults, coerces bool aliases and
+        # attaches the score back-references while it builds the objects
+        score = score_from_dict(fixed_data)
         score.renumber_id()
-        score._reattach_score_references()
-        # Normalize any 0/1 values for '?' aliases to Python booleans
-        try:
-            score._coerce_bool_alias_fields()
-        except Exception:
-            pass
         return score
     
     def _reattach_score_references(self):
@@ -571,70 +749,15 @@ class SCORE:
         '''Traverse the SCORE object and coerce any fields whose JSON alias ends with '?' to Python bools.
         This keeps the in-memory model using True/False consistently, regardless of legacy 0/1 values.
         '''
-        def _walk(obj):
-            if is_dataclass(obj):
-                for f in fields(obj):
-                    try:
-                        val = getattr(obj, f.name)
-                    except Exception:
-                        continue
-                    # Recurse into containers first
-                    if is_dataclass(val) or isinstance(val, (list, dict)):
-                        _walk(val)
-                        continue
-                    # Coerce scalar if alias ends with '?'
-                    try:
-                        jn = self._json_field_name(f)
-                        is_bool_intended = isinstance(jn, str) and jn.endswith('?')
-                        # Heuristic fallback: fields commonly used as visibility toggles
-                        if not is_bool_intended and (f.name == 'visible' or f.name.endswith('Visible')):
-                            is_bool_intended = True
-                        if is_bool_intended:
-                            if val is None:
-                                continue
-                            # Only coerce ints/bools; never coerce floats/strings
-                            if isinstance(val, bool):
-                                setattr(obj, f.name, val)
-                            elif isinstance(val, int) and not isinstance(val, bool):
-                                setattr(obj, f.name, bool(val))
-                    except Exception:
-                        continue
-                return
-            if isinstance(obj, list):
-                for it in obj:
-                    _walk(it)
-                return
-            if isinstance(obj, dict):
-                for it in obj.values():
-                    _walk(it)
-                return
-            # scalars: nothing to do
-        _walk(self)
+        coerce_bool_aliases(self)
 
     def _to_dict_with_bool_aliases(self) -> dict:
         '''Return a dict suitable for JSON dump where any key ending with '?' has boolean values.'''
-        base = self.to_dict()
-
-        def _convert(x):
-            if isinstance(x, dict):
-                out = {}
-                for k, v in x.items():
-                    cv = _convert(v)
-                    if isinstance(k, str) and k.endswith('?'):
-                        # Force to bool for primitives; leave containers unchanged (shouldn't happen for bool fields)
-                        if isinstance(cv, (bool, int, float)):
-                            out[k] = bool(cv)
-                        else:
-                            out[k] = cv
-                    else:
-                        out[k] = cv
-                return out
-            if isinstance(x, list):
-                return [_convert(i) for i in x]
-            return x
-
-        return _convert(base)
+        return score_to_dict(self)
 
 
 # Auto-generate all event factory methods (new_note, new_grace_note, etc.)
 setup_event_factories(SCORE)
+
+# Generate the single-pass dict codecs used by load() and save()
+setup_score_codec(SCORE)
@@ -0,0 +1,389 @@
+'''
+Binary .piano container.
+
+An alternative to the single-line JSON .piano file for large scores. JSON stays
+the interchange format: write_binary() takes the same dict SCORE.save writes
+and read_binary() gives it back unchanged (same keys, key order, values and
+value types), so converting in either direction is lossless.
+
+Layout (all integers little-endian):
+
+    header         magic b'PTABBIN\\0', u16 version, u16 section count, u32 reserved
+    section table  per section: u8 kind, u16 name length, name (utf-8), u64 offset, u64 length
+    sections       each starts on an 8-byte boundary
+
+Every top-level key of the score dict (metaInfo, header, properties, baseGrid,
+lineBreak, stave, fileSettings) is a JSON section of that name. The event lists
+of the staves are taken out of the 'stave' section (their place is kept as
+null) and stored as one columnar section per stave per event type, named
+'stave/<index>/<event type>':
+
+    u32 prelude length, prelude (JSON), padding, column arrays
+
+The prelude lists the row count and the fields in order. Fields typed float,
+int or Literal[str, ...] are fixed-width column arrays ('<f8', '<i8' and 'u1'
+codes into the literal's choices) that can be read in place with mmap and
+numpy.frombuffer (see BinaryScoreReader.columns). All other fields (optional
+overrides like color, articulation lists) live in a sparse side table that
+only holds the rows where they differ from their default. Values that do not
+fit their column (an int in a float column, None, ...) and rows whose keys are
+not exactly the fields in order also go to the side table, which is what keeps
+the conversion lossless for any input.
+'''
+
+from array import array
+from dataclasses import fields, MISSING
+from itertools import repeat
+from typing import Any, Dict, List, Literal, Optional, Tuple, get_args, get_origin, get_type_hints
+import json
+import mmap
+import struct
+import sys
+
+try:
+    import numpy as np  # Optional: zero-copy column views on the memory-mapped file
+except ImportError:
+    np = None
+
+from file.validation import field_schema
+
+
+MAGIC = b'PTABBIN\0'
+VERSION = 1
+
+_HEADER = struct.Struct('<8sHHI')
+_ENTRY_HEAD = struct.Struct('<BH')
+_ENTRY_TAIL = struct.Struct('<QQ')
+_PRELUDE_LENGTH = struct.Struct('<I')
+
+SECTION_JSON = ord('J')
+SECTION_COLUMNS = ord('C')
+
+# numpy dtype -> array module typecode (both 8/8/1 bytes wide)
+_ARRAY_TYPECODES = {'<f8': 'd', '<i8': 'q', 'u1': 'B'}
+_I8_MIN, _I8_MAX = -2 ** 63, 2 ** 63 - 1
+
+
+def _dumps(value) -> bytes:
+    return json.dumps(value, ensure_ascii=True, separators=(',', ':')).encode('ascii')
+
+
+def _pad8(length: int) -> int:
+    return -length % 8
+
+
+def _event_classes() -> Dict[str, type]:
+    '''Event list name -> event dataclass, from the Event container.'''
+    from file.SCORE import Event
+    hints = get_type_hints(Event)
+    return {f.name: get_args(hints[f.name])[0] for f in fields(Event)}
+
+
+def _column_layout(cls) -> List[Tuple[str, Optional[str], Any]]:
+    '''(JSON name, dtype or None for side-table fields, choices or default) per field of cls.'''
+    schema = field_schema(cls)
+    hints = get_type_hints(cls)
+    layout = []
+    for f in fields(cls):
+        json_name = schema.code_to_json[f.name]
+        field_type = hints[f.name]
+        if field_type is float:
+            layout.append((json_name, '<f8', None))
+        elif field_type is int:
+            layout.append((json_name, '<i8', None))
+        elif get_origin(field_type) is Literal and all(isinstance(a, str) for a in get_args(field_type)):
+            layout.append((json_name, 'u1', list(get_args(field_type))))
+        else:
+            default = f.default if f.default is not MISSING else f.default_factory()
+            # Compared and restored as it reads back from the prelude JSON
+            layout.append((json_name, None, json.loads(_dumps(default))))
+    return layout
+
+
+def _fits(value, dtype: str, choices) -> bool:
+    if dtype == '<f8':
+        return type(value) is float
+    if dtype == '<i8':
+        return type(value) is int and _I8_MIN <= value <= _I8_MAX
+    return type(value) is str and value in choices
+
+
+def _same(value, default) -> bool:
+    return type(value) is type(default) and value == default
+
+
+def _fresh(default):
+    '''A side-table default for one row; containers are not shared between rows.'''
+    if isinstance(default, (list, dict)):
+        return json.loads(_dumps(default)) if default else type(default)()
+    return default
+
+
+def _encode_rows(rows: list, cls) -> bytes:
+    '''Columnar section for one stave's list of events of class cls.'''
+    layout = _column_layout(cls)
+    names = [json_name for json_name, _dtype, _extra in layout]
+    columns = {json_name: [] for json_name, dtype, _extra in layout if dtype}
+    sparse = []   # [row, {json name: value}] for side-table fields and values that don't fit
+    raw = []      # [row, row dict] for rows that are not exactly the fields in order
+
+    for index, row in enumerate(rows):
+        if type(row) is not dict or list(row) != names:
+            raw.append([index, row])
+            for values in columns.values():
+                values.append(0)
+            continue
+        overrides = {}
+        for json_name, dtype, extra in layout:
+            value = row[json_name]
+            if dtype is None:
+                if not _same(value, extra):
+                    overrides[json_name] = value
+            elif _fits(value, dtype, extra):
+                columns[json_name].append(extra.index(value) if dtype == 'u1' else value)
+            else:
+                columns[json_name].append(0)
+                overrides[json_name] = value
+        if overrides:
+            sparse.append([index, overrides])
+
+    prelude = {
+        'class': cls.__name__,
+        'rows': len(rows),
+        'fields': [[json_name, dtype, extra] for json_name, dtype, extra in layout],
+        'columns': [],
+        'sparse': sparse,
+        'raw': raw,
+    }
+    # Column offsets are relative to the section start; they depend on the prelude
+    # length, which depends on the offsets, so settle the prelude first
+    column_sizes = [(json_name, dtype, len(rows) * array(_ARRAY_TYPECODES[dtype]).itemsize)
+                    for json_name, dtype, _extra in layout if dtype]
+    offset_width = 0
+    while True:
+        start = _PRELUDE_LENGTH.size + len(_dumps(prelude))
+        start += _pad8(start)
+        offsets = []
+        for json_name, dtype, size in column_sizes:
+            offsets.append([json_name, dtype, start])
+            start += size + _pad8(size)
+        prelude['columns'] = offsets
+        if len(_dumps(prelude)) == offset_width:
+            break
+        offset_width = len(_dumps(prelude))
+
+    prelude_bytes = _dumps(prelude)
+    parts = [_PRELUDE_LENGTH.pack(len(prelude_bytes)), prelude_bytes]
+    length = _PRELUDE_LENGTH.size + len(prelude_bytes)
+    for (json_name, dtype, offset), (_name, _dtype, size) in zip(offsets, column_sizes):
+        parts.append(b'\0' * (offset - length))
+        data = array(_ARRAY_TYPECODES[dtype], columns[json_name])
+        if sys.byteorder == 'big':
+            data.byteswap()
+        parts.append(data.tobytes())
+        length = offset + size
+    return b''.join(parts)
+
+
+def _split_staves(staves) -> Tuple[Any, List[Tuple[str, bytes]]]:
+    '''Take the event lists out of the stave dicts; returns the skeleton and the columnar sections.'''
+    if not isinstance(staves, list):
+        return staves, []
+    event_classes = _event_classes()
+    skeleton = []
+    sections = []
+    for stave_idx, stave in enumerate(staves):
+        events = stave.get('event') if isinstance(stave, dict) else None
+        if not isinstance(events, dict):
+            skeleton.append(stave)
+            continue
+        kept = {}
+        for event_type, rows in events.items():
+            if event_type in event_classes and isinstance(rows, list):
+                kept[event_type] = None
+                sections.append((f'stave/{stave_idx}/{event_type}', _encode_rows(rows, event_classes[event_type])))
+            else:
+                kept[event_type] = rows
+        skeleton.append({**stave, 'event': kept})
+    return skeleton, sections
+
+
+def encode_binary(data: dict) -> bytes:
+    '''Encode a score dict (as written to a JSON .piano file) into the binary container.'''
+    sections: List[Tuple[int, str, bytes]] = []
+    for key, value in data.items():
+        if key == 'stave':
+            value, event_sections = _split_staves(value)
+            sections.append((SECTION_JSON, key, _dumps(value)))
+            sections.extend((SECTION_COLUMNS, name, payload) for name, payload in event_sections)
+        else:
+            sections.append((SECTION_JSON, key, _dumps(value)))
+
+    table_size = sum(_ENTRY_HEAD.size + len(name.encode('utf-8')) + _ENTRY_TAIL.size
+                     for _kind, name, _payload in sections)
+    offset = _HEADER.size + table_size
+    offset += _pad8(offset)
+    table = []
+    body = []
+    for kind, name, payload in sections:
+        encoded_name = name.encode('utf-8')
+        table.append(_ENTRY_HEAD.pack(kind, len(encoded_name)) + encoded_name + _ENTRY_TAIL.pack(offset, len(payload)))
+        body.append(payload + b'\0' * _pad8(len(payload)))
+        offset += len(payload) + _pad8(len(payload))
+
+    head = _HEADER.pack(MAGIC, VERSION, len(sections), 0) + b''.join(table)
+    return head + b'\0' * _pad8(len(head)) + b''.join(body)
+
+
+def write_binary(data: dict, filename: str) -> None:
+    '''Write a score dict to filename as a binary .piano container.'''
+    with open(filename, 'wb') as f:
+        f.write(encode_binary(data))
+
+
+def is_binary_score(filename: str) -> bool:
+    '''True if filename starts with the binary container magic.'''
+    with open(filename, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+class BinaryScoreReader:
+    '''Reads a binary .piano container from a buffer (a memory-mapped file by default).
+
+    Section payloads are sliced out of the buffer only when asked for;
+    columns() returns the fixed-width arrays of an event section, as numpy
+    views on the buffer when numpy is available (valid while the reader is open).
+    '''
+
+    def __init__(self, buffer):
+        self._buffer = buffer
+        self._file = None
+        magic, version, count, _reserved = _HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError('Not a binary .piano container')
+        if version > VERSION:
+            raise ValueError(f'Unsupported binary .piano version {version}')
+        self.sections: Dict[str, Tuple[int, int, int]] = {}  # name -> (kind, offset, length)
+        self.order: List[str] = []
+        position = _HEADER.size
+        for _ in range(count):
+            kind, name_length = _ENTRY_HEAD.unpack_from(buffer, position)
+            position += _ENTRY_HEAD.size
+            name = bytes(buffer[position:position + name_length]).decode('utf-8')
+            position += name_length
+            offset, length = _ENTRY_TAIL.unpack_from(buffer, position)
+            position += _ENTRY_TAIL.size
+            self.sections[name] = (kind, offset, length)
+            self.order.append(name)
+
+    @classmethod
+    def open(cls, filename: str) -> 'BinaryScoreReader':
+        f = open(filename, 'rb')
+        try:
+            reader = cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        except Exception:
+            f.close()
+            raise
+        reader._file = f
+        return reader
+
+    def close(self) -> None:
+        if self._file is not None:
+            try:
+                self._buffer.close()
+            except BufferError:
+                pass  # column views handed out by columns() still use it; freed with them
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def json(self, name: str):
+        '''Decoded JSON section.'''
+        _kind, offset, length = self.sections[name]
+        return json.loads(self._buffer[offset:offset + length])
+
+    def _prelude(self, name: str) -> Tuple[dict, int]:
+        _kind, offset, _length = self.sections[name]
+        (length,) = _PRELUDE_LENGTH.unpack_from(self._buffer, offset)
+        start = offset + _PRELUDE_LENGTH.size
+        return json.loads(bytes(self._buffer[start:start + length])), offset
+
+    def columns(self, stave_idx: int, event_type: str) -> Dict[str, Any]:
+        '''Column arrays of one stave's event list: JSON field name -> array.
+        'u1' columns hold codes into the field's choices (see prelude()).
+        Values that did not fit a column are only in the side table.'''
+        prelude, offset = self._prelude(f'stave/{stave_idx}/{event_type}')
+        count = prelude['rows']
+        result = {}
+        for json_name, dtype, column_offset in prelude['columns']:
+            start = offset + column_offset
+            if np is not None:
+                result[json_name] = np.frombuffer(self._buffer, dtype=dtype, count=count, offset=start)
+            else:
+                values = array(_ARRAY_TYPECODES[dtype])
+                values.frombytes(self._buffer[start:start + count * values.itemsize])
+                if sys.byteorder == 'big':
+                    values.byteswap()
+                result[json_name] = values
+        return result
+
+    def prelude(self, stave_idx: int, event_type: str) -> dict:
+        '''Field layout, row count and side table of one stave's event list.'''
+        return self._prelude(f'stave/{stave_idx}/{event_type}')[0]
+
+    def rows(self, stave_idx: int, event_type: str) -> list:
+        '''The event list as JSON dicts, exactly as it was written.'''
+        prelude = self.prelude(stave_idx, event_type)
+        columns = self.columns(stave_idx, event_type)
+        values = {json_name: (column.tolist() if hasattr(column, 'tolist') else list(column))
+                  for json_name, column in columns.items()}
+        for json_name, dtype, choices in prelude['fields']:
+            if dtype == 'u1':
+                values[json_name] = [choices[code] for code in values[json_name]]
+
+        count = prelude['rows']
+        names = []
+        sources = []
+        for json_name, dtype, extra in prelude['fields']:
+            names.append(json_name)
+            if dtype is not None:
+                sources.append(values[json_name])
+            elif isinstance(extra, (list, dict)):
+                sources.append([_fresh(extra) for _ in range(count)])
+            else:
+                sources.append(repeat(extra, count))
+        rows = [dict(zip(names, row)) for row in zip(*sources)]
+        for index, overrides in prelude['sparse']:
+            rows[index].update(overrides)
+        for index, row in prelude['raw']:
+            rows[index] = row
+        return rows
+
+    def to_dict(self) -> dict:
+        '''The score dict exactly as it was passed to write_binary().'''
+        data = {}
+        for name in self.order:
+            if self.sections[name][0] != SECTION_JSON:
+                continue
+            value = self.json(name)
+            if name == 'stave' and isinstance(value, list):
+                for stave_idx, stave in enumerate(value):
+                    events = stave.get('event') if isinstance(stave, dict) else None
+                    if not isinstance(events, dict):
+                        continue
+                    for event_type in events:
+                        if f'stave/{stave_idx}/{event_type}' in self.sections:
+                            events[event_type] = self.rows(stave_idx, event_type)
+            data[name] = value
+        return data
+
+
+def read_binary(filename: str) -> dict:
+    '''Read a binary .piano container back into the score dict it was written from.'''
+    with BinaryScoreReader.open(filename) as reader:
+        return reader.to_dict()
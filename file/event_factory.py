@@ -69,6 +69,9 @@ def _generate_event_factory(event_class: Type, event_list_name: str):
         event_list = getattr(stave.event, event_list_name)
         event_list.append(event)
         
+        # Keep the SCORE id registry in sync for O(1) find_by_id/delete_by_id
+        self._register_event(event, stave_idx, event_list_name)
+        
         return event
     
     # Set a helpful docstring
@@ -52,4 +52,14 @@ class MetaInfo:
             'tree_tooltip': 'File format license',
             'tree_edit_type': 'readonly',
         }
-    )
\ No newline at end of file
+    )
+    schema: str = field(
+        default='',
+        metadata={
+            'tree_icon': 'property',
+            'tree_tooltip': 'Fingerprint of the data model that wrote this file (set on save); files with the current fingerprint load without full validation',
+            'tree_edit_type': 'readonly',
+            # Files from before the fingerprint lack it; fill in the default without a warning
+            'missing_ok': True,
+        }
+    )
@@ -5,6 +5,9 @@ from typing import List, TYPE_CHECKING, Literal, Optional
 if TYPE_CHECKING:
     from file.SCORE import SCORE
 
+# Fields that determine a note's position in SCORE.note_index()
+_INDEXED_FIELDS = frozenset(('time', 'duration', 'hand'))
+
 @dataclass_json
 @dataclass
 class Note:
@@ -190,6 +193,17 @@ class Note:
     def __post_init__(self):
         '''Initialize score reference as a non-dataclass attribute.'''
         self.score: Optional['SCORE'] = None
+
+    def __setattr__(self, name, value):
+        '''Keep the owning score's note index sorted when time, duration or hand changes.
+        Any other attribute, or a score without a built note index (as while it is loaded
+        or decoded), is a plain attribute write.'''
+        object.__setattr__(self, name, value)
+        if name not in _INDEXED_FIELDS:
+            return
+        score = self.__dict__.get('score')
+        if score is not None and score._note_indexes:
+            score._on_note_changed(self)
     
     # Property: color
     @property
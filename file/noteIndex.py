@@ -0,0 +1,375 @@
+'''
+Time-sorted note index for one stave.
+
+Keeps the notes of each hand in balanced search trees (treaps) on start time
+and on end time so the neighbourhood queries used by the editor (next note in
+the same hand, notes overlapping a time range, notes starting at a time) are
+answered in O(log n + k) instead of scanning the whole stave.event.note list,
+and a moved or resized note is re-sorted in O(log n).
+
+The index is owned by SCORE (see SCORE.note_index) and is kept up to date
+incrementally: new_note() adds, delete_by_id() removes and Note.__setattr__
+re-sorts a note when its time, duration or hand changes.
+'''
+
+from itertools import count
+import random
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from utils.CONSTANTS import OPERATOR_TRESHOLD
+
+if TYPE_CHECKING:
+    from file.note import Note
+
+_INF = float('inf')
+
+
+class _Node:
+    '''Treap node: a note under its (time, seq) or (end, seq) key.'''
+
+    __slots__ = ('key', 'note', 'end', 'max_end', 'priority', 'left', 'right')
+
+    def __init__(self, key: Tuple[float, int], note: 'Note', end: float, priority: float):
+        self.key = key
+        self.note = note
+        self.end = end
+        self.max_end = end  # largest end in this subtree
+        self.priority = priority
+        self.left: Optional['_Node'] = None
+        self.right: Optional['_Node'] = None
+
+
+def _pull(node: _Node) -> None:
+    max_end = node.end
+    left, right = node.left, node.right
+    if left is not None and left.max_end > max_end:
+        max_end = left.max_end
+    if right is not None and right.max_end > max_end:
+        max_end = right.max_end
+    node.max_end = max_end
+
+
+def _split(node: Optional[_Node], key) -> Tuple[Optional[_Node], Optional[_Node]]:
+    '''Split a treap into the nodes with keys < key and those with keys >= key.'''
+    if node is None:
+        return None, None
+    if node.key < key:
+        node.right, right = _split(node.right, key)
+        _pull(node)
+        return node, right
+    left, node.left = _split(node.left, key)
+    _pull(node)
+    return left, node
+
+
+def _merge(left: Optional[_Node], right: Optional[_Node]) -> Optional[_Node]:
+    '''Join two treaps where every key in left is smaller than every key in right.'''
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        _pull(left)
+        return left
+    right.left = _merge(left, right.left)
+    _pull(right)
+    return right
+
+
+def _from_sorted(nodes: List[_Node]) -> Optional[_Node]:
+    '''Treap over nodes already sorted on key, in O(n) (Cartesian tree on priority).'''
+    spine: List[_Node] = []
+    for node in nodes:
+        last = None
+        while spine and spine[-1].priority < node.priority:
+            last = spine.pop()
+        node.left = last
+        if spine:
+            spine[-1].right = node
+        spine.append(node)
+    # Fix max_end bottom-up: children come before their parents in post-order
+    stack = [(spine[0], False)] if spine else []
+    while stack:
+        node, children_done = stack.pop()
+        if children_done:
+            _pull(node)
+            continue
+        stack.append((node, True))
+        for child in (node.left, node.right):
+            if child is not None:
+                stack.append((child, False))
+    return spine[0] if spine else None
+
+
+def _ascending(node: Optional[_Node], key=None) -> Iterator[_Node]:
+    '''Nodes with keys >= key (all nodes if key is None), in ascending key order.'''
+    stack = []
+    while stack or node is not None:
+        if node is not None:
+            if key is None or node.key >= key:
+                stack.append(node)
+                node = node.left
+            else:
+                node = node.right
+            continue
+        node = stack.pop()
+        yield node
+        node = node.right
+        key = None  # everything right of a yielded node is past key
+
+
+def _descending(node: Optional[_Node], key) -> Iterator[_Node]:
+    '''Nodes with keys < key, in descending key order.'''
+    stack = []
+    while stack or node is not None:
+        if node is not None:
+            if key is None or node.key < key:
+                stack.append(node)
+                node = node.right
+            else:
+                node = node.left
+            continue
+        node = stack.pop()
+        yield node
+        node = node.left
+        key = None
+
+
+class _HandIndex:
+    '''The notes of a single hand in two treaps: one on (time, seq), one on (end, seq).
+
+    The start treap carries the largest end time of every subtree, so overlap
+    queries only descend into subtrees that contain a note still sounding at
+    the query start. Inserts and removals are O(log n) expected and keep that
+    augmentation up to date along the path they touch.
+    '''
+
+    __slots__ = ('by_start', 'by_end', 'size', '_random')
+
+    def __init__(self, rng: random.Random):
+        self.by_start: Optional[_Node] = None
+        self.by_end: Optional[_Node] = None
+        self.size = 0
+        self._random = rng.random
+
+    def build(self, items: List[Tuple['Note', float, float, int]]) -> None:
+        '''Replace the contents with (note, time, duration, seq) items in O(n log n).'''
+        rnd = self._random
+        starts = sorted(((time, seq), note, time + duration) for note, time, duration, seq in items)
+        ends = sorted(((time + duration, seq), note) for note, time, duration, seq in items)
+        self.by_start = _from_sorted([_Node(key, note, end, rnd()) for key, note, end in starts])
+        self.by_end = _from_sorted([_Node(key, note, key[0], rnd()) for key, note in ends])
+        self.size = len(items)
+
+    def add(self, note: 'Note', time: float, duration: float, seq: int) -> None:
+        end = time + duration
+        key = (time, seq)
+        left, right = _split(self.by_start, key)
+        self.by_start = _merge(_merge(left, _Node(key, note, end, self._random())), right)
+
+        key = (end, seq)
+        left, right = _split(self.by_end, key)
+        self.by_end = _merge(_merge(left, _Node(key, note, end, self._random())), right)
+        self.size += 1
+
+    def remove(self, time: float, duration: float, seq: int) -> None:
+        # Keys are unique on seq, so (t, seq + 1) is the first key after (t, seq)
+        left, rest = _split(self.by_start, (time, seq))
+        _, right = _split(rest, (time, seq + 1))
+        self.by_start = _merge(left, right)
+
+        end = time + duration
+        left, rest = _split(self.by_end, (end, seq))
+        _, right = _split(rest, (end, seq + 1))
+        self.by_end = _merge(left, right)
+        self.size -= 1
+
+    def notes(self) -> List['Note']:
+        return [node.note for node in _ascending(self.by_start)]
+
+    def starting_from(self, time: float) -> Iterator['Note']:
+        '''Notes with start >= time, ascending.'''
+        return (node.note for node in _ascending(self.by_start, (time,)))
+
+    def starting_before(self, time: float) -> Iterator['Note']:
+        '''Notes with start < time, descending.'''
+        return (node.note for node in _descending(self.by_start, (time,)))
+
+    def starting_between(self, t0: float, t1: float) -> List['Note']:
+        '''Notes with t0 <= start <= t1, ascending.'''
+        result = []
+        for node in _ascending(self.by_start, (t0,)):
+            if node.key[0] > t1:
+                break
+            result.append(node.note)
+        return result
+
+    def ending_between(self, t0: float, t1: float) -> List['Note']:
+        '''Notes with t0 < end <= t1, ascending on end.'''
+        result = []
+        for node in _ascending(self.by_end, (t0, _INF)):
+            if node.key[0] > t1:
+                break
+            result.append(node.note)
+        return result
+
+    def overlapping(self, before: float, bound: float) -> List['Note']:
+        '''Notes with start < before and end > bound, ascending on start.'''
+        result = []
+        stack = []
+        node = self.by_start
+        # In-order walk that skips every subtree whose notes all end by bound
+        while stack or node is not None:
+            if node is not None:
+                if node.max_end > bound:
+                    stack.append(node)
+                    node = node.left
+                else:
+                    node = None
+                continue
+            node = stack.pop()
+            if node.key[0] >= before:
+                break  # everything after this starts too late
+            if node.end > bound:
+                result.append(node.note)
+            node = node.right
+        return result
+
+
+class NoteIndex:
+    '''Per-hand interval index over the notes of one stave.
+
+    All time comparisons use the same threshold as the editor's OperatorThreshold
+    so query results match the old linear scans.
+    '''
+
+    def __init__(self, threshold: float = OPERATOR_TRESHOLD):
+        self.threshold = threshold
+        # Tables are keyed by the note's own hand value ('<', '>' or anything else)
+        self._hands: Dict[str, _HandIndex] = {}
+        # id(note) -> (hand, time, duration, seq) as stored, used to find the old keys on update
+        self._keys: Dict[int, Tuple[str, float, float, int]] = {}
+        self._seq = count()
+        self._random = random.Random(0)  # treap priorities; seeded so layouts are reproducible
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, note: 'Note') -> bool:
+        return id(note) in self._keys
+
+    # ------------------ Maintenance ------------------
+
+    def build(self, notes: Iterable['Note']) -> None:
+        '''Rebuild the index from scratch.'''
+        self._hands = {}
+        self._keys = {}
+        items: Dict[str, list] = {}
+        for note in notes:
+            if id(note) in self._keys:
+                continue
+            seq = next(self._seq)
+            self._keys[id(note)] = (note.hand, note.time, note.duration, seq)
+            items.setdefault(note.hand, []).append((note, note.time, note.duration, seq))
+        for hand, hand_items in items.items():
+            table = self._hands[hand] = _HandIndex(self._random)
+            table.build(hand_items)
+
+    def add(self, note: 'Note') -> None:
+        '''Insert a note (no-op if it is already indexed).'''
+        if id(note) in self._keys:
+            return
+        hand = note.hand
+        table = self._hands.get(hand)
+        if table is None:
+            table = self._hands[hand] = _HandIndex(self._random)
+        seq = next(self._seq)
+        table.add(note, note.time, note.duration, seq)
+        self._keys[id(note)] = (hand, note.time, note.duration, seq)
+
+    def remove(self, note: 'Note') -> bool:
+        '''Remove a note. Returns False if it was not indexed.'''
+        key = self._keys.pop(id(note), None)
+        if key is None:
+            return False
+        hand, time, duration, seq = key
+        self._hands[hand].remove(time, duration, seq)
+        return True
+
+    def update(self, note: 'Note') -> None:
+        '''Re-sort a note after its time, duration or hand changed.'''
+        if self.remove(note):
+            self.add(note)
+
+    # ------------------ Queries ------------------
+
+    def _hand_tables(self, hand: Optional[str]) -> List[_HandIndex]:
+        if hand is None:
+            return list(self._hands.values())
+        table = self._hands.get(hand)
+        return [table] if table is not None else []
+
+    def notes(self, hand: Optional[str] = None) -> List['Note']:
+        '''All indexed notes sorted on start time.'''
+        result = []
+        for table in self._hand_tables(hand):
+            result.extend(table.notes())
+        if hand is None:
+            result.sort(key=lambda n: n.time)
+        return result
+
+    def starting_between(self, t0: float, t1: float, hand: Optional[str] = None) -> List['Note']:
+        '''Notes whose start time lies in [t0, t1] (inclusive, no threshold).'''
+        result = []
+        for table in self._hand_tables(hand):
+            result.extend(table.starting_between(t0, t1))
+        return result
+
+    def starting_at(self, time: float, hand: Optional[str] = None) -> List['Note']:
+        '''Notes that start at the given time (within threshold).'''
+        return self.starting_between(time - self.threshold, time + self.threshold, hand)
+
+    def next_in_hand(self, hand: str, time: float, exclude_id: Optional[int] = None) -> Optional['Note']:
+        '''First note in hand that starts at or after time (within threshold).'''
+        table = self._hands.get(hand)
+        if table is None:
+            return None
+        for note in table.starting_from(time - self.threshold):
+            if exclude_id is None or note.id != exclude_id:
+                return note
+        return None
+
+    def previous_in_hand(self, hand: str, time: float, exclude_id: Optional[int] = None) -> Optional['Note']:
+        '''Last note in hand that starts strictly before time (beyond threshold).'''
+        table = self._hands.get(hand)
+        if table is None:
+            return None
+        for note in table.starting_before(time - self.threshold):
+            if exclude_id is None or note.id != exclude_id:
+                return note
+        return None
+
+    def ending_between(self, t0: float, t1: float, hand: Optional[str] = None) -> List['Note']:
+        '''Notes whose end time (time + duration) lies in (t0, t1] (no threshold).'''
+        result = []
+        for table in self._hand_tables(hand):
+            result.extend(table.ending_between(t0, t1))
+        return result
+
+    def overlapping(self, start: float, end: float, hand: Optional[str] = None,
+                    exclude_id: Optional[int] = None) -> List['Note']:
+        '''Notes overlapping [start, end): other.time < end and other.end > start (within threshold).
+
+        The max-end augmentation skips every subtree whose notes all end before
+        start, so the cost is O((k + 1) log n) for k results, however long the
+        longest note in the hand is.
+        '''
+        threshold = self.threshold
+        result = []
+        for table in self._hand_tables(hand):
+            for note in table.overlapping(end - threshold, start + threshold):
+                if exclude_id is not None and note.id == exclude_id:
+                    continue
+                result.append(note)
+        return result
@@ -0,0 +1,368 @@
+'''
+Dict codec generator for the SCORE dataclasses.
+Auto-generates one decode (dict -> object) and one encode (object -> dict)
+function per dataclass reachable from SCORE, so SCORE.load/save convert the
+whole document in a single pass instead of going through dataclasses_json's
+per-field reflection.
+
+Per field the generated code handles:
+- the JSON alias from config(field_name=...) (the Python name is accepted too)
+- default filling for missing keys (default or default_factory)
+- bool alias fields (JSON name ending in '?', or named visible/*Visible):
+  0/1 become False/True on decode and JSON booleans on encode
+- nested dataclasses and lists of them
+- the 'score' back-reference, attached to every event that carries one while
+  it is decoded
+
+write_score_json() streams the same JSON that json.dump(score_to_dict(score))
+writes straight from the objects, one event at a time, through generated
+per-class writers.
+
+The same walk yields schema_fingerprint(): a hash of every class's field names,
+JSON names and types. SCORE.save stamps it into metaInfo.schema so load() can
+recognise files written by this data model.
+'''
+
+from dataclasses import fields, is_dataclass, MISSING
+from functools import partial
+from json.encoder import encode_basestring_ascii
+import hashlib
+import json
+from typing import Any, Dict, List, Type, Union, get_args, get_origin, get_type_hints
+
+from file.validation import field_schema
+
+
+_DECODERS: Dict[Type, Any] = {}
+_ENCODERS: Dict[Type, Any] = {}
+_WRITERS: Dict[Type, Any] = {}
+# cls -> (bool alias field names, ((field name, is_list, child cls), ...)), only for
+# classes that have bool alias fields somewhere below them
+_COERCE_PLANS: Dict[Type, tuple] = {}
+_ROOT: List[Type] = []
+_FINGERPRINT: List[str] = []
+
+
+def _as_bool(value):
+    '''Coerce a legacy 0/1 value of a bool alias field to a Python bool.'''
+    if isinstance(value, int) and not isinstance(value, bool):
+        return bool(value)
+    return value
+
+
+def _json_bool(value):
+    '''Force a bool alias field value to a JSON boolean.'''
+    if isinstance(value, (bool, int, float)):
+        return bool(value)
+    return value
+
+
+_INF = float('inf')
+_json_dumps = partial(json.dumps, ensure_ascii=True, separators=(',', ':'))
+
+
+def _json_float(value: float) -> str:
+    '''A float as json.dump writes it.'''
+    if value != value:
+        return 'NaN'
+    if value == _INF:
+        return 'Infinity'
+    if value == -_INF:
+        return '-Infinity'
+    return float.__repr__(value)
+
+
+_JSON_SCALARS = {
+    str: encode_basestring_ascii,
+    int: int.__repr__,
+    float: _json_float,
+    bool: lambda value: 'true' if value else 'false',
+    type(None): lambda value: 'null',
+}
+
+
+def _json_value(value) -> str:
+    '''A field value as json.dump(..., ensure_ascii=True, separators=(',', ':')) writes it.'''
+    encode = _JSON_SCALARS.get(type(value))
+    if encode is not None:
+        return encode(value)
+    return _json_dumps(value)
+
+
+def _is_bool_alias(code_name: str, json_name: str) -> bool:
+    return json_name.endswith('?') or code_name == 'visible' or code_name.endswith('Visible')
+
+
+def _field_kind(field_type):
+    '''Classify a field type as 'scalar', 'list', 'object' or 'objects' (list of dataclasses).
+    Returns (kind, dataclass or None); Optional[X] is classified as X.'''
+    origin = get_origin(field_type)
+    if origin is Union:
+        args = [a for a in get_args(field_type) if a is not type(None)]
+        if len(args) == 1:
+            return _field_kind(args[0])
+        return 'scalar', None
+    if origin is list:
+        args = get_args(field_type)
+        if args and is_dataclass(args[0]):
+            return 'objects', args[0]
+        return 'list', None
+    if is_dataclass(field_type):
+        return 'object', field_type
+    return 'scalar', None
+
+
+def _has_score_reference(cls: Type) -> bool:
+    '''True if instances of cls carry a 'score' back-reference (set up in __post_init__).'''
+    try:
+        return 'score' in vars(cls())
+    except Exception:
+        return False
+
+
+def _field_specs(cls: Type):
+    '''(code name, json name, kind, child cls, field) for every field of cls.'''
+    hints = get_type_hints(cls)
+    mappings = field_schema(cls).code_to_json
+    specs = []
+    for f in fields(cls):
+        kind, child = _field_kind(hints[f.name])
+        specs.append((f.name, mappings[f.name], kind, child, f))
+    return specs
+
+
+def _generate_decoder(cls: Type, is_root: bool):
+    '''Generate decode(d, score) for cls; the root class decodes with score=itself.'''
+    specs = _field_specs(cls)
+    namespace = {'_new': object.__new__, 'cls': cls, '_MISSING': MISSING,
+                 '_as_bool': _as_bool, '_DECODERS': _DECODERS}
+    lines = [f'def decode_{cls.__name__}(d, score):',
+             '    obj = _new(cls)']
+    if is_root:
+        lines.append('    score = obj')
+    lines.append('    get = d.get')
+
+    for i, (code_name, json_name, kind, child, f) in enumerate(specs):
+        var = f'v{i}'
+        has_factory = f.default is MISSING and f.default_factory is not MISSING
+        if f.default is not MISSING:
+            namespace[f'_default{i}'] = f.default
+            missing = f'_default{i}'
+        elif has_factory:
+            namespace[f'_factory{i}'] = f.default_factory
+            missing = '_MISSING'
+        else:
+            missing = 'None'
+
+        if json_name != code_name:
+            lines.append(f'    {var} = get({json_name!r}, _MISSING)')
+            lines.append(f'    if {var} is _MISSING:')
+            lines.append(f'        {var} = get({code_name!r}, {missing})')
+        else:
+            lines.append(f'    {var} = get({json_name!r}, {missing})')
+        if has_factory:
+            lines.append(f'    if {var} is _MISSING:')
+            lines.append(f'        {var} = _factory{i}()')
+
+        if kind == 'scalar':
+            if _is_bool_alias(code_name, json_name):
+                lines.append(f'    {var} = _as_bool({var})')
+        elif kind == 'list':
+            lines.append(f'    if {var} is not None:')
+            lines.append(f'        {var} = list({var})')
+        elif kind == 'object':
+            namespace[f'_child{i}'] = child
+            lines.append(f'    if type({var}) is dict:')
+            lines.append(f'        {var} = _DECODERS[_child{i}]({var}, score)')
+        else:  # objects
+            namespace[f'_child{i}'] = child
+            lines.append(f'    if {var} is not None:')
+            lines.append(f'        decode = _DECODERS[_child{i}]')
+            lines.append(f'        {var} = [decode(x, score) if type(x) is dict else x for x in {var}]')
+
+    items = ', '.join(f'{code_name!r}: v{i}' for i, (code_name, *_rest) in enumerate(specs))
+    lines.append(f'    obj.__dict__.update({{{items}}})')
+    if hasattr(cls, '__post_init__'):
+        lines.append('    obj.__post_init__()')
+    if not is_root and _has_score_reference(cls):
+        lines.append("    obj.__dict__['score'] = score")
+    lines.append('    return obj')
+
+    exec('\n'.join(lines), namespace)
+    return namespace[f'decode_{cls.__name__}']
+
+
+def _generate_encoder(cls: Type):
+    '''Generate encode(obj) for cls, producing the same dict as to_dict() with bool aliases applied.'''
+    specs = _field_specs(cls)
+    namespace = {'_json_bool': _json_bool, '_ENCODERS': _ENCODERS}
+    lines = [f'def encode_{cls.__name__}(o):']
+    items = []
+    for i, (code_name, json_name, kind, child, f) in enumerate(specs):
+        var = f'v{i}'
+        lines.append(f'    {var} = o.{code_name}')
+        if kind == 'scalar':
+            if json_name.endswith('?'):
+                lines.append(f'    {var} = _json_bool({var})')
+        elif kind == 'list':
+            lines.append(f'    if {var} is not None:')
+            lines.append(f'        {var} = list({var})')
+        elif kind == 'object':
+            namespace[f'_child{i}'] = child
+            lines.append(f'    if {var} is not None:')
+            lines.append(f'        {var} = _ENCODERS[_child{i}]({var})')
+        else:  # objects
+            namespace[f'_child{i}'] = child
+            lines.append(f'    if {var} is not None:')
+            lines.append(f'        encode = _ENCODERS[_child{i}]')
+            lines.append(f'        {var} = [encode(x) for x in {var}]')
+        items.append(f'{json_name!r}: {var}')
+    lines.append(f'    return {{{", ".join(items)}}}')
+
+    exec('\n'.join(lines), namespace)
+    return namespace[f'encode_{cls.__name__}']
+
+
+def _generate_writer(cls: Type):
+    '''Generate write(obj, w) for cls: streams the JSON of encode(obj) through w (a file's write).
+    Runs of scalar fields go out as one string; nested objects and lists call the child writers.'''
+    specs = _field_specs(cls)
+    namespace = {'_v': _json_value, '_json_bool': _json_bool, '_WRITERS': _WRITERS}
+    lines = [f'def write_{cls.__name__}(o, w):']
+    pending = []  # string expressions not written yet
+
+    def flush():
+        if pending:
+            lines.append(f'    w({" + ".join(pending)})')
+            pending.clear()
+
+    for i, (code_name, json_name, kind, child, f) in enumerate(specs):
+        pending.append(repr(('{' if i == 0 else ',') + encode_basestring_ascii(json_name) + ':'))
+        if kind == 'scalar' and json_name.endswith('?'):
+            pending.append(f'_v(_json_bool(o.{code_name}))')
+        elif kind in ('scalar', 'list'):
+            pending.append(f'_v(o.{code_name})')
+        else:
+            flush()
+            namespace[f'_child{i}'] = child
+            lines.append(f'    v = o.{code_name}')
+            lines.append('    if v is None:')
+            lines.append("        w('null')")
+            if kind == 'object':
+                lines.append('    else:')
+                lines.append(f'        _WRITERS[_child{i}](v, w)')
+            else:  # objects
+                lines.append('    elif not v:')
+                lines.append("        w('[]')")
+                lines.append('    else:')
+                lines.append(f'        write = _WRITERS[_child{i}]')
+                lines.append("        w('[')")
+                lines.append('        for index, x in enumerate(v):')
+                lines.append('            if index:')
+                lines.append("                w(',')")
+                lines.append('            write(x, w)')
+                lines.append("        w(']')")
+    pending.append(repr('}' if specs else '{}'))
+    flush()
+
+    exec('\n'.join(lines), namespace)
+    return namespace[f'write_{cls.__name__}']
+
+
+def _build_coerce_plans(classes) -> None:
+    '''Keep a coerce plan for every class with bool alias fields at or below it.'''
+    specs = {cls: _field_specs(cls) for cls in classes}
+    needed: Dict[Type, bool] = {}
+
+    def _needs(cls) -> bool:
+        if cls not in needed:
+            needed[cls] = False  # guard against cycles
+            needed[cls] = any(
+                (kind == 'scalar' and _is_bool_alias(code_name, json_name))
+                or (child is not None and _needs(child))
+                for code_name, json_name, kind, child, _f in specs[cls]
+            )
+        return needed[cls]
+
+    for cls in classes:
+        if _needs(cls):
+            bool_names = tuple(code_name for code_name, json_name, kind, _c, _f in specs[cls]
+                               if kind == 'scalar' and _is_bool_alias(code_name, json_name))
+            children = tuple((code_name, kind == 'objects', child)
+                             for code_name, _j, kind, child, _f in specs[cls]
+                             if child is not None and _needs(child))
+            _COERCE_PLANS[cls] = (bool_names, children)
+
+
+def setup_score_codec(score_class: Type) -> None:
+    '''Generate the decoders and encoders for score_class and every dataclass below it.'''
+    classes = []
+    pending = [score_class]
+    while pending:
+        cls = pending.pop()
+        if cls in classes:
+            continue
+        classes.append(cls)
+        pending.extend(child for *_names, kind, child, _f in _field_specs(cls) if child is not None)
+
+    for cls in classes:
+        _DECODERS[cls] = _generate_decoder(cls, is_root=cls is score_class)
+        _ENCODERS[cls] = _generate_encoder(cls)
+        _WRITERS[cls] = _generate_writer(cls)
+    _build_coerce_plans(classes)
+    _ROOT[:] = [score_class]
+    _FINGERPRINT[:] = [_fingerprint(classes)]
+
+
+def _fingerprint(classes) -> str:
+    '''Hash of the field layout (names, JSON names, types) of all classes; defaults are left out
+    because a file that has every field does not depend on them.'''
+    digest = hashlib.sha256()
+    for cls in sorted(classes, key=lambda c: (c.__module__, c.__qualname__)):
+        digest.update(f'{cls.__module__}.{cls.__qualname__}\n'.encode())
+        hints = get_type_hints(cls)
+        for code_name, json_name, *_rest in _field_specs(cls):
+            digest.update(f'  {code_name} {json_name} {hints[code_name]}\n'.encode())
+    return digest.hexdigest()[:16]
+
+
+def schema_fingerprint() -> str:
+    '''Fingerprint of the SCORE data model, stamped into metaInfo.schema on save.'''
+    return _FINGERPRINT[0]
+
+
+def score_from_dict(data: dict):
+    '''Build a SCORE from a JSON dict (as read from a .piano file) in a single pass.'''
+    return _DECODERS[_ROOT[0]](data, None)
+
+
+def score_to_dict(score) -> dict:
+    '''Convert a SCORE to a JSON-ready dict; bool alias fields are written as true/false.'''
+    return _ENCODERS[type(score)](score)
+
+
+def write_score_json(score, f) -> None:
+    '''Stream the JSON of score_to_dict(score) to the text file f, byte for byte as
+    json.dump(..., ensure_ascii=True, separators=(',', ':')) writes it.'''
+    _WRITERS[type(score)](score, f.write)
+
+
+def coerce_bool_aliases(obj) -> None:
+    '''Coerce legacy 0/1 values of all bool alias fields at or below obj to Python bools.'''
+    plan = _COERCE_PLANS.get(type(obj))
+    if plan is None:
+        return
+    bool_names, children = plan
+    for name in bool_names:
+        value = getattr(obj, name)
+        if value is not None:
+            setattr(obj, name, _as_bool(value))
+    for name, is_list, _child in children:
+        value = getattr(obj, name)
+        if value is None:
+            continue
+        if is_list:
+            for item in value:
+                coerce_bool_aliases(item)
+        else:
+            coerce_bool_aliases(value)
@@ -0,0 +1,165 @@
+'''
+Cumulative measure/grid timeline of a score.
+
+Barline and gridline positions follow from SCORE.baseGrid and
+fileSettings.quarterNoteUnit alone. The editor, the grid drawer and the
+engraver used to walk baseGrid measure by measure every time they needed
+them. A Timeline is built once from those inputs and answers the same
+questions with bisect: which measure (and beat) a tick falls in, which
+barlines lie in a range and where the next barline or gridline is.
+
+The timeline is owned by SCORE (see SCORE.timeline) and cached there. The
+cache is checked against Timeline.key_for(score) on every access, so in-place
+edits of a baseGrid entry (property tree editor) or of quarterNoteUnit
+invalidate it without any hooks. A Timeline is immutable, so the engraver
+can share it with its worker thread.
+'''
+
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from file.SCORE import SCORE
+
+
+@dataclass(frozen=True)
+class GridSpan:
+    '''One baseGrid entry placed on the timeline.'''
+    start: float               # tick of its first barline
+    first_measure: int         # index of its first measure in the whole score (0-based)
+    measure_amount: int
+    measure_ticks: float
+    numerator: int
+    denominator: int
+    grid_times: Tuple[float, ...]
+    time_signature_visible: bool
+
+    @property
+    def end(self) -> float:
+        return self.start + self.measure_amount * self.measure_ticks
+
+    def measure_start(self, measure_idx: int) -> float:
+        '''Tick of a measure of this span, measure_idx counted from the span start.'''
+        return self.start + measure_idx * self.measure_ticks
+
+
+class Timeline:
+    '''Immutable measure/grid index built from baseGrid and quarterNoteUnit.
+
+    measure_starts holds the barline tick of every measure (the end barline is
+    not included; it is at end). grid_ticks holds every barline plus every
+    measure_start + gridTime, sorted, like the editor's barline-and-grid list.
+    '''
+
+    __slots__ = ('key', 'quarter_note_unit', 'spans', 'measure_starts', 'end', 'grid_ticks',
+                 '_span_starts')
+
+    def __init__(self, quarter_note_unit: float, grids: Tuple[Tuple[int, int, int, Tuple[float, ...], bool], ...]):
+        self.key = (quarter_note_unit, grids)
+        self.quarter_note_unit = quarter_note_unit
+
+        spans: List[GridSpan] = []
+        measure_starts: List[float] = []
+        grid_ticks: List[float] = []
+        cursor = 0.0
+        for numerator, denominator, measure_amount, grid_times, visible in grids:
+            measure_ticks = (numerator / denominator) * 4.0 * quarter_note_unit
+            span = GridSpan(cursor, len(measure_starts), measure_amount, measure_ticks,
+                            numerator, denominator, grid_times, visible)
+            spans.append(span)
+            for measure_idx in range(measure_amount):
+                measure_start = span.measure_start(measure_idx)
+                measure_starts.append(measure_start)
+                grid_ticks.append(measure_start)
+                grid_ticks.extend(measure_start + g for g in grid_times)
+            cursor = span.end
+
+        grid_ticks.sort()
+        self.spans: Tuple[GridSpan, ...] = tuple(spans)
+        self.measure_starts: Tuple[float, ...] = tuple(measure_starts)
+        self.end: float = cursor
+        self.grid_ticks: Tuple[float, ...] = tuple(grid_ticks)
+        self._span_starts = [span.start for span in spans]
+
+    @staticmethod
+    def key_for(score: 'SCORE') -> tuple:
+        '''The inputs a timeline of this score depends on, as a hashable key.'''
+        return (
+            score.fileSettings.quarterNoteUnit,
+            tuple(
+                (grid.numerator, grid.denominator, grid.measureAmount,
+                 tuple(grid.gridTimes), bool(grid.timeSignatureIndicatorVisible))
+                for grid in score.baseGrid
+            ),
+        )
+
+    @classmethod
+    def from_score(cls, score: 'SCORE') -> 'Timeline':
+        return cls(*cls.key_for(score))
+
+    # ------------------ Queries ------------------
+
+    @property
+    def measure_count(self) -> int:
+        return len(self.measure_starts)
+
+    def span_at(self, tick: float) -> Optional[GridSpan]:
+        '''The baseGrid span containing tick (ticks before 0 give the first, past the end the last).'''
+        if not self.spans:
+            return None
+        i = bisect_right(self._span_starts, tick) - 1
+        return self.spans[max(i, 0)]
+
+    def measure_at(self, tick: float) -> int:
+        '''Index (0-based) of the measure containing tick, clamped to the score.'''
+        return max(bisect_right(self.measure_starts, tick) - 1, 0)
+
+    def beat_at(self, tick: float) -> Tuple[int, float]:
+        '''(measure index, beat) of tick; beat is 0-based, in denominator units.'''
+        measure_idx = self.measure_at(tick)
+        span = self.span_at(tick)
+        if span is None or not self.measure_starts:
+            return 0, 0.0
+        beat_ticks = 4.0 * self.quarter_note_unit / span.denominator
+        return measure_idx, (tick - self.measure_starts[measure_idx]) / beat_ticks
+
+    def barlines_between(self, start: float, end: float) -> Tuple[float, ...]:
+        '''Barline ticks in [start, end), the end barline excluded.'''
+        return self.measure_starts[bisect_left(self.measure_starts, start):
+                                   bisect_left(self.measure_starts, end)]
+
+    def first_barline_after(self, tick: float, threshold: float = 0.0) -> Optional[float]:
+        '''First barline b with b - tick > threshold, or None.'''
+        starts = self.measure_starts
+        i = bisect_right(starts, tick + threshold)
+        # Settle float rounding of tick + threshold against the exact comparison
+        while i > 0 and starts[i - 1] - tick > threshold:
+            i -= 1
+        while i < len(starts) and not starts[i] - tick > threshold:
+            i += 1
+        return starts[i] if i < len(starts) else None
+
+    def next_gridline(self, tick: float) -> Optional[float]:
+        '''First barline or gridline strictly after tick; the end barline if none, None past the end.'''
+        i = bisect_right(self.grid_ticks, tick)
+        if i < len(self.grid_ticks):
+            return self.grid_ticks[i]
+        return self.end if tick < self.end else None
+
+    def is_on_barline(self, tick: float, threshold: float = 0.0) -> bool:
+        '''True if a barline (not the end barline) lies within threshold of tick.'''
+        return self._is_near(self.measure_starts, tick, threshold)
+
+    def is_on_grid(self, tick: float, threshold: float = 0.0) -> bool:
+        '''True if a barline or gridline lies within threshold of tick.'''
+        return self._is_near(self.grid_ticks, tick, threshold)
+
+    @staticmethod
+    def _is_near(ticks: Tuple[float, ...], tick: float, threshold: float) -> bool:
+        i = bisect_left(ticks, tick - threshold)
+        # Check both neighbours: tick - threshold may round across the nearest entry
+        return any(abs(ticks[j] - tick) <= threshold for j in (i - 1, i) if 0 <= j < len(ticks))
+
+
+__all__ = ['GridSpan', 'Timeline']
@@ -4,20 +4,35 @@ Handles field name mapping and missing field detection.
 '''
 
 from dataclasses import fields, MISSING
-from typing import Dict, Any, List, Tuple, Type
+from functools import lru_cache
+from typing import Dict, Any, Callable, FrozenSet, List, NamedTuple, Tuple, Type
 import json
 
 
-def get_field_mappings(cls: Type) -> Dict[str, str]:
+class FieldSchema(NamedTuple):
+    '''Per-class field tables, built once by field_schema().'''
+    code_to_json: Dict[str, str]
+    json_to_code: Dict[str, str]
+    expected: FrozenSet[str]          # all JSON field names
+    defaults: Dict[str, Any]          # JSON name -> default value (fields with default=...)
+    factories: Dict[str, Callable]    # JSON name -> default_factory (called per missing field)
+    required: FrozenSet[str]          # JSON names without any default
+    quiet: FrozenSet[str]             # JSON names filled in without a warning (metadata 'missing_ok')
+
+
+@lru_cache(maxsize=None)
+def field_schema(cls: Type) -> FieldSchema:
     '''
-    Extract code→JSON field name mappings from dataclass metadata.
+    Build the field tables of a dataclass once per class.
     
-    Returns:
-        Dict mapping Python field names to JSON field names.
-        Example: {'duration': 'dur', 'velocity': 'vel', 'color': 'color', ...}
-        Note: Storage fields like _color map to their JSON name without underscore.
+    JSON names come from config(field_name=...) via the letter_case override;
+    storage fields like _color keep the underscore in their code name.
     '''
-    mappings = {}
+    code_to_json = {}
+    defaults = {}
+    factories = {}
+    required = set()
+    quiet = set()
     for field_obj in fields(cls):
         # Get JSON name from metadata
         metadata = field_obj.metadata.get('dataclasses_json', {})
@@ -31,14 +46,38 @@ def get_field_mappings(cls: Type) -> Dict[str, str]:
         else:
             # Fallback to field_name or the field's name
             json_name = metadata.get('field_name', field_obj.name)
+        code_to_json[field_obj.name] = json_name
         
-        # For storage fields (like _color), keep the underscore in the code name
-        # because that's how it's defined in the dataclass
-        code_name = field_obj.name
-        
-        mappings[code_name] = json_name
+        if field_obj.default is not MISSING:
+            defaults[json_name] = field_obj.default
+        elif field_obj.default_factory is not MISSING:
+            factories[json_name] = field_obj.default_factory
+        else:
+            required.add(json_name)
+        if field_obj.metadata.get('missing_ok'):
+            quiet.add(json_name)
     
-    return mappings
+    return FieldSchema(
+        code_to_json=code_to_json,
+        json_to_code={json_name: code_name for code_name, json_name in code_to_json.items()},
+        expected=frozenset(code_to_json.values()),
+        defaults=defaults,
+        factories=factories,
+        required=frozenset(required),
+        quiet=frozenset(quiet),
+    )
+
+
+def get_field_mappings(cls: Type) -> Dict[str, str]:
+    '''
+    Extract code→JSON field name mappings from dataclass metadata.
+    
+    Returns:
+        Dict mapping Python field names to JSON field names.
+        Example: {'duration': 'dur', 'velocity': 'vel', 'color': 'color', ...}
+        Note: Storage fields like _color map to their JSON name without underscore.
+    '''
+    return dict(field_schema(cls).code_to_json)
 
 
 def get_field_defaults(cls: Type) -> Dict[str, Any]:
@@ -49,23 +88,17 @@ def get_field_defaults(cls: Type) -> Dict[str, Any]:
         Dict mapping JSON field names to their default values.
         Example: {'pitch': 40, 'dur': 100.0, 'color': None, ...}
     '''
+    schema = field_schema(cls)
     defaults = {}
-    mappings = get_field_mappings(cls)
-    
-    for field_obj in fields(cls):
-        code_name = field_obj.name
-        json_name = mappings.get(code_name, field_obj.name)
-        
-        # Get default value
-        if field_obj.default is not MISSING:
-            defaults[json_name] = field_obj.default
-        elif field_obj.default_factory is not MISSING:
+    for json_name in schema.code_to_json.values():
+        if json_name in schema.defaults:
+            defaults[json_name] = schema.defaults[json_name]
+        elif json_name in schema.factories:
             # Call factory to get default (like list, dict, etc.)
-            defaults[json_name] = field_obj.default_factory()
+            defaults[json_name] = schema.factories[json_name]()
         else:
             # No default specified - field is required
             defaults[json_name] = MISSING
-    
     return defaults
 
 
@@ -88,39 +121,39 @@ def validate_and_fix_object(obj_dict: Dict[str, Any], cls: Type, obj_type: str =
     
     warnings = []
     fixed_dict = obj_dict.copy()
+    schema = field_schema(cls)
     
-    # Get mappings and defaults
-    mappings = get_field_mappings(cls)
-    defaults = get_field_defaults(cls)
-    
-    # Reverse mapping: JSON name → code name
-    json_to_code = {json_name: code_name for code_name, json_name in mappings.items()}
+    # Common case: exactly the expected fields
+    actual_json_names = obj_dict.keys()
+    if actual_json_names == schema.expected:
+        return fixed_dict, warnings
     
     # Check for unexpected fields in JSON
-    expected_json_names = set(mappings.values())
-    actual_json_names = set(obj_dict.keys())
-    
-    unexpected = actual_json_names - expected_json_names
+    unexpected = actual_json_names - schema.expected
     if unexpected:
         warnings.append(f'{obj_type}: Unexpected fields in JSON: {unexpected}')
     
     # Check for missing fields and fill with defaults
-    missing = expected_json_names - actual_json_names
+    missing = schema.expected - actual_json_names
     for json_name in missing:
-        if json_name in defaults:
-            default_value = defaults[json_name]
-            if default_value is not MISSING:
-                fixed_dict[json_name] = default_value
-                code_name = json_to_code.get(json_name, json_name)
-                warnings.append(
-                    f'{obj_type}: Missing field "{json_name}" (code: "{code_name}"), '
-                    f'using default: {default_value}'
-                )
-            else:
-                # Required field with no default
-                warnings.append(
-                    f'{obj_type}: REQUIRED field "{json_name}" is missing and has no default!'
-                )
+        if json_name in schema.required:
+            # Required field with no default
+            warnings.append(
+                f'{obj_type}: REQUIRED field "{json_name}" is missing and has no default!'
+            )
+            continue
+        if json_name in schema.defaults:
+            default_value = schema.defaults[json_name]
+        else:
+            default_value = schema.factories[json_name]()
+        fixed_dict[json_name] = default_value
+        if json_name in schema.quiet:
+            continue
+        code_name = schema.json_to_code.get(json_name, json_name)
+        warnings.append(
+            f'{obj_type}: Missing field "{json_name}" (code: "{code_name}"), '
+            f'using default: {default_value}'
+        )
     
     return fixed_dict, warnings
 
@@ -247,6 +280,8 @@ def validate_and_fix_score(score_dict: Dict[str, Any]) -> Tuple[Dict[str, Any],
             'tempo': Tempo,
         }
         
+        art_expected = field_schema(Articulation).expected
+        
         for stave_idx, stave in enumerate(fixed_score['stave']):
             if 'event' not in stave:
                 continue
@@ -258,21 +293,26 @@ def validate_and_fix_score(score_dict: Dict[str, Any]) -> Tuple[Dict[str, Any],
                     continue
                 
                 event_list = events[event_type]
+                expected = field_schema(event_class).expected
                 for event_idx, event in enumerate(event_list):
-                    fixed_event, warnings = validate_and_fix_object(
-                        event, event_class, f'Stave[{stave_idx}].{event_type}[{event_idx}]'
-                    )
-                    events[event_type][event_idx] = fixed_event
-                    all_warnings.extend(warnings)
+                    # Events with exactly the expected fields need no fixing (and no copy)
+                    if event.keys() != expected:
+                        event, warnings = validate_and_fix_object(
+                            event, event_class, f'Stave[{stave_idx}].{event_type}[{event_idx}]'
+                        )
+                        event_list[event_idx] = event
+                        all_warnings.extend(warnings)
                     
                     # Validate articulations within notes
-                    if event_type == 'note' and 'art' in fixed_event:
-                        for art_idx, art in enumerate(fixed_event['art']):
+                    if event_type == 'note' and event.get('art'):
+                        for art_idx, art in enumerate(event['art']):
+                            if art.keys() == art_expected:
+                                continue
                             fixed_art, art_warnings = validate_and_fix_object(
                                 art, Articulation, 
                                 f'Stave[{stave_idx}].Note[{event_idx}].Articulation[{art_idx}]'
                             )
-                            fixed_event['art'][art_idx] = fixed_art
+                            event['art'][art_idx] = fixed_art
                             all_warnings.extend(art_warnings)
     
     return fixed_score, all_warnings
@@ -294,6 +334,44 @@ def validate_score_integrity(score_instance) -> List[str]:
         return ['Warning: SCORE instance does not support integrity validation']
 
 
+def is_trusted_score(score_data: Any) -> bool:
+    '''
+    Cheap structural check whether a loaded score can skip full_score_validation.
+    
+    The file must carry the schema fingerprint of this build in metaInfo.schema
+    (stamped by SCORE.save) and have the expected top-level and stave/event
+    layout. Individual events are not inspected: a file written by the same
+    data model already has every field.
+    
+    Args:
+        score_data: Raw score data from JSON
+    
+    Returns:
+        True if the data was written with the current schema
+    '''
+    from file.SCORE import SCORE, Event
+    from file.score_codec import schema_fingerprint
+    
+    if not isinstance(score_data, dict) or score_data.keys() != field_schema(SCORE).expected:
+        return False
+    meta = score_data['metaInfo']
+    if not isinstance(meta, dict) or meta.get('schema') != schema_fingerprint():
+        return False
+    if not all(isinstance(score_data[name], dict) for name in ('header', 'properties', 'fileSettings')):
+        return False
+    if not all(isinstance(score_data[name], list) for name in ('baseGrid', 'lineBreak', 'stave')):
+        return False
+    
+    event_names = field_schema(Event).expected
+    for stave in score_data['stave']:
+        events = stave.get('event') if isinstance(stave, dict) else None
+        if not isinstance(events, dict) or events.keys() != event_names:
+            return False
+        if not all(isinstance(event_list, list) for event_list in events.values()):
+            return False
+    return True
+
+
 def full_score_validation(score_data: dict) -> tuple[dict, list[str]]:
     '''
     Complete validation pipeline: structural validation + cross-reference validation.
@@ -309,10 +387,9 @@ def full_score_validation(score_data: dict) -> tuple[dict, list[str]]:
     
     # Convert to SCORE instance for cross-reference validation
     try:
-        from file.SCORE import SCORE
-        score_instance = SCORE.from_dict(fixed_data)
+        from file.score_codec import score_from_dict
+        score_instance = score_from_dict(fixed_data)
         score_instance.renumber_id()
-        score_instance._reattach_score_references()
         
         # Run integrity validation
         integrity_warnings = validate_score_integrity(score_instance)
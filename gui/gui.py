@@ -144,7 +144,8 @@ class Editor(BoxLayout):
             border_width_px=1.0,
             keep_aspect=True,
             scale_to_width=True,
-            enable_keyboard=True  # Enable keyboard for editor canvas
+            enable_keyboard=True,  # Enable keyboard for editor canvas
+            batch_primitives=True  # Note rectangles and grid lines share per-layer meshes
         )
         self.add_widget(self.canvas_view)
 
@@ -2097,6 +2097,7 @@ class PropertyTreeEditor(BoxLayout):
             if item_class is not None and is_dataclass(item_class):
                 new_item = item_class()
                 lst.append(new_item)
+                self._sync_score_id_registry()
                 
                 # Auto-collapse all other items
                 self._collapse_sibling_list_items(path)
@@ -2114,6 +2115,7 @@ class PropertyTreeEditor(BoxLayout):
                 item_class = type(lst[0])
                 new_item = item_class()
                 lst.append(new_item)
+                self._sync_score_id_registry()
                 
                 # Auto-collapse all other items
                 self._collapse_sibling_list_items(path)
@@ -2239,6 +2241,7 @@ class PropertyTreeEditor(BoxLayout):
                 parent_obj = self._read_at_path(self._score, parent_path)
                 if isinstance(parent_obj, list) and 0 <= item_index < len(parent_obj):
                     parent_obj.pop(item_index)
+                    self._sync_score_id_registry()
                     # Remove from open paths
                     item_path = parent_path + (item_index,)
                     self._open_paths.discard(item_path)
@@ -2360,10 +2363,17 @@ class PropertyTreeEditor(BoxLayout):
         try:
             if list_ref:
                 list_ref.pop()
+                self._sync_score_id_registry()
                 self._fire_change_and_rebuild()
         except Exception:
             pass
 
+    def _sync_score_id_registry(self):
+        '''Rebuild the SCORE id registry after a list item was added or removed directly.'''
+        rebuild = getattr(self._score, 'rebuild_id_registry', None)
+        if callable(rebuild):
+            rebuild()
+
     def _fire_change_and_rebuild(self):
         if callable(self.on_change):
             try:
@@ -2735,6 +2745,9 @@ class PropertyTreeEditor(BoxLayout):
             obj[last] = value
         else:
             setattr(obj, last, value)
+        # Replacing a list item or editing an id invalidates the SCORE id registry
+        if root is self._score and (isinstance(last, int) or last == 'id'):
+            self._sync_score_id_registry()
 
 
 __all__ = ['PropertyTreeEditor']
\ No newline at end of file
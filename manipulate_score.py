@@ -91,6 +91,7 @@ def generate_performance_test(score: SCORE, editor=None, note_count: int = 1000)
     
     # Clear existing notes
     score.stave[stave_idx].event.note.clear()
+    score.rebuild_id_registry()
     
     import random
     current_time = 0.0
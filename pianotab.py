@@ -150,6 +150,7 @@ class pianoTAB(App):
         
         # Initialize Editor (which owns the SCORE model)
         self.editor = Editor(self.gui.get_editor_widget(), gui=self.gui)
+        self.editor.virtualized = bool(self.settings.get('virtualized_editor', True))
         
         # Connect editor to grid_selector for cursor snapping
         self.editor.grid_selector = self.gui.side_panel.grid_selector
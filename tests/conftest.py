@@ -0,0 +1,50 @@
+"""
+Shared pytest fixtures.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.canvas import Canvas
+
+
+@pytest.fixture
+def make_canvas():
+    '''Factory for an empty, laid out 800x600 px Canvas over a 210 x 20000 mm page:
+    make_canvas(batch_primitives=False) -> Canvas.'''
+    def make(batch_primitives: bool = False) -> Canvas:
+        canvas = Canvas(width_mm=210.0, height_mm=20000.0, batch_primitives=batch_primitives)
+        canvas.size = (800, 600)
+        canvas._update_layout_and_redraw()
+        return canvas
+    return make
+
+
+class _FixedGridSelector:
+    '''Stands in for the GUI's GridSelector: a fixed grid step in ticks.'''
+
+    def __init__(self, step: float = 256.0):
+        self.step = step
+
+    def get_grid_step(self) -> float:
+        return self.step
+
+
+@pytest.fixture
+def make_editor(make_canvas):
+    '''Factory for an Editor on its own canvas with score drawn:
+    make_editor(score, virtualized=False) -> Editor.'''
+    from editor.editor import Editor
+
+    def make(score, virtualized: bool = False):
+        editor = Editor(make_canvas())
+        editor.grid_selector = _FixedGridSelector()
+        editor.virtualized = virtualized
+        editor.score = score
+        editor.redraw_pianoroll()
+        return editor
+    return make
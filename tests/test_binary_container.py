@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Tests for the binary .piano container (file/binary_container.py): JSON ->
+binary -> JSON must give back the identical document, the note columns must
+be readable in place, and SCORE.load must read what SCORE.save_binary writes.
+
+Run with: python -m pytest tests/test_binary_container.py
+"""
+import copy
+import json
+import random
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import file.binary_container as binary_container
+from file.binary_container import (BinaryScoreReader, encode_binary, is_binary_score,
+                                   read_binary, write_binary)
+from file.SCORE import SCORE
+
+ROOT = Path(__file__).parent.parent
+SAMPLES = sorted(ROOT.glob('*.piano'))
+
+
+def _round_trip(data: dict) -> BinaryScoreReader:
+    reader = BinaryScoreReader(encode_binary(data))
+    result = reader.to_dict()
+    # json.dumps compares key order and int/float/bool types as well
+    assert json.dumps(result) == json.dumps(data)
+    return reader
+
+
+def test_samples_round_trip():
+    for path in SAMPLES:
+        with open(path, 'r', encoding='utf-8') as f:
+            _round_trip(json.load(f))
+
+
+def test_irregular_documents_round_trip():
+    with open(SAMPLES[0], 'r', encoding='utf-8') as f:
+        base = json.load(f)
+    rng = random.Random(1)
+    odd_values = [None, 0, 1, 1.5, True, 'x', [1], {'a': 1}, 2 ** 70, -0.0, '<']
+
+    def mutate(x):
+        if isinstance(x, dict):
+            for key in list(x):
+                r = rng.random()
+                if r < 0.05:
+                    del x[key]
+                elif r < 0.1:
+                    x[key] = rng.choice(odd_values)
+                else:
+                    mutate(x[key])
+            if rng.random() < 0.05:
+                x['extra'] = 1
+        elif isinstance(x, list):
+            for item in x:
+                mutate(item)
+
+    for _trial in range(100):
+        data = copy.deepcopy(base)
+        mutate(data)
+        _round_trip(data)
+
+
+def test_note_columns():
+    with open(SAMPLES[0], 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    notes = data['stave'][0]['event']['note']
+    notes[0]['color'] = '#ff0000'
+    notes[1]['time'] = 5  # int in a float column: side table
+
+    reader = _round_trip(data)
+    columns = reader.columns(0, 'note')
+    assert list(columns['pitch']) == [n['pitch'] for n in notes]
+    assert list(columns['duration']) == [n['duration'] for n in notes]
+    choices = dict((name, extra) for name, dtype, extra in reader.prelude(0, 'note')['fields'])['hand']
+    assert [choices[code] for code in columns['hand']] == [n['hand'] for n in notes]
+    sparse = dict((row, overrides) for row, overrides in reader.prelude(0, 'note')['sparse'])
+    assert sparse == {0: {'color': '#ff0000'}, 1: {'time': 5}}
+
+
+def test_without_numpy(monkeypatch):
+    monkeypatch.setattr(binary_container, 'np', None)
+    with open(SAMPLES[0], 'r', encoding='utf-8') as f:
+        _round_trip(json.load(f))
+
+
+def test_score_save_binary(tmp_path, monkeypatch):
+    # Both saves stamp the modification time; keep it equal
+    monkeypatch.setattr('time.strftime', lambda fmt, *args: fmt)
+    for path in SAMPLES:
+        score = SCORE.load(str(path))
+        json_path, binary_path = tmp_path / 'score.piano', tmp_path / 'score.bin.piano'
+        score.save(str(json_path))
+        write_binary(json.loads(json_path.read_text(encoding='utf-8')), str(binary_path))
+        assert is_binary_score(str(binary_path)) and not is_binary_score(str(json_path))
+        assert read_binary(str(binary_path)) == json.loads(json_path.read_text(encoding='utf-8'))
+
+        score.save_binary(str(binary_path))
+        loaded = SCORE.load(str(binary_path))
+        assert loaded.to_dict() == SCORE.load(str(json_path)).to_dict()
+        with BinaryScoreReader.open(str(binary_path)) as reader:
+            times = reader.columns(0, 'note')['time']
+            assert list(times) == [note.time for note in loaded.stave[0].event.note]
+            del times
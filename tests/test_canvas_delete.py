@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Tests for Canvas.delete_many: a bulk delete leaves the canvas in the same
+state as deleting the items one by one (items, tag index, spatial index,
+layer children and Mesh slots).
+
+Run with: python -m pytest tests/test_canvas_delete.py
+"""
+import random
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.canvas import Canvas
+
+
+def _filled(canvas: Canvas) -> Canvas:
+    rng = random.Random(4)
+    for i in range(3000):
+        # Crowd the first page so that layers lose more than _REBUILD_LAYER_MIN drawn items at once
+        y = rng.uniform(0, 300) if i % 3 else rng.uniform(0, 20000)
+        kind = rng.random()
+        if kind < 0.4:
+            canvas.add_rectangle(10, y, 20, y + 3, fill=True, tags=['midi_note', f'note_0_{i}'])
+        elif kind < 0.7:
+            canvas.add_line(0, y, 210, y, tags=['gridline'])
+        elif kind < 0.85:
+            canvas.add_polyline([0, y, 5, y + 1, 9, y + 4], tags=['stem', 'edit'])
+        else:
+            canvas.add_text(str(i), 1, y, font_size_pt=12, tags=['measure_number', 'edit'])
+    canvas._redraw_all()
+    return canvas
+
+
+def _state(canvas: Canvas) -> dict:
+    groups = canvas._items.groups
+    by_group = {id(group): item_id for item_id, group in groups.items()}
+    runs = {id(run.group): run for run in set(canvas._item_runs.values())}
+    layers = {}
+    for z_index, layer_group in canvas._layer_groups.items():
+        layers[z_index] = [by_group[id(child)] if id(child) in by_group else ('run', tuple(runs[id(child)].ids))
+                           for child in layer_group.children]
+    return {
+        'items': list(canvas._items),
+        'tags': {tag: set(ids) for tag, ids in canvas._tag_index.items()},
+        'buckets': {bucket: set(ids) for bucket, ids in canvas._y_buckets.items()},
+        'drawn': set(canvas._drawn_items),
+        'layers': layers,
+        'slots': {layer: list(slots.keys) for layer, slots in canvas._layer_slots.items() if slots.keys},
+        'pieces': {item_id: set(parts) for item_id, parts in canvas._item_pieces.items()},
+    }
+
+
+def test_delete_many_matches_one_by_one_deletes(make_canvas):
+    one_by_one, bulk = _filled(make_canvas(True)), _filled(make_canvas(True))
+    rng = random.Random(9)
+    for _ in range(3):
+        drawn = sorted(one_by_one._drawn_items)
+        victims = rng.sample(drawn, len(drawn) // 3) + rng.sample(sorted(one_by_one._items), 200) + [10 ** 9]
+        for item_id in victims:
+            one_by_one.delete(item_id)
+        bulk.delete_many(victims)
+        for canvas in (one_by_one, bulk):
+            canvas._flush_batches()
+            canvas._redraw_all()
+        assert _state(bulk) == _state(one_by_one)
+
+    bulk.delete_by_tag('edit')
+    assert bulk.find_by_tag('edit') == [] and 'edit' not in bulk._tag_index
+    assert not any({'stem', 'measure_number'} & set(bulk.get_tags(item_id)) for item_id in bulk._items)
+    assert set(bulk._items.groups) <= bulk._drawn_items
+
+
+def test_default_tags_let_a_layer_be_deleted_by_tag(make_canvas):
+    canvas = make_canvas()
+    canvas.default_tags = ('dynamic_layer',)
+    with canvas.default_tagging():
+        static = canvas.add_line(0.0, 10.0, 100.0, 10.0, tags=['barline'])
+    notes = [canvas.add_rectangle(10.0, y, 20.0, y + 5.0, tags=['midi_note', str(y)]) for y in (20.0, 40.0)]
+    assert canvas.get_tags(notes[0]) == ['midi_note', '20.0', 'dynamic_layer']
+    assert canvas.get_tags(static) == ['barline']
+    assert canvas.default_tags == ('dynamic_layer',)
+
+    canvas.delete_by_tag('dynamic_layer')
+    assert canvas.find_all() == [static]
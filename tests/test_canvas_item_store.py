@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Tests for the Canvas column item store: item views carry the fields the old
+item dicts had, deletes and compaction keep ids, rows and points in step, the
+NumPy and pure-Python bulk queries agree, and only drawn items own an
+instruction group.
+
+Run with: python -m pytest tests/test_canvas_item_store.py
+"""
+import random
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import utils.canvas_items as canvas_items
+
+
+def test_views_have_the_item_dict_fields(make_canvas):
+    canvas = make_canvas()
+    rect = canvas.add_rectangle(20, 10, 5, 12, fill=True, fill_color='#ff0000', outline_width_mm=0.5,
+                                tags=['midi_note', 'note_0_1'])
+    line = canvas.add_line(0, 1, 10, 2, dash=True, dash_pattern_mm=(1.0, 3.0), cap='square', tags=['stem'])
+    path = canvas.add_polyline([0, 0, 5, 5, 10, 0], width_mm=0.4, z_index=3)
+    poly = canvas.add_polygon([0, 0, 5, 3, 10, -2], fill=True, outline=False)
+    text = canvas.add_text('12', 1, 40, font_size_pt=16, anchor='bc', angle_deg=90.0, tags=['measure_number'])
+
+    assert {k: v for k, v in canvas.get_item(rect).items() if k not in ('group', 'layer_group')} == {
+        'type': 'rectangle', 'x_mm': 5.0, 'y_mm': 10.0, 'w_mm': 15.0, 'h_mm': 2.0,
+        'fill': True, 'fill_color': (1.0, 0.0, 0.0, 1.0), 'outline': True,
+        'outline_color': (0.0, 0.0, 0.0, 1.0), 'outline_w_mm': 0.5,
+        'tags': {'midi_note', 'note_0_1'}, 'z_index': canvas.get_item(rect)['z_index'],
+    }
+    line_item = canvas.get_item(line)
+    assert line_item['points_mm'] == [0.0, 1.0, 10.0, 2.0]
+    assert (line_item['dash'], line_item['dash_mm'], line_item['cap'], line_item['close']) == (True, (1.0, 3.0), 'square', False)
+    assert canvas.get_item(path)['dash_mm'] == (2.0, 2.0) and canvas.get_item(path)['z_index'] == 3
+    assert 'w_mm' not in canvas.get_item(poly) and canvas.get_item(poly).get('w_mm', 0.25) == 0.25
+    assert canvas.get_item(poly)['outline'] is False
+    text_item = canvas.get_item(text)
+    assert (text_item['text'], text_item['font_pt'], text_item['anchor'], text_item['angle_deg']) == ('12', 16.0, 'bc', 90.0)
+
+    canvas.add_tag(rect, 'selected')
+    assert canvas.find_by_tag('selected') == [rect] and 'selected' in canvas.get_tags(rect)
+    canvas.remove_tag(rect, 'selected')
+    assert 'selected' not in canvas.get_item(rect)['tags'] and canvas.find_by_tag('selected') == []
+
+
+def test_deletes_and_compaction_keep_items_consistent(make_canvas):
+    canvas = make_canvas()
+    rng = random.Random(3)
+    expected = {}
+    for i in range(6000):
+        y = rng.uniform(0, 20000)
+        if i % 2:
+            item_id = canvas.add_polyline([0, y, 5, y + 1, 9, y + 4], tags=[f'p{i}'])
+            expected[item_id] = [0.0, y, 5.0, y + 1, 9.0, y + 4]
+        else:
+            item_id = canvas.add_rectangle(0, y, 5, y + 1)
+            expected[item_id] = (0.0, y)
+        if rng.random() < 0.7:
+            victim = rng.choice(sorted(expected))
+            canvas.delete(victim)
+            del expected[victim]
+
+    store = canvas._items
+    assert len(store.ids) < 6000  # compacted at least once
+    assert list(store) == sorted(expected) == canvas._draw_order
+    for item_id, value in expected.items():
+        item = store[item_id]
+        if isinstance(value, list):
+            assert item['points_mm'] == value and item['type'] == 'path'
+        else:
+            assert (item['x_mm'], item['y_mm']) == value
+    assert canvas._items_in_y_range(0, 20000) == set(expected)
+
+
+def test_row_map_tracks_live_items_only(make_canvas):
+    canvas = make_canvas()
+    static = canvas.add_rectangle(0, 0, 5, 1)  # a low id that is never deleted
+    for _cycle in range(20):
+        ids = [canvas.add_rectangle(0, i, 5, i + 1) for i in range(3000)]
+        canvas.delete_many(ids)
+    store = canvas._items
+    assert len(store._rows) == len(store) == 1
+    assert len(store.ids) < 3000 and store[static]['y_mm'] == 0.0
+
+
+def test_numpy_and_python_bulk_queries_agree(make_canvas, monkeypatch):
+    canvas = make_canvas()
+    rng = random.Random(8)
+    for _ in range(3000):
+        y = rng.uniform(0, 20000)
+        canvas.add_line(0, y, 10, y + rng.uniform(0, 50), z_index=rng.randrange(5))
+    for item_id in rng.sample(sorted(canvas._items), 500):
+        canvas.delete(item_id)
+
+    store = canvas._items
+    fast = (store.live_ids(), store.ids_by_z(), store.ids_in_y_range(5000, 9000))
+    monkeypatch.setattr(canvas_items, 'np', None)
+    slow = (store.live_ids(), store.ids_by_z(), store.ids_in_y_range(5000, 9000))
+    assert fast == slow
+    assert slow[1] == [item_id for _, item_id in sorted((store[i]['z_index'], i) for i in store)]
+    assert slow[2] == canvas._items.filter_y_range(canvas._bucket_candidates(5000, 9000), 5000, 9000)
+
+
+def test_only_drawn_items_own_a_group(make_canvas):
+    canvas = make_canvas()
+    for i in range(2000):
+        canvas.add_rectangle(0, i * 10.0, 5, i * 10.0 + 2, tags=['midi_note'])
+    canvas._redraw_all()
+    assert set(canvas._items.groups) == canvas._drawn_items
+    assert len(canvas._drawn_items) < 200
+
+    # Groups keep the creation order inside their layer whatever order they were drawn in
+    canvas._scroll_px = 20000.0
+    canvas._redraw_all()
+    canvas._scroll_px = 19000.0
+    canvas._redraw_all()
+    layer = canvas._get_layer_group(canvas.get_item(1)['z_index'])
+    groups = canvas._items.groups
+    by_group = {id(group): item_id for item_id, group in groups.items()}
+    assert [by_group[id(child)] for child in layer.children] == sorted(groups)
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Tests for batched Canvas primitives: rectangles, ovals and solid lines of a
+layer share MeshBatch meshes, their slots follow redraws, deletes and scrolls,
+hit-testing does not change and items paint in creation order, as without
+batching (apart from fills and outlines inside one run).
+
+Run with: python -m pytest tests/test_canvas_mesh_batch.py
+"""
+import random
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.canvas import Canvas, MeshBatch, _BatchRun
+
+
+def _filled(canvas: Canvas) -> Canvas:
+    rng = random.Random(1)
+    for i in range(4000):
+        y = rng.uniform(0, 20000)
+        kind = rng.random()
+        if kind < 0.4:
+            canvas.add_rectangle(10, y, 20, y + 3, fill=True, fill_color='#ff0000', tags=['midi_note'])
+        elif kind < 0.8:
+            canvas.add_line(0, y, 210, y, tags=['gridline'])
+        elif kind < 0.9:
+            canvas.add_oval(30, y, 35, y + 2, fill=True, tags=['notehead_white'])
+        else:
+            canvas.add_line(50, y, 60, y + 5, dash=True, tags=['gridline'])
+    canvas._redraw_all()
+    return canvas
+
+
+def _live_triangles(batch: MeshBatch) -> int:
+    indices = batch.indices
+    return sum(1 for i in range(0, len(indices), 3) if len({indices[i], indices[i + 1], indices[i + 2]}) > 1)
+
+
+def _check_slots(canvas: Canvas):
+    pieces = {(item_id, part) for item_id, parts in canvas._item_pieces.items() for part in parts}
+    assert set(canvas._item_pieces) <= canvas._drawn_items
+    slots = set()
+    for chain in canvas._mesh_batches.values():
+        for batch in chain:
+            slots.update(batch._slots)
+            assert _live_triangles(batch) == sum(slot[3] // 3 for slot in batch._slots.values())
+            assert not batch.dirty
+    assert slots == pieces
+
+
+def _paint_order(canvas: Canvas) -> dict:
+    '''Layer -> drawn item ids in paint order (runs expanded), checking the layer slots on the way.'''
+    groups = canvas._items.groups
+    order = {}
+    for layer, slots in canvas._layer_slots.items():
+        children = canvas._get_layer_group(layer).children
+        assert [id(child) for child in children] == [
+            id(entry.group if isinstance(entry, _BatchRun) else groups[entry]) for entry in slots.entries]
+        ids = []
+        for entry, key in zip(slots.entries, slots.keys):
+            if isinstance(entry, _BatchRun):
+                assert key == entry.ids[0] and all(canvas._item_runs[i] is entry for i in entry.ids)
+                ids.extend(entry.ids)
+            else:
+                assert key == entry
+                ids.append(entry)
+        for first, second in zip(slots.entries, slots.entries[1:]):
+            # Runs are maximal: two touching runs would have been joined
+            assert not (isinstance(first, _BatchRun) and isinstance(second, _BatchRun)
+                        and first.signature == second.signature)
+        assert ids == sorted(ids)
+        if ids:
+            order[layer] = ids
+    return order
+
+
+def test_paint_order_matches_unbatched(make_canvas):
+    plain, batched = make_canvas(False), make_canvas(True)
+    rng = random.Random(6)
+    colors = ['#000000', '#ff0000', '#00aa00']
+    for i in range(3000):
+        y = rng.uniform(0, 20000)
+        kind = rng.random()
+        color = rng.choice(colors)
+        for canvas in (plain, batched):
+            if kind < 0.5:
+                canvas.add_rectangle(10, y, 20, y + 3, fill=True, fill_color=color, tags=['notehead_black'])
+            elif kind < 0.8:
+                canvas.add_line(0, y, 210, y, color=color, tags=['notehead_black'])
+            else:
+                canvas.add_text(str(i), 12, y, font_size_pt=12, tags=['notehead_black'])
+    for step in range(12):
+        victims = rng.sample(sorted(plain._items), 100)
+        scroll_px = rng.uniform(0, 60000)
+        for canvas in (plain, batched):
+            canvas.delete_many(victims if step % 2 else victims[:5])
+            canvas._scroll_px = scroll_px
+            canvas._redraw_all()
+        expected = {layer: list(slots.keys) for layer, slots in plain._layer_slots.items() if slots.keys}
+        assert _paint_order(batched) == expected
+        _check_slots(batched)
+
+
+def test_accent_item_drawn_first_does_not_sink_later_ones(make_canvas):
+    canvas = make_canvas(True)
+    # The accent color gets its first mesh before any black one, like the cursor before the notes
+    cursor = canvas.add_rectangle(10, 10, 20, 13, fill=True, fill_color='#ff0000', tags=['notehead_black'])
+    black = [canvas.add_rectangle(10, 10 + i, 20, 13 + i, fill=True, tags=['notehead_black']) for i in range(3)]
+    selected = canvas.add_rectangle(10, 11, 20, 14, fill=True, fill_color='#ff0000', tags=['notehead_black'])
+    label = canvas.add_text('1', 12, 12, font_size_pt=12, tags=['notehead_black'])
+    after = canvas.add_rectangle(10, 12, 20, 15, fill=True, tags=['notehead_black'])
+    canvas._redraw_all()
+
+    layer = canvas._items.layer_of(cursor)
+    slots = canvas._layer_slots[layer]
+    assert [tuple(e.ids) if isinstance(e, _BatchRun) else e for e in slots.entries] == [
+        (cursor,), tuple(black), (selected,), label, (after,)]
+
+    # Removing the items between same-colored runs joins them again
+    canvas.delete(selected)
+    canvas._redraw_all()
+    assert [tuple(e.ids) if isinstance(e, _BatchRun) else e for e in slots.entries] == [
+        (cursor,), tuple(black), label, (after,)]
+    canvas.delete(label)
+    canvas._redraw_all()
+    assert [tuple(e.ids) for e in slots.entries] == [(cursor,), tuple(black) + (after,)]
+
+
+def test_fills_draw_below_outlines_inside_a_run(make_canvas):
+    canvas = make_canvas(True)
+    first = canvas.add_rectangle(10, 10, 20, 13, fill=True, fill_color='#ff0000', tags=['notehead_black'])
+    second = canvas.add_rectangle(12, 11, 22, 14, fill=True, fill_color='#ff0000', tags=['notehead_black'])
+    canvas._redraw_all()
+
+    run = canvas._item_runs[first]
+    assert canvas._item_runs[second] is run and run.ids == [first, second]
+    fills, outlines = run.passes
+    assert list(run.group.children) == [fills, outlines]
+    assert canvas._item_pieces[second][0].group in fills.children
+    assert canvas._item_pieces[first][1].group in outlines.children
+
+
+def test_batching_reduces_draw_calls_and_keeps_hit_tests(make_canvas):
+    plain, batched = _filled(make_canvas(False)), _filled(make_canvas(True))
+    assert batched.get_canvas_stats()['draw_calls'] * 5 < plain.get_canvas_stats()['draw_calls']
+    _check_slots(batched)
+
+    rng = random.Random(3)
+    for _ in range(300):
+        x_px, y_px = rng.uniform(0, 800), rng.uniform(0, 600)
+        assert batched.get_all_items_at_position(x_px, y_px) == plain.get_all_items_at_position(x_px, y_px)
+
+
+def test_slots_follow_deletes_scroll_and_zoom(make_canvas):
+    canvas = _filled(make_canvas(True))
+    rng = random.Random(5)
+    for step in range(20):
+        for item_id in rng.sample(sorted(canvas._items), 40):
+            canvas.delete(item_id)
+        canvas._scroll_px = rng.uniform(0, 60000)
+        if step % 5 == 4:
+            canvas.size = (rng.choice([700, 900]), 600)
+            canvas._update_layout_and_redraw()
+        canvas._redraw_all()
+        _check_slots(canvas)
+
+    canvas.clear()
+    assert not canvas._mesh_batches and not canvas._item_pieces
+
+
+def test_mesh_batch_reuses_and_compacts_slots():
+    batch = MeshBatch((0, 0, 0, 1))
+    quad = ([0.0, 0.0, 1.0, 0.0, 1.0, 1.0, 0.0, 1.0], [0, 1, 2, 0, 2, 3])
+    for key in range(10):
+        batch.put(key, *quad)
+    batch.put(3, [5.0, 5.0, 6.0, 5.0, 6.0, 6.0, 5.0, 6.0], quad[1])
+    assert len(batch.vertices) == 10 * 4 * 4  # updated in place
+    assert batch.vertices[3 * 16:3 * 16 + 2] == [5.0, 5.0]
+
+    batch.release(4)
+    batch.put(42, *quad)
+    assert batch._slots[42][0] == 4 * 4  # took over the released slot of piece 4
+    assert len(batch.vertices) == 10 * 4 * 4
+
+    for key in (0, 1, 2, 5, 6, 7):
+        batch.release(key)
+    assert len(batch.vertices) == 4 * 4 * 4  # compacted to pieces 3, 8, 9 and 42
+    assert batch.indices[batch._slots[3][2]:batch._slots[3][2] + 6] == [0, 1, 2, 0, 2, 3]
+    assert batch.vertices[:2] == [5.0, 5.0]
+    assert _live_triangles(batch) == 2 * len(batch)
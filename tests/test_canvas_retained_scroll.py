@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Tests for the Canvas retained mode: a scroll moves the layers through the
+scroll Translate instead of re-tessellating the drawn items, a zoom
+re-tessellates everything, and long dashed lines follow the scroll.
+
+Run with: python -m pytest tests/test_canvas_retained_scroll.py
+"""
+import random
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.canvas import Canvas
+
+
+def _filled(canvas: Canvas) -> Canvas:
+    rng = random.Random(1)
+    for _ in range(3000):
+        y = rng.uniform(0, 20000)
+        canvas.add_rectangle(10, y, 20, y + 3, fill=True)
+        canvas.add_line(0, y, 210, y)
+    canvas._redraw_all()
+    return canvas
+
+
+def _instructions(canvas: Canvas, item_ids):
+    return {item_id: list(canvas._items[item_id]['group'].children) for item_id in item_ids}
+
+
+def test_scroll_keeps_retained_items(make_canvas):
+    canvas = _filled(make_canvas())
+    before = _instructions(canvas, canvas._drawn_items)
+
+    canvas._scroll_px += 40.0
+    canvas._redraw_all()
+
+    assert canvas._scroll_translate.y == canvas._scroll_px
+    retained = before.keys() & canvas._drawn_items
+    assert retained
+    assert _instructions(canvas, retained) == {item_id: before[item_id] for item_id in retained}
+
+    # Content-space geometry plus the translate lands where the scrolled mapping puts it
+    x, y = canvas._content_mm_to_px_point(12.0, 100.0)
+    assert (x, y + canvas._scroll_translate.y) == canvas._mm_to_px_point(12.0, 100.0)
+
+
+def test_zoom_retessellates_drawn_items(make_canvas):
+    canvas = _filled(make_canvas())
+    before = _instructions(canvas, canvas._drawn_items)
+
+    canvas.size = (1000, 600)
+    canvas._update_layout_and_redraw()
+
+    retained = before.keys() & canvas._drawn_items
+    assert retained
+    after = _instructions(canvas, retained)
+    assert all(after[item_id] != before[item_id] for item_id in retained)
+
+
+def test_dashed_stave_line_follows_scroll(make_canvas):
+    canvas = _filled(make_canvas())
+    stave = canvas.add_line(50, 0, 50, 20000, dash=True)
+    canvas._redraw_all()
+    assert stave in canvas._scroll_bound_items
+
+    def dash_span():
+        ys = [y for line in canvas._items[stave]['group'].children if hasattr(line, 'points')
+              for y in line.points[1::2]]
+        return min(ys), max(ys)
+
+    for scroll_px in (100.0, 30000.0, 60000.0):
+        canvas._scroll_px = scroll_px
+        canvas._redraw_all()
+        # The visible widget band, in content space, is covered by dashes
+        low, high = dash_span()
+        assert low <= canvas._view_y - scroll_px
+        assert high >= canvas._view_y + canvas._view_h - scroll_px
+
+
+def test_view_change_items_are_drawn_in_the_same_pass(make_canvas):
+    canvas = _filled(make_canvas())
+    views = []
+
+    def on_view_change(_canvas, y_min_mm, y_max_mm):
+        views.append((y_min_mm, y_max_mm))
+        views_item[0] = canvas.add_rectangle(10, y_min_mm + 1, 20, y_min_mm + 2, fill=True)
+
+    views_item = [None]
+    canvas.bind(on_view_change=on_view_change)
+    canvas._scroll_px = 5000.0
+    canvas._redraw_all()
+
+    assert views[-1] == canvas._get_visible_y_range_mm()
+    assert views_item[0] in canvas._drawn_items
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Tests for the Canvas y-bucket index used by viewport culling: range queries
+match a brute-force scan over all items, deletes and clear() keep the index
+in sync, and a scroll only redraws the items near the viewport.
+
+Run with: python -m pytest tests/test_canvas_spatial_index.py
+"""
+import random
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.canvas import Canvas
+
+
+def _fill(canvas: Canvas, count: int, seed: int = 1):
+    rng = random.Random(seed)
+    for _ in range(count):
+        y = rng.uniform(0, 20000)
+        kind = rng.random()
+        if kind < 0.4:
+            canvas.add_rectangle(10, y, 20, y + rng.uniform(0, 5), fill=True)
+        elif kind < 0.8:
+            canvas.add_line(0, y, 210, y + rng.choice([0.0, 0.0, 80.0]))
+        else:
+            canvas.add_polygon([0, y, 5, y + 3, 10, y - 2])
+    # A line spanning the whole score, like the vertical stave lines
+    canvas.add_line(50, 0, 50, 20000, tags=['stave'])
+
+
+def _brute_force(canvas: Canvas, y_min: float, y_max: float):
+    result = set()
+    for item_id, item in canvas._items.items():
+        if item['type'] in ('rectangle', 'oval'):
+            lo, hi = item['y_mm'], item['y_mm'] + item['h_mm']
+        else:
+            ys = item['points_mm'][1::2]
+            lo, hi = min(ys), max(ys)
+        if not (hi < y_min or lo > y_max):
+            result.add(item_id)
+    return result
+
+
+def test_range_queries_match_brute_force(make_canvas):
+    canvas = make_canvas()
+    _fill(canvas, 3000)
+    rng = random.Random(7)
+
+    for step in range(60):
+        if step % 3 == 0:
+            for item_id in rng.sample(sorted(canvas._items), 50):
+                canvas.delete(item_id)
+        y_min = rng.uniform(-100, 20000)
+        y_max = y_min + rng.uniform(0, 400)
+        assert canvas._items_in_y_range(y_min, y_max) == _brute_force(canvas, y_min, y_max)
+
+
+def test_scroll_redraws_only_items_near_viewport(make_canvas):
+    canvas = make_canvas()
+    _fill(canvas, 5000)
+    canvas._redraw_all()
+
+    for scroll_px in (0.0, 5000.0, 40000.0):
+        canvas._scroll_px = scroll_px
+        canvas._redraw_all()
+        expected = _brute_force(canvas, *canvas._cull_y_range_mm())
+        assert canvas._drawn_items == expected
+        assert len(canvas._drawn_items) < len(canvas._items) // 10
+
+
+def test_clear_resets_index(make_canvas):
+    canvas = make_canvas()
+    _fill(canvas, 200)
+    canvas.clear()
+    assert not canvas._items and not canvas._items.groups and not canvas._y_buckets and not canvas._drawn_items
+    assert canvas._items_in_y_range(0, 20000) == set()
+
+
+def _brute_force_hits(canvas: Canvas, x_mm: float, y_mm: float):
+    return [item_id for item_id in reversed(canvas._draw_order) if canvas._hit_test(item_id, (x_mm, y_mm))]
+
+
+def test_hit_candidates_match_full_scan(make_canvas):
+    canvas = make_canvas()
+    _fill(canvas, 2000, seed=3)
+    rng = random.Random(9)
+    for item_id in rng.sample(sorted(canvas._items), 100):
+        canvas.delete(item_id)
+    targets = [canvas._items[i] for i in rng.sample(sorted(canvas._items), 150)]
+
+    for item in targets:
+        # Points on and around existing items, so most queries hit something
+        if 'points_mm' in item:
+            x, y = item['points_mm'][0], item['points_mm'][1]
+        else:
+            x, y = item['x_mm'], item['y_mm']
+        for dx, dy in ((0, 0), (0.4, 0.2), (-0.6, 0.5), (3, -2)):
+            expected = _brute_force_hits(canvas, x + dx, y + dy)
+            actual = [i for i in canvas._hit_candidates(x + dx, y + dy) if canvas._hit_test(i, (x + dx, y + dy))]
+            assert actual == expected
+
+
+def test_point_in_item_queries_match_full_scan(make_canvas):
+    canvas = make_canvas()
+    _fill(canvas, 1000, seed=5)
+    rng = random.Random(4)
+    for _ in range(200):
+        y = rng.uniform(0, 20000)
+        canvas.add_text('12', 1, y, font_size_pt=16, anchor=rng.choice(['top_left', 'bc', 'tc']))
+    px_per_mm = canvas._px_per_mm
+
+    for item_id in rng.sample(sorted(canvas._items), 200):
+        item = canvas._items[item_id]
+        if 'x_mm' not in item:
+            continue
+        x_px, y_px = item['x_mm'] * px_per_mm + 3, item['y_mm'] * px_per_mm - 2
+        expected = [i for i in reversed(canvas._draw_order)
+                    if canvas._point_in_item(x_px, y_px, canvas._items[i])]
+        assert canvas.get_all_items_at_position(x_px, y_px) == expected
+        assert canvas.get_topmost_item_at_position(x_px, y_px) == (expected[0] if expected else None)
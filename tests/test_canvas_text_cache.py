@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Tests for the Canvas text texture cache: scrolling over a long score renders
+each distinct label once, and the LRU keeps the cache inside its byte budget.
+
+Run with: python -m pytest tests/test_canvas_text_cache.py
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.canvas import Canvas, TextTextureCache
+from utils.embedded_font import get_embedded_monospace_font
+
+
+def _scroll_through(canvas: Canvas):
+    content_px = canvas._content_height_px()
+    scroll_px = 0.0
+    while scroll_px < content_px:
+        canvas._scroll_px = scroll_px
+        canvas._redraw_all()
+        scroll_px += canvas._view_h / 2
+
+
+def test_scrolling_renders_each_label_once():
+    Canvas._text_cache = TextTextureCache()
+    canvas = Canvas(width_mm=210.0, height_mm=500 * 40.0)
+    canvas.size = (800, 600)
+    canvas._update_layout_and_redraw()
+
+    # 500 measures: a measure number and a time signature each
+    for measure in range(500):
+        canvas.add_text(str(measure + 1), 1, measure * 40.0, font_size_pt=16)
+        canvas.add_text('4', 190, measure * 40.0, font_size_pt=16, anchor='bc')
+
+    _scroll_through(canvas)
+    first_pass = canvas.get_canvas_stats()['text_cache']
+    assert first_pass['misses'] == 500  # '1'..'500'; the time signature '4' shares measure 4's texture
+
+    _scroll_through(canvas)
+    second_pass = canvas.get_canvas_stats()['text_cache']
+    assert second_pass['misses'] == first_pass['misses']
+    assert second_pass['hits'] > first_pass['hits']
+
+
+def test_lru_stays_within_budget():
+    cache = TextTextureCache(budget_bytes=64 * 1024)
+    font = get_embedded_monospace_font()
+    for i in range(200):
+        cache.get(f'label {i}', font, 20, (0, 0, 0, 1))
+    stats = cache.stats()
+    assert stats['bytes'] <= stats['budget_bytes']
+    assert stats['evictions'] > 0
+    assert stats['entries'] + stats['evictions'] == 200
+
+    # The most recent label is still cached; the oldest one was evicted
+    cache.get('label 199', font, 20, (0, 0, 0, 1))
+    assert cache.hits == 1
+    cache.get('label 0', font, 20, (0, 0, 0, 1))
+    assert cache.misses == 201
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Dirty-region redraw test: after random selection edits (move, transpose, hand
+change, delete), the canvas left by Editor.invalidate_notes must hold the same
+items and detection rectangles as a full redraw_pianoroll.
+
+Run with: python -m pytest tests/test_editor_invalidate.py
+"""
+import random
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from file.SCORE import SCORE
+
+MEASURE = 1024.0
+
+
+def _score(seed: int = 1) -> SCORE:
+    rng = random.Random(seed)
+    score = SCORE()
+    score.baseGrid[0].measureAmount = 16
+    for _ in range(300):
+        score.new_note(time=float(rng.randrange(0, 16 * 16) * 64), duration=rng.choice([64.0, 128.0, 256.0, 1024.0]),
+                       pitch=rng.randint(20, 70), hand=rng.choice('<>'))
+    return score
+
+
+def _state(editor):
+    '''Every canvas item as a comparable signature, plus the detection rectangles.'''
+    canvas = editor.canvas
+    items = []
+    for item_id in canvas.find_all():
+        item = canvas.get_item(item_id)
+        items.append(tuple(sorted(
+            (key, tuple(value) if isinstance(value, list) else value)
+            for key, value in item.items() if key not in ('group', 'layer_group')
+        )))
+    return sorted(items, key=repr), dict(editor.detection_rects)
+
+
+def _random_edit(editor, rng: random.Random) -> None:
+    manager = editor.selection_manager
+    notes = editor.score.stave[0].event.note
+    manager.selected_elements = [
+        {'type': 'note', 'element': note, 'stave_idx': 0} for note in rng.sample(notes, rng.randint(1, 4))
+    ]
+    action = rng.random()
+    if action < 0.2:
+        manager._delete_selected()
+        return
+    if action < 0.5:
+        manager._move_selection_time(rng.choice([-1024.0, -128.0, -64.0, 64.0, 192.0, 1024.0]))
+    elif action < 0.75:
+        manager._transpose_selection(rng.choice([-5, -1, 1, 3]))
+    else:
+        manager._assign_selection_hand(rng.choice('<>'))
+    manager.clear_selection()
+
+
+def test_invalidate_matches_full_redraw(make_editor):
+    rng = random.Random(3)
+    editor = make_editor(_score())
+
+    for _ in range(30):
+        _random_edit(editor, rng)
+        incremental = _state(editor)
+        editor.redraw_pianoroll()
+        assert incremental == _state(editor)
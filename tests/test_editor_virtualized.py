@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Virtualized piano roll test: while a virtualized editor scrolls across its
+window edges, the canvas must hold exactly the notes, grace notes and grid
+measures of the window, drawn like a full (non-virtualized) drawing, and
+nothing that left the window. Editor.full_canvas and export_canvas_to_pdf
+must see the whole score.
+
+Run with: python -m pytest tests/test_editor_virtualized.py
+"""
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from file.SCORE import SCORE
+
+
+def _score(measures: int = 120, seed: int = 1) -> SCORE:
+    rng = random.Random(seed)
+    score = SCORE()
+    score.baseGrid[0].measureAmount = measures
+    for i in range(measures * 4):
+        score.new_note(time=float(i * 256), duration=rng.choice([128.0, 256.0, 1024.0]),
+                       pitch=rng.randint(20, 70), hand=rng.choice('<>'))
+    for i in range(0, measures, 7):
+        score.new_grace_note(time=float(i * 1024), pitch=rng.randint(20, 70))
+    return score
+
+
+def _items_tagged(canvas, tag: str):
+    return sorted(tuple(sorted(canvas.get_tags(item_id))) for item_id in canvas.find_by_tag(tag))
+
+
+def _scroll_to(canvas, fraction: float) -> None:
+    max_scroll = canvas.height_mm * canvas._px_per_mm - canvas._view_h
+    canvas._scroll_px = max(0.0, fraction * max_scroll)
+    canvas._redraw_all()
+
+
+def _assert_canvas_holds_window(editor, reference) -> None:
+    canvas, window = editor.canvas, editor._window
+    start, end = window
+    events = editor.score.stave[0].event
+    for note in events.note:
+        if note.time < end and note.time + note.duration > start:
+            assert _items_tagged(canvas, str(note.id)) == _items_tagged(reference.canvas, str(note.id))
+            assert note.id in editor.detection_rects
+        else:
+            assert canvas.find_by_tag(str(note.id)) == []
+            assert note.id not in editor.detection_rects
+    for gracenote in events.graceNote:
+        assert bool(canvas.find_by_tag(str(gracenote.id))) == (start <= gracenote.time <= end)
+
+    measures = set(editor._grid_measures(window))
+    assert {tag for tag in canvas._tag_index if tag.startswith('grid_measure_')} == measures
+    for measure_tag in measures:
+        assert _items_tagged(canvas, measure_tag) == _items_tagged(reference.canvas, measure_tag)
+
+
+def test_scrolling_moves_the_window(make_editor):
+    editor = make_editor(_score(), virtualized=True)
+    reference = make_editor(_score())
+    assert editor._window is not None and reference._window is None
+    _assert_canvas_holds_window(editor, reference)
+
+    windows = {editor._window}
+    for fraction in [i / 40 for i in range(1, 41)] + [0.5, 0.1, 0.9, 0.0]:
+        _scroll_to(editor.canvas, fraction)
+        y_min, y_max = editor.canvas._get_visible_y_range_mm()
+        assert editor._window[0] <= max(0.0, editor.y_to_time(y_min))
+        assert editor._window[1] >= min(editor.total_time, editor.y_to_time(y_max))
+        _assert_canvas_holds_window(editor, reference)
+        windows.add(editor._window)
+    assert len(windows) > 5
+    assert len(editor.canvas.find_by_tag('midi_note')) < len(reference.canvas.find_by_tag('midi_note'))
+
+
+def test_full_canvas_draws_the_whole_score(make_editor):
+    editor = make_editor(_score(), virtualized=True)
+    window = editor._window
+    with editor.full_canvas():
+        assert editor._window is None
+        assert len(editor.canvas.find_by_tag('midi_note')) == len(editor.score.stave[0].event.note)
+        assert len(editor._grid_measures(None)) == 120
+    assert editor.virtualized and editor._window == window
+
+
+def test_pdf_export_of_virtualized_canvas_is_complete(make_editor, tmp_path, monkeypatch):
+    pytest.importorskip('fitz')
+    import utils.pymupdf_converter as converter
+
+    # PDF export is slow per item; a shorter score still spans several windows
+    editor = make_editor(_score(measures=12), virtualized=True)
+    editor.canvas.set_piano_roll_editor(editor)
+    exported = []
+    export_items = converter._export_canvas_items_to_page
+
+    def counting_export(canvas, page):
+        exported.append(len(canvas.find_by_tag('midi_note')))
+        export_items(canvas, page)
+    monkeypatch.setattr(converter, '_export_canvas_items_to_page', counting_export)
+
+    converter.export_canvas_to_pdf(editor.canvas, str(tmp_path / 'score.pdf'))
+    assert exported == [len(editor.score.stave[0].event.note)]
+    assert len(editor.canvas.find_by_tag('midi_note')) < exported[0]
+    assert editor.virtualized and editor._window is not None
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Equivalence test for the sweep-line continuation dot / stop sign / connect stem pass.
+
+Compares engraver_helpers_new.continuation_dot_stopsign_and_connectstem_processor
+against the original nested-scan implementation (kept below as legacy_processor)
+on the bundled .piano files and on synthetic scores; a 50k-note run checks
+the sweep line stays fast.
+
+Run with: python -m pytest tests/test_engraver_decorations.py
+"""
+import copy
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+
+from engraver.engraver_helpers_new import (
+    EQUALS,
+    FRACTION,
+    GREATER,
+    continuation_dot_stopsign_and_connectstem_processor,
+    note_processor,
+)
+from engraver.layout_event import NOTE_KINDS, EventKind, NoteEvent
+from file.SCORE import SCORE
+
+ROOT = Path(__file__).parent.parent
+PIANO_FILES = sorted(ROOT.glob('*.piano'))
+
+
+def continuation_dot(time: float, pitch: int, note: Dict) -> Dict:
+    """Dict continuation dot, as the legacy processor built it."""
+    return {'time': time, 'pitch': pitch, 'type': 'continuationdot',
+            'staff': note.get('staff', 0), 'hand': note.get('hand', 'r')}
+
+
+def stop_sign(time: float, pitch: int, note: Dict) -> Dict:
+    """Dict stop sign, as the legacy processor built it."""
+    return {'time': time, 'pitch': pitch, 'type': 'notestop',
+            'staff': note.get('staff', 0), 'hand': note.get('hand', 'r')}
+
+
+def legacy_processor(note_events: List[Dict], DOC: List[Dict]) -> List[Dict]:
+    """The original nested-scan implementation, kept as the reference.
+
+    Only change: the forward scans index into note_on_off instead of copying
+    note_on_off[idx + 1:] for every note. The visited events and their order
+    are the same.
+    """
+    # Create note_on_off list like MIDI
+    note_on_off = []
+    for note in sorted(note_events, key=lambda y: y['time']):
+        evt = copy.deepcopy(note)
+        evt['endtime'] = evt['time'] + evt['duration']
+        evt['original_type'] = evt.get('type', 'note')
+        note_on_off.append(copy.deepcopy(evt))
+        
+        # Add noteoff
+        evt_off = copy.deepcopy(evt)
+        evt_off['type'] = 'noteoff'
+        note_on_off.append(evt_off)
+    
+    # Sort by time
+    note_on_off = sorted(
+        note_on_off,
+        key=lambda y: (
+            round(y['time']) if y['type'] != 'noteoff' else round(y['endtime']),
+            round(y['endtime'])
+        )
+    )
+    
+    # Add notestop and continuationdot events
+    active_notes = []
+    for idx, note in enumerate(note_on_off):
+        if note['type'] != 'noteoff':
+            active_notes.append(note)
+            
+            # Continuation dots for note start
+            for n in active_notes:
+                if n.get('id') != note.get('id'):
+                    if (not EQUALS(n['time'], note['time']) and
+                        note.get('staff') == n.get('staff') and
+                        note.get('hand') == n.get('hand')):
+                        DOC.append(continuation_dot(note['time'], n['pitch'], note))
+        
+        elif note['type'] == 'noteoff':
+            # Remove from active notes
+            for n in list(active_notes):
+                if (n.get('duration') == note.get('duration') and
+                    n.get('pitch') == note.get('pitch') and
+                    n.get('staff') == note.get('staff') and
+                    n.get('hand') == note.get('hand')):
+                    active_notes.remove(n)
+                    break
+            
+            # Continuation dots for note end
+            for n in active_notes:
+                if n.get('id') != note.get('id'):
+                    if (not EQUALS(n['endtime'], note['endtime']) and
+                        note.get('staff') == n.get('staff') and
+                        note.get('hand') == n.get('hand')):
+                        DOC.append(continuation_dot(note['endtime'], n['pitch'], note))
+        
+        if note['type'] == 'noteoff':
+            continue
+        
+        # Stop sign
+        stop_flag = False
+        for n in (note_on_off[j] for j in range(idx + 1, len(note_on_off))):
+            if (n['type'] != 'noteoff' and
+                EQUALS(n['time'], note['time'] + note['duration']) and
+                n.get('staff') == note.get('staff') and
+                n.get('hand') == note.get('hand')):
+                break
+            if (n['type'] != 'noteoff' and
+                GREATER(n['time'], note['time'] + note['duration']) and
+                n.get('staff') == note.get('staff') and
+                n.get('hand') == note.get('hand')):
+                stop_flag = True
+                break
+            if n == note_on_off[-1]:
+                stop_flag = True
+        
+        if stop_flag:
+            DOC.append(stop_sign(note['time'] + note['duration'] - FRACTION, note['pitch'], note))
+        
+        # Connect stem
+        for n in (note_on_off[j] for j in range(idx + 1, len(note_on_off))):
+            if (EQUALS(n['time'], note['time']) and
+                n.get('staff') == note.get('staff') and
+                n.get('hand') == note.get('hand')):
+                DOC.append({
+                    'type': 'connectstem',
+                    'time': note['time'],
+                    'pitch': note['pitch'],
+                    'time2': note['time'],
+                    'pitch2': n['pitch'],
+                    'staff': note.get('staff', 0)
+                })
+            if n['time'] > note['time']:
+                break
+    
+    return DOC
+
+
+def _barline_times(score: SCORE) -> List[float]:
+    """Barline ticks, as generated by Engraver._generate_structural_events."""
+    barline_times = []
+    time_ticks = 0.0
+    quarter_note_ticks = score.fileSettings.quarterNoteUnit
+    for grid in score.baseGrid:
+        measure_ticks = (grid.numerator / grid.denominator) * 4.0 * quarter_note_ticks
+        for measure_num in range(grid.measureAmount):
+            barline_times.append(time_ticks + (measure_num * measure_ticks))
+        time_ticks += grid.measureAmount * measure_ticks
+    return barline_times
+
+
+def _note_events(score: SCORE) -> List[NoteEvent]:
+    """Note/notesplit events, as built by Engraver._process_notes."""
+    barline_times = _barline_times(score)
+    events = []
+    for stave_idx, stave in enumerate(score.stave):
+        for note_obj in stave.event.note:
+            note_event = NoteEvent(EventKind.NOTE, note_obj.time, note_obj.duration, note_obj.pitch,
+                                   stave_idx, note_obj.hand, note_obj.color, note_obj.id)
+            events.extend(note_processor(note_event, barline_times))
+    return [e for e in events if e.kind in NOTE_KINDS]
+
+
+def _records(notes: List[Dict]) -> List[NoteEvent]:
+    return [NoteEvent(EventKind[n['type'].upper()], n['time'], n['duration'], n['pitch'],
+                      n['staff'], n['hand'], n.get('color', '#000000'), n['id'])
+            for n in notes]
+
+
+def _synthetic_score(note_count: int, seed: int = 7) -> SCORE:
+    """Dense two-stave score with chords, ties, overlaps and barline-crossing notes."""
+    rng = random.Random(seed)
+    score = SCORE()
+    score.new_stave()
+    score.baseGrid[0].measureAmount = note_count // 8 + 8
+    durations = [32.0, 64.0, 128.0, 256.0, 512.0, 1024.0, 96.0, 0.5]
+    cursor = 0.0
+    for _ in range(note_count):
+        # Both hands move forward together; sometimes a chord, a near-chord or an overlap
+        roll = rng.random()
+        if roll < 0.3:
+            start = cursor
+        elif roll < 0.4:
+            start = cursor + rng.choice([0.05, 0.5, -64.0])
+        else:
+            cursor += rng.choice([32.0, 64.0, 128.0])
+            start = cursor
+        score.new_note(stave_idx=rng.randrange(2), time=max(0.0, start),
+                       duration=rng.choice(durations), pitch=rng.randint(1, 88),
+                       hand=rng.choice('<>'))
+    return score
+
+
+def _assert_equivalent(note_events: List[NoteEvent]) -> None:
+    before = copy.deepcopy(note_events)
+    expected = legacy_processor([e.to_dict() for e in note_events], [])
+    actual = continuation_dot_stopsign_and_connectstem_processor(note_events, [])
+    assert [e.to_dict() for e in actual] == expected
+    # The sweep-line version must not modify its input
+    assert note_events == before
+
+
+@pytest.mark.parametrize('path', PIANO_FILES, ids=lambda p: p.name)
+def test_bundled_files_match_legacy(path):
+    score = SCORE.load(str(path))
+    _assert_equivalent(_note_events(score))
+
+
+def test_edge_cases_match_legacy():
+    notes = [
+        # Identical twins (same pitch/duration/time) and a twin with another id
+        {'time': 0.0, 'duration': 256.0, 'pitch': 40, 'staff': 0, 'hand': '>', 'id': 1, 'type': 'note'},
+        {'time': 0.0, 'duration': 256.0, 'pitch': 40, 'staff': 0, 'hand': '>', 'id': 1, 'type': 'note'},
+        {'time': 0.0, 'duration': 256.0, 'pitch': 40, 'staff': 0, 'hand': '>', 'id': 2, 'type': 'note'},
+        # Starts within the EQUALS threshold, exactly on the GREATER threshold and just after
+        {'time': 256.05, 'duration': 10.0, 'pitch': 41, 'staff': 0, 'hand': '>', 'id': 3, 'type': 'note'},
+        {'time': 266.15, 'duration': 0.4, 'pitch': 42, 'staff': 0, 'hand': '>', 'id': 4, 'type': 'note'},
+        {'time': 266.6, 'duration': 0.0, 'pitch': 43, 'staff': 0, 'hand': '>', 'id': 5, 'type': 'note'},
+        # Other hand and other staff at the same times
+        {'time': 0.0, 'duration': 512.0, 'pitch': 20, 'staff': 0, 'hand': '<', 'id': 6, 'type': 'note'},
+        {'time': 256.0, 'duration': 256.0, 'pitch': 20, 'staff': 1, 'hand': '>', 'id': 7, 'type': 'notesplit'},
+        {'time': 255.6, 'duration': 0.8, 'pitch': 21, 'staff': 1, 'hand': '>', 'id': 8, 'type': 'note'},
+    ]
+    _assert_equivalent(_records(notes))
+    _assert_equivalent([])
+    _assert_equivalent(_records(notes[:1]))
+
+
+def test_synthetic_score_matches_legacy():
+    score = _synthetic_score(5000)
+    _assert_equivalent(_note_events(score))
+
+
+def test_synthetic_50k_score_is_subquadratic():
+    score = _synthetic_score(50000)
+    note_events = _note_events(score)
+    assert len(note_events) >= 50000
+
+    # The legacy scans take minutes on this input; the sweep line needs ~1s
+    start = time.perf_counter()
+    continuation_dot_stopsign_and_connectstem_processor(note_events, [])
+    assert time.perf_counter() - start < 30.0
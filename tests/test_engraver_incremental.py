@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Incremental engraving test: after random edits, re-laying out only the lines
+in the dirty range must give the same LayoutData.DOC as a full layout, and
+changed_pages must cover every page that differs.
+
+Run with: python -m pytest tests/test_engraver_incremental.py
+"""
+import random
+import sys
+import threading
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from engraver.engraver import Engraver, EngraveTask
+from engraver.snapshot import take_snapshot
+from file.SCORE import SCORE
+
+CANVAS = object()
+MEASURE = 1024.0
+
+
+def _engraver() -> Engraver:
+    # Layout methods only; no worker thread needed
+    engraver = Engraver.__new__(Engraver)
+    engraver._layout_cache = {}
+    engraver._stale_canvases = set()
+    engraver._stale_canvases_lock = threading.Lock()
+    return engraver
+
+
+def _score(seed: int = 1) -> SCORE:
+    rng = random.Random(seed)
+    score = SCORE()
+    score.new_stave()
+    score.baseGrid[0].measureAmount = 64
+    for measure in range(4, 64, 4):
+        score.new_linebreak(time=measure * MEASURE)
+    for _ in range(600):
+        score.new_note(stave_idx=rng.randrange(2), time=float(rng.randrange(0, 64 * 8) * 128),
+                       duration=rng.choice([64.0, 128.0, 256.0, 1024.0, 3000.0]),
+                       pitch=rng.randint(1, 88), hand=rng.choice('<>'))
+    score.new_text(time=512.0)
+    return score
+
+
+def _layout(engraver: Engraver, score: SCORE, **changes):
+    task = EngraveTask(take_snapshot(score), CANVAS, task_id=0, **changes)
+    return engraver._calculate_layout_for_task(task)
+
+
+def _random_edit(score: SCORE, rng: random.Random):
+    '''Apply one edit and return (dirty_range, changed_ids).'''
+    notes = score.stave[rng.randrange(2)].event.note
+    action = rng.random()
+    if action < 0.3 and notes:
+        note = rng.choice(notes)
+        extent = (note.time, note.time + note.duration)
+        score.delete_by_id(note.id)
+        return extent, None
+    if action < 0.6:
+        note = score.new_note(stave_idx=rng.randrange(2), time=float(rng.randrange(0, 64 * 8) * 128),
+                              duration=rng.choice([128.0, 2048.0]), pitch=rng.randint(1, 88))
+        return None, {note.id}
+    note = rng.choice(notes)
+    old = (note.time, note.time + note.duration)
+    note.time = float(rng.randrange(0, 64 * 8) * 128)
+    note.duration = rng.choice([64.0, 512.0, 5000.0])
+    note.hand = rng.choice('<>')
+    return (min(old[0], note.time), max(old[1], note.time + note.duration)), None
+
+
+def test_incremental_layout_matches_full_layout():
+    rng = random.Random(4)
+    score = _score()
+    incremental = _engraver()
+    _layout(incremental, score)
+
+    for _ in range(40):
+        dirty_range, changed_ids = _random_edit(score, rng)
+        previous = incremental._layout_cache[id(CANVAS)].layout_data
+        actual = _layout(incremental, score, dirty_range=dirty_range, changed_ids=changed_ids)
+        expected = _engraver()._calculate_layout(take_snapshot(score))
+
+        assert actual.changed_pages is not None
+        assert actual.DOC == expected.DOC
+        for page_idx in range(max(len(actual.DOC), len(previous.DOC))):
+            if page_idx not in actual.changed_pages:
+                assert actual.DOC[page_idx] == previous.DOC[page_idx]
+
+
+def test_structure_change_falls_back_to_full_layout():
+    score = _score()
+    engraver = _engraver()
+    _layout(engraver, score)
+
+    score.new_linebreak(time=2 * MEASURE)
+    layout = _layout(engraver, score, dirty_range=(0.0, 1.0))
+    assert layout.changed_pages is None
+    assert layout.DOC == _engraver()._calculate_layout(take_snapshot(score)).DOC
+
+
+def test_edit_outside_any_event_reports_no_changed_pages():
+    score = _score()
+    engraver = _engraver()
+    _layout(engraver, score)
+    assert _layout(engraver, score, changed_ids={10 ** 9}).changed_pages == []
+
+
+def test_skipped_tasks_merge_their_changes():
+    snapshot = take_snapshot(_score())
+    newer = EngraveTask(snapshot, CANVAS, dirty_range=(100.0, 200.0))
+    newer.absorb(EngraveTask(snapshot, CANVAS, dirty_range=(0.0, 50.0), changed_ids=frozenset({3})))
+    assert newer.dirty_range == (0.0, 200.0)
+    assert newer.changed_ids == frozenset({3})
+
+    newer.absorb(EngraveTask(snapshot, CANVAS))
+    assert not newer.has_changes()
+
+
+def test_task_for_another_canvas_marks_the_skipped_canvas_stale():
+    score = _score()
+    engraver = _engraver()
+    _layout(engraver, score)
+    cache = engraver._layout_cache[id(CANVAS)]
+
+    # Another thread supersedes a queued CANVAS task: the worker's cache is left alone
+    snapshot = take_snapshot(score)
+    engraver._supersede_task(EngraveTask(snapshot, CANVAS, dirty_range=(0.0, 1.0)), EngraveTask(snapshot, object()))
+    assert engraver._layout_cache[id(CANVAS)] is cache
+    assert engraver._stale_canvases == {id(CANVAS)}
+
+    # The next CANVAS task on the worker drops the cache and lays out in full
+    layout = _layout(engraver, score, dirty_range=(0.0, 1.0))
+    assert layout.changed_pages is None
+    assert not engraver._stale_canvases
+    assert _layout(engraver, score, dirty_range=(0.0, 1.0)).changed_pages is not None
+
+
+def test_snapshot_holds_only_immutable_values():
+    score = _score()
+    beam = score.new_beam(time=256.0)
+    snapshot = take_snapshot(score)
+    for stave in snapshot.staves:
+        for value in vars(stave).values():
+            assert isinstance(value, tuple)
+            assert all(isinstance(x, (int, float, str)) for x in value)
+
+    # Edits made by the UI after the snapshot do not reach it
+    beam.time = 9999.0
+    score.stave[0].event.note[0].time = 9999.0
+    assert snapshot.staves[0].events('beam') == ((256.0,), (beam.id,))
+    assert 9999.0 not in snapshot.staves[0].note_time
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Equivalence test for the shared key position table (KEY_UNIT_OFFSETS).
+
+Compares Editor.pitch_to_x / x_to_pitch and the engraver's pitch2x_view and
+calculate_staff_width against the original per-call loops (kept below as
+legacy_*).
+
+Run with: python -m pytest tests/test_key_layout.py
+"""
+import random
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+
+from editor.editor import Editor
+from engraver.engraver_helpers_new import (
+    PITCH_UNIT,
+    calculate_staff_width,
+    pitch2x_view,
+    trim_key_to_outer_sides_staff,
+)
+from utils.CONSTANTS import BE_GAPS, PIANO_KEY_COUNT
+
+
+def legacy_x_positions(editor_margin: float, semitone_width: float):
+    x_pos = editor_margin - semitone_width
+    x_positions = [x_pos]
+    for n in range(1, PIANO_KEY_COUNT + 1):
+        if n in BE_GAPS:
+            x_pos += semitone_width
+        x_pos += semitone_width
+        x_positions.append(x_pos)
+    return x_positions
+
+
+def legacy_x_to_pitch(editor_margin: float, semitone_width: float, x_mm: float) -> int:
+    x_positions = legacy_x_positions(editor_margin, semitone_width)
+    closest_x = min(x_positions, key=lambda y: abs(y - x_mm))
+    return x_positions.index(closest_x) + 1
+
+
+def legacy_pitch2x_view(pitch, staff_range, scale, x_cursor):
+    key_min, key_max = trim_key_to_outer_sides_staff(*staff_range)
+    x = x_cursor
+    for n in range(1, key_min):
+        remainder = ((n - 1) % 12) + 1
+        x -= PITCH_UNIT * 2 * scale if remainder in [4, 9] else PITCH_UNIT * 2 * scale / 2
+    for n in range(1, 88):
+        remainder = ((n - 1) % 12) + 1
+        x += PITCH_UNIT * 2 * scale if remainder in [4, 9] and n != key_min else PITCH_UNIT * 2 * scale / 2
+        if n == pitch:
+            break
+    return x
+
+
+def legacy_calculate_staff_width(key_min, key_max, draw_scale=1.0):
+    if key_min == 0 and key_max == 0:
+        return 0.0
+    key_min, key_max = trim_key_to_outer_sides_staff(key_min, key_max)
+    width = 0.0
+    for n in range(key_min - 1, key_max + 1):
+        width += PITCH_UNIT * 2 if ((n - 1) % 12) + 1 in [4, 9] and n != key_min else PITCH_UNIT
+    return width * draw_scale
+
+
+class _Layout:
+    '''Just the editor state the key conversions use.'''
+    _key_x_table = Editor._key_x_table
+    pitch_to_x = Editor.pitch_to_x
+    x_to_pitch = Editor.x_to_pitch
+
+    def __init__(self, editor_margin: float, semitone_width: float):
+        self.editor_margin = editor_margin
+        self.semitone_width = semitone_width
+        self._key_x = []
+        self._key_x_layout = None
+
+
+@pytest.mark.parametrize('editor_margin, semitone_width', [(35.0, 1.5), (20.0, 2.25), (0.0, 1.0)])
+def test_editor_key_positions_match_legacy(editor_margin, semitone_width):
+    layout = _Layout(editor_margin, semitone_width)
+    x_positions = legacy_x_positions(editor_margin, semitone_width)
+    for key in range(-1, PIANO_KEY_COUNT + 3):
+        expected = x_positions[key - 1] if 1 <= key <= PIANO_KEY_COUNT else editor_margin
+        assert layout.pitch_to_x(key) == pytest.approx(expected)
+
+    rng = random.Random(3)
+    samples = [rng.uniform(-20, x_positions[-1] + 20) for _ in range(2000)]
+    # Exact key positions and midpoints between neighbours (ties go to the lower key)
+    samples += x_positions + [(a + b) / 2 for a, b in zip(x_positions, x_positions[1:])]
+    for x_mm in samples:
+        assert layout.x_to_pitch(x_mm) == legacy_x_to_pitch(editor_margin, semitone_width, x_mm)
+
+
+def test_editor_key_table_follows_layout_changes():
+    layout = _Layout(35.0, 1.5)
+    before = layout.pitch_to_x(40)
+    layout.semitone_width = 2.0
+    assert layout.pitch_to_x(40) != before
+    assert layout.pitch_to_x(40) == pytest.approx(legacy_x_positions(35.0, 2.0)[39])
+
+
+def test_pitch2x_view_matches_legacy():
+    ranges = [(0, 0), (1, 88), (40, 44), (21, 60), (30, 80), (4, 9), (16, 16)]
+    for staff_range in ranges:
+        for scale in (1.0, 0.35):
+            for pitch in range(-1, 91):
+                assert pitch2x_view(pitch, staff_range, scale, 12.5) == pytest.approx(
+                    legacy_pitch2x_view(pitch, staff_range, scale, 12.5))
+
+
+def test_calculate_staff_width_matches_legacy():
+    for key_min in range(0, 89):
+        for key_max in range(key_min, 89, 3):
+            for scale in (1.0, 0.35):
+                assert calculate_staff_width(key_min, key_max, scale) == pytest.approx(
+                    legacy_calculate_staff_width(key_min, key_max, scale))
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Tests for file/noteIndex.NoteIndex: add/remove/update and the neighbourhood
+queries, checked against brute-force scans using the same threshold rules.
+
+Run with: python -m pytest tests/test_note_index.py
+"""
+import copy
+import random
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from file.SCORE import SCORE
+from file.noteIndex import NoteIndex, _ascending
+from utils.CONSTANTS import OPERATOR_TRESHOLD as T
+
+
+def _brute_overlapping(notes, start, end, hand, exclude_id=None):
+    return sorted(
+        (n for n in notes
+         if n.hand == hand and n.id != exclude_id
+         and n.time < end - T and (n.time + n.duration) - start > T),
+        key=lambda n: (n.time, n.id),
+    )
+
+
+def _ids(notes):
+    return sorted(n.id for n in notes)
+
+
+def _random_score(count=400, seed=3):
+    rng = random.Random(seed)
+    score = SCORE()
+    for _ in range(count):
+        score.new_note(
+            time=float(rng.randrange(0, 64) * 128),
+            duration=float(rng.choice([64, 128, 256, 1024])),
+            pitch=rng.randrange(20, 70),
+            hand=rng.choice(['<', '>']),
+        )
+    # One very long note per hand, like a held bass
+    score.new_note(time=0.0, duration=64 * 128.0, pitch=20, hand='<')
+    score.new_note(time=0.0, duration=64 * 128.0, pitch=80, hand='>')
+    return score
+
+
+def test_queries_match_brute_force():
+    score = _random_score()
+    notes = score.stave[0].event.note
+    index = score.note_index(0)
+    assert len(index) == len(notes)
+
+    rng = random.Random(11)
+    for _ in range(200):
+        start = rng.uniform(-100, 64 * 128 + 100)
+        end = start + rng.uniform(0, 2000)
+        for hand in ('<', '>'):
+            assert _ids(index.overlapping(start, end, hand=hand)) == _ids(_brute_overlapping(notes, start, end, hand))
+            assert _ids(index.starting_between(start, end, hand=hand)) == _ids(
+                n for n in notes if n.hand == hand and start <= n.time <= end)
+            assert _ids(index.ending_between(start, end, hand=hand)) == _ids(
+                n for n in notes if n.hand == hand and start < n.time + n.duration <= end)
+        assert _ids(index.starting_at(float(int(start) // 128 * 128))) == _ids(
+            n for n in notes if abs(n.time - int(start) // 128 * 128) <= T)
+
+
+def test_next_and_previous_in_hand():
+    score = SCORE()
+    a = score.new_note(time=0.0, duration=256.0, hand='>')
+    b = score.new_note(time=256.0, duration=256.0, hand='>')
+    c = score.new_note(time=256.0, duration=256.0, hand='<')
+    index = score.note_index(0)
+
+    assert index.next_in_hand('>', 256.0) is b
+    assert index.next_in_hand('>', 256.0, exclude_id=b.id) is None
+    assert index.next_in_hand('<', 0.0) is c
+    assert index.previous_in_hand('>', 256.0) is a
+    assert index.previous_in_hand('>', 0.0) is None
+
+
+def test_add_remove_update_keep_index_sorted():
+    score = _random_score(100)
+    index = score.note_index(0)
+    notes = score.stave[0].event.note
+    rng = random.Random(5)
+
+    for _ in range(300):
+        action = rng.random()
+        if action < 0.3:
+            score.new_note(time=float(rng.randrange(0, 64) * 128), duration=float(rng.choice([128, 4096])),
+                           hand=rng.choice(['<', '>']))
+        elif action < 0.5 and notes:
+            assert score.delete_by_id(rng.choice(notes).id)
+        elif notes:
+            # Note.__setattr__ re-sorts the note in the index
+            note = rng.choice(notes)
+            note.time = float(rng.randrange(0, 64) * 128)
+            note.duration = float(rng.choice([64, 512, 8192]))
+            note.hand = rng.choice(['<', '>'])
+
+    assert len(index) == len(notes)
+    for hand in ('<', '>'):
+        assert [n.time for n in index.notes(hand)] == sorted(n.time for n in notes if n.hand == hand)
+        for start in range(0, 64 * 128, 500):
+            assert _ids(index.overlapping(start, start + 300, hand=hand)) == _ids(
+                _brute_overlapping(notes, start, start + 300, hand))
+
+
+def _check_treap(node):
+    '''Heap order on priority and the max-end augmentation of every subtree; returns its size.'''
+    if node is None:
+        return 0
+    ends = [node.end]
+    for child in (node.left, node.right):
+        if child is not None:
+            assert child.priority <= node.priority
+            ends.append(child.max_end)
+    assert node.max_end == max(ends)
+    return 1 + _check_treap(node.left) + _check_treap(node.right)
+
+
+def test_edits_keep_treaps_consistent():
+    score = _random_score(300)
+    index = score.note_index(0)
+    notes = score.stave[0].event.note
+    rng = random.Random(7)
+    for _ in range(500):
+        note = rng.choice(notes)
+        note.time = float(rng.randrange(0, 64) * 128)
+        note.duration = float(rng.choice([64, 512, 8192]))
+
+    for hand, table in index._hands.items():
+        hand_notes = [n for n in notes if n.hand == hand]
+        assert _check_treap(table.by_start) == _check_treap(table.by_end) == table.size == len(hand_notes)
+        keys = [node.key for node in _ascending(table.by_start)]
+        assert keys == sorted(keys)
+        assert [node.key[0] for node in _ascending(table.by_end)] == sorted(n.time + n.duration for n in hand_notes)
+
+
+def test_note_hook_is_idle_without_an_index(monkeypatch):
+    calls = []
+    monkeypatch.setattr(SCORE, '_on_note_changed', lambda self, note: calls.append(note))
+    score = SCORE.load(str(Path(__file__).parent.parent / 'lonely_christmass.piano'))
+    note = score.stave[0].event.note[0]
+    note.time += 128.0
+    assert calls == []
+
+    score.note_index(0)
+    note.time += 128.0
+    note.pitch += 1
+    assert calls == [note]
+
+
+def test_unknown_hand_is_kept_under_its_own_key():
+    index = NoteIndex()
+    score = SCORE()
+    note = score.new_note(time=0.0, duration=256.0, hand='>')
+    note.hand = '?'
+    index.build([note])
+
+    assert index.overlapping(0.0, 128.0, hand='?') == [note]
+    assert index.overlapping(0.0, 128.0, hand='>') == []
+    assert index.notes() == [note]
+
+
+def test_deepcopied_score_rebuilds_its_own_index():
+    score = _random_score(50)
+    score.note_index(0)
+
+    clone = copy.deepcopy(score)
+    assert clone._note_indexes == {}
+    cloned_index = clone.note_index(0)
+    assert len(cloned_index) == len(clone.stave[0].event.note)
+    assert all(n in cloned_index for n in clone.stave[0].event.note)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Equivalence test for the bisect note_processor and note_processor_batch.
+
+Both are compared against the original full barline scan (kept below as
+legacy_note_processor), the batch variant with and without NumPy.
+
+Run with: python -m pytest tests/test_note_processor.py
+"""
+import random
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+
+import engraver.engraver_helpers_new as helpers
+from engraver.engraver_helpers_new import continuation_dot, note_processor, note_processor_batch, _note_piece
+from engraver.layout_event import EventKind, NoteEvent
+
+
+def legacy_note_processor(note, barline_times):
+    output = []
+    note_start = note.time
+    note_end = note.time + note.duration
+    bl_times = []
+    for bl in barline_times:
+        if note_start < bl < note_end:
+            bl_times.append(bl)
+            output.append(continuation_dot(bl, note.pitch, note))
+    if not bl_times:
+        output.append(note if note.kind == EventKind.NOTE else
+                      _note_piece(note, EventKind.NOTE, note.time, note.duration))
+        return output
+    first = True
+    for bl in bl_times:
+        output.append(_note_piece(note, EventKind.NOTE if first else EventKind.NOTESPLIT,
+                                  note_start, bl - note_start))
+        note_start = bl
+        first = False
+    output.append(_note_piece(note, EventKind.NOTESPLIT, note_start, note_end - note_start))
+    return output
+
+
+def _notes_and_barlines(seed: int = 5):
+    rng = random.Random(seed)
+    barline_times = [i * 1024.0 for i in range(60)]
+    notes = []
+    for note_id in range(2000):
+        # Starts and ends on barlines, inside measures and past the last barline
+        time = rng.choice([rng.uniform(0, 62000), float(rng.randrange(60) * 1024), float(rng.randrange(0, 62000, 256))])
+        duration = rng.choice([rng.uniform(1, 5000), 1024.0, 256.0, 0.0])
+        kind = EventKind.NOTE if note_id % 7 else EventKind.NOTESPLIT
+        notes.append(NoteEvent(kind, time, duration, rng.randint(1, 88), 0, rng.choice('<>'), '#000000', note_id))
+    return notes, barline_times
+
+
+def _expected(notes, barline_times):
+    return [event for note in notes for event in legacy_note_processor(note, barline_times)]
+
+
+def test_note_processor_matches_legacy():
+    notes, barline_times = _notes_and_barlines()
+    assert [event for note in notes for event in note_processor(note, barline_times)] == _expected(notes, barline_times)
+
+
+@pytest.mark.parametrize('use_numpy', [True, False])
+def test_note_processor_batch_matches_legacy(monkeypatch, use_numpy):
+    if use_numpy:
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setattr(helpers, 'np', None)
+    notes, barline_times = _notes_and_barlines()
+    assert note_processor_batch(notes, barline_times) == _expected(notes, barline_times)
+    assert note_processor_batch(notes, []) == _expected(notes, [])
+    assert note_processor_batch([], barline_times) == []
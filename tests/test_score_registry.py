@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Tests for the SCORE id registry: new_* -> lookup_id -> delete_by_id,
+renumber_id and remove_stave (stave indices are remapped).
+
+Run with: python -m pytest tests/test_score_registry.py
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from file.SCORE import SCORE
+from file.note import Note
+
+
+def _score_with_two_staves():
+    score = SCORE()
+    score.new_stave()
+    a = score.new_note(stave_idx=0, time=0.0, duration=256.0, pitch=40)
+    b = score.new_note(stave_idx=1, time=256.0, duration=256.0, pitch=41)
+    text = score.new_text(stave_idx=1, time=0.0)
+    return score, a, b, text
+
+
+def test_new_lookup_delete():
+    score, a, b, text = _score_with_two_staves()
+
+    assert score.lookup_id(a.id) == (0, 'note', a)
+    assert score.lookup_id(b.id) == (1, 'note', b)
+    assert score.lookup_id(text.id) == (1, 'text', text)
+    assert score.find_by_id(b.id) is b
+    assert score.lookup_id(10 ** 9) is None
+
+    assert score.delete_by_id(a.id)
+    assert a not in score.stave[0].event.note
+    assert score.lookup_id(a.id) is None
+    assert not score.delete_by_id(a.id)
+
+
+def test_renumber_id():
+    score, a, b, text = _score_with_two_staves()
+    a.id, b.id, text.id = 500, 600, 700
+    score.renumber_id()
+
+    for event in (a, b, text):
+        assert score.find_by_id(event.id) is event
+    assert score.lookup_id(500) is None
+
+
+def test_id_edited_in_place_is_found_under_new_id():
+    score, a, b, text = _score_with_two_staves()
+    old_id = a.id
+    a.id = 9999
+
+    # The stale entry triggers a re-registration under the current ids
+    assert score.lookup_id(old_id) is None
+    assert score.lookup_id(9999) == (0, 'note', a)
+    assert score.delete_by_id(9999)
+    assert a not in score.stave[0].event.note
+
+
+def test_id_edited_in_place_is_found_after_rebuild():
+    score, a, b, text = _score_with_two_staves()
+    old_id = a.id
+    text.id = 8888
+    a.id = 9999
+
+    # Editors of ids in place (renumber_id, the property tree) rebuild the registry
+    score.rebuild_id_registry()
+    assert score.lookup_id(9999) == (0, 'note', a)
+    assert score.find_by_id(8888) is text
+    assert score.lookup_id(old_id) is None
+
+
+def test_miss_keeps_registry_and_note_indexes():
+    score, a, b, text = _score_with_two_staves()
+    index = score.note_index(0)
+    registry = score._id_registry
+
+    assert score.lookup_id(10 ** 9) is None
+    assert not score.delete_by_id(10 ** 9)
+    assert score._id_registry is registry
+    assert score.note_index(0) is index
+
+    # A rebuild only drops the indexes of staves whose notes changed
+    score.rebuild_id_registry()
+    assert score.note_index(0) is index
+    score.stave[0].event.note.append(Note(time=512.0))
+    score.rebuild_id_registry()
+    assert score.note_index(0) is not index and len(score.note_index(0)) == 2
+
+
+def test_delete_finds_event_by_identity():
+    score = SCORE()
+    same = [score.new_note(time=256.0, pitch=40) for _ in range(3)]
+    first = score.new_note(time=0.0, pitch=40)
+    notes = score.stave[0].event.note
+
+    # Sorted list: found in the run of equal times
+    notes.sort(key=lambda n: n.time)
+    assert score.delete_by_id(same[1].id)
+    assert notes == [first, same[0], same[2]] and notes[1] is same[0]
+
+    # Unsorted list: the bisect misses and the identity scan finds it
+    notes.reverse()
+    assert score.delete_by_id(first.id)
+    assert [n.id for n in notes] == [same[2].id, same[0].id]
+
+
+def test_remove_stave_remaps_indices():
+    score, a, b, text = _score_with_two_staves()
+    assert score.remove_stave(0)
+
+    assert score.lookup_id(a.id) is None
+    assert score.lookup_id(b.id) == (0, 'note', b)
+    assert score.lookup_id(text.id) == (0, 'text', text)
+    assert score.delete_by_id(b.id)
+    assert score.stave[0].event.note == []
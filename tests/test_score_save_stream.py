@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming JSON writer behind SCORE.save (write_score_json in
+file/score_codec.py): the output must be byte-identical to json.dump of
+score_to_dict, and a failed save must leave the previous file untouched.
+
+Run with: python -m pytest tests/test_score_save_stream.py
+"""
+import io
+import json
+import os
+import stat
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from file.SCORE import SCORE
+from file.score_codec import score_to_dict, write_score_json
+
+ROOT = Path(__file__).parent.parent
+SAMPLES = sorted(ROOT.glob('*.piano'))
+
+
+def _dumped(score: SCORE) -> str:
+    return json.dumps(score_to_dict(score), ensure_ascii=True, separators=(',', ':'))
+
+
+def _streamed(score: SCORE) -> str:
+    f = io.StringIO()
+    write_score_json(score, f)
+    return f.getvalue()
+
+
+def test_samples_match_json_dump():
+    for path in SAMPLES:
+        score = SCORE.load(str(path))
+        assert _streamed(score) == _dumped(score)
+
+
+def test_odd_values_match_json_dump():
+    score = SCORE.load(str(SAMPLES[0]))
+    notes = score.stave[0].event.note
+    notes[0].time = float('nan')
+    notes[1].duration = float('inf')
+    notes[2].time = -float('inf')
+    notes[3].time = 5  # int in a float field
+    notes[4].color = 'é "quoted" \\ \n ♪ 𝄞'
+    notes[5].time = -0.0
+    notes[6].time = 1e-300
+    score.header.title = None
+    score.metaInfo.__dict__['extra'] = 'not a field'
+    score.stave[0].event.note = notes[:7]
+    score.stave[0].event.text = []
+    score.lineBreak = []
+    assert _streamed(score) == _dumped(score)
+    assert 'NaN' in _streamed(score)
+
+
+def test_save_writes_stream(tmp_path):
+    score = SCORE.load(str(SAMPLES[0]))
+    path = tmp_path / 'score.piano'
+    score.save(str(path))
+    assert path.read_text(encoding='utf-8') == _dumped(score)
+    assert sorted(os.listdir(tmp_path)) == ['score.piano']
+
+
+def _fail(*args, **kwargs):
+    raise RuntimeError('writer failed')
+
+
+def test_save_falls_back_to_codec_dict_then_to_dict(tmp_path, monkeypatch):
+    score = SCORE.load(str(SAMPLES[0]))
+    path = tmp_path / 'score.piano'
+    monkeypatch.setattr('file.SCORE.write_score_json', _fail)
+    score.save(str(path))
+    assert path.read_text(encoding='utf-8') == _dumped(score)
+
+    monkeypatch.setattr('file.SCORE.score_to_dict', _fail)
+    score.save(str(path))
+    expected = json.dumps(score.to_dict(), ensure_ascii=True, separators=(',', ':'))
+    assert path.read_text(encoding='utf-8') == expected
+    assert os.listdir(tmp_path) == ['score.piano']
+
+
+def test_failed_save_keeps_previous_file(tmp_path, monkeypatch):
+    path = tmp_path / 'score.piano'
+    path.write_text('previous', encoding='utf-8')
+
+    def failing_fsync(fd):
+        raise OSError('disk full')
+    monkeypatch.setattr(os, 'fsync', failing_fsync)
+    with pytest.raises(OSError):
+        SCORE.load(str(SAMPLES[0])).save(str(path))
+    assert path.read_text(encoding='utf-8') == 'previous'
+    assert os.listdir(tmp_path) == ['score.piano']
+
+
+def test_save_keeps_file_mode(tmp_path):
+    path = tmp_path / 'score.piano'
+    path.write_text('{}', encoding='utf-8')
+    os.chmod(path, 0o640)
+    SCORE.load(str(SAMPLES[0])).save(str(path))
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o640
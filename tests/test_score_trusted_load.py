@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Tests for the schema fingerprint stamped by SCORE.save: files written with the
+current data model load without full_score_validation, anything else (or a
+trusted file that fails to decode) goes through it.
+
+Run with: python -m pytest tests/test_score_trusted_load.py
+"""
+import json
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import file.SCORE as score_module
+import file.validation as validation
+from file.SCORE import SCORE
+from file.score_codec import _fingerprint, schema_fingerprint
+
+SAMPLE = Path(__file__).parent.parent / 'lonely_christmass.piano'
+
+
+def _count_full_validations(monkeypatch):
+    calls = []
+    original = validation.full_score_validation
+
+    def counting(data):
+        calls.append(1)
+        return original(data)
+    monkeypatch.setattr(validation, 'full_score_validation', counting)
+    return calls
+
+
+def test_saved_file_skips_full_validation(tmp_path, monkeypatch):
+    calls = _count_full_validations(monkeypatch)
+    original = SCORE.load(str(SAMPLE))
+    assert len(calls) == 1 and original.metaInfo.schema == ''
+
+    path = tmp_path / 'saved.piano'
+    original.save(str(path))
+    assert json.loads(path.read_text(encoding='utf-8'))['metaInfo']['schema'] == schema_fingerprint()
+
+    trusted = SCORE.load(str(path))
+    assert len(calls) == 1
+    assert trusted.to_dict() == original.to_dict()
+    assert all(note.score is trusted for note in trusted.stave[0].event.note)
+
+
+def test_mismatch_runs_full_validation(tmp_path, monkeypatch):
+    path = tmp_path / 'saved.piano'
+    SCORE.load(str(SAMPLE)).save(str(path))
+    data = json.loads(path.read_text(encoding='utf-8'))
+
+    calls = _count_full_validations(monkeypatch)
+    data['metaInfo']['schema'] = 'stale'
+    path.write_text(json.dumps(data), encoding='utf-8')
+    SCORE.load(str(path))
+    assert len(calls) == 1
+
+    # Right fingerprint but an unexpected layout
+    data['metaInfo']['schema'] = schema_fingerprint()
+    del data['stave'][0]['event']['tempo']
+    path.write_text(json.dumps(data), encoding='utf-8')
+    assert not validation.is_trusted_score(data)
+    score = SCORE.load(str(path))
+    assert len(calls) == 2
+    assert score.stave[0].event.tempo == []
+
+
+def test_decode_failure_falls_back(tmp_path, monkeypatch):
+    path = tmp_path / 'saved.piano'
+    SCORE.load(str(SAMPLE)).save(str(path))
+
+    calls = _count_full_validations(monkeypatch)
+    decode = score_module.score_from_dict
+    failures = []
+
+    def failing_once(data):
+        if not failures:
+            failures.append(1)
+            raise TypeError('broken')
+        return decode(data)
+    monkeypatch.setattr(score_module, 'score_from_dict', failing_once)
+    score = SCORE.load(str(path))
+    assert failures and len(calls) == 1
+    assert score.stave[0].event.note
+
+
+def _model(field_type, default):
+    @dataclass
+    class Model:
+        x: field_type = default
+    return Model
+
+
+def test_fingerprint_follows_field_layout():
+    assert _fingerprint([_model(int, 0)]) == _fingerprint([_model(int, 0)])
+    assert _fingerprint([_model(int, 0)]) != _fingerprint([_model(float, 0)])
+    # Defaults are left out: a complete file does not depend on them
+    assert _fingerprint([_model(int, 0)]) == _fingerprint([_model(int, 5)])
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Tests for file/timeline.Timeline and SCORE.timeline(): positions match the
+old per-call baseGrid walks, queries match brute-force scans, and the cached
+timeline follows in-place baseGrid and quarterNoteUnit edits.
+
+Run with: python -m pytest tests/test_timeline.py
+"""
+import copy
+import random
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from file.SCORE import SCORE
+
+
+def _score() -> SCORE:
+    score = SCORE()
+    score.baseGrid[0].measureAmount = 5
+    score.new_basegrid(numerator=3, denominator=4, gridTimes=[100.0, 200.0], measureAmount=4)
+    score.new_basegrid(numerator=7, denominator=8, gridTimes=[150.0, 300.0, 500.0], measureAmount=3)
+    return score
+
+
+def _legacy_barlines(score):
+    # Editor._get_barline_positions before the timeline
+    positions, total = [], 0.0
+    for grid in score.baseGrid:
+        measure_ticks = (score.fileSettings.quarterNoteUnit * 4) * (grid.numerator / grid.denominator)
+        for _ in range(grid.measureAmount):
+            positions.append(total)
+            total += measure_ticks
+    return positions, total
+
+
+def _legacy_barlines_and_grid(score):
+    # Editor._get_barline_and_grid_positions before the timeline
+    positions, cursor = [], 0.0
+    for grid in score.baseGrid:
+        measure_ticks = (score.fileSettings.quarterNoteUnit * 4) * (grid.numerator / grid.denominator)
+        for _ in range(grid.measureAmount):
+            positions.append(cursor)
+            positions.extend(cursor + g for g in grid.gridTimes)
+            cursor += measure_ticks
+    return positions
+
+
+def test_positions_match_legacy_walks():
+    score = _score()
+    timeline = score.timeline()
+    barlines, total = _legacy_barlines(score)
+
+    assert list(timeline.measure_starts) == barlines
+    assert timeline.end == total
+    assert list(timeline.grid_ticks) == sorted(_legacy_barlines_and_grid(score))
+    assert [span.first_measure for span in timeline.spans] == [0, 5, 9]
+
+
+def test_queries_match_brute_force():
+    timeline = _score().timeline()
+    starts = timeline.measure_starts
+    rng = random.Random(2)
+
+    for _ in range(500):
+        a = rng.uniform(-50, timeline.end + 50)
+        b = a + rng.uniform(0, 2000)
+        assert list(timeline.barlines_between(a, b)) == [t for t in starts if a <= t < b]
+
+        measure = max([i for i, t in enumerate(starts) if t <= a] or [0])
+        assert timeline.measure_at(a) == measure
+
+        later = [t for t in timeline.grid_ticks if t > a]
+        expected = later[0] if later else (timeline.end if a < timeline.end else None)
+        assert timeline.next_gridline(a) == expected
+
+        after = [t for t in starts if t - a > 1.0]
+        assert timeline.first_barline_after(a, 1.0) == (after[0] if after else None)
+
+        tick = rng.choice(timeline.grid_ticks) + rng.choice([-1.5, -1.0, 0.0, 0.5, 1.0, 2.0])
+        assert timeline.is_on_grid(tick, 1.0) == any(abs(t - tick) <= 1.0 for t in timeline.grid_ticks)
+        assert timeline.is_on_barline(tick, 1.0) == any(abs(t - tick) <= 1.0 for t in starts)
+
+
+def test_beat_at_uses_the_span_denominator():
+    timeline = _score().timeline()
+    seven_eight = timeline.spans[2]
+    eighth = 4.0 * timeline.quarter_note_unit / 8
+
+    assert timeline.beat_at(0.0) == (0, 0.0)
+    assert timeline.beat_at(seven_eight.start + 2.5 * eighth) == (9, 2.5)
+    assert timeline.span_at(seven_eight.start - 1.0) is timeline.spans[1]
+
+
+def test_cache_follows_in_place_edits():
+    score = _score()
+    first = score.timeline()
+    assert score.timeline() is first
+
+    score.baseGrid[1].measureAmount = 6
+    assert score.timeline() is not first
+    assert score.timeline().measure_count == 14
+
+    score.baseGrid[0].gridTimes.append(50.0)
+    assert 50.0 in score.timeline().grid_ticks
+
+    score.fileSettings.quarterNoteUnit = 256.0
+    assert score.timeline().end == _legacy_barlines(score)[1]
+
+    clone = copy.deepcopy(score)
+    assert clone._timeline is None
+    assert clone.timeline().key == score.timeline().key
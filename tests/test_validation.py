@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Tests for the cached per-class field tables in file/validation.py and the
+missing/unexpected field handling built on them.
+
+Run with: python -m pytest tests/test_validation.py
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from file.articulation import Articulation
+from file.metaInfo import MetaInfo
+from file.note import Note
+from file.validation import (field_schema, get_field_defaults, get_field_mappings,
+                             validate_and_fix_object, validate_and_fix_score)
+
+
+def test_schema_is_built_once_per_class():
+    schema = field_schema(Note)
+    assert field_schema(Note) is schema
+    assert schema.code_to_json['articulation'] == 'art'
+    assert schema.json_to_code['color'] == '_color'
+    assert schema.expected == frozenset(get_field_mappings(Note).values())
+    assert 'art' in schema.factories and schema.defaults['pitch'] == 40
+
+
+def test_factory_defaults_are_fresh():
+    first, second = get_field_defaults(Note), get_field_defaults(Note)
+    assert first['art'] == [] and first['art'] is not second['art']
+
+    fixed_a, _ = validate_and_fix_object({}, Note)
+    fixed_b, _ = validate_and_fix_object({}, Note)
+    assert fixed_a['art'] is not fixed_b['art']
+
+
+def test_missing_and_unexpected_fields():
+    complete = get_field_defaults(Note)
+    fixed, warnings = validate_and_fix_object(complete, Note)
+    assert fixed == complete and fixed is not complete
+    assert warnings == []
+
+    partial = dict(complete, extra=1)
+    del partial['duration']
+    fixed, warnings = validate_and_fix_object(partial, Note, 'n')
+    assert fixed['duration'] == 100.0
+    assert any('Unexpected fields' in w and 'extra' in w for w in warnings)
+    assert any('Missing field "duration"' in w for w in warnings)
+
+
+def test_missing_schema_fingerprint_is_filled_quietly():
+    old_file = get_field_defaults(MetaInfo)
+    del old_file['schema']
+    fixed, warnings = validate_and_fix_object(old_file, MetaInfo)
+    assert fixed['schema'] == ''
+    assert warnings == []
+
+
+def test_score_events_fixed_in_place():
+    note = {'time': 0.0, 'pitch': 41, 'art': [{}]}
+    fixed, warnings = validate_and_fix_score({'stave': [{'event': {'note': [note]}}]})
+    fixed_note = fixed['stave'][0]['event']['note'][0]
+    assert fixed_note['duration'] == 100.0 and fixed_note['pitch'] == 41
+    assert fixed_note['art'][0].keys() == field_schema(Articulation).expected
+    assert any('Stave[0].note[0]' in w for w in warnings)
@@ -0,0 +1,81 @@
+'''
+Microbenchmark of Canvas deletes (headless Kivy).
+
+Usage:
+    python tools/bench_canvas_delete.py [item_count ...]
+
+For each canvas size (default 10000 and 100000 items) it reports the delete
+throughput of:
+- one by one: delete() of a random 10% of the items
+- bulk: delete_many() of another random 10% of the items
+- cursor churn: 40 'cursor' items added and removed with delete_by_tag, as the
+  editor does on every mouse move
+'''
+import gc
+import random
+import sys
+import time
+from pathlib import Path
+
+# Ensure project root is on sys.path for 'utils.*' imports
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from utils.canvas import Canvas
+
+
+def build_canvas(item_count: int, seed: int = 1) -> Canvas:
+    canvas = Canvas(width_mm=210.0, height_mm=item_count * 0.1)
+    canvas.size = (800, 600)
+    canvas._update_layout_and_redraw()
+    rng = random.Random(seed)
+    for i in range(item_count):
+        y = rng.uniform(0, canvas.height_mm)
+        if i % 2:
+            canvas.add_rectangle(10, y, 20, y + 3, fill=True, tags=['midi_note', f'note_0_{i}'])
+        else:
+            canvas.add_line(0, y, 210, y, tags=['gridline'])
+    canvas._redraw_all()
+    return canvas
+
+
+def cursor_churn(canvas: Canvas, rounds: int = 200) -> float:
+    '''Seconds per deleted item.'''
+    elapsed = 0.0
+    for r in range(rounds):
+        for i in range(40):
+            canvas.add_rectangle(i, 10 + r % 50, i + 1, 12 + r % 50, tags=['cursor'])
+        start = time.perf_counter()
+        canvas.delete_by_tag('cursor')
+        elapsed += time.perf_counter() - start
+    return elapsed / (rounds * 40)
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10000, 100000]
+    for item_count in sizes:
+        canvas = build_canvas(item_count)
+        rng = random.Random(2)
+        gc.disable()
+
+        victims = rng.sample(sorted(canvas._items), item_count // 10)
+        start = time.perf_counter()
+        for item_id in victims:
+            canvas.delete(item_id)
+        one_by_one = len(victims) / (time.perf_counter() - start)
+
+        victims = rng.sample(sorted(canvas._items), item_count // 10)
+        start = time.perf_counter()
+        canvas.delete_many(victims)
+        bulk = len(victims) / (time.perf_counter() - start)
+
+        per_item = cursor_churn(canvas)
+
+        gc.enable()
+        print(f'{item_count} items: delete() {one_by_one:,.0f} items/s, '
+              f'delete_many() {bulk:,.0f} items/s, cursor churn {per_item * 1e6:.1f} us/item')
+
+
+if __name__ == '__main__':
+    main()
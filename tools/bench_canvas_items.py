@@ -0,0 +1,77 @@
+'''
+Benchmark the Canvas item store: memory per item and full-iteration time
+on a large canvas (headless Kivy).
+
+Usage:
+    python tools/bench_canvas_items.py [item_count] [repeats]
+
+Reports the tracemalloc bytes per item after adding item_count items (note
+rectangles with a per-note tag, grid lines, polygons and measure numbers) and
+the best time of the full passes: listing all ids, the z-ordered id list the
+PDF exporter walks, and a y-range query over the whole canvas.
+'''
+import gc
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# Ensure project root is on sys.path for 'utils.*' imports
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from utils.canvas import Canvas
+
+
+def fill_canvas(canvas: Canvas, item_count: int, seed: int = 1):
+    rng = random.Random(seed)
+    for i in range(item_count):
+        y = rng.uniform(0, canvas.height_mm)
+        kind = rng.random()
+        if kind < 0.4:
+            canvas.add_rectangle(10, y, 20, y + 3, fill=True, tags=['midi_note', f'note_0_{i}'])
+        elif kind < 0.8:
+            canvas.add_line(0, y, 210, y, tags=['gridline'])
+        elif kind < 0.9:
+            canvas.add_polygon([0, y, 5, y + 3, 10, y - 2], fill=True, tags=['stem'])
+        else:
+            canvas.add_text(str(i % 100), 1, y, font_size_pt=12, tags=['measure_number'])
+
+
+def best_of(repeats: int, fn) -> float:
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    item_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    canvas = Canvas(width_mm=210.0, height_mm=item_count * 0.1)
+    canvas.size = (800, 600)
+    canvas._update_layout_and_redraw()
+
+    gc.collect()
+    tracemalloc.start()
+    fill_canvas(canvas, item_count)
+    gc.collect()
+    traced, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    gc.disable()  # keep collections of the unrelated heap out of the timings
+    items = canvas._items
+    print(f'{item_count} items: {traced / item_count:.0f} bytes/item (tracemalloc)')
+    print(f'all ids:          {best_of(repeats, items.live_ids) * 1e3:.1f} ms')
+    print(f'ids by z_index:   {best_of(repeats, items.ids_by_z) * 1e3:.1f} ms')
+    print(f'full y range:     {best_of(repeats, lambda: canvas._items_in_y_range(0.0, canvas.height_mm)) * 1e3:.1f} ms')
+    gc.enable()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+'''
+Benchmark of the editor's dirty-region note redraw (headless Kivy).
+
+Usage:
+    python tools/bench_editor_invalidate.py [note_count ...]
+
+For each piece size (default 1000 and 5000 notes) a selection of 16 notes is
+edited through the SelectionManager, as the keyboard shortcuts do. Reported
+per edit:
+- move: _move_selection_time by one grid step (and back)
+- transpose: _transpose_selection by a semitone (and back)
+- hand: _assign_selection_hand
+- full redraw: redraw_pianoroll, the cost of every edit before invalidate_notes
+'''
+import gc
+import random
+import sys
+import time
+from pathlib import Path
+
+# Ensure project root is on sys.path for 'editor.*' imports
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from editor.editor import Editor
+from file.SCORE import SCORE
+from utils.canvas import Canvas
+
+
+class FixedGridSelector:
+    '''Stands in for the GUI's GridSelector.'''
+
+    def get_grid_step(self) -> float:
+        return 128.0
+
+
+def build_editor(note_count: int, seed: int = 1) -> Editor:
+    rng = random.Random(seed)
+    score = SCORE()
+    score.baseGrid[0].measureAmount = note_count // 8 + 2
+    for i in range(note_count):
+        score.new_note(time=float((i // 2) * 256), duration=rng.choice([128.0, 256.0, 512.0]),
+                       pitch=rng.randint(20, 70), hand='<' if i % 2 else '>')
+    canvas = Canvas(width_mm=210.0, height_mm=20000.0)
+    canvas.size = (800, 600)
+    canvas._update_layout_and_redraw()
+    editor = Editor(canvas)
+    editor.grid_selector = FixedGridSelector()
+    editor.score = score
+    editor.redraw_pianoroll()
+    return editor
+
+
+def per_edit(edits, rounds: int = 20) -> float:
+    '''Seconds per call, over rounds of the given edit functions.'''
+    gc.disable()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for edit in edits:
+            edit()
+    elapsed = time.perf_counter() - start
+    gc.enable()
+    return elapsed / (rounds * len(edits))
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 5000]
+    for note_count in sizes:
+        editor = build_editor(note_count)
+        manager = editor.selection_manager
+        notes = editor.score.stave[0].event.note
+        middle = len(notes) // 2
+        manager.selected_elements = [
+            {'type': 'note', 'element': note, 'stave_idx': 0} for note in notes[middle:middle + 16]
+        ]
+        move = per_edit([lambda: manager._move_selection_time(128.0), lambda: manager._move_selection_time(-128.0)])
+        transpose = per_edit([lambda: manager._transpose_selection(1), lambda: manager._transpose_selection(-1)])
+        hand = per_edit([lambda: manager._assign_selection_hand('<'), lambda: manager._assign_selection_hand('>')])
+        full = per_edit([editor.redraw_pianoroll], rounds=3)
+        print(f'{note_count:>6} notes  move {move * 1e3:7.2f} ms  transpose {transpose * 1e3:7.2f} ms  '
+              f'hand {hand * 1e3:7.2f} ms  full redraw {full * 1e3:8.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+'''
+Benchmark the engraver layout pass: time and peak memory of
+Engraver._calculate_layout on a synthetic score.
+
+Usage:
+    python tools/bench_layout.py [note_count] [repeats]
+
+Reports the best layout time, the tracemalloc peak of one layout and the
+process peak RSS (ru_maxrss). Run it in a fresh process per measurement:
+peak RSS only ever grows.
+'''
+import random
+import resource
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# Ensure project root is on sys.path for 'file.*' / 'engraver.*' imports
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from engraver.engraver import Engraver
+from engraver.snapshot import take_snapshot
+from file.SCORE import SCORE
+
+
+def build_score(note_count: int, seed: int = 7) -> SCORE:
+    '''Two staves of chords and overlapping notes, a line break every 4 measures.'''
+    rng = random.Random(seed)
+    score = SCORE()
+    score.new_stave()
+    measures = note_count // 8 + 8
+    score.baseGrid[0].measureAmount = measures
+    for measure in range(4, measures, 4):
+        score.new_linebreak(time=measure * 1024.0)
+    cursor = 0.0
+    for _ in range(note_count):
+        if rng.random() > 0.3:
+            cursor += rng.choice([32.0, 64.0, 128.0])
+        score.new_note(stave_idx=rng.randrange(2), time=cursor,
+                       duration=rng.choice([64.0, 128.0, 256.0, 512.0, 1024.0]),
+                       pitch=rng.randint(1, 88), hand=rng.choice('<>'))
+    return score
+
+
+def main():
+    note_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    score = build_score(note_count)
+    snapshot = take_snapshot(score)
+    engraver = Engraver.__new__(Engraver)  # layout methods only, no worker thread
+    engraver._layout_cache = {}
+
+    # Silence the engraver's progress prints while measuring
+    stdout, sys.stdout = sys.stdout, open('/dev/null', 'w')
+    try:
+        tracemalloc.start()
+        layout = engraver._calculate_layout(snapshot)
+        _, traced_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        events = sum(len(line) for page in layout.DOC for line in page)
+        del layout
+
+        best = float('inf')
+        for _ in range(repeats):
+            start = time.perf_counter()
+            layout = engraver._calculate_layout(snapshot)
+            best = min(best, time.perf_counter() - start)
+            del layout
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+    print(f'{note_count} notes, {events} layout events')
+    print(f'layout time (best of {repeats}): {best:.3f}s')
+    print(f'layout allocation peak (tracemalloc): {traced_peak / 2 ** 20:.1f} MiB')
+    print(f'process peak RSS: {rss_mb:.1f} MiB')
+
+
+if __name__ == '__main__':
+    main()
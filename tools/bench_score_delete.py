@@ -0,0 +1,74 @@
+'''
+Benchmark of SCORE id lookups and deletes as the score grows.
+
+Usage:
+    python tools/bench_score_delete.py [note_count ...]
+
+For each score size (default 2000 and 20000 notes, sorted by time as the note
+tool keeps them) it reports per call:
+- lookup hit / lookup miss: lookup_id of a present and of an unknown id (a
+  miss must not rebuild the registry or drop the note index)
+- delete (sorted): delete_by_id of a random 10% of the notes
+- delete (unsorted): the same on a shuffled note list, where the identity
+  scan is used
+The per-call costs should stay flat between sizes, except for the unsorted
+delete, which scans.
+'''
+import gc
+import random
+import sys
+import time
+from pathlib import Path
+
+# Ensure project root is on sys.path for 'file.*' imports
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from file.SCORE import SCORE
+
+
+def build_score(note_count: int, seed: int = 1) -> SCORE:
+    score = SCORE()
+    rng = random.Random(seed)
+    for i in range(note_count):
+        score.new_note(time=float((i // 4) * 128), duration=128.0, pitch=rng.randint(1, 88),
+                       hand='<' if i % 2 else '>')
+    score.note_index(0)
+    return score
+
+
+def per_call(func, args) -> float:
+    '''Seconds per call of func over args.'''
+    gc.disable()
+    start = time.perf_counter()
+    for arg in args:
+        func(arg)
+    elapsed = time.perf_counter() - start
+    gc.enable()
+    return elapsed / max(1, len(args))
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [2000, 20000]
+    for note_count in sizes:
+        for shuffled in (False, True):
+            score = build_score(note_count)
+            notes = score.stave[0].event.note
+            rng = random.Random(2)
+            if shuffled:
+                rng.shuffle(notes)
+            else:
+                hit = per_call(score.lookup_id, [note.id for note in rng.sample(notes, 1000)])
+                index = score.note_index(0)
+                miss = per_call(score.lookup_id, range(10 ** 9, 10 ** 9 + 1000))
+                assert score.note_index(0) is index
+                print(f'{note_count:>7} notes  lookup hit {hit * 1e6:8.2f} us  lookup miss {miss * 1e6:8.2f} us')
+            victims = [note.id for note in rng.sample(notes, note_count // 10)]
+            delete = per_call(score.delete_by_id, victims)
+            label = 'unsorted' if shuffled else 'sorted'
+            print(f'{note_count:>7} notes  delete ({label}) {delete * 1e6:8.2f} us')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+'''
+Benchmark of SCORE.load/save on a scaled-up score.
+
+Usage:
+    python tools/bench_score_load.py [score.piano] [scale]
+
+The score (default lonely_christmass.piano) has its staves' events repeated
+`scale` times (default 100), shifted in time, and is written to a temporary
+file. Reported:
+- json: json.load of the file alone
+- validation: full_score_validation of the parsed dict
+- decode: the generated single-pass decoder vs dataclasses_json from_dict
+  followed by the old reattach/coerce walks
+- load/save: SCORE.load and SCORE.save end to end, then SCORE.load of the
+  saved file, which carries the schema fingerprint and skips full validation
+- save (dict): the old save path, json.dump of score_to_dict, with the peak
+  memory traced for it and for the streamed SCORE.save
+'''
+import copy
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import fields, is_dataclass
+from pathlib import Path
+
+# Ensure project root is on sys.path for 'file.*' imports
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from file.SCORE import SCORE
+from file.score_codec import score_from_dict, score_to_dict
+from file.validation import full_score_validation
+
+
+def scaled_score_dict(path: Path, scale: int) -> dict:
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    for stave in data['stave']:
+        events = stave['event']
+        times = [e['time'] + e.get('duration', 0) for kind in events.values() for e in kind if 'time' in e]
+        span = max(times, default=0.0)
+        for kind, items in events.items():
+            copies = []
+            for rep in range(scale):
+                for item in items:
+                    item = copy.deepcopy(item)
+                    if 'time' in item:
+                        item['time'] += rep * span
+                    copies.append(item)
+            events[kind] = copies
+    return data
+
+
+def legacy_decode(data: dict) -> SCORE:
+    '''SCORE.load's decode step before the generated codec.'''
+    score = SCORE.from_dict(data)
+    score.renumber_id()
+    score._reattach_score_references()
+
+    def _walk(obj):
+        if is_dataclass(obj):
+            for f in fields(obj):
+                val = getattr(obj, f.name)
+                if is_dataclass(val) or isinstance(val, (list, dict)):
+                    _walk(val)
+                    continue
+                jn = SCORE._json_field_name(f)
+                if jn.endswith('?') or f.name == 'visible' or f.name.endswith('Visible'):
+                    if isinstance(val, int) and not isinstance(val, bool):
+                        setattr(obj, f.name, bool(val))
+        elif isinstance(obj, list):
+            for item in obj:
+                _walk(item)
+    _walk(score)
+    return score
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def dict_save(score: SCORE, filename: str) -> None:
+    '''SCORE.save before the streaming writer.'''
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(score_to_dict(score), f, ensure_ascii=True, separators=(',', ':'))
+
+
+def traced_peak(func, *args) -> float:
+    tracemalloc.start()
+    try:
+        func(*args)
+        return tracemalloc.get_traced_memory()[1] / 1e6
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    path = Path(sys.argv[1]) if len(sys.argv) > 1 else ROOT / 'lonely_christmass.piano'
+    scale = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    data = scaled_score_dict(path, scale)
+    note_count = sum(len(stave['event'].get('note', [])) for stave in data['stave'])
+
+    fd, tmp = tempfile.mkstemp(suffix='.piano')
+    os.close(fd)
+    try:
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=True, separators=(',', ':'))
+
+        with open(tmp, 'r', encoding='utf-8') as f:
+            t_json, parsed = timed(json.load, f)
+        t_valid, (fixed, _warnings) = timed(full_score_validation, copy.deepcopy(parsed))
+        t_legacy, _ = timed(legacy_decode, copy.deepcopy(fixed))
+        t_decode, score = timed(score_from_dict, copy.deepcopy(fixed))
+        score.renumber_id()
+        t_load, score = timed(SCORE.load, tmp)
+        t_save, _ = timed(score.save, tmp)
+        t_trusted, _ = timed(SCORE.load, tmp)
+        t_dict_save, _ = timed(dict_save, score, tmp)
+        peak_save, peak_dict_save = traced_peak(score.save, tmp), traced_peak(dict_save, score, tmp)
+
+        print(f'{path.name} x{scale}: {note_count} notes, {os.path.getsize(tmp) / 1e6:.1f} MB')
+        print(f'  json.load           {t_json * 1000:8.1f} ms')
+        print(f'  validation          {t_valid * 1000:8.1f} ms')
+        print(f'  decode (legacy)     {t_legacy * 1000:8.1f} ms')
+        print(f'  decode (generated)  {t_decode * 1000:8.1f} ms  ({t_legacy / t_decode:.1f}x)')
+        print(f'  SCORE.load          {t_load * 1000:8.1f} ms')
+        print(f'  SCORE.save          {t_save * 1000:8.1f} ms  (peak {peak_save:.1f} MB)')
+        print(f'  save (dict)         {t_dict_save * 1000:8.1f} ms  (peak {peak_dict_save:.1f} MB)')
+        print(f'  SCORE.load (saved)  {t_trusted * 1000:8.1f} ms')
+    finally:
+        os.remove(tmp)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+'''
+Benchmark of SCORE validation throughput, in notes per second.
+
+Usage:
+    python tools/bench_validation.py [score.piano] [scale ...]
+
+The score (default lonely_christmass.piano) is scaled up like in
+bench_score_load.py (default scales 10 and 100). Reported per scale:
+- structural: validate_and_fix_score (field mapping and default filling)
+- full: full_score_validation (structural + cross-reference checks)
+'''
+import copy
+import sys
+import time
+from pathlib import Path
+
+# Ensure project root is on sys.path for 'file.*' imports
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from file.validation import full_score_validation, validate_and_fix_score
+from tools.bench_score_load import scaled_score_dict
+
+
+def notes_per_second(func, data: dict, note_count: int, repeats: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeats):
+        sample = copy.deepcopy(data)
+        start = time.perf_counter()
+        func(sample)
+        best = min(best, time.perf_counter() - start)
+    return note_count / best
+
+
+def main():
+    args = sys.argv[1:]
+    path = Path(args.pop(0)) if args and not args[0].isdigit() else ROOT / 'lonely_christmass.piano'
+    scales = [int(arg) for arg in args] or [10, 100]
+    for scale in scales:
+        data = scaled_score_dict(path, scale)
+        note_count = sum(len(stave['event'].get('note', [])) for stave in data['stave'])
+        structural = notes_per_second(validate_and_fix_score, data, note_count)
+        full = notes_per_second(full_score_validation, data, note_count)
+        print(f'{path.name} x{scale} ({note_count} notes): '
+              f'structural {structural:,.0f} notes/s, full {full:,.0f} notes/s')
+
+
+if __name__ == '__main__':
+    main()
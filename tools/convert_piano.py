@@ -0,0 +1,51 @@
+'''
+Convert a .piano file between the JSON and the binary container format.
+
+Usage:
+    python tools/convert_piano.py input.piano output.piano
+
+The direction follows the input: a JSON file is written as a binary container
+and a binary container as single-line JSON (as SCORE.save writes it). The
+document itself is not loaded into a SCORE, so the conversion is lossless; the
+result is read back and compared before the command reports success.
+'''
+import json
+import sys
+from pathlib import Path
+
+# Ensure project root is on sys.path for 'file.*' imports
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from file.binary_container import is_binary_score, read_binary, write_binary
+
+
+def main():
+    if len(sys.argv) != 3:
+        print(__doc__)
+        sys.exit(1)
+    source, target = sys.argv[1], sys.argv[2]
+
+    if is_binary_score(source):
+        data = read_binary(source)
+        with open(target, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=True, separators=(',', ':'))
+        with open(target, 'r', encoding='utf-8') as f:
+            converted = json.load(f)
+        kind = 'JSON'
+    else:
+        with open(source, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        write_binary(data, target)
+        converted = read_binary(target)
+        kind = 'binary'
+
+    if json.dumps(converted) != json.dumps(data):
+        print(f'Round trip of {source} does not match; {target} is not a faithful copy')
+        sys.exit(2)
+    print(f'{source} -> {target} ({kind}, {Path(source).stat().st_size} -> {Path(target).stat().st_size} bytes)')
+
+
+if __name__ == '__main__':
+    main()
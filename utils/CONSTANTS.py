@@ -32,6 +32,17 @@ MIDI_KEY_OFFSET = 20
 PIANO_KEY_COUNT = 88
 '''Total number of piano keys (1-88).'''
 
+KEY_UNIT_OFFSETS = [0]
+for _key in range(1, PIANO_KEY_COUNT + 2):
+    KEY_UNIT_OFFSETS.append(KEY_UNIT_OFFSETS[-1] + (2 if _key - 1 in BE_GAPS else 1))
+KEY_UNIT_OFFSETS = tuple(KEY_UNIT_OFFSETS)
+del _key
+'''Horizontal position of each key in semitone units (index = key number 0-89).
+
+Each key is one unit right of the previous one, two units across a BE gap
+(into keys 4, 9, 16, ...). Index 89 is one position past the top key.
+Shared by Editor.pitch_to_x/x_to_pitch and the engraver's pitch2x_view.'''
+
 MIDI_PITCH_MIN = 21
 '''Minimum MIDI pitch number (key 1).'''
 
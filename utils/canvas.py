@@ -1,15 +1,19 @@
 from typing import List, Tuple, Optional, Dict, Any, Iterable, Callable
 import math
+from bisect import bisect_left, bisect_right
 import os
+from collections import OrderedDict
 from contextlib import contextmanager
 
 from kivy.uix.widget import Widget
 from kivy.graphics import Color, Rectangle, Line, Ellipse, Mesh, InstructionGroup, PushMatrix, PopMatrix, Rotate, Translate
+from kivy.graphics.instructions import VertexInstruction
 from kivy.core.text import Label as CoreLabel
 from kivy.graphics.scissor_instructions import ScissorPush, ScissorPop
 from kivy.clock import Clock
 from kivy.core.window import Window
 from .embedded_font import get_embedded_monospace_font
+from .canvas_items import CanvasItemStore, FILL, OUTLINE, DASH, SQUARE_CAP, DEFAULT_DASH_MM
 from gui.colors import LIGHT, LIGHT_DARKER, DARK_LIGHTER, DARK, ACCENT_COLOR
 from utils.CONSTANTS import DEFAULT_GRID_STEP_TICKS
 
@@ -250,6 +254,208 @@ class CustomScrollbar(Widget):
         self.update_layout()
 
 
+class TextTextureCache:
+    '''
+    LRU cache of rasterized text textures, keyed on (text, font, px size, color).
+
+    Building a CoreLabel and calling refresh() renders every glyph of the text, and
+    the canvas used to do that for each text item on every redraw. Textures are
+    immutable once rendered, so identical labels (measure numbers, time signatures,
+    tempo marks) share one texture. The cache holds at most budget_bytes of RGBA
+    texture data and drops the least recently used textures beyond that.
+    '''
+
+    def __init__(self, budget_bytes: int = 32 * 1024 * 1024):
+        self.budget_bytes = int(budget_bytes)
+        self._entries: 'OrderedDict[Tuple[str, str, int, Tuple[float, ...]], Any]' = OrderedDict()
+        self._sizes: Dict[Tuple[str, str, int, Tuple[float, ...]], int] = {}
+        self.bytes_used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, text: str, font_name: str, font_px: int, color: Tuple[float, ...]):
+        '''Return the texture for this label, rendering it on a miss. None if nothing was rendered.'''
+        key = (text, font_name, font_px, tuple(color))
+        texture = self._entries.get(key)
+        if texture is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return texture
+
+        self.misses += 1
+        lbl = CoreLabel(text=text, font_name=font_name, font_size=font_px, color=color)
+        lbl.refresh()
+        texture = lbl.texture
+        if not texture:
+            return None
+        size = texture.width * texture.height * 4
+        if size <= self.budget_bytes:
+            self._entries[key] = texture
+            self._sizes[key] = size
+            self.bytes_used += size
+            self._evict()
+        return texture
+
+    def _evict(self):
+        while self.bytes_used > self.budget_bytes and self._entries:
+            key, _ = self._entries.popitem(last=False)
+            self.bytes_used -= self._sizes.pop(key)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+        self._sizes.clear()
+        self.bytes_used = 0
+
+    def stats(self) -> dict:
+        return {
+            'entries': len(self._entries),
+            'bytes': self.bytes_used,
+            'budget_bytes': self.budget_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+
+class MeshBatch:
+    '''
+    Triangles of many canvas items that share a layer and a color, in one Mesh.
+
+    Every piece of an item (a rectangle fill, an oval outline, a line) owns a slot:
+    a vertex range and an index range. Putting a piece again with the same counts
+    rewrites its slot in place. A released slot is collapsed to zero-area triangles
+    and reused by the next piece of the same size; the lists are compacted when
+    more than half of them is free. Vertices and indices are uploaded to the Mesh
+    by flush(), once per frame.
+    '''
+
+    MAX_VERTICES = 65535  # Mesh indices are 16 bit
+
+    def __init__(self, rgba: Tuple[float, ...]):
+        self.rgba = rgba
+        self.group = InstructionGroup()
+        self.group.add(Color(*rgba))
+        self.mesh = Mesh(mode='triangles')
+        self.group.add(self.mesh)
+        self.vertices: List[float] = []  # x, y, u, v per vertex
+        self.indices: List[int] = []
+        self._slots: Dict[Any, Tuple[int, int, int, int]] = {}  # key -> (v_start, v_count, i_start, i_count)
+        self._free: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}  # (v_count, i_count) -> [(v_start, i_start)]
+        self._free_vertices = 0
+        self.dirty = False
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def fits(self, v_count: int, i_count: int) -> bool:
+        return bool(self._free.get((v_count, i_count))) or len(self.vertices) // 4 + v_count <= self.MAX_VERTICES
+
+    def put(self, key: Any, xy: List[float], triangles: List[int]):
+        '''Store the piece key: xy is the flat vertex list, triangles indexes into it.'''
+        v_count, i_count = len(xy) // 2, len(triangles)
+        slot = self._slots.get(key)
+        if slot is not None and (slot[1], slot[3]) != (v_count, i_count):
+            self.release(key)
+            slot = None
+        if slot is None:
+            free = self._free.get((v_count, i_count))
+            if free:
+                v_start, i_start = free.pop()
+                self._free_vertices -= v_count
+            else:
+                v_start, i_start = len(self.vertices) // 4, len(self.indices)
+                self.vertices.extend([0.0] * (4 * v_count))
+                self.indices.extend([0] * i_count)
+            slot = (v_start, v_count, i_start, i_count)
+            self._slots[key] = slot
+            self.indices[i_start:i_start + i_count] = [v_start + i for i in triangles]
+
+        base = 4 * slot[0]
+        self.vertices[base:base + 4 * v_count:4] = xy[0::2]
+        self.vertices[base + 1:base + 4 * v_count:4] = xy[1::2]
+        self.dirty = True
+
+    def piece(self, key: Any) -> Tuple[List[float], List[int]]:
+        '''The (xy, triangles) of a stored piece, as they were passed to put().'''
+        v_start, v_count, i_start, i_count = self._slots[key]
+        xy = [0.0] * (2 * v_count)
+        xy[0::2] = self.vertices[4 * v_start:4 * (v_start + v_count):4]
+        xy[1::2] = self.vertices[4 * v_start + 1:4 * (v_start + v_count):4]
+        return xy, [i - v_start for i in self.indices[i_start:i_start + i_count]]
+
+    def release(self, key: Any):
+        slot = self._slots.pop(key, None)
+        if slot is None:
+            return
+        v_start, v_count, i_start, i_count = slot
+        self.dirty = True
+        if not self._slots:
+            self.vertices.clear()
+            self.indices.clear()
+            self._free.clear()
+            self._free_vertices = 0
+            return
+        self.indices[i_start:i_start + i_count] = [v_start] * i_count
+        self._free.setdefault((v_count, i_count), []).append((v_start, i_start))
+        self._free_vertices += v_count
+        if self._free_vertices * 2 > len(self.vertices) // 4:
+            self._compact()
+
+    def _compact(self):
+        vertices: List[float] = []
+        indices: List[int] = []
+        slots = {}
+        for key, (v_start, v_count, i_start, i_count) in self._slots.items():
+            new_v, new_i = len(vertices) // 4, len(indices)
+            vertices.extend(self.vertices[4 * v_start:4 * (v_start + v_count)])
+            indices.extend(i - v_start + new_v for i in self.indices[i_start:i_start + i_count])
+            slots[key] = (new_v, v_count, new_i, i_count)
+        self.vertices, self.indices, self._slots = vertices, indices, slots
+        self._free.clear()
+        self._free_vertices = 0
+
+    def flush(self):
+        '''Upload the vertex and index lists to the Mesh if they changed.'''
+        if self.dirty:
+            self.mesh.vertices = self.vertices
+            self.mesh.indices = self.indices
+            self.dirty = False
+
+
+class _BatchRun:
+    '''
+    Batched items of one layer that are consecutive in creation order among the
+    layer's drawn items and have the same piece colors (signature).
+
+    The run's group holds a fill and an outline pass group with the MeshBatch
+    chains of its colors, and sits between the layer's own item groups where its
+    items are, so batching keeps the creation order between runs and other items.
+    '''
+
+    __slots__ = ('signature', 'ids', 'passes', 'group')
+
+    def __init__(self, signature: Tuple[Tuple[int, Tuple[float, ...]], ...]):
+        self.signature = signature  # (pass, rgba) of each piece of its items
+        self.ids: List[int] = []    # sorted
+        self.passes = (InstructionGroup(), InstructionGroup())
+        self.group = InstructionGroup()
+        self.group.add(self.passes[0])
+        self.group.add(self.passes[1])
+
+
+class _LayerSlots:
+    '''Children of a layer group in draw order: item ids (own group) and _BatchRuns,
+    with the first item id of each entry in keys for bisection.'''
+
+    __slots__ = ('entries', 'keys')
+
+    def __init__(self):
+        self.entries: List[Any] = []
+        self.keys: List[int] = []
+
+
 class Canvas(Widget):
     '''
     Tkinter-like Canvas for Kivy using millimeters and top-left origin.
@@ -260,15 +466,37 @@ class Canvas(Widget):
     - Background color and border
     - Tag-based grouping and z-ordering
     - Click detection, returns top-most item handle (internal integer)
+    - Optional batching (batch_primitives): filled/outlined rectangles and ovals and
+      solid straight lines are merged into Meshes per run of same-colored items
+      that are consecutive in creation order within their layer; inside a run
+      all fills draw below all outlines
 
     Units:
     - All coordinates/sizes passed to add_* are in millimeters (mm) relative to top-left.
 
     Events:
     - bind(on_item_click=callback) -> callback(self, item_handle, touch, pos_mm)
+    - bind(on_view_change=callback) -> callback(self, y_min_mm, y_max_mm), fired by
+      _redraw_all with the visible y range before culling, so that items for the
+      new view can be added first
     '''
 
-    __events__ = ('on_item_click',)
+    __events__ = ('on_item_click', 'on_view_change')
+
+    # Rasterized text shared by all canvases (editor and print preview)
+    _text_cache = TextTextureCache()
+
+    # Viewport culling: bucket height of the y index and the buffer drawn around the viewport
+    _CULL_BUCKET_MM = 25.0
+    _CULL_MAX_BUCKETS = 256
+    _CULL_BUFFER_MM = 50.0
+    # Dashes of long vertical dashed lines are created this far (px) around the viewport
+    _DASH_BUFFER_PX = 600.0
+    # Batched geometry: segments of an oval and of a round line cap
+    _BATCH_OVAL_SEGMENTS = 32
+    _BATCH_CAP_SEGMENTS = 6
+    # Deleting more drawn items than this from one layer rebuilds it instead of one remove() each
+    _REBUILD_LAYER_MIN = 8
     
     # Class variable to track the canvas that should reclaim keyboard
     _global_keyboard_canvas = None
@@ -283,6 +511,7 @@ class Canvas(Widget):
         keep_aspect: bool = True,
         scale_to_width: bool = True,
         enable_keyboard: bool = False,  # Only enable for main editor canvas
+        batch_primitives: bool = False,
         **kwargs
     ):
         super().__init__(**kwargs)
@@ -295,6 +524,7 @@ class Canvas(Widget):
         self.border_width_px: float = border_width_px
         self.keep_aspect: bool = keep_aspect
         self.scale_to_width: bool = scale_to_width
+        self.batch_primitives: bool = batch_primitives
 
         # Viewport (in device px) where the mm-canvas is rendered
         self._view_x: int = 0
@@ -335,8 +565,22 @@ class Canvas(Widget):
             self._border_color_instr = Color(*self.border_color)
             self._border_line = Line(rectangle=(0, 0, 0, 0), width=self.border_width_px)
 
+        # Retained mode: items are tessellated once in content space (scroll 0) and the
+        # scroll is applied to all layers by this single Translate
+        self.canvas.add(PushMatrix())
+        self._scroll_translate = Translate(0, 0)
+        self.canvas.add(self._scroll_translate)
+        self._layers_root = InstructionGroup()
+        self.canvas.add(self._layers_root)
+        self.canvas.add(PopMatrix())
+        # Layout (_px_per_mm and viewport) the drawn items were tessellated for
+        self._tessellated_layout: Optional[Tuple[float, int, int, int]] = None
+        # Items tessellated only around the scroll position they were drawn at
+        # (viewport-culled dashed lines): item id -> that _scroll_px
+        self._scroll_bound_items: Dict[int, float] = {}
+
         # Layer-based instruction groups (one group per z_index layer)
-        # These are added to canvas in z-order, so layer 0 is behind layer 1, etc.
+        # These are added to the layers root in z-order, so layer 0 is behind layer 1, etc.
         self._layer_groups: Dict[int, InstructionGroup] = {}
         self._initialize_layer_groups()
 
@@ -353,13 +597,34 @@ class Canvas(Widget):
         self.canvas.add(self._overlay_bg_group)
         self.canvas.add(self._overlay_group)
 
-        # Items and tags
+        # Items and tags: column store of all items (id -> dict-like ItemView), in draw order
         self._next_id: int = 1
-        self._items: Dict[int, Dict[str, Any]] = {}
+        self._items: CanvasItemStore = CanvasItemStore(self._layer_groups)
         # Map tag -> set of item handles
         self._tag_index: Dict[str, set] = {}
-        self._draw_order: List[int] = []  # z-order (append = on top)
+        # Tags appended to every new item (see default_tagging)
+        self.default_tags: Tuple[str, ...] = ()
         self._next_z_index: int = 0  # Auto-incrementing z-index for items
+        # Layer z_index -> its children in draw order: the items that currently have an
+        # instruction group and the runs of batched items
+        self._layer_slots: Dict[int, _LayerSlots] = {}
+
+        # Spatial index for viewport culling and hit tests: the y bounds and hit box
+        # of each item are cached in the item store, and y buckets of _CULL_BUCKET_MM
+        # hold the items whose hit box overlaps them
+        self._y_buckets: Dict[int, set] = {}
+        self._tall_items: set = set()       # span more than _CULL_MAX_BUCKETS buckets
+        self._unbounded_items: set = set()  # no usable bounds; always drawn
+        self._drawn_items: set = set()      # items whose group currently holds instructions
+
+        # Batched primitives (batch_primitives): the run of each batched item, the
+        # MeshBatch chain per (run, pass, color) and the batches holding each item's
+        # pieces (part -> batch)
+        self._item_runs: Dict[int, _BatchRun] = {}
+        self._mesh_batches: Dict[Tuple[_BatchRun, int, Tuple[float, ...]], List[MeshBatch]] = {}
+        self._item_pieces: Dict[int, Dict[int, MeshBatch]] = {}
+        self._dirty_batches: set = set()
+        self._flush_batches_trigger = Clock.create_trigger(lambda dt: self._flush_batches())
 
         # Create and add custom scrollbar
         self.custom_scrollbar = CustomScrollbar(self)
@@ -826,8 +1091,8 @@ class Canvas(Widget):
         for z_index in range(len(DRAWING_LAYERS)):
             group = InstructionGroup()
             self._layer_groups[z_index] = group
-            # Add directly to canvas between background and border
-            self.canvas.add(group)
+            # Add to the scrolled layers root, between background and scissor pop
+            self._layers_root.add(group)
         
         # Also create groups for auto-increment layers (starting after defined layers)
         # We'll create these on-demand when needed
@@ -847,9 +1112,9 @@ class Canvas(Widget):
             group = InstructionGroup()
             self._layer_groups[z_index] = group
             
-            # Simply add the new layer to the canvas
+            # Append the new layer to the layers root
             # Since auto-increment z_index values are high, this will be on top
-            self.canvas.add(group)
+            self._layers_root.add(group)
         
         return self._layer_groups[z_index]
 
@@ -857,7 +1122,8 @@ class Canvas(Widget):
         '''Get statistics about canvas items and groups for debugging.
         
         Returns:
-            Dictionary with item count, layer group count, and instruction counts per layer
+            Dictionary with item count, layer group count, instruction counts per layer
+            and the text texture cache counters
         '''
         layer_stats = {}
         total_instructions = 0
@@ -870,9 +1136,19 @@ class Canvas(Widget):
             'total_items': len(self._items),
             'layer_groups': len(self._layer_groups),
             'total_instruction_groups': total_instructions,
-            'layer_details': layer_stats
+            'layer_details': layer_stats,
+            'draw_calls': self._count_draw_calls(),
+            'mesh_batches': sum(1 for chain in self._mesh_batches.values() for batch in chain if len(batch)),
+            'text_cache': self._text_cache.stats(),
         }
 
+    def _count_draw_calls(self) -> int:
+        '''Vertex instructions drawn per frame: one per primitive of the drawn item groups plus one per used Mesh batch.'''
+        calls = sum(1 for chain in self._mesh_batches.values() for batch in chain if len(batch))
+        for group in self._items.groups.values():
+            calls += sum(1 for child in group.children if isinstance(child, VertexInstruction))
+        return calls
+
     def clear(self):
         '''Remove all items.'''
         # Clear all layer groups
@@ -881,7 +1157,16 @@ class Canvas(Widget):
         
         self._items.clear()
         self._tag_index.clear()
-        self._draw_order.clear()
+        self._layer_slots.clear()
+        self._y_buckets.clear()
+        self._tall_items.clear()
+        self._unbounded_items.clear()
+        self._drawn_items.clear()
+        self._scroll_bound_items.clear()
+        self._item_runs.clear()
+        self._mesh_batches.clear()
+        self._item_pieces.clear()
+        self._dirty_batches.clear()
 
 
     def add_rectangle(
@@ -914,12 +1199,8 @@ class Canvas(Widget):
         # Determine z_index from tags or explicit value
         final_z_index = self._get_z_index_from_tags(tags or id, z_index)
         
-        # Get the layer group for this z_index
-        layer_group = self._get_layer_group(final_z_index)
-        
-        # Create individual instruction group for this item
-        item_group = InstructionGroup()
-        layer_group.add(item_group)
+        # Make sure the layer group for this z_index exists
+        self._get_layer_group(final_z_index)
 
         # Normalize to top-left (x,y) and size
         x_min = float(min(x1_mm, x2_mm))
@@ -927,25 +1208,18 @@ class Canvas(Widget):
         w_mm = abs(float(x2_mm) - float(x1_mm))
         h_mm = abs(float(y2_mm) - float(y1_mm))
 
-        self._items[item_id] = {
-            'type': 'rectangle',
-            'group': item_group,
-            'layer_group': layer_group,
-            'x_mm': x_min,
-            'y_mm': y_min,
-            'w_mm': w_mm,
-            'h_mm': h_mm,
-            'fill': bool(fill),
-            'fill_color': self._parse_color(fill_color),
-            'outline': bool(outline),
-            'outline_color': self._parse_color(outline_color),
-            'outline_w_mm': float(outline_width_mm),
-            'tags': set(tags or id or []),
-            'z_index': final_z_index,
-        }
+        self._items.add(
+            item_id, 'rectangle', final_z_index,
+            x=x_min, y=y_min, w=w_mm, h=h_mm,
+            color=self._parse_color(fill_color),
+            color2=self._parse_color(outline_color),
+            line_w=float(outline_width_mm),
+            flags=(FILL if fill else 0) | (OUTLINE if outline else 0),
+            tags=tags or id or (),
+        )
         self._register_tags(item_id)
-        self._draw_order.append(item_id)
-        self._redraw_item(item_id)
+        self._index_item(item_id)
+        self._draw_if_in_view(item_id)
         return item_id
 
     def add_oval(
@@ -973,37 +1247,26 @@ class Canvas(Widget):
         # Determine z_index from tags or explicit value
         final_z_index = self._get_z_index_from_tags(tags or id, z_index)
         
-        # Get the layer group for this z_index
-        layer_group = self._get_layer_group(final_z_index)
-        
-        # Create individual instruction group for this item
-        item_group = InstructionGroup()
-        layer_group.add(item_group)
+        # Make sure the layer group for this z_index exists
+        self._get_layer_group(final_z_index)
 
         x_min = float(min(x1_mm, x2_mm))
         y_min = float(min(y1_mm, y2_mm))
         w_mm = abs(float(x2_mm) - float(x1_mm))
         h_mm = abs(float(y2_mm) - float(y1_mm))
 
-        self._items[item_id] = {
-            'type': 'oval',
-            'group': item_group,
-            'layer_group': layer_group,
-            'x_mm': x_min,
-            'y_mm': y_min,
-            'w_mm': w_mm,
-            'h_mm': h_mm,
-            'fill': bool(fill),
-            'fill_color': self._parse_color(fill_color),
-            'outline': bool(outline),
-            'outline_color': self._parse_color(outline_color),
-            'outline_w_mm': float(outline_width_mm),
-            'tags': set(tags or id or []),
-            'z_index': final_z_index,
-        }
+        self._items.add(
+            item_id, 'oval', final_z_index,
+            x=x_min, y=y_min, w=w_mm, h=h_mm,
+            color=self._parse_color(fill_color),
+            color2=self._parse_color(outline_color),
+            line_w=float(outline_width_mm),
+            flags=(FILL if fill else 0) | (OUTLINE if outline else 0),
+            tags=tags or id or (),
+        )
         self._register_tags(item_id)
-        self._draw_order.append(item_id)
-        self._redraw_item(item_id)
+        self._index_item(item_id)
+        self._draw_if_in_view(item_id)
         return item_id
 
     def add_line(
@@ -1034,31 +1297,21 @@ class Canvas(Widget):
         # Determine z_index from tags or explicit value
         final_z_index = self._get_z_index_from_tags(tags or id, z_index)
         
-        # Get the layer group for this z_index
-        layer_group = self._get_layer_group(final_z_index)
-        
-        # Create individual instruction group for this item
-        item_group = InstructionGroup()
-        layer_group.add(item_group)
-
-        self._items[item_id] = {
-            'type': 'line',
-            'group': item_group,
-            'layer_group': layer_group,
-            'points_mm': [float(x1_mm), float(y1_mm), float(x2_mm), float(y2_mm)],
-            'color': self._parse_color(color),
-            'w_mm': float(width_mm),
-            'smooth': False,
-            'close': False,
-            'dash': bool(dash),
-            'dash_mm': (float(dash_pattern_mm[0]), float(dash_pattern_mm[1])),
-            'cap': str(cap).lower(),
-            'tags': set(tags or id or []),
-            'z_index': final_z_index,
-        }
+        # Make sure the layer group for this z_index exists
+        self._get_layer_group(final_z_index)
+
+        self._items.add(
+            item_id, 'line', final_z_index,
+            points=(float(x1_mm), float(y1_mm), float(x2_mm), float(y2_mm)),
+            color=self._parse_color(color),
+            line_w=float(width_mm),
+            flags=(DASH if dash else 0) | (0 if str(cap).lower() == 'round' else SQUARE_CAP),
+            tags=tags or id or (),
+            extra=self._dash_extra(dash_pattern_mm),
+        )
         self._register_tags(item_id)
-        self._draw_order.append(item_id)
-        self._redraw_item(item_id)
+        self._index_item(item_id)
+        self._draw_if_in_view(item_id)
         return item_id
 
     def add_polyline(
@@ -1085,28 +1338,21 @@ class Canvas(Widget):
         # Determine z_index from tags or explicit value
         final_z_index = self._get_z_index_from_tags(tags or id, z_index)
         
-        # Get the layer group for this z_index
-        layer_group = self._get_layer_group(final_z_index)
-        
-        # Create individual instruction group for this item
-        item_group = InstructionGroup()
-        layer_group.add(item_group)
-
-        self._items[item_id] = {
-            'type': 'path',
-            'group': item_group,
-            'layer_group': layer_group,
-            'points_mm': pts,
-            'color': self._parse_color(color),
-            'w_mm': float(width_mm),
-            'dash': bool(dash),
-            'dash_mm': (float(dash_pattern_mm[0]), float(dash_pattern_mm[1])),
-            'tags': set(tags or id or []),
-            'z_index': final_z_index,
-        }
+        # Make sure the layer group for this z_index exists
+        self._get_layer_group(final_z_index)
+
+        self._items.add(
+            item_id, 'path', final_z_index,
+            points=pts,
+            color=self._parse_color(color),
+            line_w=float(width_mm),
+            flags=DASH if dash else 0,
+            tags=tags or id or (),
+            extra=self._dash_extra(dash_pattern_mm),
+        )
         self._register_tags(item_id)
-        self._draw_order.append(item_id)
-        self._redraw_item(item_id)
+        self._index_item(item_id)
+        self._draw_if_in_view(item_id)
         return item_id
 
     def add_polygon(
@@ -1134,29 +1380,21 @@ class Canvas(Widget):
         # Determine z_index from tags or explicit value
         final_z_index = self._get_z_index_from_tags(tags or id, z_index)
         
-        # Get the layer group for this z_index
-        layer_group = self._get_layer_group(final_z_index)
-        
-        # Create individual instruction group for this item
-        item_group = InstructionGroup()
-        layer_group.add(item_group)
-
-        self._items[item_id] = {
-            'type': 'polygon',
-            'group': item_group,
-            'layer_group': layer_group,
-            'points_mm': pts,
-            'fill': bool(fill),
-            'fill_color': self._parse_color(fill_color),
-            'outline': bool(outline),
-            'outline_color': self._parse_color(outline_color),
-            'outline_w_mm': float(outline_width_mm),
-            'tags': set(tags or id or []),
-            'z_index': final_z_index,
-        }
+        # Make sure the layer group for this z_index exists
+        self._get_layer_group(final_z_index)
+
+        self._items.add(
+            item_id, 'polygon', final_z_index,
+            points=pts,
+            color=self._parse_color(fill_color),
+            color2=self._parse_color(outline_color),
+            line_w=float(outline_width_mm),
+            flags=(FILL if fill else 0) | (OUTLINE if outline else 0),
+            tags=tags or id or (),
+        )
         self._register_tags(item_id)
-        self._draw_order.append(item_id)
-        self._redraw_item(item_id)
+        self._index_item(item_id)
+        self._draw_if_in_view(item_id)
         return item_id
 
     def add_text(
@@ -1194,59 +1432,65 @@ class Canvas(Widget):
         # Determine z_index from tags or explicit value
         final_z_index = self._get_z_index_from_tags(tags or id, z_index)
         
-        # Get the layer group for this z_index
-        layer_group = self._get_layer_group(final_z_index)
-        
-        # Create individual instruction group for this item
-        item_group = InstructionGroup()
-        layer_group.add(item_group)
-
-        self._items[item_id] = {
-            'type': 'text',
-            'group': item_group,
-            'layer_group': layer_group,
-            'text': str(text),
-            'x_mm': float(x_mm),
-            'y_mm': float(y_mm),
-            'font_pt': float(font_size_pt),
-            'angle_deg': float(angle_deg),
-            'anchor': str(anchor or 'top_left'),
-            'color': self._parse_color(color),
-            'tags': set(tags or id or []),
-            'z_index': final_z_index,
-        }
+        # Make sure the layer group for this z_index exists
+        self._get_layer_group(final_z_index)
+
+        self._items.add(
+            item_id, 'text', final_z_index,
+            x=float(x_mm), y=float(y_mm),
+            color=self._parse_color(color),
+            tags=tags or id or (),
+            extra={
+                'text': str(text),
+                'font_pt': float(font_size_pt),
+                'angle_deg': float(angle_deg),
+                'anchor': str(anchor or 'top_left'),
+            },
+        )
         self._register_tags(item_id)
-        self._draw_order.append(item_id)
-        self._redraw_item(item_id)
+        self._index_item(item_id)
+        self._draw_if_in_view(item_id)
         return item_id
 
     # ----- Tags API -----
 
     def get_item(self, item_handle: int) -> Optional[Dict[str, Any]]:
-        '''Return the stored item dict by internal handle.'''
+        '''Return the stored item by internal handle, as a read-only dict-like view.'''
         return self._items.get(item_handle)
 
     def add_tag(self, item_handle: int, tag: str):
         if item_handle in self._items:
-            self._items[item_handle]['tags'].add(tag)
+            self._items.set_tags(item_handle, self._items.tags(item_handle) + (tag,))
             self._tag_index.setdefault(tag, set()).add(item_handle)
 
     def remove_tag(self, item_handle: int, tag: str):
         if item_handle in self._items:
-            self._items[item_handle]['tags'].discard(tag)
+            self._items.set_tags(item_handle, [t for t in self._items.tags(item_handle) if t != tag])
         if tag in self._tag_index:
             self._tag_index[tag].discard(item_handle)
             if not self._tag_index[tag]:
                 del self._tag_index[tag]
 
+    @contextmanager
+    def default_tagging(self, *tags: str):
+        '''Use tags as default_tags for the items added inside the with block.'''
+        previous = self.default_tags
+        self.default_tags = tuple(tags)
+        try:
+            yield
+        finally:
+            self.default_tags = previous
+
     def find_by_tag(self, tag: str) -> List[int]:
         return sorted(self._tag_index.get(tag, set()))
 
+    def find_all(self) -> List[int]:
+        '''All item ids in draw order.'''
+        return self._items.live_ids()
+
     def delete_by_tag(self, tag: str):
         '''Delete all items with the specified tag.'''
-        item_ids = list(self._tag_index.get(tag, set()))
-        for item_id in item_ids:
-            self.delete(item_id)
+        self.delete_many(list(self._tag_index.get(tag, ())))
 
     def _tag_draw_order(self, tags: List[str]):
         '''Reorder items so that items with the specified tags are drawn in the given order.
@@ -1281,8 +1525,7 @@ class Canvas(Widget):
             # Assign z-index based on tag position
             # Use tag_index * z_step to group items by tag
             for item_id in item_ids:
-                if item_id in self._items:
-                    self._items[item_id]['z_index'] = base_z + (tag_index * z_step)
+                self._items.set_z(item_id, base_z + (tag_index * z_step))
         
         # Rebuild canvas in z-index order (all in one operation)
         self._rebuild_canvas_by_z_order()
@@ -1297,20 +1540,49 @@ class Canvas(Widget):
 
     def delete(self, item_handle: int):
         '''Delete an item by internal handle.'''
-        item = self._items.pop(item_handle, None)
-        if not item:
-            return
+        self.delete_many((item_handle,))
+
+    def delete_many(self, item_handles: Iterable[int]):
+        '''Delete several items at once; unknown handles are ignored.
         
-        # Remove item's instruction group from its layer group
-        item_group: InstructionGroup = item['group']
-        layer_group: InstructionGroup = item.get('layer_group')
-        if layer_group:
-            layer_group.remove(item_group)
+        The instruction groups of the deleted items are detached per layer in
+        one pass, and the touched Mesh batches are flushed once.
+        '''
+        items = self._items
+        doomed = {item_id for item_id in item_handles if item_id in items}
+        if not doomed:
+            return
         
-        for tag in list(item.get('tags', [])):
-            self.remove_tag(item_handle, tag)
-        if item_handle in self._draw_order:
-            self._draw_order.remove(item_handle)
+        # Detach the instruction groups of drawn items, grouped by layer
+        by_layer: Dict[int, List[int]] = {}
+        for item_id in doomed:
+            if item_id in items.groups:
+                by_layer.setdefault(items.layer_of(item_id), []).append(item_id)
+        for layer, item_ids in by_layer.items():
+            self._release_groups(layer, item_ids)
+        
+        released_pieces = False
+        tag_index = self._tag_index
+        for item_id in doomed:
+            if item_id in self._item_pieces:
+                self._release_pieces(item_id)
+                released_pieces = True
+            self._scroll_bound_items.pop(item_id, None)
+            self._unindex_item(item_id)
+            for tag in items.tags(item_id):
+                tagged = tag_index.get(tag)
+                if tagged is not None:
+                    tagged.discard(item_id)
+                    if not tagged:
+                        del tag_index[tag]
+            items.remove(item_id)
+        if released_pieces:
+            self._flush_batches_trigger()
+
+    @property
+    def _draw_order(self) -> List[int]:
+        '''Item ids in draw order (creation order; z_index layers aside).'''
+        return list(self._items)
 
     def get_topmost_item_at_position(self, x_px: float, y_px: float) -> Optional[int]:
         """
@@ -1323,15 +1595,10 @@ class Canvas(Widget):
         Returns:
             Item ID or None if no item at position
         """
-        # Iterate through items in reverse order (top to bottom)
-        for item_id in reversed(self._draw_order):
-            if item_id not in self._items:
-                continue
-            
-            item = self._items[item_id]
-            
+        # Candidates near the point, in reverse draw order (top to bottom)
+        for item_id in self._point_in_item_candidates(x_px, y_px):
             # Check if point is within item bounds
-            if self._point_in_item(x_px, y_px, item):
+            if self._point_in_item(x_px, y_px, self._items[item_id]):
                 return item_id
         
         return None
@@ -1349,19 +1616,23 @@ class Canvas(Widget):
         """
         items_at_position = []
         
-        # Iterate through items in reverse order (top to bottom)
-        for item_id in reversed(self._draw_order):
-            if item_id not in self._items:
-                continue
-            
-            item = self._items[item_id]
-            
+        # Candidates near the point, in reverse draw order (top to bottom)
+        for item_id in self._point_in_item_candidates(x_px, y_px):
             # Check if point is within item bounds
-            if self._point_in_item(x_px, y_px, item):
+            if self._point_in_item(x_px, y_px, self._items[item_id]):
                 items_at_position.append(item_id)
         
         return items_at_position
 
+    def _point_in_item_candidates(self, x_px: float, y_px: float) -> List[int]:
+        '''Items _point_in_item may accept for this point, topmost first.
+
+        _point_in_item compares px against item mm * _px_per_mm with a 5 px
+        tolerance, so the point in mm is (x_px, y_px) / _px_per_mm.
+        '''
+        px_per_mm = max(1e-6, self._px_per_mm)
+        return self._hit_candidates(x_px / px_per_mm, y_px / px_per_mm, pad_mm=5.0 / px_per_mm)
+
     def _point_in_item(self, x_px: float, y_px: float, item: dict) -> bool:
         """
         Check if a point is within an item's bounds.
@@ -1414,7 +1685,7 @@ class Canvas(Widget):
             List of tag strings, or empty list if item not found
         """
         if item_id in self._items:
-            return self._items[item_id].get('tags', [])
+            return list(self._items.tags(item_id))
         return []
 
     # ----- Background / properties -----
@@ -1470,6 +1741,10 @@ class Canvas(Widget):
         '''Default handler (no-op). Bind to this event to handle clicks.'''
         pass
 
+    def on_view_change(self, y_min_mm: float, y_max_mm: float):
+        '''Default handler (no-op). Bind to this event to generate items for the visible range.'''
+        pass
+
     def on_touch_down(self, touch):
         # Reclaim keyboard focus when canvas is clicked
         if self._enable_keyboard and not self._keyboard:
@@ -1536,8 +1811,8 @@ class Canvas(Widget):
         # Convert to mm (top-left origin)
         mm = self._px_to_mm(*touch.pos)
 
-        # Hit test in reverse draw order (top-most first)
-        for item_id in reversed(self._draw_order):
+        # Hit test the items near the point in reverse draw order (top-most first)
+        for item_id in self._hit_candidates(*mm):
             if self._hit_test(item_id, mm):
                 self.dispatch('on_item_click', item_id, touch, mm)
                 return True
@@ -1713,6 +1988,11 @@ class Canvas(Widget):
         y_px = anchor_px - y_mm_top * self._px_per_mm
         return x_px, y_px
 
+    def _content_mm_to_px_point(self, x_mm: float, y_mm_top: float) -> Tuple[float, float]:
+        '''Convert a top-left mm point to a px point at scroll 0; _scroll_translate adds the scroll.'''
+        return (self._view_x + x_mm * self._px_per_mm,
+                self._view_y + self._view_h - y_mm_top * self._px_per_mm)
+
     def _px_to_mm(self, x_px: float, y_px: float) -> Tuple[float, float]:
         '''Convert a Kivy px point to top-left mm coordinates.'''
         mm_x = (x_px - self._view_x) / self._px_per_mm
@@ -1736,44 +2016,192 @@ class Canvas(Widget):
         return nid
 
     def _register_tags(self, item_handle: int):
-        for tag in self._items[item_handle]['tags']:
+        if self.default_tags:
+            self._items.set_tags(item_handle, self._items.tags(item_handle) + self.default_tags)
+        for tag in self._items.tags(item_handle):
             self._tag_index.setdefault(tag, set()).add(item_handle)
 
     def _redraw_all(self):
-        '''Redraw all items with viewport culling optimization.
-        
-        Only redraws items that are currently visible in the viewport,
-        significantly improving performance for large vertical piano rolls.
-        Layer groups maintain z_index order automatically.
+        '''Bring the drawn items up to date with the current scroll and layout.
+        
+        Retained mode: items are tessellated in content space, so a scroll only
+        moves the _scroll_translate. Items are (re)tessellated when _px_per_mm or
+        the viewport changed, when they enter the culled band, and for dashed
+        lines culled around an older scroll position. Items that leave the band
+        are cleared to save GPU memory. The y bucket index yields the items near
+        the viewport, so the cost follows the number of visible items.
+        on_view_change is dispatched first, so listeners can add the items of
+        the new view. Layer groups maintain z_index order automatically.
         '''
-        # Redraw items with culling
-        if self.scale_to_width and self._view_h > 0:
-            # Calculate visible Y range in mm coordinates
-            visible_y_min_mm, visible_y_max_mm = self._get_visible_y_range_mm()
-            
-            # Add buffer zone above and below viewport for smoother scrolling
-            buffer_mm = 50.0  # 50mm buffer (~2 inches) above/below visible area
-            cull_y_min_mm = max(0.0, visible_y_min_mm - buffer_mm)
-            cull_y_max_mm = min(self.height_mm, visible_y_max_mm + buffer_mm)
-            
-            # Only redraw items that intersect the visible range
-            visible_count = 0
-            for item_id, item_data in self._items.items():
-                # Always draw active UI elements like selection rectangle and cursor
-                tags = item_data.get('tags', set())
-                is_active_ui = 'selectionrect' in tags or 'cursor_line' in tags
-                
-                if is_active_ui or self._item_in_y_range(item_id, cull_y_min_mm, cull_y_max_mm):
-                    self._redraw_item(item_id)
-                    visible_count += 1
-                else:
-                    # Clear item group to save GPU memory
-                    if 'group' in item_data:
-                        item_data['group'].clear()
+        self._scroll_translate.y = self._scroll_px if self.scale_to_width else 0.0
+        layout = (self._px_per_mm, self._view_x, self._view_y, self._view_h)
+        relayout = layout != self._tessellated_layout
+        self._tessellated_layout = layout
+        
+        cull_range = self._cull_y_range_mm()
+        if cull_range is not None:
+            self.dispatch('on_view_change', *self._get_visible_y_range_mm())
+            visible = self._items_in_y_range(*cull_range)
+            visible |= self._unbounded_items
+            # Always draw active UI elements like selection rectangle and cursor
+            visible.update(self._tag_index.get('selectionrect', ()))
+            visible.update(self._tag_index.get('cursor_line', ()))
         else:
             # No culling when not in scale_to_width mode or viewport not ready
-            for item_id in self._items:
-                self._redraw_item(item_id)
+            visible = set(self._items)
+        
+        # Drop the groups of items that scrolled out, to save GPU and item memory
+        for item_id in self._drawn_items - visible:
+            self._release_group(item_id)
+            if item_id in self._item_pieces:
+                self._release_pieces(item_id)
+            self._scroll_bound_items.pop(item_id, None)
+        
+        if relayout:
+            stale = visible
+        else:
+            stale = visible - self._drawn_items
+            slack_px = self._DASH_BUFFER_PX / 2
+            stale.update(item_id for item_id, scroll_px in self._scroll_bound_items.items()
+                         if abs(scroll_px - self._scroll_px) > slack_px)
+        for item_id in stale:
+            self._redraw_item(item_id)
+        self._drawn_items = visible
+        self._flush_batches()
+
+    def _cull_y_range_mm(self) -> Optional[Tuple[float, float]]:
+        '''The y range in mm (viewport plus buffer) whose items are drawn, or None when not culling.'''
+        if not (self.scale_to_width and self._view_h > 0):
+            return None
+        visible_y_min_mm, visible_y_max_mm = self._get_visible_y_range_mm()
+        return (max(0.0, visible_y_min_mm - self._CULL_BUFFER_MM),
+                min(self.height_mm, visible_y_max_mm + self._CULL_BUFFER_MM))
+
+    def _draw_if_in_view(self, item_id: int):
+        '''Draw a new item now if it is inside the cull range; otherwise _redraw_all draws it on scroll.'''
+        cull_range = self._cull_y_range_mm()
+        tags = self._items.tags(item_id)
+        if (cull_range is None or self._item_in_y_range(item_id, *cull_range)
+                or 'selectionrect' in tags or 'cursor_line' in tags):
+            self._redraw_item(item_id)
+            if self._dirty_batches:
+                self._flush_batches_trigger()
+
+    # ---------- Internal: spatial index ----------
+
+    @staticmethod
+    def _item_y_bounds(item: Dict[str, Any]) -> Optional[Tuple[float, float]]:
+        '''(y_min, y_max) of an item in mm, or None if it has no usable bounds.'''
+        item_type = item.get('type')
+        
+        if item_type in ('rectangle', 'oval'):
+            return item['y_mm'], item['y_mm'] + item['h_mm']
+        
+        if item_type in ('line', 'path', 'polygon'):
+            # Y coordinates are the odd indices of the flat point list
+            y_coords = item.get('points_mm', [])[1::2]
+            if not y_coords:
+                return None
+            return min(y_coords), max(y_coords)
+        
+        if item_type == 'text':
+            # Text baseline is at y_mm; approximate height from font size
+            # Rough estimate: text height ~= font_size_pt * 0.35mm (assuming ~72 DPI)
+            return item['y_mm'], item['y_mm'] + item.get('font_pt', 12) * 0.35
+        
+        return None
+
+    @staticmethod
+    def _item_hit_box(item: Dict[str, Any], y_bounds: Tuple[float, float]) -> Tuple[float, float, float, float]:
+        '''Conservative (x_min, y_min, x_max, y_max) in mm that contains every point _hit_test
+        or _point_in_item can accept for this item, and its culling y bounds.'''
+        item_type = item['type']
+        
+        if item_type in ('rectangle', 'oval'):
+            tol = max(item.get('outline_w_mm', 0.25), 0.5)
+            x0, y0 = item['x_mm'], item['y_mm']
+            x1, y1 = x0 + item['w_mm'], y0 + item['h_mm']
+        
+        elif item_type == 'text':
+            # The box sits on any side of the anchor depending on 'anchor' and rotation is
+            # ignored by the hit test, so reach a full text width/height in every direction
+            font_mm = item['font_pt'] * 25.4 / 72.0
+            lines = item['text'].split('\n')
+            tol = 0.0
+            reach_x = font_mm * (max(len(line) for line in lines) + 2)
+            reach_y = font_mm * 2.0 * len(lines)
+            x0, x1 = item['x_mm'] - reach_x, item['x_mm'] + reach_x
+            y0, y1 = item['y_mm'] - reach_y, item['y_mm'] + reach_y
+        
+        else:
+            pts = item['points_mm']
+            tol = max(0.3, item.get('w_mm', 0.25) / 2.0, item.get('outline_w_mm', 0.25) / 2.0)
+            x0, x1 = min(pts[0::2]), max(pts[0::2])
+            y0, y1 = min(pts[1::2]), max(pts[1::2])
+        
+        return (x0 - tol, min(y0 - tol, y_bounds[0]), x1 + tol, max(y1 + tol, y_bounds[1]))
+
+    def _index_item(self, item_id: int):
+        '''Cache the y bounds and hit box of an item and add it to the y buckets its hit box overlaps.'''
+        item = self._items[item_id]
+        bounds = self._item_y_bounds(item)
+        if bounds is None:
+            # Nothing to cull against and nothing _hit_test could accept
+            self._unbounded_items.add(item_id)
+            return
+        hit_box = self._item_hit_box(item, bounds)
+        self._items.set_bounds(item_id, bounds, hit_box)
+        first = int(hit_box[1] // self._CULL_BUCKET_MM)
+        last = int(hit_box[3] // self._CULL_BUCKET_MM)
+        if last - first >= self._CULL_MAX_BUCKETS:
+            self._tall_items.add(item_id)
+            return
+        for bucket in range(first, last + 1):
+            self._y_buckets.setdefault(bucket, set()).add(item_id)
+
+    def _unindex_item(self, item_id: int):
+        '''Remove an item from the spatial index.'''
+        self._drawn_items.discard(item_id)
+        self._unbounded_items.discard(item_id)
+        self._tall_items.discard(item_id)
+        hit_box = self._items.hit_box(item_id)
+        if hit_box is None:
+            return
+        for bucket in range(int(hit_box[1] // self._CULL_BUCKET_MM), int(hit_box[3] // self._CULL_BUCKET_MM) + 1):
+            items = self._y_buckets.get(bucket)
+            if items is not None:
+                items.discard(item_id)
+                if not items:
+                    del self._y_buckets[bucket]
+
+    def _bucket_candidates(self, y_min_mm: float, y_max_mm: float) -> set:
+        '''Ids of the items whose bucket range overlaps [y_min_mm, y_max_mm], plus the tall items.'''
+        candidates = set()
+        buckets = self._y_buckets
+        for bucket in range(int(y_min_mm // self._CULL_BUCKET_MM), int(y_max_mm // self._CULL_BUCKET_MM) + 1):
+            items = buckets.get(bucket)
+            if items:
+                candidates |= items
+        candidates |= self._tall_items
+        return candidates
+
+    def _items_in_y_range(self, y_min_mm: float, y_max_mm: float) -> set:
+        '''Ids of the bounded items that intersect [y_min_mm, y_max_mm].'''
+        if (y_max_mm - y_min_mm) / self._CULL_BUCKET_MM > self._CULL_MAX_BUCKETS:
+            # Most of the canvas: one scan over the bounds columns beats merging buckets
+            return self._items.ids_in_y_range(y_min_mm, y_max_mm)
+        return self._items.filter_y_range(self._bucket_candidates(y_min_mm, y_max_mm), y_min_mm, y_max_mm)
+
+    def _hit_candidates(self, x_mm: float, y_mm: float, pad_mm: float = 0.0) -> List[int]:
+        '''Ids of the items whose hit box, grown by pad_mm, contains the point; topmost first.
+
+        Items are stored in creation order and ids only grow, so the reversed
+        draw order is the descending id order.
+        '''
+        hits = self._items.filter_hit_boxes(self._bucket_candidates(y_mm - pad_mm, y_mm + pad_mm),
+                                            x_mm, y_mm, pad_mm)
+        hits.sort(reverse=True)
+        return hits
 
     def _get_visible_y_range_mm(self) -> Tuple[float, float]:
         '''Calculate the visible Y range in mm coordinates based on current scroll.
@@ -1800,41 +2228,14 @@ class Canvas(Widget):
         
         Returns True if the item should be drawn, False if it can be culled.
         '''
-        item = self._items.get(item_id)
-        if not item:
+        if item_id not in self._items:
             return False
-        
-        item_type = item.get('type')
-        
-        # Get item Y bounds based on type
-        if item_type in ('rectangle', 'oval'):
-            item_y_min = item['y_mm']
-            item_y_max = item['y_mm'] + item['h_mm']
-        
-        elif item_type in ('line', 'path', 'polygon'):
-            points_mm = item.get('points_mm', [])
-            if not points_mm:
-                return True  # Draw empty items to be safe
-            
-            # Extract all Y coordinates (odd indices in flat list)
-            y_coords = [points_mm[i] for i in range(1, len(points_mm), 2)]
-            item_y_min = min(y_coords)
-            item_y_max = max(y_coords)
-        
-        elif item_type == 'text':
-            # Text baseline is at y_mm; approximate height from font size
-            item_y_min = item['y_mm']
-            # Rough estimate: text height ~= font_size_pt * 0.35mm (assuming ~72 DPI)
-            font_size_mm = item.get('font_pt', 12) * 0.35
-            item_y_max = item['y_mm'] + font_size_mm
-        
-        else:
-            # Unknown type - draw it to be safe
-            return True
+        bounds = self._items.bounds(item_id)
+        if bounds is None:
+            return True  # Items without bounds are drawn to be safe
         
         # Check intersection: item intersects range if NOT (completely above OR completely below)
-        intersects = not (item_y_max < y_min_mm or item_y_min > y_max_mm)
-        return intersects
+        return not (bounds[1] < y_min_mm or bounds[0] > y_max_mm)
 
     def _content_height_px(self) -> int:
         '''Height in pixels of the logical content at current scale.'''
@@ -1855,29 +2256,347 @@ class Canvas(Widget):
 
     def _redraw_item(self, item_id: int):
         item = self._items.get(item_id)
-        if not item:
+        if item is None:
+            return
+        self._drawn_items.add(item_id)
+        if self.batch_primitives and self._draw_batched(item_id, item):
+            self._scroll_bound_items.pop(item_id, None)
             return
-        g: InstructionGroup = item['group']
+        if item_id in self._item_pieces:
+            # No longer batched (e.g. the canvas stopped batching)
+            self._release_pieces(item_id)
+        g = self._item_group(item_id)
         g.clear()
 
+        scroll_bound = False
         t = item['type']
         if t == 'rectangle':
             self._draw_rectangle_instr(g, item)
         elif t == 'oval':
             self._draw_oval_instr(g, item)
         elif t == 'line':
-            self._draw_line_instr(g, item)
+            scroll_bound = self._draw_line_instr(g, item)
         elif t == 'path':
-            self._draw_path_instr(g, item)
+            scroll_bound = self._draw_path_instr(g, item)
         elif t == 'polygon':
             self._draw_polygon_instr(g, item)
         elif t == 'text':
             self._draw_text_instr(g, item)
+        
+        if scroll_bound:
+            self._scroll_bound_items[item_id] = self._scroll_px
+        else:
+            self._scroll_bound_items.pop(item_id, None)
+
+    def _item_group(self, item_id: int) -> InstructionGroup:
+        '''The instruction group of an item, created on first draw at its creation-order place in its layer.'''
+        group = self._items.groups.get(item_id)
+        if group is None:
+            layer = self._items.layer_of(item_id)
+            slots = self._layer_slots.setdefault(layer, _LayerSlots())
+            i = bisect_right(slots.keys, item_id)
+            if i and isinstance(slots.entries[i - 1], _BatchRun) and slots.entries[i - 1].ids[-1] > item_id:
+                # Drawn between batched items of a run: the run continues after this item
+                self._split_run(layer, i - 1, item_id)
+            group = InstructionGroup()
+            self._items.groups[item_id] = group
+            self._insert_entry(layer, i, item_id, item_id, group)
+        return group
+
+    def _release_group(self, item_id: int):
+        '''Remove the instruction group of an item that is no longer drawn.'''
+        group = self._items.groups.pop(item_id, None)
+        if group is None:
+            return
+        layer = self._items.layer_of(item_id)
+        i = bisect_left(self._layer_slots[layer].keys, item_id)
+        self._remove_entry(layer, i, group)
+        self._merge_runs_at(layer, i)
+
+    def _release_groups(self, layer: int, item_ids: List[int]):
+        '''Remove the instruction groups of several drawn items of one layer.'''
+        if len(item_ids) <= self._REBUILD_LAYER_MIN:
+            for item_id in item_ids:
+                self._release_group(item_id)
+            return
+        groups = self._items.groups
+        for item_id in item_ids:
+            del groups[item_id]
+        # Re-add the remaining item groups and runs in order, joining runs that now touch
+        slots = self._layer_slots[layer]
+        entries: List[Any] = []
+        for entry in slots.entries:
+            if isinstance(entry, _BatchRun):
+                previous = entries[-1] if entries else None
+                if isinstance(previous, _BatchRun) and previous.signature == entry.signature:
+                    self._move_run_items(entry, previous, list(entry.ids))
+                    self._drop_run(entry)
+                    continue
+            elif entry not in groups:
+                continue
+            entries.append(entry)
+        slots.entries = entries
+        slots.keys = [entry.ids[0] if isinstance(entry, _BatchRun) else entry for entry in entries]
+        layer_group = self._get_layer_group(layer)
+        layer_group.clear()
+        for entry in entries:
+            layer_group.add(entry.group if isinstance(entry, _BatchRun) else groups[entry])
+
+    def _insert_entry(self, layer: int, i: int, entry: Any, key: int, group: InstructionGroup):
+        slots = self._layer_slots.setdefault(layer, _LayerSlots())
+        slots.entries.insert(i, entry)
+        slots.keys.insert(i, key)
+        self._get_layer_group(layer).insert(i, group)
+
+    def _remove_entry(self, layer: int, i: int, group: InstructionGroup):
+        slots = self._layer_slots[layer]
+        del slots.entries[i]
+        del slots.keys[i]
+        self._get_layer_group(layer).remove(group)
+
+    # ---------- Internal: batched primitives ----------
+
+    def _draw_batched(self, item_id: int, item: Dict[str, Any]) -> bool:
+        '''Tessellate a rectangle, oval or solid straight line into the Mesh batches of its run.
+        
+        Returns False (and batches nothing) for other items; they keep their own group.
+        '''
+        t = item['type']
+        pieces = []  # (pass, rgba, xy, triangles); pass 0 = fill, 1 = outline
+        if t in ('rectangle', 'oval'):
+            x0, y0 = self._content_mm_to_px_point(item['x_mm'], item['y_mm'] + item['h_mm'])
+            w_px, h_px = item['w_mm'] * self._px_per_mm, item['h_mm'] * self._px_per_mm
+            stroke = item['outline'] and item['outline_w_mm'] > 0
+            half_w = self._stroke_half_width(max(1.0, item['outline_w_mm'] * self._px_per_mm))
+            if t == 'rectangle':
+                if item['fill']:
+                    pieces.append((0, item['fill_color'], *self._fan([x0, y0, x0 + w_px, y0,
+                                                                     x0 + w_px, y0 + h_px, x0, y0 + h_px])))
+                if stroke:
+                    outer = self._rect_outline(x0 - half_w, y0 - half_w, w_px + 2 * half_w, h_px + 2 * half_w)
+                    inner = self._rect_outline(x0 + half_w, y0 + half_w, w_px - 2 * half_w, h_px - 2 * half_w)
+                    pieces.append((1, item['outline_color'], *self._ring(outer, inner)))
+            else:
+                cx, cy, rx, ry = x0 + w_px / 2, y0 + h_px / 2, w_px / 2, h_px / 2
+                if item['fill']:
+                    pieces.append((0, item['fill_color'], *self._fan(self._ellipse_outline(cx, cy, rx, ry))))
+                if stroke:
+                    outer = self._ellipse_outline(cx, cy, rx + half_w, ry + half_w)
+                    inner = self._ellipse_outline(cx, cy, max(0.0, rx - half_w), max(0.0, ry - half_w))
+                    pieces.append((1, item['outline_color'], *self._ring(outer, inner)))
+        elif t == 'line' and not item.get('dash') and not item.get('close') and len(item['points_mm']) == 4:
+            x1, y1, x2, y2 = item['points_mm']
+            p1 = self._content_mm_to_px_point(x1, y1)
+            p2 = self._content_mm_to_px_point(x2, y2)
+            half_w = self._stroke_half_width(max(0.2, item['w_mm'] * self._px_per_mm))
+            outline = self._segment_outline(*p1, *p2, half_w, item.get('cap', 'round') == 'round')
+            pieces.append((1, item['color'], *self._fan(outline)))
+        else:
+            return False
+
+        # Batched from now on: leave the layer's item groups
+        self._release_group(item_id)
+        if not pieces:
+            self._release_pieces(item_id)
+            return True
+
+        signature = tuple((pass_idx, tuple(rgba)) for pass_idx, rgba, _, _ in pieces)
+        run = self._item_runs.get(item_id)
+        if run is not None and run.signature == signature:
+            old = self._item_pieces[item_id]
+        else:
+            self._release_pieces(item_id)
+            run = self._run_for(self._items.layer_of(item_id), item_id, signature)
+            self._item_runs[item_id] = run
+            old = {}
+        new: Dict[int, MeshBatch] = {}
+        for part, (pass_idx, rgba, xy, triangles) in enumerate(pieces):
+            batch = old.get(part)
+            if batch is None:
+                batch = self._batch_for((run, *signature[part]), len(xy) // 2, len(triangles))
+            batch.put((item_id, part), xy, triangles)
+            self._dirty_batches.add(batch)
+            new[part] = batch
+        self._item_pieces[item_id] = new
+        return True
+
+    def _batch_for(self, key: Tuple[_BatchRun, int, Tuple[float, ...]], v_count: int, i_count: int) -> MeshBatch:
+        '''A batch of this (run, pass, color) with room for a piece, created on demand.'''
+        chain = self._mesh_batches.setdefault(key, [])
+        for batch in reversed(chain):
+            if batch.fits(v_count, i_count):
+                return batch
+        run, pass_idx, rgba = key
+        batch = MeshBatch(rgba)
+        run.passes[pass_idx].add(batch.group)
+        chain.append(batch)
+        return batch
+
+    def _run_for(self, layer: int, item_id: int, signature: Tuple) -> _BatchRun:
+        '''The run a newly batched item joins: a neighbour in creation order with the same
+        signature, or a new run at its place (splitting a run it falls inside of).'''
+        slots = self._layer_slots.setdefault(layer, _LayerSlots())
+        entries = slots.entries
+        i = bisect_right(slots.keys, item_id)
+        before = entries[i - 1] if i else None
+        after = entries[i] if i < len(entries) else None
+        if isinstance(before, _BatchRun):
+            if before.signature == signature:
+                before.ids.insert(bisect_left(before.ids, item_id), item_id)
+                return before
+            if before.ids[-1] > item_id:
+                # Inside a run of other colors: the new run goes between its two parts
+                self._split_run(layer, i - 1, item_id)
+                after = None
+        if isinstance(after, _BatchRun) and after.signature == signature:
+            after.ids.insert(0, item_id)
+            slots.keys[i] = item_id
+            return after
+        run = _BatchRun(signature)
+        run.ids.append(item_id)
+        self._insert_entry(layer, i, run, item_id, run.group)
+        return run
+
+    def _split_run(self, layer: int, i: int, item_id: int):
+        '''Split the run at entry i into the items before and after item_id (moving the smaller part).'''
+        slots = self._layer_slots[layer]
+        run = slots.entries[i]
+        cut = bisect_right(run.ids, item_id)
+        head, tail = run.ids[:cut], run.ids[cut:]
+        part = _BatchRun(run.signature)
+        if len(head) < len(tail):
+            self._move_run_items(run, part, head)
+            self._insert_entry(layer, i, part, head[0], part.group)
+            slots.keys[i + 1] = tail[0]
+        else:
+            self._move_run_items(run, part, tail)
+            self._insert_entry(layer, i + 1, part, tail[0], part.group)
+
+    def _merge_runs_at(self, layer: int, i: int):
+        '''Join the entries i - 1 and i if they are runs with the same signature (moving the smaller one).'''
+        slots = self._layer_slots[layer]
+        if not 0 < i < len(slots.entries):
+            return
+        first, second = slots.entries[i - 1], slots.entries[i]
+        if not (isinstance(first, _BatchRun) and isinstance(second, _BatchRun)
+                and first.signature == second.signature):
+            return
+        if len(first.ids) < len(second.ids):
+            self._move_run_items(first, second, list(first.ids))
+            self._drop_run(first)
+            self._remove_entry(layer, i - 1, first.group)
+            slots.keys[i - 1] = second.ids[0]
+        else:
+            self._move_run_items(second, first, list(second.ids))
+            self._drop_run(second)
+            self._remove_entry(layer, i, second.group)
+
+    def _move_run_items(self, source: _BatchRun, target: _BatchRun, item_ids: List[int]):
+        '''Move the pieces of item_ids (sorted) from one run to another with the same signature.'''
+        for item_id in item_ids:
+            pieces = self._item_pieces[item_id]
+            for part, batch in pieces.items():
+                xy, triangles = batch.piece((item_id, part))
+                batch.release((item_id, part))
+                self._dirty_batches.add(batch)
+                moved = self._batch_for((target, *target.signature[part]), len(xy) // 2, len(triangles))
+                moved.put((item_id, part), xy, triangles)
+                self._dirty_batches.add(moved)
+                pieces[part] = moved
+            self._item_runs[item_id] = target
+        moving = set(item_ids)
+        source.ids = [item_id for item_id in source.ids if item_id not in moving]
+        target.ids = sorted(target.ids + item_ids)
+
+    def _drop_run(self, run: _BatchRun):
+        '''Forget the batches of an emptied run.'''
+        for pass_idx, rgba in set(run.signature):
+            for batch in self._mesh_batches.pop((run, pass_idx, rgba), ()):
+                self._dirty_batches.discard(batch)
+
+    def _release_pieces(self, item_id: int):
+        '''Remove a batched item from its run (dropping the run when it empties).'''
+        for part, batch in self._item_pieces.pop(item_id, {}).items():
+            batch.release((item_id, part))
+            self._dirty_batches.add(batch)
+        run = self._item_runs.pop(item_id, None)
+        if run is None:
+            return
+        layer = self._items.layer_of(item_id)
+        slots = self._layer_slots[layer]
+        i = bisect_right(slots.keys, item_id) - 1
+        del run.ids[bisect_left(run.ids, item_id)]
+        if run.ids:
+            slots.keys[i] = run.ids[0]
+            return
+        self._drop_run(run)
+        self._remove_entry(layer, i, run.group)
+        self._merge_runs_at(layer, i)
+
+    def _flush_batches(self):
+        for batch in self._dirty_batches:
+            batch.flush()
+        self._dirty_batches.clear()
+
+    @staticmethod
+    def _stroke_half_width(width_px: float) -> float:
+        '''Half the stroke thickness Kivy draws for Line(width=width_px): 1 px lines up to width 1.'''
+        return width_px if width_px > 1.0 else 0.5
+
+    @staticmethod
+    def _fan(outline: List[float]) -> Tuple[List[float], List[int]]:
+        '''Triangulate a convex outline (flat x, y list) as a fan around its first point.'''
+        n = len(outline) // 2
+        triangles = []
+        for i in range(1, n - 1):
+            triangles += [0, i, i + 1]
+        return outline, triangles
+
+    @staticmethod
+    def _ring(outer: List[float], inner: List[float]) -> Tuple[List[float], List[int]]:
+        '''Triangulate the band between two closed outlines with the same number of points.'''
+        n = len(outer) // 2
+        triangles = []
+        for i in range(n):
+            j = (i + 1) % n
+            triangles += [i, j, n + j, i, n + j, n + i]
+        return outer + inner, triangles
+
+    @staticmethod
+    def _rect_outline(x: float, y: float, w: float, h: float) -> List[float]:
+        w, h = max(0.0, w), max(0.0, h)
+        return [x, y, x + w, y, x + w, y + h, x, y + h]
+
+    def _ellipse_outline(self, cx: float, cy: float, rx: float, ry: float) -> List[float]:
+        outline = []
+        segments = self._BATCH_OVAL_SEGMENTS
+        for i in range(segments):
+            a = 2.0 * math.pi * i / segments
+            outline += [cx + rx * math.cos(a), cy + ry * math.sin(a)]
+        return outline
+
+    def _segment_outline(self, x1: float, y1: float, x2: float, y2: float, half_w: float,
+                         round_cap: bool) -> List[float]:
+        '''Convex outline of a stroked segment with round or square caps.'''
+        length = math.hypot(x2 - x1, y2 - y1)
+        a = math.atan2(y2 - y1, x2 - x1) if length > 0 else 0.0
+        if not round_cap:
+            dx, dy = half_w * math.cos(a), half_w * math.sin(a)
+            nx, ny = -dy, dx
+            return [x1 - dx + nx, y1 - dy + ny, x1 - dx - nx, y1 - dy - ny,
+                    x2 + dx - nx, y2 + dy - ny, x2 + dx + nx, y2 + dy + ny]
+        outline = []
+        segments = self._BATCH_CAP_SEGMENTS
+        for cx, cy, start in ((x1, y1, a + math.pi / 2), (x2, y2, a - math.pi / 2)):
+            for i in range(segments + 1):
+                b = start + math.pi * i / segments
+                outline += [cx + half_w * math.cos(b), cy + half_w * math.sin(b)]
+        return outline
 
     def _draw_rectangle_instr(self, g: InstructionGroup, item: Dict[str, Any]):
         x_mm, y_mm, w_mm, h_mm = item['x_mm'], item['y_mm'], item['w_mm'], item['h_mm']
         # Kivy uses bottom-left for pos; convert using y+height
-        pos = self._mm_to_px_point(x_mm, y_mm + h_mm)
+        pos = self._content_mm_to_px_point(x_mm, y_mm + h_mm)
         size = (w_mm * self._px_per_mm, h_mm * self._px_per_mm)
 
         if item['fill']:
@@ -1890,7 +2609,7 @@ class Canvas(Widget):
 
     def _draw_oval_instr(self, g: InstructionGroup, item: Dict[str, Any]):
         x_mm, y_mm, w_mm, h_mm = item['x_mm'], item['y_mm'], item['w_mm'], item['h_mm']
-        pos = self._mm_to_px_point(x_mm, y_mm + h_mm)
+        pos = self._content_mm_to_px_point(x_mm, y_mm + h_mm)
         size = (w_mm * self._px_per_mm, h_mm * self._px_per_mm)
 
         if item['fill']:
@@ -1901,12 +2620,13 @@ class Canvas(Widget):
             g.add(Color(*item['outline_color']))
             g.add(Line(ellipse=(*pos, *size), width=max(1.0, item['outline_w_mm'] * self._px_per_mm)))
 
-    def _draw_line_instr(self, g: InstructionGroup, item: Dict[str, Any]):
+    def _draw_line_instr(self, g: InstructionGroup, item: Dict[str, Any]) -> bool:
+        '''Returns True if dashes were culled to the area around the current scroll.'''
         pts_px = []
         pts_mm = item['points_mm']
         for i in range(0, len(pts_mm), 2):
             x_mm, y_mm = pts_mm[i], pts_mm[i + 1]
-            pts_px += list(self._mm_to_px_point(x_mm, y_mm))
+            pts_px += list(self._content_mm_to_px_point(x_mm, y_mm))
         g.add(Color(*item['color']))
         width_px = max(0.2, item['w_mm'] * self._px_per_mm)
         
@@ -1917,24 +2637,25 @@ class Canvas(Widget):
         if item.get('dash'):
             on_px = max(1.0, item['dash_mm'][0] * self._px_per_mm)
             off_px = max(1.0, item['dash_mm'][1] * self._px_per_mm)
-            self._draw_dashed_polyline(g, pts_px, width_px, on_px, off_px, cap=kivy_cap)
-        else:
-            g.add(Line(points=pts_px, width=width_px, close=item.get('close', False), cap=kivy_cap))
+            return self._draw_dashed_polyline(g, pts_px, width_px, on_px, off_px, cap=kivy_cap)
+        g.add(Line(points=pts_px, width=width_px, close=item.get('close', False), cap=kivy_cap))
+        return False
 
-    def _draw_path_instr(self, g: InstructionGroup, item: Dict[str, Any]):
+    def _draw_path_instr(self, g: InstructionGroup, item: Dict[str, Any]) -> bool:
+        '''Returns True if dashes were culled to the area around the current scroll.'''
         pts_px = []
         pts_mm = item['points_mm']
         for i in range(0, len(pts_mm), 2):
             x_mm, y_mm = pts_mm[i], pts_mm[i + 1]
-            pts_px += list(self._mm_to_px_point(x_mm, y_mm))
+            pts_px += list(self._content_mm_to_px_point(x_mm, y_mm))
         g.add(Color(*item['color']))
         width_px = max(0.2, item['w_mm'] * self._px_per_mm)
         if item.get('dash'):
             on_px = max(1.0, item['dash_mm'][0] * self._px_per_mm)
             off_px = max(1.0, item['dash_mm'][1] * self._px_per_mm)
-            self._draw_dashed_polyline(g, pts_px, width_px, on_px, off_px)
-        else:
-            g.add(Line(points=pts_px, width=width_px))
+            return self._draw_dashed_polyline(g, pts_px, width_px, on_px, off_px)
+        g.add(Line(points=pts_px, width=width_px))
+        return False
 
     def _draw_polygon_instr(self, g: InstructionGroup, item: Dict[str, Any]):
         pts_mm = item['points_mm']
@@ -1944,7 +2665,7 @@ class Canvas(Widget):
             # Convert to px vertices
             verts: List[Tuple[float, float]] = []
             for i in range(0, len(pts_mm), 2):
-                verts.append(self._mm_to_px_point(pts_mm[i], pts_mm[i + 1]))
+                verts.append(self._content_mm_to_px_point(pts_mm[i], pts_mm[i + 1]))
 
             if len(verts) >= 3:
                 # Use default Mesh vertex format (x, y, u, v); color via Color instruction
@@ -1965,7 +2686,7 @@ class Canvas(Widget):
         if item['outline'] and item['outline_w_mm'] > 0:
             pts_px: List[float] = []
             for i in range(0, len(pts_mm), 2):
-                pts_px += list(self._mm_to_px_point(pts_mm[i], pts_mm[i + 1]))
+                pts_px += list(self._content_mm_to_px_point(pts_mm[i], pts_mm[i + 1]))
             g.add(Color(*item['outline_color']))
             g.add(Line(points=pts_px, width=max(1.0, item['outline_w_mm'] * self._px_per_mm), close=True))
 
@@ -1973,20 +2694,14 @@ class Canvas(Widget):
         # Prepare label (Courier New, size in px converted from pt)
         text = item['text']
         color_rgba = item['color']
-        # Convert pt -> mm -> px (1 pt = 1/72 inch = 25.4/72 mm)
-        px_per_mm = max(1e-6, self._px_per_mm)
-        font_px = max(1.0, (item['font_pt'] * 25.4 / 72.0) * px_per_mm)
-
-        # Build CoreLabel for texture (bold to match PDF appearance)
-        lbl = CoreLabel(text=text, font_name=self._get_courier_bold_font(), font_size=font_px, color=color_rgba)
-        lbl.refresh()
-        tex = lbl.texture
+        # Rasterized label from the shared cache (bold to match PDF appearance)
+        tex = self._text_texture(text, item['font_pt'], color_rgba)
         if not tex:
             return
         w_px, h_px = tex.size
 
-        # Anchor point in px (global coordinates)
-        ax_px, ay_px = self._mm_to_px_point(item['x_mm'], item['y_mm'])
+        # Anchor point in px (content space)
+        ax_px, ay_px = self._content_mm_to_px_point(item['x_mm'], item['y_mm'])
 
         # Offsets from anchor to rectangle bottom-left
         off_x, off_y = self._anchor_offsets(item.get('anchor', 'top_left'), w_px, h_px)
@@ -2003,6 +2718,13 @@ class Canvas(Widget):
         g.add(Rectangle(texture=tex, pos=(off_x, off_y), size=(w_px, h_px)))
         g.add(PopMatrix())
 
+    def _text_texture(self, text: str, font_pt: float, color_rgba: Tuple[float, ...]):
+        '''Cached texture of a text label at the current scale.'''
+        # Convert pt -> mm -> px (1 pt = 1/72 inch = 25.4/72 mm); whole px so zoom steps share entries
+        px_per_mm = max(1e-6, self._px_per_mm)
+        font_px = max(1, int(round((font_pt * 25.4 / 72.0) * px_per_mm)))
+        return self._text_cache.get(text, self._get_courier_bold_font(), font_px, color_rgba)
+
     # ---------- Internal: hit testing ----------
 
     def _hit_test(self, item_id: int, pos_mm: Tuple[float, float]) -> bool:
@@ -2089,12 +2811,8 @@ class Canvas(Widget):
             # Simple AABB hit test ignoring rotation.
             # Compute bottom-left of the text box from the anchor and compare.
             # Convert anchor point to px, then to mm for comparison with current (x,y) mm.
-            px_per_mm = max(1e-6, self._px_per_mm)
-            # Build texture metrics similar to draw (pt -> px)
-            font_px = max(1.0, (item['font_pt'] * 25.4 / 72.0) * px_per_mm)
-            lbl = CoreLabel(text=item['text'], font_name=self._get_courier_bold_font(), font_size=font_px)
-            lbl.refresh()
-            tex = lbl.texture
+            # Same texture as the drawn label, so the same metrics
+            tex = self._text_texture(item['text'], item['font_pt'], item['color'])
             if not tex:
                 return False
             w_px, h_px = tex.size
@@ -2162,6 +2880,12 @@ class Canvas(Widget):
 
     # ---------- Helpers ----------
 
+    @staticmethod
+    def _dash_extra(dash_pattern_mm: Tuple[float, float]) -> Optional[dict]:
+        '''Item store extra for a non-default dash pattern.'''
+        dash_mm = (float(dash_pattern_mm[0]), float(dash_pattern_mm[1]))
+        return None if dash_mm == DEFAULT_DASH_MM else {'dash_mm': dash_mm}
+
     @staticmethod
     def _parse_color(color: str) -> Tuple[float, float, float, float]:
         '''Parse a '#RRGGBB' or '#RRGGBBAA' hex color into RGBA floats.'''
@@ -2185,7 +2909,8 @@ class Canvas(Widget):
         return (0.0, 0.0, 0.0, 1.0)
 
     def _draw_dashed_polyline(self, g: InstructionGroup, pts_px: List[float], width_px: float,
-                               on_px: float, off_px: float, cap: str = 'round'):
+                               on_px: float, off_px: float, cap: str = 'round',
+                               content_space: bool = True) -> bool:
         '''Render a dashed polyline given points in px using on/off dash lengths.
         
         Applies viewport culling to skip creating dash segments outside the visible area,
@@ -2194,9 +2919,14 @@ class Canvas(Widget):
         
         Args:
             cap: Line cap style - 'round' or 'square'
+            content_space: True if pts_px are content-space px (scroll 0, item layers),
+                False if they are widget px (overlays drawn outside the scroll translate)
+        
+        Returns:
+            True if dashes were culled, i.e. the line must be redrawn after scrolling away
         '''
         if len(pts_px) < 4:
-            return
+            return False
         
         # Determine if this is a predominantly vertical line
         # Only apply Y-axis viewport culling to vertical lines
@@ -2210,13 +2940,14 @@ class Canvas(Widget):
         visible_y_min_px = None
         visible_y_max_px = None
         if is_vertical and self.scale_to_width and hasattr(self, '_view_h') and self._view_h > 0:
-            # The pixel coordinates from _mm_to_px_point already include scroll offset in their calculation
-            # So we just need to check against the widget's fixed viewport bounds
-            buffer_px = 200.0  # Buffer zone to draw dashes slightly outside viewport
+            # Content-space px are drawn under the scroll translate, so the viewport
+            # shows content y in [view_y - scroll, view_y + view_h - scroll]
+            buffer_px = self._DASH_BUFFER_PX  # Buffer zone to draw dashes outside viewport
+            offset_px = self._scroll_px if content_space else 0.0
             
-            # Viewport in Kivy coordinates (fixed widget bounds)
-            viewport_bottom_y = self._view_y  # Bottom edge of widget viewport
-            viewport_top_y = self._view_y + self._view_h  # Top edge of widget viewport
+            # Viewport in the coordinates of pts_px
+            viewport_bottom_y = self._view_y - offset_px  # Bottom edge of widget viewport
+            viewport_top_y = self._view_y + self._view_h - offset_px  # Top edge of widget viewport
             
             # Visible range with buffer
             visible_y_min_px = viewport_bottom_y - buffer_px
@@ -2268,6 +2999,8 @@ class Canvas(Widget):
                 overshoot = pos - seg_len
                 remaining = max(1e-6, (on_px if on else off_px) - overshoot)
             cx, cy = nx, ny
+        
+        return culled_count > 0
 
     # ---------- Grid-based cursor snapping ----------
     
@@ -2343,7 +3076,8 @@ class Canvas(Widget):
         dash_length = 5.0  # 5px on
         gap_length = 3.0   # 3px off
         points = [cursor_x_px, y_bottom, cursor_x_px, y_top]
-        self._draw_dashed_polyline(self._cursor_line_instr, points, 1.0, dash_length, gap_length)
+        self._draw_dashed_polyline(self._cursor_line_instr, points, 1.0, dash_length, gap_length,
+                                   content_space=False)
         
         # Add cursor to canvas (on top of everything)
         self.canvas.add(self._cursor_line_instr)
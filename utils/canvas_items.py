@@ -0,0 +1,382 @@
+'''
+Struct-of-arrays storage for Canvas items.
+
+The canvas used to keep every item as a dict with string keys, a tag set, a
+point list and its own InstructionGroup: well over a kilobyte per item, and
+a dict lookup per field when iterating. CanvasItemStore keeps the same data
+in parallel typed columns (array module), one row per item in creation order,
+which is also the draw order:
+
+- kind, z_index and layer codes and the fill/outline/dash/... flags
+- geometry (x, y, w, h, line width) and the cached culling bounds and hit box
+- the points of lines, paths and polygons, in one shared array
+- colors and tag tuples, interned to small integer ids
+
+Text labels and custom dash patterns, which few items have, live in a side
+table keyed by item id. Instruction groups only exist for the items that are
+currently drawn (see Canvas._item_group) and are held in groups.
+
+The store is a Mapping from item id to ItemView, a read-only dict-like view
+with the keys the item dicts used to have, so get_item(), the PDF exporter
+and the editor keep working. Bulk queries (ids, ids_by_z, the y-range and
+hit-box filters of the spatial index) run over the columns directly, and
+over zero-copy NumPy views of them when NumPy is installed.
+'''
+
+from array import array
+from collections.abc import Mapping
+from itertools import compress
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import numpy as np  # Optional: vectorized bulk queries over the columns
+except ImportError:
+    np = None
+
+KINDS = ('', 'rectangle', 'oval', 'line', 'path', 'polygon', 'text')  # code 0 = deleted row
+KIND_CODES = {name: code for code, name in enumerate(KINDS) if name}
+
+# Flag bits
+FILL = 1
+OUTLINE = 2
+DASH = 4
+SMOOTH = 8
+CLOSE = 16
+SQUARE_CAP = 32
+BOUNDED = 64
+
+DEFAULT_DASH_MM = (2.0, 2.0)
+
+# Column name -> array typecode
+_COLUMNS = (
+    ('ids', 'q'), ('kind', 'b'), ('flags', 'B'), ('z', 'q'), ('layer', 'q'),
+    ('x', 'd'), ('y', 'd'), ('w', 'd'), ('h', 'd'), ('line_w', 'd'),
+    ('color', 'i'), ('color2', 'i'), ('tagset', 'i'),
+    ('pts_at', 'q'), ('pts_n', 'i'),
+    ('y0', 'd'), ('y1', 'd'), ('hx0', 'd'), ('hy0', 'd'), ('hx1', 'd'), ('hy1', 'd'),
+)
+
+
+class CanvasItemStore(Mapping):
+    '''Canvas items as parallel columns; a Mapping of item id -> ItemView.'''
+
+    def __init__(self, layer_groups: Optional[Dict[int, Any]] = None):
+        # The canvas' z_index -> layer InstructionGroup map, for ItemView['layer_group']
+        self.layer_groups = layer_groups if layer_groups is not None else {}
+        self.groups: Dict[int, Any] = {}  # item id -> InstructionGroup, drawn items only
+        self.colors: List[Tuple[float, ...]] = []
+        self._color_ids: Dict[Tuple[float, ...], int] = {}
+        self.clear()
+
+    def clear(self):
+        '''Remove all items (interned colors are kept).'''
+        self.tagsets: List[Tuple[str, ...]] = []
+        self._tagset_ids: Dict[Tuple[str, ...], int] = {}
+        for name, typecode in _COLUMNS:
+            setattr(self, name, array(typecode))
+        self.points = array('d')
+        self.extras: Dict[int, dict] = {}
+        self.groups.clear()
+        self._rows: Dict[int, int] = {}  # live item id -> row
+        self._live = 0
+
+    # ------------------ Mapping ------------------
+
+    def __len__(self) -> int:
+        return self._live
+
+    def __iter__(self) -> Iterator[int]:
+        '''Item ids in creation (draw) order.'''
+        return iter(self.live_ids())
+
+    def live_ids(self) -> List[int]:
+        '''List of the item ids in creation (draw) order.'''
+        if np is not None:
+            live = np.frombuffer(self.kind, dtype=np.int8) != 0
+            return np.frombuffer(self.ids, dtype=np.int64)[live].tolist()
+        return list(compress(self.ids, self.kind))
+
+    def __contains__(self, item_id: object) -> bool:
+        return isinstance(item_id, int) and self.row(item_id) >= 0
+
+    def __getitem__(self, item_id: int) -> 'ItemView':
+        if self.row(item_id) < 0:
+            raise KeyError(item_id)
+        return ItemView(self, item_id)
+
+    def get(self, item_id: int, default=None):
+        return ItemView(self, item_id) if self.row(item_id) >= 0 else default
+
+    def row(self, item_id: int) -> int:
+        '''Row of an item, -1 if there is no such item.'''
+        return self._rows.get(item_id, -1)
+
+    # ------------------ Adding and removing ------------------
+
+    def add(self, item_id: int, kind: str, z_index: int, *, layer: Optional[int] = None,
+            x: float = 0.0, y: float = 0.0, w: float = 0.0, h: float = 0.0,
+            points: Optional[Iterable[float]] = None, color: Optional[Tuple[float, ...]] = None,
+            color2: Optional[Tuple[float, ...]] = None, line_w: float = 0.0, flags: int = 0,
+            tags: Iterable[str] = (), extra: Optional[dict] = None) -> int:
+        '''Append an item; ids must be increasing. Returns its row.'''
+        if self.ids and item_id <= self.ids[-1]:
+            raise ValueError(f'item id {item_id} is not larger than the last one')
+        row = len(self.ids)
+        self._rows[item_id] = row
+
+        self.ids.append(item_id)
+        self.kind.append(KIND_CODES[kind])
+        self.flags.append(flags)
+        self.z.append(z_index)
+        self.layer.append(z_index if layer is None else layer)
+        self.x.append(x)
+        self.y.append(y)
+        self.w.append(w)
+        self.h.append(h)
+        self.line_w.append(line_w)
+        self.color.append(self.color_id(color) if color is not None else -1)
+        self.color2.append(self.color_id(color2) if color2 is not None else -1)
+        self.tagset.append(self.tagset_id(tags))
+        self.pts_at.append(len(self.points))
+        if points is not None:
+            self.points.extend(points)
+        self.pts_n.append(len(self.points) - self.pts_at[row])
+        for column in (self.y0, self.y1, self.hx0, self.hy0, self.hx1, self.hy1):
+            column.append(0.0)
+        if extra:
+            self.extras[item_id] = extra
+        self._live += 1
+        return row
+
+    def remove(self, item_id: int) -> bool:
+        '''Delete an item; returns False if it did not exist.'''
+        row = self.row(item_id)
+        if row < 0:
+            return False
+        del self._rows[item_id]
+        self.kind[row] = 0
+        self.flags[row] = 0  # not BOUNDED: out of the column scans
+        self.extras.pop(item_id, None)
+        self.groups.pop(item_id, None)
+        self._live -= 1
+        dead = len(self.ids) - self._live
+        if dead > 1024 and dead > self._live:
+            self._compact()
+        return True
+
+    def _compact(self):
+        '''Drop deleted rows (and their points), keeping the row order.'''
+        rows = [row for row in range(len(self.ids)) if self.kind[row]]
+        old = {name: getattr(self, name) for name, _ in _COLUMNS}
+        old_points = self.points
+        for name, typecode in _COLUMNS:
+            column = old[name]
+            setattr(self, name, array(typecode, [column[row] for row in rows]))
+        self.points = array('d')
+        pts_at = self.pts_at
+        for new_row, row in enumerate(rows):
+            at, n = old['pts_at'][row], old['pts_n'][row]
+            pts_at[new_row] = len(self.points)
+            self.points.extend(old_points[at:at + n])
+
+        self._rows = {item_id: new_row for new_row, item_id in enumerate(self.ids)}
+
+    # ------------------ Interning ------------------
+
+    def color_id(self, rgba: Tuple[float, ...]) -> int:
+        rgba = tuple(rgba)
+        color_id = self._color_ids.get(rgba)
+        if color_id is None:
+            color_id = self._color_ids[rgba] = len(self.colors)
+            self.colors.append(rgba)
+        return color_id
+
+    def tagset_id(self, tags: Iterable[str]) -> int:
+        tagset = tuple(dict.fromkeys(tags))  # unique, in the given order
+        tagset_id = self._tagset_ids.get(tagset)
+        if tagset_id is None:
+            tagset_id = self._tagset_ids[tagset] = len(self.tagsets)
+            self.tagsets.append(tagset)
+        return tagset_id
+
+    # ------------------ Per-item fields ------------------
+
+    def tags(self, item_id: int) -> Tuple[str, ...]:
+        row = self.row(item_id)
+        return self.tagsets[self.tagset[row]] if row >= 0 else ()
+
+    def set_tags(self, item_id: int, tags: Iterable[str]):
+        row = self.row(item_id)
+        if row >= 0:
+            self.tagset[row] = self.tagset_id(tags)
+
+    def set_z(self, item_id: int, z_index: int):
+        row = self.row(item_id)
+        if row >= 0:
+            self.z[row] = z_index
+
+    def layer_of(self, item_id: int) -> int:
+        return self.layer[self.row(item_id)]
+
+    def points_of(self, row: int) -> List[float]:
+        at = self.pts_at[row]
+        return self.points[at:at + self.pts_n[row]].tolist()
+
+    # ------------------ Spatial index columns ------------------
+
+    def set_bounds(self, item_id: int, y_bounds: Tuple[float, float], hit_box: Tuple[float, float, float, float]):
+        '''Cache the culling y bounds and the hit box (x0, y0, x1, y1) of an item, in mm.'''
+        row = self.row(item_id)
+        self.y0[row], self.y1[row] = y_bounds
+        self.hx0[row], self.hy0[row], self.hx1[row], self.hy1[row] = hit_box
+        self.flags[row] |= BOUNDED
+
+    def bounds(self, item_id: int) -> Optional[Tuple[float, float]]:
+        row = self.row(item_id)
+        if row < 0 or not self.flags[row] & BOUNDED:
+            return None
+        return self.y0[row], self.y1[row]
+
+    def hit_box(self, item_id: int) -> Optional[Tuple[float, float, float, float]]:
+        row = self.row(item_id)
+        if row < 0 or not self.flags[row] & BOUNDED:
+            return None
+        return self.hx0[row], self.hy0[row], self.hx1[row], self.hy1[row]
+
+    def filter_y_range(self, item_ids: Iterable[int], y_min: float, y_max: float) -> set:
+        '''The ids among item_ids (bounded items) whose y bounds intersect [y_min, y_max].'''
+        rows, y0, y1 = self._rows, self.y0, self.y1
+        result = set()
+        for item_id in item_ids:
+            row = rows[item_id]
+            if not (y1[row] < y_min or y0[row] > y_max):
+                result.add(item_id)
+        return result
+
+    def filter_hit_boxes(self, item_ids: Iterable[int], x: float, y: float, pad: float) -> List[int]:
+        '''The ids among item_ids (bounded items) whose hit box, grown by pad, contains (x, y).'''
+        rows = self._rows
+        hx0, hy0, hx1, hy1 = self.hx0, self.hy0, self.hx1, self.hy1
+        result = []
+        for item_id in item_ids:
+            row = rows[item_id]
+            if hx0[row] - pad <= x <= hx1[row] + pad and hy0[row] - pad <= y <= hy1[row] + pad:
+                result.append(item_id)
+        return result
+
+    def ids_in_y_range(self, y_min: float, y_max: float) -> set:
+        '''Ids of all bounded items whose y bounds intersect [y_min, y_max], by a full column scan.'''
+        if np is not None:
+            bounded = (np.frombuffer(self.flags, dtype=np.uint8) & BOUNDED) != 0
+            hits = bounded & (np.frombuffer(self.y1) >= y_min) & (np.frombuffer(self.y0) <= y_max)
+            return set(np.frombuffer(self.ids, dtype=np.int64)[hits].tolist())
+        flags, y0, y1 = self.flags, self.y0, self.y1
+        return {item_id for row, item_id in enumerate(self.ids)
+                if flags[row] & BOUNDED and not (y1[row] < y_min or y0[row] > y_max)}
+
+    def ids_by_z(self) -> List[int]:
+        '''Live item ids sorted by z_index, creation order within the same z_index.'''
+        if np is not None:
+            live = np.flatnonzero(np.frombuffer(self.kind, dtype=np.int8))
+            order = live[np.argsort(np.frombuffer(self.z, dtype=np.int64)[live], kind='stable')]
+            return np.frombuffer(self.ids, dtype=np.int64)[order].tolist()
+        rows = [row for row in range(len(self.ids)) if self.kind[row]]
+        rows.sort(key=self.z.__getitem__)
+        ids = self.ids
+        return [ids[row] for row in rows]
+
+
+def _flag(bit: int):
+    return lambda store, row, item_id: bool(store.flags[row] & bit)
+
+
+def _column(name: str):
+    return lambda store, row, item_id: getattr(store, name)[row]
+
+
+def _extra(key: str, default=None):
+    return lambda store, row, item_id: store.extras.get(item_id, {}).get(key, default)
+
+
+_COMMON = {
+    'type': lambda store, row, item_id: KINDS[store.kind[row]],
+    'group': lambda store, row, item_id: store.groups.get(item_id),
+    'layer_group': lambda store, row, item_id: store.layer_groups.get(store.layer[row]),
+    'tags': lambda store, row, item_id: frozenset(store.tagsets[store.tagset[row]]),
+    'z_index': _column('z'),
+}
+_BOX = {'x_mm': _column('x'), 'y_mm': _column('y'), 'w_mm': _column('w'), 'h_mm': _column('h')}
+_SHAPE = {
+    'fill': _flag(FILL),
+    'fill_color': lambda store, row, item_id: store.colors[store.color[row]],
+    'outline': _flag(OUTLINE),
+    'outline_color': lambda store, row, item_id: store.colors[store.color2[row]],
+    'outline_w_mm': _column('line_w'),
+}
+_STROKE = {
+    'points_mm': lambda store, row, item_id: store.points_of(row),
+    'color': lambda store, row, item_id: store.colors[store.color[row]],
+    'w_mm': _column('line_w'),
+    'dash': _flag(DASH),
+    'dash_mm': _extra('dash_mm', DEFAULT_DASH_MM),
+}
+
+# Kind code -> key -> getter(store, row, item_id); the keys each kind's item dict used to have
+_GETTERS: Tuple[Dict[str, Any], ...] = (
+    {},
+    {**_COMMON, **_BOX, **_SHAPE},
+    {**_COMMON, **_BOX, **_SHAPE},
+    {**_COMMON, **_STROKE, 'smooth': _flag(SMOOTH), 'close': _flag(CLOSE),
+     'cap': lambda store, row, item_id: 'square' if store.flags[row] & SQUARE_CAP else 'round'},
+    {**_COMMON, **_STROKE},
+    {**_COMMON, 'points_mm': _STROKE['points_mm'], **_SHAPE},
+    {**_COMMON, 'x_mm': _column('x'), 'y_mm': _column('y'),
+     'text': _extra('text', ''), 'font_pt': _extra('font_pt', 12.0), 'angle_deg': _extra('angle_deg', 0.0),
+     'anchor': _extra('anchor', 'top_left'),
+     'color': lambda store, row, item_id: store.colors[store.color[row]]},
+)
+
+
+class ItemView(Mapping):
+    '''Read-only dict-like view of one stored item, with the keys of the old item dicts.
+
+    Fields are read from the store on access; use the Canvas API (add_tag,
+    remove_tag, tag_draw_order) to change an item.
+    '''
+
+    __slots__ = ('_store', 'id')
+
+    def __init__(self, store: CanvasItemStore, item_id: int):
+        self._store = store
+        self.id = item_id
+
+    def _getters(self) -> Tuple[int, Dict[str, Any]]:
+        row = self._store.row(self.id)
+        return row, (_GETTERS[self._store.kind[row]] if row >= 0 else {})
+
+    def __getitem__(self, key: str):
+        row, getters = self._getters()
+        getter = getters.get(key)
+        if getter is None:
+            raise KeyError(key)
+        return getter(self._store, row, self.id)
+
+    def get(self, key: str, default=None):
+        row, getters = self._getters()
+        getter = getters.get(key)
+        return default if getter is None else getter(self._store, row, self.id)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._getters()[1]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._getters()[1])
+
+    def __len__(self) -> int:
+        return len(self._getters()[1])
+
+    def __repr__(self) -> str:
+        return f'ItemView({self.id}, {dict(self)!r})'
+
+
+__all__ = ['CanvasItemStore', 'ItemView', 'KINDS']
@@ -365,12 +365,19 @@ def export_canvas_to_pdf(
     Example:
         from utils.pymupdf_converter import export_canvas_to_pdf
         
-        # Export canvas to PDF
+        # Export canvas to PDF (a virtualized editor's canvas is filled with the whole score first)
         export_canvas_to_pdf(editor.canvas, 'score.pdf')
     """
     if fitz is None:
         raise ImportError("PyMuPDF (fitz) is required for PDF export")
     
+    # A virtualized piano roll only holds the items around its viewport
+    editor = getattr(canvas, 'piano_roll_editor', None)
+    if editor is not None and getattr(editor, 'virtualized', False):
+        with editor.full_canvas():
+            return export_canvas_to_pdf(canvas, filepath,
+                                        page_width_mm=page_width_mm, page_height_mm=page_height_mm)
+    
     # Use canvas dimensions if not specified
     width_mm = page_width_mm if page_width_mm is not None else canvas.width_mm
     height_mm = page_height_mm if page_height_mm is not None else canvas.height_mm
@@ -392,14 +399,10 @@ def _export_canvas_items_to_page(canvas: Canvas, page: Any):
         canvas: Canvas widget containing items to export
         page: PyMuPDF Page object to draw on
     """
-    # Get all items sorted by z-index
-    sorted_items = sorted(
-        canvas._items.items(),
-        key=lambda x: x[1].get('z_index', 0)
-    )
-    
-    # Export each item in z-order
-    for item_id, item_data in sorted_items:
+    # Export each item in z-order (creation order within a z-index)
+    items = canvas._items
+    for item_id in items.ids_by_z():
+        item_data = items[item_id]
         item_type = item_data.get('type')
         
         try:
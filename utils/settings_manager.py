@@ -35,6 +35,8 @@ DEFAULTS: Dict[str, Any] = {
     'auto_save_interval_in_seconds': 30,  # 0 = instant autosave; >0 = interval in seconds
     'recent_files': [],
     'midi_port': '',
+    # Only generate the piano roll items around the viewport (faster for long pieces)
+    'virtualized_editor': True,
 }
 
 